@@ -1,6 +1,7 @@
 """API modules."""
 from .routes import router
+from .admin import admin_router
 from .websocket_manager import manager
 
-__all__ = ["router", "manager"]
+__all__ = ["router", "admin_router", "manager"]
 
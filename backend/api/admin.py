@@ -0,0 +1,144 @@
+"""Admin-only API routes (require the X-Admin-Token header)."""
+import asyncio
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+from config import get_settings
+from utils import get_logger
+from database import SessionLocal
+from services.embeddings import embedding_stats
+from services.job_archiver import job_archiver
+from utils.profiling import profiler, PROFILE_MODES
+from utils.query_log import query_stats, SORT_KEYS
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without the configured admin token (all of them if none is set)."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (set ADMIN_TOKEN to enable it)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+admin_router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@admin_router.get("/profiling")
+async def get_profiling():
+    """Profiler status and stored results, newest first."""
+    return profiler.status()
+
+
+@admin_router.post("/profiling/cycles")
+async def profile_cycles(
+    count: int = Query(1, ge=1, le=100, description="Number of upcoming fetch runs to profile"),
+    mode: str = Query("sampling", description=f"Profiler: {' or '.join(PROFILE_MODES)}"),
+    memory: bool = Query(False, description="Also record top allocations with tracemalloc")
+):
+    """
+    Profile the next fetch runs.
+    
+    Sampling mode covers every thread (scraping, scoring pool, worker drain);
+    cProfile mode only sees the event loop thread, including every other
+    task that runs on it during the fetch run.
+    """
+    try:
+        profiler.arm_cycles(count, mode=mode, memory=memory)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return profiler.status()
+
+
+@admin_router.post("/profiling/requests")
+async def profile_requests(
+    count: int = Query(10, ge=1, le=1000, description="Number of requests to profile"),
+    mode: str = Query("cprofile", description=f"Profiler: {' or '.join(PROFILE_MODES)}"),
+    memory: bool = Query(False, description="Also record top allocations with tracemalloc"),
+    sample_rate: float = Query(1.0, gt=0.0, le=1.0, description="Share of matching requests to profile"),
+    path_prefix: str = Query("/api/jobs", description="Only profile requests under this path")
+):
+    """
+    Profile a sample of upcoming API requests.
+    
+    cProfile mode records the event loop thread, so concurrent requests that
+    run while a profiled one is awaiting show up in its profile.
+    """
+    try:
+        profiler.arm_requests(count, mode=mode, memory=memory, sample_rate=sample_rate, path_prefix=path_prefix)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return profiler.status()
+
+
+@admin_router.delete("/profiling")
+async def disarm_profiling():
+    """Stop profiling new runs and requests."""
+    profiler.disarm()
+    return profiler.status()
+
+
+@admin_router.get("/profiling/results/{result_id}/{fmt}")
+async def download_profile(result_id: str, fmt: str):
+    """
+    Download a profiling result.
+    
+    - **pstats**: cProfile dump (``python -m pstats``, snakeviz)
+    - **collapsed**: collapsed stacks for flamegraph.pl / speedscope
+    - **allocations**: top tracemalloc allocators as JSON
+    """
+    path = profiler.result_path(result_id, fmt)
+    
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile result not found")
+    
+    return FileResponse(path, filename=path.name, media_type="application/octet-stream")
+
+
+@admin_router.get("/queries")
+async def get_query_stats(
+    sort: str = Query("total_ms", description=f"Sort by: {', '.join(SORT_KEYS)}"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Per-statement aggregates since startup (or the last reset).
+    
+    Statements are grouped by fingerprint (literals and placeholders
+    normalized). Slow SELECTs carry the plan captured on their first slow run.
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_KEYS)}")
+    return {
+        "enabled": settings.query_stats_enabled,
+        "slow_query_ms": settings.slow_query_ms,
+        "queries": query_stats.snapshot(sort=sort, limit=limit),
+    }
+
+
+@admin_router.delete("/queries")
+async def reset_query_stats():
+    """Clear the statement aggregates."""
+    query_stats.reset()
+    return {"message": "Query statistics reset"}
+
+
+@admin_router.get("/embeddings")
+async def get_embedding_stats():
+    """Embedding micro-batcher counters: cache hits, batches and model throughput (texts/sec)."""
+    return embedding_stats()
+
+
+@admin_router.post("/retention")
+async def run_retention():
+    """Archive jobs past their retention age now, then ANALYZE (and VACUUM if retention_vacuum is on)."""
+    def run():
+        db = SessionLocal()
+        try:
+            return job_archiver.run(db)
+        finally:
+            db.close()
+    
+    return await asyncio.to_thread(run)
@@ -1,16 +1,29 @@
 """API routes."""
+import asyncio
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from typing import List, Optional
+from config import get_settings
 from database import get_db
-from models import Job, Resume, JobStatus, JobLabel
-from schemas import JobResponse, ResumeResponse
+from models import DEFAULT_PROFILE, Embedding, Job, JobScore, Resume, FetchRun, JobStatus, JobLabel
+from schemas import JobResponse, ResumeResponse, FetchRunResponse, SimilarJobResponse
 from services import ResumeParser
+from services.embedding_store import embedding_store, JOB, RESUME
+from services.job_archiver import job_archiver
+from services.job_exporter import EXPORT_FORMATS, JobExporter, parquet_available
+from services.job_read_model import job_read_model
+from services.profile_scores import ProfileScores
+from services.run_recorder import RunRecorder
+from services.skill_index import SkillIndex
 from api.websocket_manager import manager
 from utils import get_logger
+from utils.response_cache import response_cache
 
 logger = get_logger(__name__)
+settings = get_settings()
 router = APIRouter()
 
 
@@ -30,8 +43,12 @@ async def get_jobs(
     company: Optional[str] = Query(None, description="Filter by company name"),
     remote_only: bool = Query(False, description="Show only remote jobs"),
     search: Optional[str] = Query(None, description="Search in title or description"),
+    skills: Optional[List[str]] = Query(None, description="Filter by matched skills (repeat or comma-separate)"),
+    skills_mode: str = Query("all", pattern="^(all|any)$", description="all: jobs with every skill, any: with at least one"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of jobs to return"),
     offset: int = Query(0, ge=0, description="Number of jobs to skip"),
+    include_archived: bool = Query(False, description="Also search jobs moved to the retention archives"),
+    profile: Optional[str] = Query(None, description="Score and label jobs for this resume profile"),
     db: Session = Depends(get_db)
 ):
     """
@@ -41,24 +58,83 @@ async def get_jobs(
     - **company**: Filter by company name (partial match)
     - **remote_only**: Show only remote positions
     - **search**: Search term for title or description
+    - **skills**: Matched skills, from the skill index (e.g. ``skills=kubernetes,go``)
+    - **skills_mode**: ``all`` (AND) or ``any`` (OR) of the skills
     - **limit**: Maximum results to return
     - **offset**: Pagination offset
+    - **include_archived**: Merge in archived jobs (slower - reads the archive files)
+    - **profile**: Use one team member's scores (default: the best score across profiles)
     """
-    query = db.query(Job).filter(Job.status == JobStatus.CLASSIFIED)
+    skill_names = SkillIndex.parse(skills)
+    match_all = skills_mode == "all"
+    if skill_names and include_archived:
+        raise HTTPException(status_code=400, detail="include_archived can't be combined with skills")
+    if skill_names and profile is not None:
+        # The skill index holds the best profile's keywords, not each profile's
+        raise HTTPException(status_code=400, detail="profile can't be combined with skills")
+    
+    if profile is not None:
+        if include_archived:
+            raise HTTPException(status_code=400, detail="include_archived can't be combined with profile")
+        resume = _resume_or_404(db, profile)
+        query = (
+            db.query(Job, JobScore)
+            .join(JobScore, and_(JobScore.job_id == Job.id, JobScore.resume_id == resume.id))
+            .filter(*_job_filters(None, company, remote_only, search))
+        )
+        if label:
+            query = query.filter(JobScore.label == label)
+        rows = query.order_by(JobScore.score.desc()).offset(offset).limit(limit).all()
+        return [_profile_view(job, score, profile) for job, score in rows]
+    
+    query = db.query(Job).filter(*_job_filters(label, company, remote_only, search, skill_names, match_all))
+    
+    # Order by score (descending) and limit
+    if settings.read_model_enabled and not search and not skill_names and not include_archived:
+        # Page ids from the in-memory columns, rows by primary key
+        job_read_model.ensure_loaded(db)
+        ids = job_read_model.query(label=label, company=company, remote_only=remote_only, offset=offset, limit=limit)
+        jobs = _jobs_by_id(db, ids)
+    elif include_archived:
+        # Merge the best offset + limit of both sources, then page
+        hot = query.order_by(Job.score.desc()).limit(offset + limit).all()
+        archived = job_archiver.search(
+            label=label.value if label else None, company=company, remote_only=remote_only,
+            search=search, limit=offset + limit
+        )
+        merged = sorted(hot + archived, key=lambda job: _score_of(job), reverse=True)
+        jobs = merged[offset:offset + limit]
+    else:
+        jobs = query.order_by(Job.score.desc()).offset(offset).limit(limit).all()
+    
+    logger.info(f"Retrieved {len(jobs)} jobs with filters: label={label}, company={company}, remote_only={remote_only}, search={search}, skills={skill_names}")
+    
+    return jobs
+
+
+def _job_filters(
+    label: Optional[JobLabel], company: Optional[str], remote_only: bool, search: Optional[str],
+    skills: List[str] = (), match_all: bool = True
+) -> list:
+    """WHERE clauses shared by the job list, the export and the skill facets."""
+    filters = [
+        Job.status == JobStatus.CLASSIFIED,
+        Job.canonical_job_id.is_(None)  # Hide near-duplicate clones
+    ]
     
     # Apply filters
     if label:
-        query = query.filter(Job.label == label)
+        filters.append(Job.label == label)
     
     if company:
-        query = query.filter(Job.company.ilike(f"%{company}%"))
+        filters.append(Job.company.ilike(f"%{company}%"))
     
     if remote_only:
-        query = query.filter(Job.type == "remote")
+        filters.append(Job.type == "remote")
     
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        filters.append(
             or_(
                 Job.title.ilike(search_term),
                 Job.description.ilike(search_term),
@@ -66,12 +142,94 @@ async def get_jobs(
             )
         )
     
-    # Order by score (descending) and limit
-    jobs = query.order_by(Job.score.desc()).offset(offset).limit(limit).all()
+    if skills:
+        filters.append(SkillIndex.filter(list(skills), match_all))
     
-    logger.info(f"Retrieved {len(jobs)} jobs with filters: label={label}, company={company}, remote_only={remote_only}, search={search}")
+    return filters
+
+
+def _jobs_by_id(db: Session, ids: List[int]) -> List[Job]:
+    """Load jobs in the order of ids, dropping any no longer visible (the read model lags by a poll)."""
+    if not ids:
+        return []
+    rows = {job.id: job for job in db.query(Job).filter(Job.id.in_(ids), *_job_filters(None, None, False, None))}
+    return [rows[job_id] for job_id in ids if job_id in rows]
+
+
+def _profile_view(job: Job, score: JobScore, profile: str) -> dict:
+    """A job carrying one profile's score and label instead of the best one."""
+    view = JobResponse.model_validate(job).model_dump()
+    view.update(
+        score=score.score,
+        label=score.label,
+        keywords_matched=score.keywords_matched,
+        llm_reasoning=score.llm_reasoning,
+        profile=profile
+    )
+    return view
+
+
+def _resume_for(db: Session, profile: Optional[str]) -> Optional[Resume]:
+    """A profile's resume; without a profile, the first one uploaded."""
+    if profile is not None:
+        return db.query(Resume).filter(Resume.profile == profile).first()
+    return db.query(Resume).order_by(Resume.id).first()
+
+
+def _resume_or_404(db: Session, profile: Optional[str]) -> Resume:
+    resume = _resume_for(db, profile)
+    if not resume:
+        detail = f"No resume for profile '{profile}'" if profile is not None else "No resume found"
+        raise HTTPException(status_code=404, detail=detail)
+    return resume
+
+
+def _score_of(job) -> float:
+    """Score of a stored job or an archived record."""
+    score = job["score"] if isinstance(job, dict) else job.score
+    return score or 0.0
+
+
+@router.get("/jobs/export")
+async def export_jobs(
+    fmt: str = Query("ndjson", alias="format", description="ndjson, csv or parquet"),
+    label: Optional[JobLabel] = Query(None, description="Filter by job label (best/mid/least)"),
+    company: Optional[str] = Query(None, description="Filter by company name"),
+    remote_only: bool = Query(False, description="Show only remote jobs"),
+    search: Optional[str] = Query(None, description="Search in title or description"),
+    skills: Optional[List[str]] = Query(None, description="Filter by matched skills (repeat or comma-separate)"),
+    skills_mode: str = Query("all", pattern="^(all|any)$", description="all: jobs with every skill, any: with at least one"),
+    include_archived: bool = Query(False, description="Append jobs moved to the retention archives"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream every job matching the /api/jobs filters (no paging).
     
-    return jobs
+    Rows come from a server-side cursor in ``export_batch_rows`` batches and
+    are written as they are read, so large exports use constant memory.
+    Parquet files get one row group per batch.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export needs pyarrow installed")
+    skill_names = SkillIndex.parse(skills)
+    if skill_names and include_archived:
+        raise HTTPException(status_code=400, detail="include_archived can't be combined with skills")
+    
+    exporter = JobExporter(db.get_bind())
+    statement = exporter.statement(_job_filters(label, company, remote_only, search, skill_names, skills_mode == "all"))
+    archived = job_archiver.iter_matches(
+        label=label.value if label else None, company=company, remote_only=remote_only, search=search
+    ) if include_archived else ()
+    
+    media_type, suffix = EXPORT_FORMATS[fmt]
+    filename = f"jobs-{datetime.now().strftime('%Y%m%d')}{suffix}"
+    return StreamingResponse(
+        exporter.stream(statement, fmt, archived),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/jobs/{job_id}", response_model=JobResponse)
@@ -85,15 +243,45 @@ async def get_job(job_id: int, db: Session = Depends(get_db)):
     return job
 
 
+@router.get("/jobs/{job_id}/similar", response_model=List[SimilarJobResponse])
+async def get_similar_jobs(
+    job_id: int,
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of jobs to return"),
+    db: Session = Depends(get_db)
+):
+    """Jobs most similar to a given job, by embedding cosine similarity."""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    vector = embedding_store.get(db, JOB, job_id)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="No embedding stored for this job (is EMBEDDING_ENABLED set?)")
+    
+    return _similar_jobs(db, vector, limit, exclude=[job_id])
+
+
 @router.get("/jobs/stats/summary")
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(
+    profile: Optional[str] = Query(None, description="Count labels of this resume profile"),
+    db: Session = Depends(get_db)
+):
     """Get statistics summary of jobs."""
     total_jobs = db.query(Job).count()
     classified_jobs = db.query(Job).filter(Job.status == JobStatus.CLASSIFIED).count()
+    duplicate_jobs = db.query(Job).filter(Job.canonical_job_id.isnot(None)).count()
     
-    best_fit = db.query(Job).filter(Job.label == JobLabel.BEST_FIT).count()
-    mid_fit = db.query(Job).filter(Job.label == JobLabel.MID_FIT).count()
-    least_fit = db.query(Job).filter(Job.label == JobLabel.LEAST_FIT).count()
+    if profile is not None:
+        counts = ProfileScores.counts(db, _resume_or_404(db, profile))
+        best_fit = counts.get(JobLabel.BEST_FIT, 0)
+        mid_fit = counts.get(JobLabel.MID_FIT, 0)
+        least_fit = counts.get(JobLabel.LEAST_FIT, 0)
+    else:
+        canonical = db.query(Job).filter(Job.canonical_job_id.is_(None))
+        best_fit = canonical.filter(Job.label == JobLabel.BEST_FIT).count()
+        mid_fit = canonical.filter(Job.label == JobLabel.MID_FIT).count()
+        least_fit = canonical.filter(Job.label == JobLabel.LEAST_FIT).count()
     
     remote_jobs = db.query(Job).filter(Job.type == "remote").count()
     hybrid_jobs = db.query(Job).filter(Job.type == "hybrid").count()
@@ -102,6 +290,7 @@ async def get_stats(db: Session = Depends(get_db)):
     return {
         "total_jobs": total_jobs,
         "classified_jobs": classified_jobs,
+        "duplicate_jobs": duplicate_jobs,
         "by_label": {
             "best_fit": best_fit,
             "mid_fit": mid_fit,
@@ -115,14 +304,58 @@ async def get_stats(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/jobs/facets/skills")
+async def get_skill_facets(
+    label: Optional[JobLabel] = Query(None, description="Filter by job label (best/mid/least)"),
+    company: Optional[str] = Query(None, description="Filter by company name"),
+    remote_only: bool = Query(False, description="Show only remote jobs"),
+    search: Optional[str] = Query(None, description="Search in title or description"),
+    skills: Optional[List[str]] = Query(None, description="Filter by matched skills (repeat or comma-separate)"),
+    skills_mode: str = Query("all", pattern="^(all|any)$", description="all: jobs with every skill, any: with at least one"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of skills to return"),
+    db: Session = Depends(get_db)
+):
+    """Matched-skill counts over the jobs the /api/jobs filters select, most common first."""
+    filters = _job_filters(label, company, remote_only, search, SkillIndex.parse(skills), skills_mode == "all")
+    return SkillIndex.facets(db, filters, limit=limit)
+
+
+@router.get("/runs", response_model=List[FetchRunResponse])
+async def get_runs(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of runs to return"),
+    offset: int = Query(0, ge=0, description="Number of runs to skip"),
+    db: Session = Depends(get_db)
+):
+    """Get fetch run history, most recent first."""
+    return RunRecorder.list_runs(db, limit=limit, offset=offset)
+
+
+@router.get("/runs/{run_id}", response_model=FetchRunResponse)
+async def get_run(run_id: int, db: Session = Depends(get_db)):
+    """Get a specific fetch run by ID."""
+    run = db.query(FetchRun).filter(FetchRun.id == run_id).first()
+    
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    
+    return run
+
+
+@router.get("/resumes", response_model=List[ResumeResponse])
+async def get_resumes(db: Session = Depends(get_db)):
+    """List the resume profiles every fetched job is scored against."""
+    return db.query(Resume).order_by(Resume.id).all()
+
+
 @router.post("/resume/upload", response_model=ResumeResponse)
 async def upload_resume(
     file: UploadFile = File(...),
+    profile: str = Query(DEFAULT_PROFILE, min_length=1, description="Profile (team member) the resume belongs to"),
     db: Session = Depends(get_db)
 ):
     """
-    Upload and parse a resume (PDF or text).
-    Only ONE resume is allowed - uploading a new one replaces the existing one.
+    Upload and parse a resume (PDF or text) for a profile.
+    One resume per profile - uploading again replaces that profile's resume.
     """
     try:
         content = await file.read()
@@ -136,38 +369,82 @@ async def upload_resume(
         # Parse resume
         parsed_data = ResumeParser.parse_text(text)
         
-        # DELETE all existing resumes (only one allowed)
-        db.query(Resume).delete()
+        # Replace the profile's resume in place, keeping its job scores
+        resume = db.query(Resume).filter(Resume.profile == profile).first()
+        if resume is None:
+            resume = Resume(profile=profile)
+            db.add(resume)
+        else:
+            # The stored resume embedding was computed from the old text
+            db.query(Embedding).filter(Embedding.kind == RESUME, Embedding.owner_id == resume.id).delete()
         
-        # Create new resume entry (no embedding, no is_active)
-        resume = Resume(
-            filename=file.filename,
-            content=parsed_data["content"],
-            skills=parsed_data["skills"],
-            experiences=parsed_data["experiences"],
-            education=parsed_data["education"]
-        )
+        resume.filename = file.filename
+        resume.content = parsed_data["content"]
+        resume.skills = parsed_data["skills"]
+        resume.experiences = parsed_data["experiences"]
+        resume.education = parsed_data["education"]
+        resume.created_at = datetime.now()
         
-        db.add(resume)
         db.commit()
         db.refresh(resume)
+        response_cache.bump("resume uploaded")
         
-        logger.info(f"Uploaded and parsed resume: {file.filename}")
+        logger.info(f"Uploaded and parsed resume for profile '{profile}': {file.filename}")
         logger.info(f"  - Skills: {len(parsed_data['skills'])}")
         logger.info(f"  - Experiences: {len(parsed_data['experiences'])}")
         logger.info(f"  - Education: {len(parsed_data['education'])}")
         
         return resume
-        
+    
     except Exception as e:
         logger.error(f"Error uploading resume: {e}")
         raise HTTPException(status_code=400, detail=f"Error processing resume: {str(e)}")
 
 
+@router.get("/resume/matches", response_model=List[SimilarJobResponse])
+async def get_resume_matches(
+    limit: int = Query(20, ge=1, le=200, description="Maximum number of jobs to return"),
+    profile: Optional[str] = Query(None, description="Resume profile (default: the first one)"),
+    db: Session = Depends(get_db)
+):
+    """Jobs nearest to a profile's resume by embedding similarity (no LLM call)."""
+    resume = _resume_or_404(db, profile)
+    
+    try:
+        # Embedding the resume may load the model - keep it off the event loop
+        vector = await asyncio.to_thread(embedding_store.resume_vector, db, resume)
+    except Exception as e:
+        logger.error(f"Error embedding resume: {e}")
+        raise HTTPException(status_code=503, detail=f"Embedding model unavailable: {e}")
+    
+    return _similar_jobs(db, vector, limit)
+
+
+def _similar_jobs(db: Session, vector, limit: int, exclude: List[int] = ()) -> List[dict]:
+    """Nearest visible jobs to a vector, most similar first."""
+    embedding_store.refresh(db)
+    # Over-fetch: neighbors may be unclassified, duplicates or deleted
+    neighbors = embedding_store.nearest(vector, limit * 2, exclude=exclude)
+    jobs = {
+        job.id: job for job in db.query(Job).filter(
+            Job.id.in_([job_id for job_id, _ in neighbors]),
+            Job.status == JobStatus.CLASSIFIED,
+            Job.canonical_job_id.is_(None)
+        )
+    }
+    return [
+        {"job": jobs[job_id], "similarity": similarity}
+        for job_id, similarity in neighbors if job_id in jobs
+    ][:limit]
+
+
 @router.get("/resume/current", response_model=ResumeResponse)
-async def get_current_resume(db: Session = Depends(get_db)):
-    """Get the current resume (only one allowed)."""
-    resume = db.query(Resume).first()
+async def get_current_resume(
+    profile: Optional[str] = Query(None, description="Resume profile (default: the first one)"),
+    db: Session = Depends(get_db)
+):
+    """Get a profile's resume."""
+    resume = _resume_for(db, profile)
     
     if not resume:
         raise HTTPException(status_code=404, detail="No resume found. Please upload a resume first.")
@@ -176,15 +453,26 @@ async def get_current_resume(db: Session = Depends(get_db)):
 
 
 @router.delete("/resume/delete")
-async def delete_resume(db: Session = Depends(get_db)):
-    """Delete the current resume."""
-    deleted_count = db.query(Resume).delete()
-    db.commit()
+async def delete_resume(
+    profile: Optional[str] = Query(None, description="Profile to delete (default: every profile)"),
+    db: Session = Depends(get_db)
+):
+    """Delete a profile's resume and its job scores."""
+    query = db.query(Resume)
+    if profile is not None:
+        query = query.filter(Resume.profile == profile)
+    resumes = query.all()
     
-    if deleted_count == 0:
+    if not resumes:
         raise HTTPException(status_code=404, detail="No resume found to delete.")
     
-    logger.info("Resume deleted")
+    for resume in resumes:
+        ProfileScores.remove_profile(db, resume)
+    if job_read_model.loaded:
+        job_read_model.refresh(db)  # Best scores changed
+    response_cache.bump("resume deleted")
+    
+    logger.info(f"Deleted {len(resumes)} resume profile(s)")
     return {"message": "Resume deleted successfully"}
 
 
@@ -208,7 +496,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 {"type": "heartbeat", "message": "pong"},
                 websocket
             )
-            
+    
     except WebSocketDisconnect:
         manager.disconnect(websocket)
         logger.info("WebSocket client disconnected")
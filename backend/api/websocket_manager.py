@@ -2,6 +2,7 @@
 from typing import List
 from fastapi import WebSocket
 from utils import get_logger
+from utils.metrics import BROADCAST_SECONDS, WEBSOCKET_CLIENTS
 
 logger = get_logger(__name__)
 
@@ -11,6 +12,7 @@ class ConnectionManager:
     
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        WEBSOCKET_CLIENTS.set_function(lambda: len(self.active_connections))
     
     async def connect(self, websocket: WebSocket):
         """Accept and store a new WebSocket connection."""
@@ -35,12 +37,13 @@ class ConnectionManager:
         """Broadcast a message to all connected WebSockets."""
         disconnected = []
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
+        with BROADCAST_SECONDS.time():
+            for connection in self.active_connections:
+                try:
+                    await connection.send_json(message)
+                except Exception as e:
+                    logger.error(f"Error broadcasting to connection: {e}")
+                    disconnected.append(connection)
         
         # Clean up disconnected clients
         for connection in disconnected:
@@ -52,7 +55,7 @@ class ConnectionManager:
             "type": "new_job",
             "data": job_data
         })
-        logger.info(f"Broadcasted new job: {job_data.get('job_id', 'unknown')}")
+        logger.debug(f"Broadcasted new job: {job_data.get('job_id', 'unknown')}")
 
 
 # Global connection manager instance
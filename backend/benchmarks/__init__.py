@@ -0,0 +1 @@
+"""Benchmark harness: synthetic JobSpy data, a fake OpenAI server and the pipeline runner."""
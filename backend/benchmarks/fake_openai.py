@@ -0,0 +1,146 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers ``POST /v1/chat/completions`` with a deterministic scoring reply
+after a configurable latency (plus uniform jitter), and rejects a share
+of requests with 429 so retry and fallback paths get exercised. Point the
+app at it with ``OPENAI_BASE_URL=<server.url>``.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+_SKILLS = ["python", "sql", "docker", "aws", "react", "kubernetes", "postgresql", "fastapi"]
+
+
+class FakeOpenAI:
+    """
+    Threaded HTTP server speaking enough of the OpenAI API for JobScorer.
+    
+    Usage::
+    
+        with FakeOpenAI(latency_ms=300, jitter_ms=100, rate_limit_ratio=0.05) as server:
+            client = OpenAI(base_url=server.url, api_key="test")
+    """
+    
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after_ms: int = 20,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after_ms = retry_after_ms
+        self.stats: Dict[str, int] = {"requests": 0, "completions": 0, "rate_limited": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL for the OpenAI client."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    def start(self) -> "FakeOpenAI":
+        """Serve on a free localhost port in a background thread."""
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, payload, headers = fake.respond(self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Shut the server down."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self) -> "FakeOpenAI":
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def respond(self, path: str, body: bytes) -> tuple:
+        """(status, JSON payload, extra headers) for one request, after the simulated latency."""
+        with self._lock:
+            self.stats["requests"] += 1
+            limited = self._rng.random() < self.rate_limit_ratio
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+        
+        if limited:
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            return 429, {
+                "error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}
+            }, {"retry-after-ms": str(self.retry_after_ms)}
+        
+        if not path.rstrip("/").endswith("/chat/completions"):
+            return 404, {"error": {"message": f"Unknown path {path}", "type": "invalid_request_error"}}, {}
+        
+        time.sleep(delay)
+        request = json.loads(body or b"{}")
+        prompt = "".join(str(message.get("content", "")) for message in request.get("messages", []))
+        with self._lock:
+            self.stats["completions"] += 1
+        return 200, self.completion(prompt, request.get("model", "gpt-4o-mini")), {}
+    
+    @staticmethod
+    def completion(prompt: str, model: str) -> dict:
+        """Chat completion with a score derived from the prompt (same prompt, same score)."""
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        lowered = prompt.lower()
+        reply = {
+            "score": digest[0] % 101,
+            "reasoning": "Synthetic score from the benchmark server.",
+            "matched_skills": [skill for skill in _SKILLS if skill in lowered][:5],
+        }
+        content = json.dumps(reply)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "id": f"chatcmpl-{digest[:6].hex()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
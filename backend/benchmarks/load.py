@@ -0,0 +1,539 @@
+"""Read-path load test: REST queries and WebSocket fan-out against one API worker.
+
+Starts ``uvicorn main:app`` (one worker) on a scratch SQLite database seeded
+with synthetic classified jobs, then for ``--duration`` seconds:
+
+- fires a mix of /api/jobs filter, search and paging queries and stats calls
+  open-loop at ``--rps`` (latency counts from the scheduled send time, so a
+  saturated server can't hide queueing),
+- keeps ``--ws-clients`` /api/ws connections open, a ``--slow-clients``
+  share of them reading only every ``--slow-delay-ms``,
+- commits newly classified jobs at ``--write-rate`` per second, as the
+  scheduler's workers would, which the API broadcasts to every client.
+
+It reports request latency percentiles per query kind, broadcast delivery
+(commit -> received, and the spread between the first and last client
+receiving a job), and the server's event-loop lag from /metrics:
+
+    python -m benchmarks.load                                    # 100 req/s, 500 clients, 20 s
+    python -m benchmarks.load --rps 300 --ws-clients 3000 --slow-clients 0.1
+    python -m benchmarks.load --find-capacity --slo-p95-ms 250   # raise req/s until p95 breaks the SLO
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import COMPANIES, SKILLS, make_jobs_frame
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+_LAG_METRIC = "jobagent_event_loop_lag_seconds"
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max of values in seconds, as milliseconds."""
+    if not values:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    array = np.asarray(values) * 1000.0
+    p50, p95, p99 = np.percentile(array, [50, 95, 99])
+    return {
+        "count": len(values),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(array.max()), 2),
+    }
+
+
+def histogram_quantiles(buckets: List[Tuple[float, float]], quantiles=(0.5, 0.95, 0.99)) -> Dict[str, Optional[float]]:
+    """
+    Quantiles (ms) of a Prometheus histogram, interpolating linearly within buckets.
+    
+    Args:
+        buckets: (upper bound in seconds, cumulative count) pairs, +Inf last
+    """
+    total = buckets[-1][1] if buckets else 0
+    result = {f"p{round(q * 100)}_ms": None for q in quantiles}
+    if not total:
+        return result
+    for q in quantiles:
+        rank = q * total
+        lower_bound, lower_count = 0.0, 0.0
+        for bound, count in buckets:
+            if count >= rank:
+                if bound == float("inf"):
+                    value = lower_bound  # Beyond the last finite bucket - report its bound
+                else:
+                    share = (rank - lower_count) / (count - lower_count) if count > lower_count else 1.0
+                    value = lower_bound + (bound - lower_bound) * share
+                result[f"p{round(q * 100)}_ms"] = round(value * 1000.0, 2)
+                break
+            lower_bound, lower_count = bound, count
+    return result
+
+
+def parse_lag_buckets(metrics_text: str) -> List[Tuple[float, float]]:
+    """Cumulative event-loop lag buckets from a /metrics page."""
+    from prometheus_client.parser import text_string_to_metric_families
+    for family in text_string_to_metric_families(metrics_text):
+        if family.name == _LAG_METRIC:
+            return sorted(
+                (float(sample.labels["le"]), sample.value)
+                for sample in family.samples if sample.name.endswith("_bucket")
+            )
+    return []
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _raise_fd_limit(needed: int):
+    """Lift the open-file soft limit so thousands of sockets fit (server inherits it)."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+def _server_peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak RSS of the server process (Linux only)."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+class LoadTest:
+    """One API worker under a configurable read and broadcast load."""
+    
+    def __init__(self, args: argparse.Namespace, workdir: str):
+        self.args = args
+        self.workdir = workdir
+        self.port = args.port or _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.rng = random.Random(args.seed)
+        self.server: Optional[subprocess.Popen] = None
+        self.receipts: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)  # job_id -> (time, slow)
+        self.commits: Dict[str, float] = {}  # job_id -> commit time
+        self.connected = 0
+        self.ws_errors = 0
+        self._written = 0
+    
+    # ===== Setup =====
+    
+    def environment(self) -> Dict[str, str]:
+        """Settings for the server and for this process's own database access."""
+        return {
+            "DATABASE_URL": f"sqlite:///{self.workdir}/load.db",
+            "OPENAI_API_KEY": "",
+            "JOB_FETCH_INTERVAL_MINUTES": "100000",  # Only the simulated writer adds jobs
+            "RETENTION_ENABLED": "false",
+            "WARMUP_ON_STARTUP": "false",
+            "EMBEDDING_CACHE_PATH": "",
+            "QUEUE_BROADCAST_INTERVAL_SECONDS": str(self.args.broadcast_interval),
+            "EVENT_LOOP_LAG_INTERVAL_MS": "50",
+            "LOG_LEVEL": "WARNING",
+            "LOG_FILE": f"{self.workdir}/app.log",
+            "PROFILING_DIR": f"{self.workdir}/profiles",
+            "ARCHIVE_DIR": f"{self.workdir}/archive",
+        }
+    
+    def seed(self):
+        """Store ``--jobs`` classified jobs to query."""
+        from database import SessionLocal, init_db
+        from models import Job, JobStatus
+        from services.job_classifier import JobClassifier
+        
+        init_db()
+        frame = make_jobs_frame(self.args.jobs, duplicate_ratio=0.0, seed=self.args.seed)
+        # Classified well before the server starts, so its broadcast poll doesn't replay the seed
+        classified_at = datetime.now() - timedelta(days=1)
+        db = SessionLocal()
+        try:
+            for row in frame.to_dict("records"):
+                score = round(self.rng.uniform(0, 100), 2)
+                db.add(Job(
+                    job_id=row["id"], title=row["title"], company=row["company"], description=row["description"],
+                    location=row["location"], type="remote" if row["is_remote"] else "onsite",
+                    apply_url=row["job_url"], status=JobStatus.CLASSIFIED, score=score,
+                    label=JobClassifier.classify(score), keywords_matched=[], classified_at=classified_at,
+                    timestamp_fetched=classified_at
+                ))
+            db.commit()
+        finally:
+            db.close()
+    
+    async def start_server(self):
+        log = open(Path(self.workdir) / "server.log", "wb")
+        self.server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--log-level", "warning", "--ws-max-queue", "32"],
+            cwd=BACKEND_DIR, env={**os.environ, **self.environment()}, stdout=log, stderr=subprocess.STDOUT
+        )
+        import httpx
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            deadline = time.monotonic() + 60
+            while time.monotonic() < deadline:
+                if self.server.poll() is not None:
+                    raise RuntimeError(f"Server exited - see {self.workdir}/server.log")
+                try:
+                    if (await client.get("/api/")).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError("Server did not start within 60s")
+    
+    def stop_server(self) -> Optional[float]:
+        """Stop the server, returning its peak RSS."""
+        if self.server is None:
+            return None
+        rss = _server_peak_rss_mb(self.server.pid)
+        self.server.terminate()
+        try:
+            self.server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.server.kill()
+        return rss
+    
+    # ===== WebSocket clients =====
+    
+    async def _ws_client(self, slow: bool, ready: asyncio.Event):
+        import websockets
+        try:
+            async with websockets.connect(
+                f"ws://127.0.0.1:{self.port}/api/ws", open_timeout=60, ping_interval=None,
+                max_queue=2 if slow else 1024
+            ) as ws:
+                self.connected += 1
+                ready.set()
+                async for raw in ws:
+                    received = time.time()
+                    message = json.loads(raw)
+                    if message.get("type") == "new_job":
+                        self.receipts[message["data"]["job_id"]].append((received, slow))
+                    if slow:
+                        await asyncio.sleep(self.args.slow_delay_ms / 1000.0)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.ws_errors += 1
+            ready.set()
+    
+    async def connect_clients(self) -> List[asyncio.Task]:
+        """Open the WebSocket clients, ramping up 100 at a time."""
+        slow_count = round(self.args.ws_clients * self.args.slow_clients)
+        tasks = []
+        for start in range(0, self.args.ws_clients, 100):
+            events = []
+            for index in range(start, min(start + 100, self.args.ws_clients)):
+                ready = asyncio.Event()
+                events.append(ready)
+                tasks.append(asyncio.create_task(self._ws_client(index < slow_count, ready)))
+            await asyncio.gather(*(event.wait() for event in events))
+        return tasks
+    
+    # ===== Writes and REST load =====
+    
+    def _insert_job(self) -> Tuple[str, float]:
+        from database import SessionLocal
+        from models import Job, JobLabel, JobStatus
+        
+        self._written += 1
+        job_id = f"load-{self._written}"
+        db = SessionLocal()
+        try:
+            db.add(Job(
+                job_id=job_id, title="Load Test Engineer", company=self.rng.choice(COMPANIES),
+                description="Written by the load test.", type="remote", apply_url=f"https://load.example/{job_id}",
+                status=JobStatus.CLASSIFIED, score=80.0, label=JobLabel.BEST_FIT, keywords_matched=[],
+                classified_at=datetime.now(), timestamp_fetched=datetime.now()
+            ))
+            db.commit()
+            return job_id, time.time()
+        finally:
+            db.close()
+    
+    async def writer(self, duration: float):
+        """Commit classified jobs at ``--write-rate`` per second."""
+        if self.args.write_rate <= 0:
+            return
+        interval = 1.0 / self.args.write_rate
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            job_id, committed = await asyncio.to_thread(self._insert_job)
+            self.commits[job_id] = committed
+            await asyncio.sleep(interval)
+    
+    def _pick_request(self) -> Tuple[str, str, Dict[str, Any]]:
+        """One request of the dashboard-like mix: (kind, path, params)."""
+        roll = self.rng.random()
+        if roll < 0.45:
+            params = {"limit": self.rng.choice([20, 50, 100])}
+            if self.rng.random() < 0.5:
+                params["label"] = self.rng.choice(["best", "mid", "least"])
+            if self.rng.random() < 0.3:
+                params["company"] = self.rng.choice(COMPANIES)[:4]
+            if self.rng.random() < 0.3:
+                params["remote_only"] = "true"
+            return "filter", "/api/jobs", params
+        if roll < 0.70:
+            return "search", "/api/jobs", {"search": self.rng.choice(SKILLS), "limit": 50}
+        if roll < 0.85:
+            return "stats", "/api/jobs/stats/summary", {}
+        return "page", "/api/jobs", {"limit": 50, "offset": self.rng.randrange(0, max(1, self.args.jobs), 50)}
+    
+    async def rest_load(self, rps: float, duration: float) -> Dict[str, Any]:
+        """Open-loop request mix at ``rps`` for ``duration`` seconds."""
+        import httpx
+        
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors = defaultdict(int)
+        loop = asyncio.get_running_loop()
+        limits = httpx.Limits(max_connections=self.args.connections, max_keepalive_connections=self.args.connections)
+        
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=30.0) as client:
+            async def send(kind: str, path: str, params: Dict[str, Any], scheduled: float):
+                try:
+                    response = await client.get(path, params=params)
+                    if response.status_code != 200:
+                        errors[kind] += 1
+                except httpx.HTTPError:
+                    errors[kind] += 1
+                latencies[kind].append(loop.time() - scheduled)
+            
+            tasks = set()
+            start = loop.time()
+            sent = 0
+            while True:
+                scheduled = start + sent / rps
+                if scheduled - start >= duration:
+                    break
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(send(*self._pick_request(), scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                sent += 1
+            await asyncio.gather(*tasks)
+            elapsed = loop.time() - start
+        
+        every = [value for values in latencies.values() for value in values]
+        return {
+            "target_rps": rps,
+            "achieved_rps": round(len(every) / elapsed, 1) if elapsed else 0.0,
+            "errors": sum(errors.values()),
+            "all": percentiles(every),
+            "by_kind": {kind: percentiles(values) for kind, values in sorted(latencies.items())},
+        }
+    
+    async def client_lag(self, duration: float) -> List[float]:
+        """Lag of this process's own loop - if high, the numbers measure the load generator."""
+        lags = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        while loop.time() < deadline:
+            started = loop.time()
+            await asyncio.sleep(0.05)
+            lags.append(max(0.0, loop.time() - started - 0.05))
+        return lags
+    
+    async def _lag_buckets(self) -> List[Tuple[float, float]]:
+        """Server lag histogram; empty if the server is too stalled to answer."""
+        import httpx
+        try:
+            async with httpx.AsyncClient(base_url=self.base_url, timeout=120.0) as client:
+                return parse_lag_buckets((await client.get("/metrics")).text)
+        except httpx.HTTPError:
+            return []
+    
+    # ===== One measured step =====
+    
+    async def step(self, rps: float) -> Dict[str, Any]:
+        """Run the mixed load for ``--duration`` seconds and summarize it."""
+        duration = self.args.duration
+        self.receipts.clear()
+        self.commits.clear()
+        lag_before = await self._lag_buckets()
+        
+        rest, _, own_lag = await asyncio.gather(
+            self.rest_load(rps, duration), self.writer(duration), self.client_lag(duration)
+        )
+        await asyncio.sleep(self.args.broadcast_interval * 2 + 1)  # Let the last broadcast land
+        
+        lag_after = await self._lag_buckets()
+        before = dict(lag_before)
+        lag = [(bound, count - before.get(bound, 0.0)) for bound, count in lag_after] if lag_before else []
+        return {
+            "rest": rest,
+            "websocket": self._fanout(),
+            "server_loop_lag": histogram_quantiles(lag),
+            "client_loop_lag": percentiles(own_lag),
+        }
+    
+    def _fanout(self) -> Dict[str, Any]:
+        """Delivery latency (commit -> received) and fan-out spread (first -> last client) per job."""
+        fast_latency, slow_latency, spread = [], [], []
+        expected = self.connected * len(self.commits)
+        delivered = 0
+        for job_id, committed in self.commits.items():
+            receipts = self.receipts.get(job_id, [])
+            delivered += len(receipts)
+            fast = [received for received, slow in receipts if not slow]
+            fast_latency.extend(received - committed for received in fast)
+            slow_latency.extend(received - committed for received, slow in receipts if slow)
+            if fast:
+                spread.append(max(fast) - min(fast))
+        return {
+            "clients": self.connected,
+            "jobs_written": len(self.commits),
+            "delivered_ratio": round(delivered / expected, 4) if expected else None,
+            "commit_to_client": percentiles(fast_latency),
+            "commit_to_slow_client": percentiles(slow_latency),
+            "fanout_spread": percentiles(spread),
+        }
+    
+    # ===== Driver =====
+    
+    async def run(self) -> Dict[str, Any]:
+        await self.start_server()
+        clients = await self.connect_clients()
+        try:
+            steps = []
+            rps = self.args.rps
+            while True:
+                result = await self.step(rps)
+                steps.append(result)
+                if not self.args.find_capacity or not self._within_slo(result) or rps >= self.args.max_rps:
+                    break
+                rps = min(self.args.max_rps, round(rps * 1.5))
+        finally:
+            for task in clients:
+                task.cancel()
+            await asyncio.gather(*clients, return_exceptions=True)
+        return {"steps": steps, "capacity": self._capacity(steps)}
+    
+    def _within_slo(self, result: Dict[str, Any]) -> bool:
+        rest = result["rest"]
+        p95 = rest["all"]["p95_ms"]
+        total = rest["all"]["count"] or 1
+        return (
+            p95 is not None and p95 <= self.args.slo_p95_ms
+            and rest["errors"] / total <= 0.01
+            and rest["achieved_rps"] >= 0.9 * rest["target_rps"]
+        )
+    
+    def _capacity(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Highest request rate that met the SLO, with the WebSocket load it was measured under."""
+        passing = [step for step in steps if self._within_slo(step)]
+        best = passing[-1] if passing else None
+        return {
+            "slo_p95_ms": self.args.slo_p95_ms,
+            "max_rps_within_slo": best["rest"]["target_rps"] if best else None,
+            "p95_ms_at_max": best["rest"]["all"]["p95_ms"] if best else None,
+            "ws_clients": self.connected,
+            "ws_fanout_spread_p95_ms": best["websocket"]["fanout_spread"]["p95_ms"] if best else None,
+            "server_loop_lag_p99_ms": best["server_loop_lag"]["p99_ms"] if best else None,
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable summary."""
+    lines = []
+    for step in report["steps"]:
+        rest, ws = step["rest"], step["websocket"]
+        lines += [
+            f"== {rest['target_rps']} req/s target: {rest['achieved_rps']} achieved, {rest['errors']} errors",
+            f"{'kind':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+        ]
+        for kind, stats in [("all", rest["all"])] + list(rest["by_kind"].items()):
+            lines.append(
+                f"{kind:<10}{stats['count']:>8}{stats['p50_ms']!s:>10}{stats['p95_ms']!s:>10}"
+                f"{stats['p99_ms']!s:>10}{stats['max_ms']!s:>10}"
+            )
+        lines += [
+            f"WebSocket: {ws['clients']} clients, {ws['jobs_written']} jobs written, delivered {ws['delivered_ratio']}",
+            f"  commit -> client p50/p95/p99: {ws['commit_to_client']['p50_ms']} / "
+            f"{ws['commit_to_client']['p95_ms']} / {ws['commit_to_client']['p99_ms']} ms "
+            f"(slow clients p95 {ws['commit_to_slow_client']['p95_ms']} ms)",
+            f"  fan-out spread p50/p95: {ws['fanout_spread']['p50_ms']} / {ws['fanout_spread']['p95_ms']} ms",
+            f"Server event-loop lag p50/p95/p99: {step['server_loop_lag']['p50_ms']} / "
+            f"{step['server_loop_lag']['p95_ms']} / {step['server_loop_lag']['p99_ms']} ms    "
+            f"(load generator p99 {step['client_loop_lag']['p99_ms']} ms)",
+            "",
+        ]
+    capacity = report["capacity"]
+    lines.append(
+        f"Capacity per worker: {capacity['max_rps_within_slo']} req/s within p95 <= {capacity['slo_p95_ms']} ms "
+        f"while serving {capacity['ws_clients']} WebSocket clients "
+        f"(fan-out spread p95 {capacity['ws_fanout_spread_p95_ms']} ms, loop lag p99 {capacity['server_loop_lag_p99_ms']} ms); "
+        f"server peak RSS {report.get('server_peak_rss_mb')} MB"
+    )
+    return "\n".join(lines)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Read-path load test for one API worker")
+    parser.add_argument("--jobs", type=int, default=5000, help="Classified jobs seeded into the database")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per measured step")
+    parser.add_argument("--rps", type=float, default=100.0, help="REST requests per second (first step)")
+    parser.add_argument("--connections", type=int, default=64, help="HTTP connection pool size")
+    parser.add_argument("--ws-clients", type=int, default=500, help="WebSocket clients kept connected")
+    parser.add_argument("--slow-clients", type=float, default=0.05, help="Share of WebSocket clients that read slowly")
+    parser.add_argument("--slow-delay-ms", type=float, default=500.0, help="Pause of slow clients after each message")
+    parser.add_argument("--write-rate", type=float, default=2.0, help="Classified jobs committed per second")
+    parser.add_argument("--broadcast-interval", type=int, default=1, help="QUEUE_BROADCAST_INTERVAL_SECONDS")
+    parser.add_argument("--find-capacity", action="store_true", help="Raise req/s by 1.5x per step until the SLO breaks")
+    parser.add_argument("--slo-p95-ms", type=float, default=250.0, help="Latency SLO for --find-capacity")
+    parser.add_argument("--max-rps", type=float, default=5000.0, help="Upper bound for --find-capacity")
+    parser.add_argument("--port", type=int, default=0, help="Server port (default: a free one)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    _raise_fd_limit(args.ws_clients * 2 + 1024)
+    
+    with tempfile.TemporaryDirectory(prefix="jobagent-load-") as workdir:
+        test = LoadTest(args, workdir)
+        if "config" in sys.modules:
+            raise RuntimeError("benchmarks.load must configure the app before anything imports config")
+        os.environ.update(test.environment())
+        test.seed()
+        try:
+            report = asyncio.run(test.run())
+        finally:
+            rss = test.stop_server()
+        report["server_peak_rss_mb"] = rss
+        report["scenario"] = vars(args)
+    
+    print(format_report(report))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+"""End-to-end pipeline benchmark.
+
+Runs ``JobScheduler.run_cycle`` against a throwaway SQLite
+database, with JobSpy replaced by synthetic DataFrames and OpenAI by a
+local FakeOpenAI server, and reports throughput, per-stage latency
+percentiles, database commit time and peak RSS:
+
+    python -m benchmarks.pipeline                               # 300 jobs, 10% reposts, 200±50 ms LLM
+    python -m benchmarks.pipeline --jobs 2000 --duplicates 0.3 --latency-ms 400 --rate-limit 0.05
+    python -m benchmarks.pipeline --save-baseline               # store the result as the baseline
+    python -m benchmarks.pipeline                               # exits 1 if it regressed vs the baseline
+
+Baselines live in ``benchmarks/baselines/<name>.json``; only compare
+results taken on the same machine with the same scenario.
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.fake_openai import FakeOpenAI
+from benchmarks.synthetic import SOURCES, make_jobs_frame, split_by_source
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+_RESUME = """Jane Doe - Senior Software Engineer
+
+Eight years building backend services in Python (FastAPI, Django) and Go on AWS.
+Designed Kafka and Airflow data pipelines, PostgreSQL and Redis storage, Docker and
+Kubernetes deployments with Terraform. Led a team of five; mentoring, code review,
+observability and on-call.
+
+Education: BSc Computer Science.
+"""
+
+
+class StageTimer:
+    """Wall time of every call to the wrapped functions, by stage name."""
+    
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._patches = []
+        self._lock = threading.Lock()
+    
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples[stage].append(seconds)
+    
+    def wrap(self, owner, name: str, stage: str):
+        """Time ``owner.name`` (a class, module or instance attribute) until :meth:`restore`."""
+        original = inspect.getattr_static(owner, name)
+        func = getattr(owner, name)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        
+        setattr(owner, name, staticmethod(wrapper) if isinstance(original, staticmethod) else wrapper)
+        self._patches.append((owner, name, original, inspect.isclass(owner) or inspect.ismodule(owner)))
+    
+    def restore(self):
+        """Undo every wrap."""
+        for owner, name, original, shared in reversed(self._patches):
+            if shared:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)  # Instance attribute shadowing the class method
+        self._patches = []
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Call count, total seconds and p50/p95/p99/max milliseconds per stage."""
+        report = {}
+        for stage, samples in sorted(self.samples.items()):
+            values = np.asarray(samples) * 1000.0
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            report[stage] = {
+                "count": len(samples),
+                "total_s": round(float(values.sum()) / 1000.0, 3),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "max_ms": round(float(values.max()), 2),
+            }
+        return report
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)  # bytes on macOS, KiB elsewhere
+
+
+def configure_environment(workdir: str, args: argparse.Namespace, openai_url: str):
+    """Point the app settings at the scratch database and the fake OpenAI server (before importing it)."""
+    if "config" in sys.modules:
+        raise RuntimeError("benchmarks.pipeline must configure the app before anything imports config")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{workdir}/benchmark.db",
+        "OPENAI_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": openai_url,
+        "JOB_SOURCES": json.dumps(SOURCES[:args.sources]),
+        "SCORING_CONCURRENCY": str(args.concurrency),
+        "QUEUE_BATCH_SIZE": str(args.batch_size),
+        "QUEUE_INLINE_WORKER": "true",
+        "EMBEDDING_ENABLED": "false",
+        "EMBEDDING_CACHE_PATH": "",
+        "WARMUP_ON_STARTUP": "false",
+        "LOG_LEVEL": args.log_level.upper(),
+        "LOG_FILE": f"{workdir}/app.log",
+        "PROFILING_DIR": f"{workdir}/profiles",
+        "ARCHIVE_DIR": f"{workdir}/archive",
+    })
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the scenario and return the report."""
+    with FakeOpenAI(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit_ratio=args.rate_limit, seed=args.seed
+    ) as server, tempfile.TemporaryDirectory(prefix="jobagent-bench-") as workdir:
+        configure_environment(workdir, args, server.url)
+        
+        # App modules read the environment above on import
+        import services.job_fetcher as job_fetcher
+        from database import SessionLocal, init_db
+        from models import FetchRun, Resume
+        from scheduler import JobScheduler
+        from services import JobNormalizer
+        from services.job_queue import JobQueue
+        from services.job_scorer import JobScorer
+        
+        init_db()
+        db = SessionLocal()
+        db.add(Resume(filename="benchmark.txt", content=_RESUME))
+        db.commit()
+        db.close()
+        
+        scheduler = JobScheduler()
+        scheduler.elector.is_leader = True
+        frames: Dict[str, Any] = {}
+        job_fetcher.scrape_jobs = lambda **kwargs: frames.get(kwargs["site_name"][0], make_jobs_frame(0))
+        
+        def cycle(count: int, seed: int) -> float:
+            frames.clear()
+            frames.update(split_by_source(make_jobs_frame(
+                count, duplicate_ratio=args.duplicates, seed=seed,
+                description_words=args.description_words, sources=SOURCES[:args.sources]
+            )))
+            start = time.perf_counter()
+            asyncio.run(scheduler.run_cycle())
+            return time.perf_counter() - start
+        
+        # Warm-up cycle: lazy imports, tokenizer and HTTP connection setup stay out of the numbers
+        cycle(min(args.jobs, 20), seed=-1)
+        server.stats.update(requests=0, completions=0, rate_limited=0)
+        
+        timer = StageTimer()
+        timer.wrap(JobNormalizer, "batch_normalize", "normalize_batch")
+        timer.wrap(JobQueue, "enqueue", "enqueue")
+        timer.wrap(scheduler.worker, "_normalize", "worker_normalize")
+        timer.wrap(scheduler.worker, "_score_own", "worker_score")
+        timer.wrap(scheduler.worker, "_classify", "worker_classify")
+        timer.wrap(JobScorer, "score_job", "llm_score")
+        _time_commits(SessionLocal, timer)
+        
+        first_run = _last_run_id(SessionLocal, FetchRun)
+        try:
+            run_seconds = []
+            for index in range(args.repeat):
+                elapsed = cycle(args.jobs, seed=args.seed + index)
+                timer.record("cycle", elapsed)
+                run_seconds.append(elapsed)
+        finally:
+            timer.restore()
+        
+        totals = _run_totals(SessionLocal, FetchRun, first_run, timer)
+    
+    total_seconds = sum(run_seconds)
+    stages = timer.summary()
+    return {
+        "scenario": {
+            "jobs": args.jobs, "duplicates": args.duplicates, "sources": args.sources,
+            "description_words": args.description_words, "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms, "rate_limit": args.rate_limit, "concurrency": args.concurrency,
+            "batch_size": args.batch_size, "repeat": args.repeat, "seed": args.seed,
+        },
+        "throughput": {
+            "jobs_per_second": round(totals["fetched"] / total_seconds, 2) if total_seconds else None,
+            "scored_per_second": round(totals["scored"] / total_seconds, 2) if total_seconds else None,
+        },
+        "counts": totals,
+        "stages": stages,
+        "db_write_seconds": stages.get("db_commit", {}).get("total_s", 0.0),
+        "peak_rss_mb": peak_rss_mb(),
+        "fake_openai": dict(server.stats),
+        "environment": {"python": platform.python_version(), "machine": platform.machine(), "host": platform.node()},
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _time_commits(session_factory, timer: StageTimer):
+    """Record every session commit (flush included) as the ``db_commit`` stage."""
+    from sqlalchemy import event
+    
+    @event.listens_for(session_factory, "before_commit")
+    def _before_commit(session):
+        session.info["benchmark_commit_started"] = time.perf_counter()
+    
+    @event.listens_for(session_factory, "after_commit")
+    def _after_commit(session):
+        started = session.info.pop("benchmark_commit_started", None)
+        if started is not None:
+            timer.record("db_commit", time.perf_counter() - started)
+
+
+def _last_run_id(session_factory, FetchRun) -> int:
+    db = session_factory()
+    try:
+        return db.query(FetchRun.id).order_by(FetchRun.id.desc()).limit(1).scalar() or 0
+    finally:
+        db.close()
+
+
+def _run_totals(session_factory, FetchRun, after_id: int, timer: StageTimer) -> Dict[str, int]:
+    """Summed fetch_runs counters of the measured runs; their stage times go to the timer as ``run_<stage>``."""
+    from services.run_recorder import RUN_COUNTS
+    db = session_factory()
+    try:
+        runs = db.query(FetchRun).filter(FetchRun.id > after_id).all()
+        totals = {name: sum(getattr(run, name) or 0 for run in runs) for name in RUN_COUNTS}
+        for run in runs:
+            for stage, seconds in (run.stage_seconds or {}).items():
+                timer.record(f"run_{stage}", seconds)
+        totals["errors"] = sum(1 for run in runs if run.error)
+        return totals
+    finally:
+        db.close()
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions of a result against a baseline.
+    
+    Args:
+        result: Report from :func:`run_benchmark`
+        baseline: Stored report
+        tolerance: Allowed relative slowdown (0.2 = 20%)
+    
+    Returns:
+        One message per regression (empty when none)
+    """
+    regressions = []
+    old, new = baseline["throughput"]["jobs_per_second"], result["throughput"]["jobs_per_second"]
+    if old and new is not None and new < old * (1 - tolerance):
+        regressions.append(f"throughput {new} jobs/s < baseline {old} jobs/s")
+    
+    for stage, before in baseline.get("stages", {}).items():
+        after = result["stages"].get(stage)
+        if not after:
+            continue
+        # Sub-millisecond stages are mostly timer noise
+        if after["p95_ms"] > before["p95_ms"] * (1 + tolerance) and after["p95_ms"] - before["p95_ms"] > 1.0:
+            regressions.append(f"{stage} p95 {after['p95_ms']} ms > baseline {before['p95_ms']} ms")
+    
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(f"peak RSS {result['peak_rss_mb']} MB > baseline {baseline['peak_rss_mb']} MB")
+    return regressions
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """Human-readable summary."""
+    lines = [
+        f"Scenario: {json.dumps(result['scenario'])}",
+        f"Throughput: {result['throughput']['jobs_per_second']} jobs/s fetched, "
+        f"{result['throughput']['scored_per_second']} jobs/s scored",
+        f"Counts: {json.dumps(result['counts'])}",
+        f"DB write time: {result['db_write_seconds']} s    Peak RSS: {result['peak_rss_mb']} MB",
+        f"Fake OpenAI: {json.dumps(result['fake_openai'])}",
+        "",
+        f"{'stage':<20}{'count':>8}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for stage, stats in result["stages"].items():
+        lines.append(
+            f"{stage:<20}{stats['count']:>8}{stats['total_s']:>10}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--jobs", type=int, default=300, help="Jobs fetched per cycle")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Share of reposted jobs (0-1)")
+    parser.add_argument("--sources", type=int, default=3, choices=range(1, len(SOURCES) + 1), help="JobSpy sources")
+    parser.add_argument("--description-words", type=int, default=150, help="Free-text words per description")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake OpenAI response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Uniform jitter around the latency")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Share of OpenAI requests answered with 429")
+    parser.add_argument("--concurrency", type=int, default=8, help="SCORING_CONCURRENCY")
+    parser.add_argument("--batch-size", type=int, default=25, help="QUEUE_BATCH_SIZE")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured fetch cycles (fresh jobs each)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--name", default="default", help="Baseline name")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this result as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    parser.add_argument("--log-level", default="ERROR", help="App log level on the console")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    
+    result = run_benchmark(args)
+    print(format_report(result))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+    
+    baseline_path = BASELINE_DIR / f"{args.name}.json"
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2))
+        print(f"\nSaved baseline {baseline_path}")
+        return 0
+    
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path} (run with --save-baseline to create one)")
+        return 0
+    
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get("scenario") != result["scenario"]:
+        print(f"\nWarning: scenario differs from baseline {baseline_path}")
+    regressions = compare(result, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions vs baseline:\n" + "\n".join(f"  - {message}" for message in regressions))
+        return 1
+    print(f"\nNo regressions vs baseline {baseline_path} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,527 @@
+"""Offline scorer evaluation: quality vs latency vs cost of each scoring backend.
+
+Runs stored jobs (the most recent classified ones in DATABASE_URL) against
+one resume profile through every available scoring backend:
+
+- ``llm``: ``JobScorer.score_job`` (needs OPENAI_API_KEY; OPENAI_BASE_URL is honored)
+- ``keyword``: ``JobScorer.keyword_score``, the fallback / prefilter score
+- ``embedding``: cosine of the job and resume embeddings, as the profile prefilter computes it
+
+Each backend is compared with the reference (the LLM, or the stored scores
+when the LLM isn't run): Spearman rank correlation, label agreement and
+confusion across the 65/85 thresholds, per-job latency, throughput and
+token cost. For the cheap backends it also prints the cutoff that keeps a
+given share of the reference's best/mid fits, and the share of LLM calls
+that cutoff would skip - the data behind PROFILE_PREFILTER_SIMILARITY.
+
+Per-job results are cached on disk by backend, job text and resume text, so
+re-running (say, with another --reference or more jobs) only pays for new
+pairs:
+
+    python -m benchmarks.scorers --limit 200
+    python -m benchmarks.scorers --profile alice --backends keyword,embedding --reference stored
+    python -m benchmarks.scorers --output eval.json --refresh
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.load import percentiles
+
+# Cached / measured outcome of one job: (score, latency s, prompt tokens, completion tokens)
+Result = Tuple[float, float, int, int]
+
+LABELS = ("best", "mid", "least")
+RECALL_TARGETS = (0.9, 0.95, 0.99)
+
+
+class ResultCache:
+    """Per-job scorer results in SQLite, keyed by backend config, job text and resume text."""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, score REAL NOT NULL, latency REAL NOT NULL, "
+            "prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL)"
+        )
+    
+    @staticmethod
+    def key(backend_key: str, job: Dict[str, Any], resume_text: str) -> str:
+        text = "\0".join([backend_key, job["title"], job["company"], job["description"], resume_text])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Result]:
+        found = {}
+        for start in range(0, len(keys), 500):  # SQLite variable limit
+            chunk = keys[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT key, score, latency, prompt_tokens, completion_tokens FROM results "
+                f"WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for key, *result in rows:
+                found[key] = tuple(result)
+        return found
+    
+    def put_many(self, items: Dict[str, Result]):
+        self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", [
+            (key, *result) for key, result in items.items()
+        ])
+        self._conn.commit()
+    
+    def close(self):
+        self._conn.close()
+
+
+# ===== Backends =====
+
+class Backend:
+    """A scoring backend: score jobs against a resume, measuring each job."""
+    
+    name = ""
+    scale = 1.0  # Multiplier onto the 0-100 scale the label thresholds use
+    
+    def key(self) -> str:
+        """Identifies the backend's configuration in cache keys."""
+        return self.name
+    
+    def unavailable(self, resume_text: str) -> Optional[str]:
+        """Why the backend can't run here (None if it can)."""
+        return None
+    
+    def score(self, jobs: List[Dict[str, Any]], resume_text: str) -> List[Optional[Result]]:
+        """Results per job (None where scoring failed - not cached, retried next run)."""
+        raise NotImplementedError
+
+
+class LLMBackend(Backend):
+    name = "llm"
+    
+    def __init__(self, concurrency: int = 8):
+        self.concurrency = concurrency
+    
+    def key(self) -> str:
+        from config import get_settings
+        return f"llm:gpt-4o-mini:{get_settings().openai_base_url or 'openai'}"
+    
+    def unavailable(self, resume_text: str) -> Optional[str]:
+        from services.job_scorer import get_client
+        if get_client() is None:
+            return "no OPENAI_API_KEY"
+        if len(resume_text) < 50:
+            return "resume too short for the LLM prompt"
+        return None
+    
+    def score(self, jobs: List[Dict[str, Any]], resume_text: str) -> List[Optional[Result]]:
+        from services.job_scorer import JobScorer
+        
+        def one(job: Dict[str, Any]) -> Optional[Result]:
+            start = time.perf_counter()
+            score, details = JobScorer.score_job(job, {"content": resume_text})
+            latency = time.perf_counter() - start
+            if details.get("fallback") or details.get("error"):
+                return None  # The LLM call failed and score_job fell back
+            usage = details.get("usage") or {}
+            return score, latency, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            return list(executor.map(one, jobs))
+
+
+class KeywordBackend(Backend):
+    name = "keyword"
+    
+    def score(self, jobs: List[Dict[str, Any]], resume_text: str) -> List[Optional[Result]]:
+        from services.job_scorer import JobScorer
+        
+        results = []
+        for job in jobs:
+            start = time.perf_counter()
+            score, _ = JobScorer.keyword_score(job, {"content": resume_text})
+            results.append((score, time.perf_counter() - start, 0, 0))
+        return results
+
+
+class EmbeddingBackend(Backend):
+    """Cosine similarity (-1..1, scaled by 100 for labels) of the prefilter's job and resume texts."""
+    
+    name = "embedding"
+    scale = 100.0
+    
+    def __init__(self, batch_size: int = 32):
+        self.batch_size = batch_size
+        self._resume_vector = None
+    
+    def key(self) -> str:
+        from services.embedding_store import embedding_store
+        return f"embedding:{embedding_store.model_name()}"
+    
+    def unavailable(self, resume_text: str) -> Optional[str]:
+        try:
+            self._resume_vector = self._embed([self._resume_text(resume_text)])[0]
+        except Exception as e:
+            return f"embedding model unavailable ({e})"
+        return None
+    
+    def score(self, jobs: List[Dict[str, Any]], resume_text: str) -> List[Optional[Result]]:
+        from services.job_normalizer import JobNormalizer
+        
+        if self._resume_vector is None:
+            self._resume_vector = self._embed([self._resume_text(resume_text)])[0]
+        results = []
+        for start in range(0, len(jobs), self.batch_size):
+            batch = jobs[start:start + self.batch_size]
+            began = time.perf_counter()
+            # Same text as EmbeddingStore.job_text
+            texts = [f"{job['title']}\n{JobNormalizer.compress_description(job['description'])}" for job in batch]
+            similarities = self._embed(texts) @ self._resume_vector
+            latency = (time.perf_counter() - began) / len(batch)  # Batched - share the batch time
+            results.extend((round(float(similarity), 4), latency, 0, 0) for similarity in similarities)
+        return results
+    
+    @staticmethod
+    def _resume_text(resume_text: str) -> str:
+        from services.job_normalizer import JobNormalizer
+        return JobNormalizer.compress_resume(resume_text)
+    
+    @staticmethod
+    def _embed(texts: List[str]) -> np.ndarray:
+        from config import get_settings
+        from services.embeddings import batch_generate_embeddings
+        
+        vectors = np.asarray(batch_generate_embeddings(texts, use_openai=get_settings().embedding_use_openai), dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+BACKENDS = {"llm": LLMBackend, "keyword": KeywordBackend, "embedding": EmbeddingBackend}
+
+
+def run_backend(
+    backend: Backend, jobs: List[Dict[str, Any]], resume_text: str, cache: Optional[ResultCache], refresh: bool = False
+) -> Dict[str, Any]:
+    """Scores and measurements of every job, from the cache where possible."""
+    keys = [ResultCache.key(backend.key(), job, resume_text) for job in jobs]
+    cached = cache.get_many(keys) if cache is not None and not refresh else {}
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    
+    fresh = backend.score([jobs[i] for i in missing], resume_text) if missing else []
+    results: List[Optional[Result]] = [cached.get(key) for key in keys]
+    for i, result in zip(missing, fresh):
+        results[i] = result
+    if cache is not None:
+        cache.put_many({keys[i]: result for i, result in zip(missing, fresh) if result is not None})
+    
+    return {
+        "scores": np.array([result[0] if result else np.nan for result in results], dtype=np.float64),
+        "latencies": [result[1] for result in results if result],
+        "prompt_tokens": sum(result[2] for result in results if result),
+        "completion_tokens": sum(result[3] for result in results if result),
+        "cached": len(keys) - len(missing),
+        "failed": sum(1 for result in fresh if result is None),
+    }
+
+
+# ===== Metrics =====
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks with ties sharing their average rank."""
+    order = np.argsort(values, kind="mergesort")
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.arange(len(values))
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    return (np.bincount(inverse, weights=ranks) / counts)[inverse]
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> Optional[float]:
+    """Spearman rank correlation over the pairs where both are scored (None if undefined)."""
+    both = ~(np.isnan(a) | np.isnan(b))
+    if both.sum() < 2:
+        return None
+    ra, rb = _ranks(a[both]), _ranks(b[both])
+    if ra.std() == 0 or rb.std() == 0:
+        return None
+    return round(float(np.corrcoef(ra, rb)[0, 1]), 4)
+
+
+def labels(scores: np.ndarray, scale: float = 1.0) -> List[Optional[str]]:
+    """best/mid/least per score on the classifier's thresholds (None where unscored)."""
+    from services.job_classifier import JobClassifier
+    return [None if np.isnan(score) else JobClassifier.classify(float(score) * scale).value for score in scores]
+
+
+def confusion(reference: List[Optional[str]], predicted: List[Optional[str]]) -> List[List[int]]:
+    """Counts of (reference label row, predicted label column) in best/mid/least order."""
+    matrix = [[0] * len(LABELS) for _ in LABELS]
+    for expected, got in zip(reference, predicted):
+        if expected is not None and got is not None:
+            matrix[LABELS.index(expected)][LABELS.index(got)] += 1
+    return matrix
+
+
+def cascade(reference: np.ndarray, scores: np.ndarray, fit_threshold: float, recalls=RECALL_TARGETS) -> List[Dict[str, float]]:
+    """
+    Cutoffs on a cheap score that keep a share of the reference's fits.
+    
+    Jobs under the cutoff would skip the LLM; ``skipped`` is that share of
+    all jobs, ``recall`` the share of reference fits (score >= fit_threshold)
+    at or above it.
+    """
+    both = ~(np.isnan(reference) | np.isnan(scores))
+    reference, scores = reference[both], scores[both]
+    fits = np.sort(scores[reference >= fit_threshold])
+    if not fits.size:
+        return []
+    rows = []
+    for target in recalls:
+        cutoff = float(fits[int(np.floor((1.0 - target) * fits.size))])
+        rows.append({
+            "target_recall": target,
+            "cutoff": round(cutoff, 4),
+            "recall": round(float((fits >= cutoff).mean()), 4),
+            "skipped": round(float((scores < cutoff).mean()), 4),
+        })
+    return rows
+
+
+def summarize(
+    name: str, backend: Backend, run: Dict[str, Any], reference_name: str, reference: Dict[str, Any],
+    prompt_price: float, completion_price: float
+) -> Dict[str, Any]:
+    """One backend's row of the report."""
+    from services.job_classifier import JobClassifier
+    
+    scored = len(run["latencies"])
+    reference_labels = labels(reference["scores"], reference["scale"])
+    backend_labels = labels(run["scores"], backend.scale)
+    compared = [(a, b) for a, b in zip(reference_labels, backend_labels) if a is not None and b is not None]
+    cost = (run["prompt_tokens"] * prompt_price + run["completion_tokens"] * completion_price) / 1e6
+    mean_latency = float(np.mean(run["latencies"])) if scored else 0.0
+    
+    summary = {
+        "scored": scored,
+        "cached": run["cached"],
+        "failed": run["failed"],
+        "spearman": spearman(reference["scores"], run["scores"]),
+        "label_agreement": round(sum(a == b for a, b in compared) / len(compared), 4) if compared else None,
+        "confusion": confusion(reference_labels, backend_labels),
+        "latency": percentiles(run["latencies"]),
+        "jobs_per_second": round(1.0 / mean_latency, 1) if mean_latency else None,
+        "tokens_per_job": round((run["prompt_tokens"] + run["completion_tokens"]) / scored, 1) if scored else 0.0,
+        "cost_per_1k_jobs": round(1000.0 * cost / scored, 4) if scored else 0.0,
+    }
+    if name == reference_name:
+        summary.update(spearman=None, label_agreement=None)  # Compared with itself
+    else:
+        summary["cascade"] = cascade(
+            reference["scores"] * reference["scale"], run["scores"], JobClassifier.MID_FIT_THRESHOLD
+        )
+    return summary
+
+
+# ===== Stored data =====
+
+def load_jobs(limit: int, profile: Optional[str]) -> Tuple[List[Dict[str, Any]], str, str, np.ndarray]:
+    """
+    The most recent visible classified jobs and a resume.
+    
+    Returns:
+        (job dicts for the scorers, profile, resume text, stored score per job for that profile)
+    """
+    from database import SessionLocal, init_db
+    from models import DEFAULT_PROFILE, Job, JobScore, JobStatus, Resume
+    from services.job_normalizer import JobNormalizer
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        if profile is not None:
+            resume = db.query(Resume).filter(Resume.profile == profile).first()
+        else:
+            resume = (db.query(Resume).filter(Resume.profile == DEFAULT_PROFILE).first()
+                      or db.query(Resume).order_by(Resume.id).first())
+        if resume is None:
+            raise SystemExit(f"No resume for profile '{profile}'" if profile else "No resume in the database - upload one first")
+        
+        rows = (
+            db.query(Job)
+            .filter(Job.status == JobStatus.CLASSIFIED, Job.canonical_job_id.is_(None))
+            .order_by(Job.id.desc())
+            .limit(limit)
+            .all()
+        )
+        profile_scores = dict(
+            db.query(JobScore.job_id, JobScore.score)
+            .filter(JobScore.resume_id == resume.id, JobScore.job_id.in_([job.id for job in rows]))
+        ) if rows else {}
+        
+        jobs, stored = [], []
+        for job in rows:
+            jobs.append({
+                "job_id": job.job_id,
+                "title": job.title or "",
+                "company": job.company or "",
+                "description": job.description or "",
+                "location": job.location or "",
+                "type": job.type or "onsite",
+                "compressed_description": JobNormalizer.compress_description(job.description or ""),
+            })
+            score = profile_scores.get(job.id, job.score)
+            stored.append(np.nan if score is None else score)
+        return jobs, resume.profile, resume.content or "", np.array(stored, dtype=np.float64)
+    finally:
+        db.close()
+
+
+def evaluate(
+    jobs: List[Dict[str, Any]],
+    resume_text: str,
+    stored: np.ndarray,
+    backends: Dict[str, Backend],
+    reference: str = "llm",
+    cache: Optional[ResultCache] = None,
+    refresh: bool = False,
+    prompt_price: float = 0.15,
+    completion_price: float = 0.60
+) -> Dict[str, Any]:
+    """
+    Run jobs through the backends and compare each with the reference.
+    
+    Args:
+        jobs: Job dicts (see load_jobs)
+        resume_text: Resume content
+        stored: Stored score per job (the ``stored`` reference)
+        backends: Backends by name
+        reference: Backend name, or ``stored``; falls back to ``stored`` if that backend can't run
+        cache: Per-job result cache (None = always score)
+        refresh: Re-score cached jobs
+        prompt_price: USD per 1M prompt tokens
+        completion_price: USD per 1M completion tokens
+    """
+    runs, skipped = {}, {}
+    for name, backend in backends.items():
+        reason = backend.unavailable(resume_text)
+        if reason:
+            skipped[name] = reason
+            continue
+        runs[name] = run_backend(backend, jobs, resume_text, cache, refresh)
+    
+    if reference not in runs:
+        reference = "stored"
+    reference_run = (
+        {"scores": stored, "scale": 1.0} if reference == "stored"
+        else {"scores": runs[reference]["scores"], "scale": backends[reference].scale}
+    )
+    
+    return {
+        "jobs": len(jobs),
+        "reference": reference,
+        "prices_per_1m_tokens": {"prompt": prompt_price, "completion": completion_price},
+        "backends": {
+            name: summarize(name, backends[name], run, reference, reference_run, prompt_price, completion_price)
+            for name, run in runs.items()
+        },
+        "skipped": skipped,
+    }
+
+
+# ===== Report =====
+
+def _fmt(value, pattern: str = "{}") -> str:
+    return "-" if value is None else pattern.format(value)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable summary: one table, then confusion matrices and cascade cutoffs."""
+    lines = [
+        f"Profile: {report.get('profile', '-')}    Jobs: {report['jobs']}    Reference: {report['reference']}",
+        "",
+        f"{'backend':<11}{'scored':>7}{'cached':>7}{'spearman':>10}{'labels':>8}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'jobs/s':>9}{'tok/job':>9}{'$/1k jobs':>11}",
+    ]
+    for name, row in report["backends"].items():
+        lines.append(
+            f"{name:<11}{row['scored']:>7}{row['cached']:>7}{_fmt(row['spearman'], '{:.3f}'):>10}"
+            f"{_fmt(row['label_agreement'], '{:.0%}'):>8}{_fmt(row['latency']['p50_ms']):>9}"
+            f"{_fmt(row['latency']['p95_ms']):>9}{_fmt(row['jobs_per_second']):>9}{row['tokens_per_job']:>9}"
+            f"{row['cost_per_1k_jobs']:>11.4f}"
+        )
+    for name, reason in report["skipped"].items():
+        lines.append(f"{name:<11}skipped: {reason}")
+    
+    for name, row in report["backends"].items():
+        if name == report["reference"]:
+            continue
+        lines += ["", f"{name} labels (rows: {report['reference']}, columns: {name})", f"{'':<8}" + "".join(f"{label:>8}" for label in LABELS)]
+        for label, counts in zip(LABELS, row["confusion"]):
+            lines.append(f"{label:<8}" + "".join(f"{count:>8}" for count in counts))
+        if row.get("cascade"):
+            lines.append(f"{name} cutoffs keeping {report['reference']} best/mid fits:")
+            for step in row["cascade"]:
+                lines.append(
+                    f"  recall >= {step['target_recall']:.0%}: cutoff {step['cutoff']}, "
+                    f"skips {step['skipped']:.0%} of LLM calls (recall {step['recall']:.1%})"
+                )
+    return "\n".join(lines)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare scoring backends on stored jobs")
+    parser.add_argument("--limit", type=int, default=200, help="Most recent classified jobs to evaluate")
+    parser.add_argument("--profile", help="Resume profile (default: the default profile, else the first)")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated: llm, keyword, embedding")
+    parser.add_argument("--reference", default="llm", help="Backend the others are compared with, or 'stored'")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel LLM requests")
+    parser.add_argument("--prompt-price", type=float, default=0.15, help="USD per 1M prompt tokens (gpt-4o-mini)")
+    parser.add_argument("--completion-price", type=float, default=0.60, help="USD per 1M completion tokens")
+    parser.add_argument("--cache", default="cache/scorer_eval.sqlite", help="Per-job result cache (empty = off)")
+    parser.add_argument("--refresh", action="store_true", help="Re-score jobs already in the cache")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+    
+    unknown = set(args.backends.split(",")) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+    if args.reference != "stored" and args.reference not in BACKENDS:
+        parser.error("--reference must be a backend name or 'stored'")
+    return args
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    
+    jobs, profile, resume_text, stored = load_jobs(args.limit, args.profile)
+    if not jobs:
+        print("No classified jobs stored - nothing to evaluate")
+        return 1
+    
+    backends = {}
+    for name in args.backends.split(","):
+        backends[name] = LLMBackend(args.concurrency) if name == "llm" else BACKENDS[name]()
+    cache = ResultCache(args.cache) if args.cache else None
+    try:
+        report = evaluate(
+            jobs, resume_text, stored, backends, reference=args.reference, cache=cache, refresh=args.refresh,
+            prompt_price=args.prompt_price, completion_price=args.completion_price
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    report["profile"] = profile
+    
+    print(format_report(report))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
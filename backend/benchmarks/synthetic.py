@@ -0,0 +1,105 @@
+"""Synthetic JobSpy DataFrames for benchmarks."""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+import pandas as pd
+
+SOURCES = ["indeed", "linkedin", "zip_recruiter", "glassdoor", "google"]
+
+_TITLES = [
+    "Software Engineer", "Senior Backend Engineer", "Data Engineer", "Machine Learning Engineer",
+    "Full Stack Developer", "Platform Engineer", "Site Reliability Engineer", "Frontend Developer",
+    "DevOps Engineer", "Data Scientist", "Staff Engineer", "Python Developer",
+]
+_LEVELS = ["", "Junior ", "Senior ", "Lead ", "Principal "]
+COMPANIES = [
+    "Initech", "Hooli", "Globex", "Umbrella", "Stark Industries", "Wayne Enterprises", "Acme",
+    "Soylent", "Vandelay", "Wonka", "Tyrell", "Cyberdyne", "Aperture", "Black Mesa", "Massive Dynamic",
+]
+_LOCATIONS = ["New York, NY", "San Francisco, CA", "Austin, TX", "Seattle, WA", "Remote", "Chicago, IL"]
+SKILLS = [
+    "python", "java", "go", "rust", "typescript", "react", "django", "fastapi", "postgresql", "mysql",
+    "redis", "kafka", "spark", "airflow", "docker", "kubernetes", "terraform", "aws", "gcp", "azure",
+    "pytorch", "tensorflow", "sql", "graphql", "grpc", "linux", "ci/cd", "microservices",
+]
+_WORDS = (
+    "build maintain design scale ship own deliver improve services systems pipelines platform "
+    "customers product reliable distributed data teams features infrastructure performance "
+    "collaborate mentor review code quality testing observability latency throughput growth"
+).split()
+_BOILERPLATE = (
+    "We are an equal opportunity employer and value diversity at our company. We do not discriminate "
+    "on the basis of race, religion, color, national origin, gender, sexual orientation, age, marital "
+    "status, veteran status, or disability status."
+)
+
+
+def _description(rng: random.Random, words: int) -> str:
+    """Random posting text: responsibilities, required skills and an EEO footer."""
+    skills = rng.sample(SKILLS, 6)
+    body = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return (
+        f"About the role\n\n{body.capitalize()}.\n\n"
+        f"Requirements\n\nExperience with {', '.join(skills[:4])} and {skills[4]}. Nice to have: {skills[5]}.\n\n"
+        f"{_BOILERPLATE}"
+    )
+
+
+def make_jobs_frame(
+    count: int,
+    duplicate_ratio: float = 0.1,
+    seed: int = 0,
+    description_words: int = 150,
+    sources: List[str] = None
+) -> pd.DataFrame:
+    """
+    DataFrame shaped like ``jobspy.scrape_jobs`` output.
+    
+    A ``duplicate_ratio`` share of the rows repost an earlier job on another
+    source: same title, company and text (a few words changed) under a new
+    id and URL, so near-duplicate detection has work to do.
+    
+    Args:
+        count: Rows to generate
+        duplicate_ratio: Share of rows that are reposts (0-1)
+        seed: Random seed; different seeds give distinct job ids and URLs
+        description_words: Approximate length of the free-text part of each description
+        sources: Site names to spread rows over
+    """
+    if not 0 <= duplicate_ratio < 1:
+        raise ValueError("duplicate_ratio must be in [0, 1)")
+    rng = random.Random(seed)
+    sources = sources or SOURCES[:3]
+    posted = datetime(2024, 6, 1, 12, 0)
+    
+    rows: List[Dict] = []
+    for index in range(count):
+        source = sources[index % len(sources)]
+        job_id = f"{source[:2]}-{seed}-{index}"
+        if rows and rng.random() < duplicate_ratio:
+            original = rng.choice(rows)
+            words = original["description"].split(" ")
+            for _ in range(3):
+                words[rng.randrange(len(words))] = rng.choice(_WORDS)
+            row = dict(original, id=job_id, site=source, description=" ".join(words))
+        else:
+            row = {
+                "id": job_id,
+                "site": source,
+                "title": f"{rng.choice(_LEVELS)}{rng.choice(_TITLES)}",
+                "company": rng.choice(COMPANIES),
+                "location": rng.choice(_LOCATIONS),
+                "job_type": rng.choice(["fulltime", "fulltime", "contract"]),
+                "is_remote": rng.random() < 0.3,
+                "date_posted": (posted - timedelta(hours=rng.randrange(72))).date(),
+                "description": _description(rng, description_words),
+            }
+        row["job_url"] = f"https://{source}.example/jobs/{job_id}"
+        rows.append(row)
+    
+    return pd.DataFrame(rows)
+
+
+def split_by_source(frame: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Rows per site, as one JobSpy call per source would return them."""
+    return {source: rows.reset_index(drop=True) for source, rows in frame.groupby("site", sort=False)}
@@ -1,7 +1,9 @@
 """Database setup and session management."""
 from config import get_settings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import declarative_base, sessionmaker
+from utils.metrics import instrument_sessions
+from utils.query_log import instrument_engine
 
 settings = get_settings()
 
@@ -11,12 +13,37 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
 )
 
+# Time statements; slow ones are logged with their plan (see utils/query_log.py)
+if settings.query_stats_enabled:
+    instrument_engine(engine)
+
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_sessions(SessionLocal)
 
 # Base class for models
 Base = declarative_base()
 
+# Columns added to tables that already existed in deployed databases:
+# (table, column, SQL default for existing rows or None). create_all never
+# alters an existing table, so init_db adds these itself.
+ADDED_COLUMNS = [
+    ("jobs", "canonical_job_id", None),
+    ("jobs", "lease_owner", None),
+    ("jobs", "lease_expires_at", None),
+    ("jobs", "attempts", "0"),
+    ("jobs", "failed_status", None),
+    ("jobs", "last_error", None),
+    ("jobs", "classified_at", None),
+    ("resumes", "profile", "'default'"),  # models.DEFAULT_PROFILE
+]
+
+# Run right after a column is added. Only one resume was kept before profiles,
+# but older ones get their own name so the unique profile index can be built.
+AFTER_ADD = {
+    ("resumes", "profile"): "UPDATE resumes SET profile = 'default-' || id WHERE id < (SELECT MAX(id) FROM resumes)",
+}
+
 
 def get_db():
     """Get database session."""
@@ -29,5 +56,38 @@ def get_db():
 
 def init_db():
     """Initialize database tables."""
-    from models import Job, Resume  # Import here to avoid circular imports
+    from models import Job, JobScore, JobSkill, Skill, JobSignature, Embedding, ArchivedJobKey, BoilerplateParagraph, SchedulerLease, FetchRun, Resume  # Import here to avoid circular imports
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+
+def upgrade_schema(bind):
+    """
+    Bring tables created by an older version up to the current models.
+    
+    Adds the missing ADDED_COLUMNS, then creates any declared index that
+    doesn't exist yet (over columns that do). Safe to run on every start.
+    
+    Args:
+        bind: Engine of the database to upgrade
+    """
+    existing = set(inspect(bind).get_table_names())
+    with bind.begin() as conn:
+        for table_name, column_name, default in ADDED_COLUMNS:
+            if table_name not in existing:
+                continue
+            if column_name in {column["name"] for column in inspect(conn).get_columns(table_name)}:
+                continue
+            column = Base.metadata.tables[table_name].c[column_name]
+            ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=bind.dialect)}"
+            if default is not None:
+                ddl += f" {'' if column.nullable else 'NOT NULL '}DEFAULT {default}"
+            conn.execute(text(ddl))
+            if (table_name, column_name) in AFTER_ADD:
+                conn.execute(text(AFTER_ADD[table_name, column_name]))
+        
+        for table_name in existing & set(Base.metadata.tables):
+            columns = {column["name"] for column in inspect(conn).get_columns(table_name)}
+            for index in Base.metadata.tables[table_name].indexes:
+                if {column.name for column in index.columns} <= columns:
+                    index.create(conn, checkfirst=True)
@@ -1,13 +1,20 @@
 """Main FastAPI application."""
+import asyncio
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from config import get_settings
 from database import init_db, SessionLocal
-from api import router
+from api import router, admin_router
 from scheduler import JobScheduler
-from utils import get_logger
+from services.job_read_model import job_read_model
+from services.skill_index import SkillIndex
+from services.warmup import warmup
+from utils import get_logger, configure_logging
+from utils.metrics import monitor_event_loop, render_latest
+from utils.profiling import ProfilingMiddleware
+from utils.response_cache import ResponseCacheMiddleware
 from fastapi import HTTPException
 from models import Resume
 
@@ -22,22 +29,46 @@ job_scheduler = JobScheduler()
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
+    configure_logging()
     logger.info("Starting Job Monitoring & Resume Fit Agent")
     
     # Initialize database
     init_db()
     logger.info("Database initialized")
     
+    # Build the skill index (first run) and the job list read model before serving queries
+    await asyncio.to_thread(_build_indexes)
+    
     # Start scheduler
     job_scheduler.start()
     
+    # Load heavy dependencies while the server starts listening (see /api/health)
+    if settings.warmup_on_startup:
+        warmup.start()
+    
+    lag_monitor = None
+    if settings.event_loop_lag_interval_ms > 0:
+        lag_monitor = asyncio.create_task(monitor_event_loop(settings.event_loop_lag_interval_ms / 1000.0))
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    if lag_monitor is not None:
+        lag_monitor.cancel()
     job_scheduler.stop()
 
 
+def _build_indexes():
+    db = SessionLocal()
+    try:
+        SkillIndex.backfill(db)
+        if settings.read_model_enabled:
+            job_read_model.load(db)
+    finally:
+        db.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Job Monitoring & Resume Fit Agent",
@@ -46,6 +77,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Answer repeated dashboard polls from the data-versioned response cache (inside CORS, so hits get its headers)
+app.add_middleware(ResponseCacheMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -55,8 +89,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profile sampled requests while armed from the admin API (a no-op otherwise)
+app.add_middleware(ProfilingMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api")
+app.include_router(admin_router, prefix="/api/admin")
 
 
 @app.get("/")
@@ -69,11 +107,27 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    content, content_type = render_latest()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/api/health")
+async def health(response: Response):
+    """Readiness probe: 503 until the background warm-up has finished."""
+    report = warmup.health() if settings.warmup_on_startup else {"status": "ok", "ready": True, "components": {}}
+    if not report["ready"]:
+        response.status_code = 503
+    return report
+
+
 @app.post("/api/trigger-fetch")
 async def trigger_fetch():
-    """Manually trigger job fetch (for testing)."""
+    """Manually trigger a job fetch; returns the run ID without waiting for it."""
     # Check if resume exists
-
+    
     
     db = SessionLocal()
     try:
@@ -86,18 +140,31 @@ async def trigger_fetch():
     finally:
         db.close()
     
-    await job_scheduler.run_now()
-    return {"message": "Job fetch triggered"}
+    run = await job_scheduler.run_now()
+    
+    if run["coalesced"]:
+        message = "Job fetch already running"
+    elif run["delegated"]:
+        message = "Job fetch queued for the scheduler leader"
+    else:
+        message = "Job fetch triggered"
+    return {"message": message, **run}
 
 
 @app.get("/api/scheduler/info")
 async def get_scheduler_info():
-    """Get scheduler information including fetch times."""
+    """Get scheduler information including fetch times and the current leader."""
     return {
+        "process": job_scheduler.elector.owner,
+        "is_leader": job_scheduler.is_leader,
+        "leader": job_scheduler.leader_info(),
         "is_running": job_scheduler.is_running,
+        "current_run_id": job_scheduler.current_run_id,
         "last_fetch": job_scheduler.last_fetch_time.isoformat() if job_scheduler.last_fetch_time else None,
         "next_fetch": job_scheduler.next_fetch_time.isoformat() if job_scheduler.next_fetch_time else None,
-        "fetch_interval_minutes": job_scheduler.fetch_interval_minutes
+        "fetch_interval_minutes": job_scheduler.fetch_interval_minutes,
+        "continuous": settings.fetch_continuous,
+        "schedules": [schedule.to_dict() for schedule in job_scheduler.schedules.values()]
     }
 
 
@@ -1,9 +1,12 @@
 """Database models."""
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, JSON, LargeBinary, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from database import Base
 import enum
 
+# Profile of resumes uploaded without naming one
+DEFAULT_PROFILE = "default"
+
 
 class JobStatus(str, enum.Enum):
     """Job processing status."""
@@ -21,6 +24,14 @@ class JobLabel(str, enum.Enum):
     LEAST_FIT = "least"
 
 
+class RunStatus(str, enum.Enum):
+    """Fetch run status."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class Job(Base):
     """Job posting model."""
     
@@ -36,18 +47,29 @@ class Job(Base):
     apply_url = Column(String, unique=True, index=True)  # UNIQUE - prevents duplicates
     timestamp_fetched = Column(DateTime, default=func.now())
     
-    # Processing fields
+    # Processing fields (best fit across resume profiles; per-profile scores live in job_scores)
     status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING, index=True)
     score = Column(Float, default=0.0)
     label = Column(SQLEnum(JobLabel), nullable=True, index=True)
     
-    # Scoring metadata
+    # Scoring metadata (of the best-fitting profile)
     keywords_matched = Column(JSON)  # Matched keywords
     llm_reasoning = Column(Text)  # LLM explanation of the score
     
+    # Near-duplicate of another stored job (score copied from it)
+    canonical_job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True, index=True)
+    
+    # Work queue (see services/job_queue.py)
+    lease_owner = Column(String, nullable=True, index=True)  # Worker lease holding this job
+    lease_expires_at = Column(DateTime, nullable=True, index=True)  # Lease expiry / retry not-before
+    attempts = Column(Integer, default=0)  # Failed processing attempts
+    failed_status = Column(SQLEnum(JobStatus), nullable=True)  # Stage to resume from after FAILED
+    last_error = Column(Text)
+    classified_at = Column(DateTime, nullable=True, index=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)  # Read model refresh cursor
     
     def to_dict(self):
         """Convert to dictionary."""
@@ -66,17 +88,187 @@ class Job(Base):
             "label": self.label.value if self.label else None,
             "keywords_matched": self.keywords_matched,
             "llm_reasoning": self.llm_reasoning,
+            "canonical_job_id": self.canonical_job_id,
+            "classified_at": self.classified_at.isoformat() if self.classified_at else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
 
 
+class JobScore(Base):
+    """Score and label of a job for one resume profile."""
+    
+    __tablename__ = "job_scores"
+    __table_args__ = (Index("ix_job_scores_resume_score", "resume_id", "score"),)
+    
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True, index=True)
+    score = Column(Float, default=0.0)
+    label = Column(SQLEnum(JobLabel), nullable=True, index=True)
+    keywords_matched = Column(JSON)  # Matched keywords
+    llm_reasoning = Column(Text)  # LLM explanation of the score
+    similarity = Column(Float, nullable=True)  # Job/resume embedding cosine similarity, when computed
+    prefiltered = Column(Boolean, default=False)  # Below the similarity cutoff - keyword score, no LLM call
+    scored_at = Column(DateTime, default=func.now())
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "job_id": self.job_id,
+            "resume_id": self.resume_id,
+            "score": self.score,
+            "label": self.label.value if self.label else None,
+            "keywords_matched": self.keywords_matched,
+            "llm_reasoning": self.llm_reasoning,
+            "similarity": self.similarity,
+            "prefiltered": self.prefiltered,
+            "scored_at": self.scored_at.isoformat() if self.scored_at else None,
+        }
+
+
+class Skill(Base):
+    """Normalized skill name, referenced by the job_skills facet index."""
+    
+    __tablename__ = "skills"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)  # Lower-cased, whitespace collapsed
+
+
+class JobSkill(Base):
+    """Skill facet index: one row per skill in a job's keywords_matched (see services/skill_index.py)."""
+    
+    __tablename__ = "job_skills"
+    
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)  # Jobs having a skill
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class JobSignature(Base):
+    """MinHash signature of a canonical job for near-duplicate detection."""
+    
+    __tablename__ = "job_signatures"
+    
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    company_key = Column(String, index=True)  # Normalized company name
+    signature = Column(LargeBinary, nullable=False)  # uint32 MinHash values
+    created_at = Column(DateTime, default=func.now())
+
+
+class Embedding(Base):
+    """Unit-normalized, quantized embedding of a job or resume."""
+    
+    __tablename__ = "embeddings"
+    
+    kind = Column(String, primary_key=True)  # "job" or "resume"
+    owner_id = Column(Integer, primary_key=True)  # jobs.id / resumes.id
+    model = Column(String, nullable=False, index=True)  # Embedding model that produced it
+    dtype = Column(String, nullable=False)  # float16 or int8
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=func.now(), index=True)
+
+
+class ArchivedJobKey(Base):
+    """Dedupe key of a job moved to the archives, so it isn't fetched again."""
+    
+    __tablename__ = "archived_job_keys"
+    
+    apply_url = Column(String, primary_key=True)
+    job_id = Column(String)  # External job ID
+    partition = Column(String)  # Archive partition (date) holding the job
+    archived_at = Column(DateTime, default=func.now())
+
+
+class BoilerplateParagraph(Base):
+    """How many distinct postings contain a given description paragraph."""
+    
+    __tablename__ = "boilerplate_paragraphs"
+    
+    paragraph_hash = Column(String, primary_key=True)
+    job_count = Column(Integer, default=0, index=True)
+    sample = Column(Text)  # Leading text, for inspecting what gets stripped
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class SchedulerLease(Base):
+    """Leader lease row - the process holding it runs the fetch cycles."""
+    
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String, primary_key=True)
+    owner = Column(String)  # host:pid of the current leader
+    expires_at = Column(DateTime)  # Other processes may take over after this
+    heartbeat_at = Column(DateTime)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "name": self.name,
+            "owner": self.owner,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+        }
+
+
+class FetchRun(Base):
+    """One fetch cycle: stage timings, counts, token usage and errors."""
+    
+    __tablename__ = "fetch_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    trigger = Column(String)  # scheduled / manual / coalesced / continuous, ":<source>[/<search term>]" for per-source runs
+    status = Column(SQLEnum(RunStatus), default=RunStatus.PENDING, index=True)
+    owner = Column(String)  # Process that ran it
+    
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    duration_seconds = Column(Float)
+    stage_seconds = Column(JSON)  # Stage name -> seconds
+    
+    # Counts
+    fetched = Column(Integer, default=0)
+    deduped = Column(Integer, default=0)
+    scored = Column(Integer, default=0)
+    stored = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    
+    # LLM usage
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    
+    error = Column(Text)
+    created_at = Column(DateTime, default=func.now(), index=True)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "status": self.status.value if self.status else None,
+            "owner": self.owner,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration_seconds,
+            "stage_seconds": self.stage_seconds or {},
+            "fetched": self.fetched,
+            "deduped": self.deduped,
+            "scored": self.scored,
+            "stored": self.stored,
+            "failed": self.failed,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
 class Resume(Base):
-    """Resume model - ONLY ONE resume allowed at a time."""
+    """Resume model - one resume per profile (team member); every profile scores every job."""
     
     __tablename__ = "resumes"
     
     id = Column(Integer, primary_key=True, index=True)
+    profile = Column(String, unique=True, index=True, nullable=False, default=DEFAULT_PROFILE)
     filename = Column(String)
     content = Column(Text, nullable=False)
     
@@ -93,6 +285,7 @@ class Resume(Base):
         """Convert to dictionary."""
         return {
             "id": self.id,
+            "profile": self.profile,
             "filename": self.filename,
             "content": self.content,
             "skills": self.skills,
@@ -1,10 +1,22 @@
 """LangGraph pipeline - simplified following best practices."""
-from typing import Dict, Any, TypedDict
-from langgraph.graph import StateGraph, START, END
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, TypedDict, Union
+from sqlalchemy import or_
+from config import get_settings
+from database import SessionLocal
+from models import Job, JobStatus
 from utils import get_logger
+from utils.metrics import NODE_SECONDS, DEDUPE_DROPS, timed
 from services import JobNormalizer, JobScorer, JobClassifier
+from services.job_deduplicator import deduplicator
+from services.job_queue import JobQueue
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 
 class PipelineState(TypedDict):
@@ -17,8 +29,27 @@ class PipelineState(TypedDict):
     label: str
     error: str
     job_id: str
+    signature: Any
+    duplicate_of: Optional[int]
+
+
+def _initial_state(raw_job: Dict[str, Any], resume_data: Dict[str, Any]) -> PipelineState:
+    """Empty per-job state."""
+    return {
+        "raw_job": raw_job,
+        "resume_data": resume_data,
+        "normalized_job": {},
+        "score": 0.0,
+        "score_details": {},
+        "label": "",
+        "error": "",
+        "job_id": "",
+        "signature": None,
+        "duplicate_of": None
+    }
 
 
+@timed(NODE_SECONDS.labels(node="normalize"))
 def normalize_job(state: PipelineState) -> Dict[str, Any]:
     """Normalize raw job data."""
     try:
@@ -36,9 +67,55 @@ def normalize_job(state: PipelineState) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+@timed(NODE_SECONDS.labels(node="dedupe"))
+def dedupe_job(state: PipelineState) -> Dict[str, Any]:
+    """Link near-duplicates to their canonical job and reuse its score."""
+    if state.get("error") or not settings.dedupe_enabled:
+        return {}
+    
+    try:
+        signature = deduplicator.signature(state["normalized_job"])
+        match = deduplicator.find_duplicate(state["normalized_job"], signature)
+        if not match:
+            return {"signature": signature}
+        
+        # Copy the canonical's score only once it has one - otherwise score this job too
+        with SessionLocal() as db:
+            canonical = db.get(Job, match["job_id"])
+            if canonical is None or canonical.status not in (JobStatus.SCORED, JobStatus.CLASSIFIED):
+                return {"signature": signature}
+            score = canonical.score or 0.0
+            details = {
+                "score": score,
+                "llm_reasoning": canonical.llm_reasoning or "",
+                "matched_keywords": canonical.keywords_matched or []
+            }
+        
+        DEDUPE_DROPS.labels(scope="stored").inc()
+        logger.debug(
+            f"Job {state['job_id']} duplicates job {match['job_id']} "
+            f"(similarity {match['similarity']})"
+        )
+        return {
+            "signature": signature,
+            "duplicate_of": match["job_id"],
+            "score": score,
+            "score_details": {
+                **details,
+                "duplicate_of": match["job_id"],
+                "similarity": match["similarity"]
+            }
+        }
+    except Exception as e:
+        # Dedupe is an optimization - never drop a job because of it
+        logger.error(f"Dedupe error: {e}")
+        return {}
+
+
+@timed(NODE_SECONDS.labels(node="score"))
 def score_job(state: PipelineState) -> Dict[str, Any]:
     """Score job against resume using LLM."""
-    if state.get("error"):
+    if state.get("error") or state.get("duplicate_of"):
         return {}
     
     try:
@@ -57,6 +134,7 @@ def score_job(state: PipelineState) -> Dict[str, Any]:
         return {"error": str(e), "score": 0.0}
 
 
+@timed(NODE_SECONDS.labels(node="classify"))
 def classify_job(state: PipelineState) -> Dict[str, Any]:
     """Classify job based on score."""
     if state.get("error"):
@@ -74,21 +152,26 @@ def classify_job(state: PipelineState) -> Dict[str, Any]:
 class JobProcessingPipeline:
     """LangGraph-based job processing pipeline."""
     
-    def __init__(self):
-        self.graph = build_graph()
+    def __init__(self, session_factory=SessionLocal, worker=None):
+        self.session_factory = session_factory
+        self._worker = worker
+    
+    @property
+    def graph(self):
+        """Compiled per-job graph (only :meth:`process_job` needs it)."""
+        return compiled_graph()
+    
+    @property
+    def worker(self):
+        """Queue worker running the batch stages, created on first use."""
+        if self._worker is None:
+            from worker import PipelineWorker  # worker imports this module's nodes
+            self._worker = PipelineWorker(session_factory=self.session_factory)
+        return self._worker
     
     def process_job(self, raw_job: Dict[str, Any], resume_data: Dict[str, Any]) -> PipelineState:
         """Process a job through the pipeline."""
-        initial_state: PipelineState = {
-            "raw_job": raw_job,
-            "resume_data": resume_data,
-            "normalized_job": {},
-            "score": 0.0,
-            "score_details": {},
-            "label": "",
-            "error": "",
-            "job_id": ""
-        }
+        initial_state = _initial_state(raw_job, resume_data)
         
         try:
             return self.graph.invoke(initial_state)
@@ -96,22 +179,119 @@ class JobProcessingPipeline:
             logger.error(f"Pipeline error: {e}")
             initial_state["error"] = str(e)
             return initial_state
+    
+    def process_batch(self, raw_jobs: "Union[pd.DataFrame, List[Dict[str, Any]]]") -> List[PipelineState]:
+        """
+        Process many jobs through the work queue's batched stages.
+        
+        The batch is normalized column-wise and queued, then the queue worker
+        drains it stage by stage: one dedupe pass, one embedding call and
+        concurrent scoring per batch, scored against every stored resume
+        profile. Jobs queued earlier are drained along with it.
+        
+        Args:
+            raw_jobs: Raw JobSpy DataFrame, or raw job dictionaries from fetcher
+        
+        Returns:
+            One PipelineState per raw job, in input order. Failed jobs carry
+            their own ``error``; the rest of the batch is unaffected.
+        """
+        if len(raw_jobs) == 0:
+            return []
+        
+        normalized_jobs = JobNormalizer.batch_normalize(raw_jobs)
+        db = self.session_factory()
+        try:
+            JobQueue.enqueue(db, normalized_jobs)
+        finally:
+            db.close()
+        
+        self.worker.drain()
+        return self._batch_states(raw_jobs, normalized_jobs)
+    
+    async def aprocess_batch(self, raw_jobs: "Union[pd.DataFrame, List[Dict[str, Any]]]") -> List[PipelineState]:
+        """Async variant of :meth:`process_batch` that keeps the event loop free."""
+        return await asyncio.to_thread(self.process_batch, raw_jobs)
+    
+    def _batch_states(
+        self,
+        raw_jobs: "Union[pd.DataFrame, List[Dict[str, Any]]]",
+        normalized_jobs: List[Optional[Dict[str, Any]]]
+    ) -> List[PipelineState]:
+        """Per-job states read back from the stored jobs, aligned with the input."""
+        import pandas as pd
+        if isinstance(raw_jobs, pd.DataFrame):
+            raw_jobs = raw_jobs.to_dict("records")
+        
+        urls = [job["apply_url"] for job in normalized_jobs if job and job.get("apply_url")]
+        job_ids = [job["job_id"] for job in normalized_jobs if job and not job.get("apply_url")]
+        db = self.session_factory()
+        try:
+            stored = db.query(Job).filter(or_(Job.apply_url.in_(urls), Job.job_id.in_(job_ids))).order_by(Job.id).all()
+            by_url = {job.apply_url: job for job in stored if job.apply_url}
+            by_job_id = {job.job_id: job for job in stored if not job.apply_url}
+            
+            states = []
+            for raw_job, normalized in zip(raw_jobs, normalized_jobs):
+                state = _initial_state(raw_job, {})
+                states.append(state)
+                if not normalized:
+                    state["error"] = "Failed to normalize job"
+                    continue
+                
+                state["normalized_job"] = normalized
+                state["job_id"] = normalized["job_id"]
+                job = by_url.get(normalized.get("apply_url")) or by_job_id.get(normalized["job_id"])
+                if job is None:
+                    state["error"] = "Job was not stored"
+                elif job.status == JobStatus.FAILED:
+                    state["error"] = job.last_error or "Job failed"
+                elif job.status != JobStatus.CLASSIFIED:
+                    state["error"] = f"Job is still {job.status.value}"
+                else:
+                    state["score"] = job.score or 0.0
+                    state["label"] = job.label.value if job.label else ""
+                    state["duplicate_of"] = job.canonical_job_id
+                    state["score_details"] = {
+                        "score": state["score"],
+                        "llm_reasoning": job.llm_reasoning or "",
+                        "matched_keywords": job.keywords_matched or []
+                    }
+            return states
+        finally:
+            db.close()
+
 
 def build_graph():
     """Build the LangGraph pipeline."""
+    from langgraph.graph import StateGraph, START, END  # Imported lazily - ~0.5s
+    
     builder = StateGraph(PipelineState)
     
     # Add nodes by function (LangGraph references them by function name)
     builder.add_node(normalize_job)
+    builder.add_node(dedupe_job)
     builder.add_node(score_job)
     builder.add_node(classify_job)
     
     # Define edges - simple linear flow
     builder.add_edge(START, "normalize_job")
-    builder.add_edge("normalize_job", "score_job")
+    builder.add_edge("normalize_job", "dedupe_job")
+    builder.add_edge("dedupe_job", "score_job")
     builder.add_edge("score_job", "classify_job")
     builder.add_edge("classify_job", END)
     
     return builder.compile()
-# Create standalone graph instance for CLI
-graph = build_graph()
\ No newline at end of file
+
+
+@lru_cache()
+def compiled_graph():
+    """Shared compiled per-job graph, built on first use (or by the startup warm-up)."""
+    return build_graph()
+
+
+def __getattr__(name: str):
+    """Standalone ``graph`` instance for the CLI, compiled on first access."""
+    if name == "graph":
+        return compiled_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""Replay recorded JobSpy fetches through the pipeline.
+
+Recordings come from running with FETCH_RECORD_DIR set. Replayed cycles go
+through normalization, queueing, scoring and classification exactly like
+scraped ones, so point DATABASE_URL (and whatever scorer or DB settings are
+under test) at a scratch setup with a resume uploaded first:
+
+    python replay.py recordings/                          # every cycle, as fast as possible
+    python replay.py recordings/ --speed 1                # original timing
+    python replay.py recordings/ --since 2024-06-01 --until 2024-06-08
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from config import get_settings
+from database import SessionLocal, init_db
+from models import FetchRun, Resume
+from scheduler import JobScheduler
+from services.fetch_recorder import ReplayFetcher
+from utils import get_logger, configure_logging
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+async def replay(fetcher: ReplayFetcher) -> int:
+    """Run one fetch cycle per recorded cycle; returns the cycles replayed."""
+    scheduler = JobScheduler()
+    scheduler.fetcher = fetcher
+    scheduler.elector.is_leader = True  # Offline run - no other process to coordinate with
+    
+    cycles = 0
+    while fetcher.remaining:
+        await scheduler.run_cycle(trigger="replay")
+        cycles += 1
+    return cycles
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Replay recorded JobSpy fetches through the pipeline.")
+    parser.add_argument("replay_dir", nargs="?", default=settings.fetch_replay_dir, help="Recording directory")
+    parser.add_argument(
+        "--speed", type=float, default=settings.fetch_replay_speed,
+        help="0 = as fast as possible, 1 = original timing, 10 = ten times faster"
+    )
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only cycles fetched at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only cycles fetched before this time")
+    args = parser.parse_args()
+    if not args.replay_dir:
+        parser.error("give a recording directory (or set FETCH_REPLAY_DIR)")
+    
+    configure_logging()
+    init_db()
+    db = SessionLocal()
+    try:
+        if not db.query(Resume).first():
+            parser.error("no resume in the database - upload one first")
+        first_run = db.query(FetchRun.id).order_by(FetchRun.id.desc()).limit(1).scalar() or 0
+    finally:
+        db.close()
+    
+    fetcher = ReplayFetcher(args.replay_dir, speed=args.speed, since=args.since, until=args.until)
+    start = time.perf_counter()
+    cycles = asyncio.run(replay(fetcher))
+    elapsed = time.perf_counter() - start
+    
+    db = SessionLocal()
+    try:
+        runs = db.query(FetchRun).filter(FetchRun.id > first_run, FetchRun.trigger == "replay").all()
+        fetched = sum(run.fetched or 0 for run in runs)
+        scored = sum(run.scored or 0 for run in runs)
+    finally:
+        db.close()
+    logger.info(
+        f"Replayed {cycles} fetch cycles in {elapsed:.1f}s: {fetched} jobs fetched, {scored} scored "
+        f"({fetched / elapsed if elapsed else 0:.1f} jobs/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,153 +1,631 @@
 """Job fetching scheduler."""
 import asyncio
+import random
+import time
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from config import get_settings
 from database import SessionLocal
-from models import Job, Resume, JobStatus, JobLabel
-from services import JobFetcher
-from pipeline import JobProcessingPipeline
+from models import Job, Resume, JobStatus, RunStatus
+from services import JobFetcher, JobNormalizer
+from services.fetch_recorder import ReplayFetcher
+from services.job_archiver import job_archiver
+from services.job_queue import JobQueue
+from services.job_read_model import job_read_model
+from services.leader_election import LeaderElector
+from services.profile_scores import ProfileScores
+from services.run_recorder import RunRecorder
 from api.websocket_manager import manager
 from utils import get_logger
+from utils.metrics import NODE_SECONDS, QUEUE_DEPTH
+from utils.profiling import profiler
+from utils.response_cache import response_cache
+from worker import PipelineWorker
+
+if TYPE_CHECKING:
+    import pandas as pd  # Imported where used, so `import main` doesn't load it
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# How far back the broadcast poll re-reads classified jobs
+_BROADCAST_OVERLAP = timedelta(seconds=30)
+
+# Schedule key of the fetch over every configured source (manual triggers, replays)
+ALL_SOURCES = "all"
+
+
+class FetchSchedule:
+    """One independently scheduled fetch: a source and search term with its own interval."""
+    
+    def __init__(self, source: Optional[str], search_term: Optional[str], interval_minutes: int):
+        self.source = source  # None = every configured source
+        self.search_term = search_term  # None = job_search_term
+        self.interval_minutes = interval_minutes
+        self.run_id = None  # Run in progress
+        self.starting = False  # Its fetch_runs row is being written
+        self.pending = False  # A cycle came due during the run; fetch again right after it
+        self.last_fetch_time = None
+        self.next_fetch_time = None
+    
+    @property
+    def active(self) -> bool:
+        return self.starting or self.run_id is not None
+    
+    @property
+    def key(self) -> str:
+        if self.source is None:
+            return ALL_SOURCES
+        return f"{self.source}/{self.search_term}" if self.search_term else self.source
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "source": self.source,
+            "search_term": self.search_term,
+            "interval_minutes": self.interval_minutes,
+            "run_id": self.run_id,
+            "pending": self.pending,
+            "last_fetch": self.last_fetch_time.isoformat() if self.last_fetch_time else None,
+            "next_fetch": self.next_fetch_time.isoformat() if self.next_fetch_time else None
+        }
+
 
 class JobScheduler:
     """Scheduler for periodic job fetching and processing."""
     
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
-        self.fetcher = JobFetcher()
-        self.pipeline = JobProcessingPipeline()
-        self.is_running = False
-        self.last_fetch_time = None
-        self.next_fetch_time = None
+        self.fetcher = ReplayFetcher(settings.fetch_replay_dir) if settings.fetch_replay_dir else JobFetcher()
+        self.worker = PipelineWorker()
+        self.elector = LeaderElector()
         self.fetch_interval_minutes = settings.job_fetch_interval_minutes
+        self.schedules = {schedule.key: schedule for schedule in self._build_schedules()}
+        # Manual triggers fetch every source (sharing the replay schedule when replaying)
+        self.manual = self.schedules.get(ALL_SOURCES) or FetchSchedule(None, None, self.fetch_interval_minutes)
+        self._source_locks: Dict[Optional[str], asyncio.Lock] = {}
+        self._source_started: Dict[Optional[str], float] = {}  # source -> monotonic start of its last fetch
+        self._process_lock = None  # Created on the event loop; one inline drain at a time
+        self._loops = []  # Continuous-mode tasks
+        self._broadcast_cursor = datetime.now()
+        self._broadcast_ids = {}  # job id -> classified_at, within the overlap window
+        self._run_tasks = set()  # Keep references so background runs aren't garbage collected
+    
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process runs the fetch cycles."""
+        return self.elector.is_leader
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether a fetch run is in progress in this process."""
+        return any(schedule.active for schedule in self._all_schedules())
+    
+    @property
+    def current_run_id(self) -> Optional[int]:
+        """Run of every source in progress (what manual triggers coalesce into)."""
+        return self.manual.run_id
+    
+    @property
+    def last_fetch_time(self) -> Optional[datetime]:
+        times = [schedule.last_fetch_time for schedule in self._all_schedules() if schedule.last_fetch_time]
+        return max(times) if times else None
+    
+    @property
+    def next_fetch_time(self) -> Optional[datetime]:
+        times = [schedule.next_fetch_time for schedule in self.schedules.values() if schedule.next_fetch_time]
+        return min(times) if times else None
     
-    async def fetch_and_process_jobs(self):
-        """Fetch new jobs and process them through the pipeline."""
+    @staticmethod
+    def _build_schedules() -> List[FetchSchedule]:
+        """
+        One schedule per configured source and search term.
+        
+        Replays fix what was fetched, so they keep a single schedule over
+        every source.
+        """
+        if settings.fetch_replay_dir:
+            return [FetchSchedule(None, None, settings.job_fetch_interval_minutes)]
+        terms = settings.job_search_terms or [None]
+        return [
+            FetchSchedule(
+                source,
+                term,
+                settings.job_source_intervals.get(source, settings.job_fetch_interval_minutes)
+            )
+            for source in settings.job_sources
+            for term in terms
+        ]
+    
+    def _running_run_ids(self) -> List[int]:
+        return [schedule.run_id for schedule in self._all_schedules() if schedule.run_id is not None]
+    
+    def _all_schedules(self) -> List[FetchSchedule]:
+        return [self.manual] + [schedule for schedule in self.schedules.values() if schedule is not self.manual]
+    
+    def _schedule(self, key: str) -> FetchSchedule:
+        return self.schedules.get(key) or self.manual
+    
+    async def fetch_and_process_jobs(self, trigger: str = "scheduled", key: str = ALL_SOURCES):
+        """
+        Scheduled fetch cycle of one schedule (leader only).
+        
+        The run goes on in the background: APScheduler skips firings while
+        the previous one is still being awaited, which would drop cycles
+        instead of coalescing them.
+        """
+        run = self._begin_cycle(trigger, key)
+        if run is not None:
+            self._spawn(run)
+    
+    async def run_cycle(self, trigger: str = "scheduled", key: str = ALL_SOURCES):
+        """Run one fetch cycle of a schedule to completion (continuous mode, replays, benchmarks)."""
+        run = self._begin_cycle(trigger, key)
+        if run is not None:
+            await run
+    
+    def _begin_cycle(self, trigger: str, key: str):
+        """
+        Start a cycle of a schedule.
+        
+        A cycle that comes due while the schedule's previous run is still
+        going is coalesced: one follow-up run starts as soon as it finishes.
+        
+        Returns:
+            The run to await, or None if there is nothing to run now
+        """
+        if not self.is_leader:
+            logger.debug("Not the scheduler leader, skipping fetch cycle")
+            return None
+        
+        schedule = self._schedule(key)
+        if schedule is not self.manual and self.manual.active:
+            logger.info(f"Fetch run #{self.manual.run_id} covers every source, coalescing the {key} cycle into it")
+            return None
+        if schedule.active:
+            if not schedule.pending:
+                logger.info(f"Fetch run #{schedule.run_id} ({key}) is still running, fetching again once it finishes")
+            schedule.pending = True
+            return None
+        
+        # Claimed before the first await, so a cycle firing meanwhile coalesces
+        schedule.starting = True
+        return self._run_schedule(schedule, trigger)
+    
+    async def _run_schedule(self, schedule: FetchSchedule, trigger: str, run_id: int = None):
+        """Start (unless already started) and execute a run, then the follow-up runs coalesced into it."""
+        while True:
+            if run_id is None:
+                try:
+                    run_id = await self._start_run(trigger, schedule)
+                except Exception as e:
+                    logger.error(f"Could not start a fetch run ({schedule.key}): {e}")
+                    schedule.pending = False
+                    return
+            await self._execute_run(run_id, schedule)
+            if not schedule.pending or not self.is_leader:
+                schedule.pending = False
+                return
+            schedule.pending = False
+            run_id, trigger = None, "coalesced"
+    
+    async def trigger(self, trigger: str = "manual") -> Dict[str, Any]:
+        """
+        Start a fetch run in the background and return its id right away.
+        
+        Args:
+            trigger: What requested the run
+        
+        Returns:
+            ``run_id`` and ``status``; ``coalesced`` is True when a run was
+            already in progress, ``delegated`` when the leader will pick it up
+        """
+        if not self.is_leader:
+            # Followers queue the run for the leader's next heartbeat
+            run_id = await asyncio.to_thread(self._create_run, trigger, RunStatus.PENDING)
+            logger.info(f"Fetch run #{run_id} queued for the scheduler leader")
+            return {"run_id": run_id, "status": RunStatus.PENDING.value, "coalesced": False, "delegated": True}
+        
         if self.is_running:
-            logger.warning("Previous job fetch is still running, skipping this cycle")
+            # Per-source runs in flight are fetching the same sites - join them instead of scraping twice
+            run_id = self.current_run_id or max(self._running_run_ids(), default=None)
+            logger.info(f"Fetch run #{run_id} already in progress, coalescing {trigger} trigger")
+            return {"run_id": run_id, "status": RunStatus.RUNNING.value, "coalesced": True, "delegated": False}
+        
+        run_id = await self._start_run(trigger, self.manual)
+        self._spawn(self._run_schedule(self.manual, trigger, run_id))
+        return {"run_id": run_id, "status": RunStatus.RUNNING.value, "coalesced": False, "delegated": False}
+    
+    async def _start_run(self, trigger: str, schedule: FetchSchedule) -> int:
+        """Record a RUNNING run off the event loop and make it the schedule's current one."""
+        if schedule.source is not None:
+            trigger = f"{trigger}:{schedule.key}"
+        # Marked before the await, so nothing can start the schedule meanwhile
+        schedule.starting = True
+        try:
+            schedule.run_id = await asyncio.to_thread(self._create_run, trigger, RunStatus.RUNNING)
+        finally:
+            schedule.starting = False
+        return schedule.run_id
+    
+    def _create_run(self, trigger: str, status: RunStatus) -> int:
+        """Insert a fetch_runs row."""
+        db: Session = SessionLocal()
+        try:
+            return RunRecorder.create(db, trigger, status=status, owner=self.elector.owner).id
+        finally:
+            db.close()
+    
+    def _spawn(self, coroutine):
+        """Run a coroutine in the background, keeping a reference until it finishes."""
+        task = asyncio.create_task(coroutine)
+        self._run_tasks.add(task)
+        task.add_done_callback(self._run_tasks.discard)
+    
+    async def _execute_run(self, run_id: int, schedule: FetchSchedule):
+        """Fetch, queue, process and broadcast, recording the run in fetch_runs."""
+        schedule.run_id = run_id
+        schedule.last_fetch_time = datetime.now()
+        recorder = RunRecorder(run_id)
+        logger.info(f"Starting fetch run #{run_id} ({schedule.key})")
+        
+        error = None
+        try:
+            with profiler.cycle(f"fetch run #{run_id}"):
+                with recorder.stage("fetch"):
+                    raw_jobs = await self._fetch(schedule)
+                recorder.add(fetched=len(raw_jobs))
+                
+                if not raw_jobs.empty:
+                    with recorder.stage("enqueue"):
+                        queued, invalid = await asyncio.to_thread(self._enqueue, raw_jobs)
+                    recorder.add(stored=queued, failed=invalid)
+                
+                if settings.queue_inline_worker:
+                    if self._process_lock is None:
+                        self._process_lock = asyncio.Lock()
+                    with recorder.stage("process"):
+                        # Concurrent source runs share the inline worker
+                        async with self._process_lock:
+                            stats = await asyncio.to_thread(self.worker.drain)
+                    response_cache.bump("jobs processed")
+                    recorder.add(
+                        deduped=stats.get("duplicates", 0),
+                        scored=stats.get("scored", 0),
+                        failed=stats.get("failed", 0),
+                        prompt_tokens=stats.get("prompt_tokens", 0),
+                        completion_tokens=stats.get("completion_tokens", 0)
+                    )
+                
+                with recorder.stage("broadcast"):
+                    await self.broadcast_classified_jobs()
+        
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Error in fetch run #{run_id}: {e}")
+        finally:
+            try:
+                await asyncio.to_thread(recorder.finish, error)
+            except Exception as e:
+                logger.error(f"Error recording fetch run #{run_id}: {e}")
+            schedule.run_id = None
+            schedule.last_fetch_time = datetime.now()
+            if not settings.fetch_continuous:
+                schedule.next_fetch_time = self._next_run_time(schedule)
+    
+    async def _fetch(self, schedule: FetchSchedule) -> "pd.DataFrame":
+        """Fetch jobs from the schedule's sources (empty if no resume is uploaded yet)."""
+        import pandas as pd
+        db: Session = SessionLocal()
+        try:
+            # Workers score every job against all resume profiles - fetch once at least one exists
+            if not db.query(Resume).first():
+                logger.warning("No resume found. Please upload a resume to start job processing.")
+                return pd.DataFrame()
+            JobNormalizer.load_boilerplate(db)
+        finally:
+            db.close()
+        
+        logger.info(f"Fetching jobs from {schedule.source or 'every source'}")
+        raw_jobs = await self.fetcher.fetch_jobs_frame(
+            search_term=schedule.search_term,
+            sources=[schedule.source] if schedule.source else None
+        )
+        
+        if raw_jobs.empty:
+            logger.info("No new jobs fetched")
+        else:
+            logger.info(f"Fetched {len(raw_jobs)} jobs")
+        return raw_jobs
+    
+    def _enqueue(self, raw_jobs: "pd.DataFrame") -> Tuple[int, int]:
+        """
+        Normalize fetched jobs and insert the new ones as PENDING.
+        
+        Returns:
+            (jobs queued, jobs that failed normalization)
+        """
+        with NODE_SECONDS.labels(node="normalize_batch").time():
+            normalized_jobs = JobNormalizer.batch_normalize(raw_jobs)
+        invalid = sum(1 for job in normalized_jobs if job is None)
+        
+        db: Session = SessionLocal()
+        try:
+            # Queue as PENDING - workers take it from here
+            queued = JobQueue.enqueue(db, normalized_jobs)
+        finally:
+            db.close()
+        if queued:
+            response_cache.bump("jobs queued")
+        
+        logger.info(f"Queued {queued} new jobs ({len(raw_jobs) - queued} already stored or invalid)")
+        return queued, invalid
+    
+    async def heartbeat(self):
+        """Renew or contend for scheduler leadership, and start runs queued by followers."""
+        try:
+            await asyncio.to_thread(self._renew_lease)
+        except Exception as e:
+            # Can't prove we still hold the lease - stand down until the next heartbeat
+            self.elector.is_leader = False
+            logger.error(f"Leader heartbeat failed: {e}")
             return
         
-        self.is_running = True
-        self.last_fetch_time = datetime.now()
-        logger.info("Starting scheduled job fetch and processing")
+        # A queued run fetches every source, so wait for the per-source runs in flight too
+        if not self.is_leader or self.is_running:
+            return
+        
+        self.manual.starting = True
+        try:
+            run_id = await asyncio.to_thread(self._claim_pending)
+        except Exception as e:
+            logger.error(f"Error claiming queued fetch runs: {e}")
+            run_id = None
+        finally:
+            self.manual.starting = False
         
+        if run_id is not None:
+            logger.info(f"Starting fetch run #{run_id} queued by another process")
+            self.manual.run_id = run_id
+            self._spawn(self._run_schedule(self.manual, "pending", run_id))
+    
+    def _claim_pending(self) -> Optional[int]:
+        """Blocking part of claiming a queued run."""
         db: Session = SessionLocal()
+        try:
+            return RunRecorder.claim_pending(db, self.elector.owner)
+        finally:
+            db.close()
+    
+    def _renew_lease(self):
+        """Blocking part of the heartbeat; a new leader fails the runs its predecessor left behind."""
+        was_leader = self.elector.is_leader
+        db: Session = SessionLocal()
+        try:
+            if self.elector.heartbeat(db) and not was_leader:
+                pending_before = datetime.now() - timedelta(seconds=settings.leader_lease_seconds)
+                RunRecorder.expire_abandoned(db, self.elector.owner, pending_before)
+        finally:
+            db.close()
+    
+    def leader_info(self) -> dict:
+        """Current leader lease, as seen from the database."""
+        db: Session = SessionLocal()
+        try:
+            return self.elector.current(db)
+        finally:
+            db.close()
+    
+    async def run_retention(self) -> Dict[str, int]:
+        """Archive jobs past their retention age (leader only, off the event loop)."""
+        if not self.is_leader:
+            return {"archived": 0, "files": 0}
+        
+        def run():
+            db: Session = SessionLocal()
+            try:
+                return job_archiver.run(db)
+            finally:
+                db.close()
         
         try:
-            # Get current resume (only one allowed)
-            resume = db.query(Resume).first()
-            
-            if not resume:
-                logger.warning("No resume found. Please upload a resume to start job processing.")
-                return
-            
-            # Build resume data - LLM only needs the content!
-            resume_data = {
-                "content": resume.content if resume.content else ""
-            }
-            
-            logger.info(f"Using resume: {len(resume_data['content'])} characters")
-            
-            # Fetch jobs
-            logger.info("Fetching jobs from sources")
-            raw_jobs = await self.fetcher.fetch_jobs()
+            return await asyncio.to_thread(run)
+        except Exception as e:
+            logger.error(f"Retention failed: {e}")
+            return {"archived": 0, "files": 0}
+    
+    async def broadcast_classified_jobs(self):
+        """Push jobs classified since the last poll (by any worker) to WebSocket clients."""
+        db: Session = SessionLocal()
+        
+        try:
+            # Piggyback the queue depth gauges on this poll
+            for status, count in JobQueue.depths(db).items():
+                QUEUE_DEPTH.labels(status=status).set(count)
             
-            if not raw_jobs:
-                logger.info("No new jobs fetched")
-                return
+            # Catch the job list read model up with stored and re-scored jobs
+            if settings.read_model_enabled:
+                job_read_model.refresh(db)
             
-            logger.info(f"Fetched {len(raw_jobs)} jobs")
+            # Notice job / resume changes made by other processes (workers, API replicas)
+            response_cache.observe(response_cache.fingerprint(db))
             
-            # Process each job through pipeline
-            new_jobs_count = 0
+            # Re-read a short window so rows committed out of order aren't missed
+            since = self._broadcast_cursor - _BROADCAST_OVERLAP
+            jobs = (
+                db.query(Job)
+                .filter(
+                    Job.status == JobStatus.CLASSIFIED,
+                    Job.canonical_job_id.is_(None),
+                    Job.classified_at >= since
+                )
+                .order_by(Job.classified_at, Job.id)
+                .all()
+            )
             
-            for raw_job in raw_jobs:
-                try:
-                    logger.info(f"Raw job: {raw_job}, Resume data : {resume_data}")
-                    # Process through pipeline first to get normalized data
-                    result = self.pipeline.process_job(raw_job, resume_data)
-                    
-                    if result.get("error"):
-                        logger.error(f"Error processing job: {result['error']}")
-                        continue
-                    
-                    apply_url = result["normalized_job"].get("apply_url")
-                    if apply_url:
-                        existing = db.query(Job).filter(Job.apply_url == apply_url).first()
-                        if existing:
-                            logger.debug(f"Job already exists (same URL): {result['normalized_job']['title']}")
-                            continue
-                    
-                    # Store in database (already processed above)
-                    job = Job(
-                        job_id=result["job_id"],
-                        title=result["normalized_job"]["title"],
-                        company=result["normalized_job"]["company"],
-                        description=result["normalized_job"]["description"],
-                        location=result["normalized_job"].get("location"),
-                        type=result["normalized_job"].get("type"),
-                        apply_url=result["normalized_job"].get("apply_url"),
-                        timestamp_fetched=result["normalized_job"].get("timestamp_fetched"),
-                        status=JobStatus.CLASSIFIED,
-                        score=result["score"],
-                        label=JobLabel(result["label"]),
-                        keywords_matched=result["score_details"].get("matched_keywords", []),
-                        llm_reasoning=result["score_details"].get("llm_reasoning", "")
-                    )
-                    
-                    db.add(job)
-                    db.commit()
-                    db.refresh(job)
-                    
-                    # Broadcast to WebSocket clients
-                    await manager.broadcast_new_job(job.to_dict())
-                    
-                    new_jobs_count += 1
-                    logger.info(f"Processed and stored job: {job.job_id} (score: {job.score})")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing individual job: {e}")
+            payloads = []
+            for job in jobs:
+                if job.id in self._broadcast_ids:
                     continue
+                self._broadcast_ids[job.id] = job.classified_at
+                payloads.append(job.to_dict())
+                if job.classified_at > self._broadcast_cursor:
+                    self._broadcast_cursor = job.classified_at
             
-            logger.info(f"Successfully processed {new_jobs_count} new jobs")
-            
-        except Exception as e:
-            logger.error(f"Error in scheduled job fetch: {e}")
+            # Each client shows its own profile's score
+            profiles = ProfileScores.by_profile(db, [payload["id"] for payload in payloads])
+            for payload in payloads:
+                payload["profiles"] = profiles[payload["id"]]
         finally:
             db.close()
-            self.is_running = False
-            self.last_fetch_time = datetime.now()
-            self.next_fetch_time = datetime.now() + timedelta(minutes=self.fetch_interval_minutes)
+        
+        # Forget ids that fell out of the overlap window
+        horizon = self._broadcast_cursor - _BROADCAST_OVERLAP
+        self._broadcast_ids = {
+            job_id: classified_at
+            for job_id, classified_at in self._broadcast_ids.items()
+            if classified_at >= horizon
+        }
+        
+        if payloads:
+            # Covers jobs classified after the fingerprint was read, which clients hear of right away
+            response_cache.bump("jobs classified")
+        
+        for payload in payloads:
+            await manager.broadcast_new_job(payload)
+        
+        if payloads:
+            logger.info(f"Broadcast {len(payloads)} newly classified jobs")
     
     def start(self):
         """Start the scheduler."""
-        # Schedule job fetching
+        # Every process heartbeats; only the lease holder runs fetch cycles
+        try:
+            self._renew_lease()
+        except Exception as e:
+            logger.error(f"Initial leader heartbeat failed: {e}")
+        
         self.scheduler.add_job(
-            self.fetch_and_process_jobs,
-            trigger=IntervalTrigger(minutes=settings.job_fetch_interval_minutes),
-            id="fetch_jobs",
-            name="Fetch and process jobs",
+            self.heartbeat,
+            trigger=IntervalTrigger(seconds=settings.leader_heartbeat_seconds),
+            id="leader_heartbeat",
+            name="Scheduler leader heartbeat",
+            replace_existing=True
+        )
+        
+        self._add_fetch_jobs()
+        
+        # Move old jobs to the archives (leader only)
+        if settings.retention_enabled:
+            self.scheduler.add_job(
+                self.run_retention,
+                trigger=IntervalTrigger(hours=settings.retention_interval_hours),
+                id="retention",
+                name="Archive old jobs",
+                replace_existing=True
+            )
+        
+        # Broadcast jobs classified by standalone workers too
+        self.scheduler.add_job(
+            self.broadcast_classified_jobs,
+            trigger=IntervalTrigger(seconds=settings.queue_broadcast_interval_seconds),
+            id="broadcast_jobs",
+            name="Broadcast classified jobs",
             replace_existing=True
         )
         
         self.scheduler.start()
-        self.next_fetch_time = datetime.now() + timedelta(minutes=self.fetch_interval_minutes)
-        logger.info(f"Scheduler started. Will fetch jobs every {self.fetch_interval_minutes} minutes")
+        for schedule in self.schedules.values():
+            if not settings.fetch_continuous:
+                schedule.next_fetch_time = self._next_run_time(schedule)
+        role = "leader" if self.is_leader else "follower"
+        if settings.fetch_continuous:
+            logger.info(f"Scheduler started as {role}. Fetching {len(self.schedules)} schedules continuously")
+        else:
+            intervals = ", ".join(f"{key} every {schedule.interval_minutes} min" for key, schedule in self.schedules.items())
+            logger.info(f"Scheduler started as {role}. Will fetch {intervals}")
+    
+    def _add_fetch_jobs(self):
+        """Each source / search term fetches on its own clock (or loop, in continuous mode)."""
+        for key, schedule in self.schedules.items():
+            if settings.fetch_continuous:
+                task = asyncio.create_task(self._continuous(schedule))
+                self._loops.append(task)
+                continue
+            self.scheduler.add_job(
+                self.fetch_and_process_jobs,
+                trigger=IntervalTrigger(
+                    minutes=schedule.interval_minutes,
+                    jitter=settings.fetch_jitter_seconds or None
+                ),
+                kwargs={"key": key},
+                id=f"fetch_jobs:{key}",
+                name=f"Fetch and process jobs ({key})",
+                replace_existing=True
+            )
+    
+    def _next_run_time(self, schedule: FetchSchedule) -> Optional[datetime]:
+        """When APScheduler fires the schedule next (jitter included)."""
+        job = self.scheduler.get_job(f"fetch_jobs:{schedule.key}")
+        if job is None or job.next_run_time is None:
+            return None
+        return job.next_run_time.replace(tzinfo=None)
+    
+    async def _continuous(self, schedule: FetchSchedule):
+        """
+        Continuous mode: fetch again as soon as the previous run finishes.
+        
+        Freshness is then bounded by the source's own latency; the per-source
+        rate budget (fetch_min_interval_seconds between starts) and jitter
+        keep it from hammering the site.
+        """
+        while True:
+            try:
+                if self.is_leader:
+                    await self._wait_for_budget(schedule.source)
+                    await self.run_cycle("continuous", schedule.key)
+                    delay = random.uniform(0, settings.fetch_jitter_seconds)
+                else:
+                    delay = settings.leader_heartbeat_seconds
+            except Exception as e:
+                logger.error(f"Continuous fetch of {schedule.key} failed: {e}")
+                delay = settings.fetch_min_interval_seconds
+            schedule.next_fetch_time = datetime.now() + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+    
+    async def _wait_for_budget(self, source: Optional[str]):
+        """Wait until the source may start another fetch, then claim the slot."""
+        lock = self._source_locks.setdefault(source, asyncio.Lock())
+        async with lock:
+            last = self._source_started.get(source)
+            if last is not None:
+                wait = last + settings.fetch_min_interval_seconds - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._source_started[source] = time.monotonic()
     
     def stop(self):
         """Stop the scheduler."""
+        for task in self._loops:
+            task.cancel()
+        self._loops.clear()
         self.scheduler.shutdown()
+        
+        # Hand leadership over right away instead of waiting for the lease to lapse
+        db: Session = SessionLocal()
+        try:
+            self.elector.release(db)
+        except Exception as e:
+            logger.error(f"Error releasing scheduler leadership: {e}")
+        finally:
+            db.close()
+        
         logger.info("Scheduler stopped")
     
-    async def run_now(self):
-        """Manually trigger job fetch and processing."""
+    async def run_now(self) -> Dict[str, Any]:
+        """Manually trigger job fetch and processing (returns immediately)."""
         logger.info("Manually triggering job fetch")
-        await self.fetch_and_process_jobs()
-
+        return await self.trigger("manual")
@@ -2,7 +2,7 @@
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from models import JobStatus, JobLabel
+from models import JobStatus, JobLabel, RunStatus
 
 
 class JobResponse(BaseModel):
@@ -20,17 +20,27 @@ class JobResponse(BaseModel):
     label: Optional[JobLabel] = None
     keywords_matched: Optional[List[str]] = None
     llm_reasoning: Optional[str] = None
+    canonical_job_id: Optional[int] = None
     timestamp_fetched: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
+    archived: bool = False  # Served from the retention archives
+    profile: Optional[str] = None  # Profile the score and label belong to (None = best across profiles)
     
     class Config:
         from_attributes = True
 
 
+class SimilarJobResponse(BaseModel):
+    """A job with its cosine similarity to the query job or resume."""
+    job: JobResponse
+    similarity: float
+
+
 class ResumeResponse(BaseModel):
     """Schema for resume API response."""
     id: int
+    profile: str
     filename: Optional[str] = None
     skills: Optional[List[str]] = None
     experiences: Optional[List[Dict[str, Any]]] = None
@@ -39,3 +49,27 @@ class ResumeResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class FetchRunResponse(BaseModel):
+    """Schema for fetch run API response."""
+    id: int
+    trigger: Optional[str] = None
+    status: RunStatus
+    owner: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    stage_seconds: Optional[Dict[str, float]] = None
+    fetched: int = 0
+    deduped: int = 0
+    scored: int = 0
+    stored: int = 0
+    failed: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
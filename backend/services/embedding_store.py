@@ -0,0 +1,282 @@
+"""Persistent embedding store with nearest-neighbor search."""
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from config import get_settings
+from models import Embedding, Job, Resume
+from services.job_normalizer import JobNormalizer
+from utils import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+JOB = "job"
+RESUME = "resume"
+
+# Storage formats for unit vectors (int8 components are scaled by 127)
+DTYPES = {"float16": np.float16, "int8": np.int8}
+_INT8_SCALE = 127.0
+
+# How far back refresh() re-reads embeddings written by other processes
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class EmbeddingStore:
+    """
+    Store job and resume embeddings and find nearest jobs.
+    
+    Vectors are unit-normalized and stored quantized (float16 or int8) in
+    the ``embeddings`` table. Job vectors are also kept in one in-memory
+    matrix with an id -> row index, so a query is a few blocked matrix
+    products instead of a scan over rows.
+    """
+    
+    def __init__(self, dtype: str = None, block_rows: int = None):
+        self.dtype = dtype or settings.embedding_store_dtype
+        if self.dtype not in DTYPES:
+            raise ValueError(f"embedding_store_dtype must be one of {', '.join(DTYPES)}")
+        self.block_rows = block_rows or settings.embedding_search_block_rows
+        
+        self._matrix: Optional[np.ndarray] = None  # (capacity, dim) in self.dtype
+        self._ids = np.empty(0, dtype=np.int64)  # job id per matrix row
+        self._rows: Dict[int, int] = {}  # job id -> matrix row
+        self._size = 0
+        self._loaded = False
+        self._refreshed_at = None  # Newest Embedding.created_at seen in the DB
+        self._lock = threading.Lock()
+    
+    @property
+    def size(self) -> int:
+        """Number of job vectors in the index."""
+        return self._size
+    
+    @staticmethod
+    def model_name() -> str:
+        """Name of the model producing new embeddings."""
+        return settings.embedding_model if settings.embedding_use_openai else settings.local_embedding_model
+    
+    # ===== Encoding =====
+    
+    def encode(self, vector) -> bytes:
+        """Unit-normalize and quantize a vector for storage."""
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        if self.dtype == "int8":
+            return np.clip(np.round(vector * _INT8_SCALE), -127, 127).astype(np.int8).tobytes()
+        return vector.astype(np.float16).tobytes()
+    
+    @staticmethod
+    def decode(blob: bytes, dtype: str) -> np.ndarray:
+        """Read-only view of a stored vector (no copy)."""
+        return np.frombuffer(blob, dtype=DTYPES[dtype])
+    
+    @staticmethod
+    def to_float(vectors: np.ndarray) -> np.ndarray:
+        """float32 unit vectors from stored ones."""
+        if vectors.dtype == np.int8:
+            return vectors.astype(np.float32) / _INT8_SCALE
+        return vectors.astype(np.float32)
+    
+    # ===== Storage =====
+    
+    def store(self, db: Session, kind: str, owner_id: int, vector) -> Embedding:
+        """Insert or replace an embedding (committed by the caller)."""
+        row = db.merge(Embedding(
+            kind=kind,
+            owner_id=owner_id,
+            model=self.model_name(),
+            dtype=self.dtype,
+            vector=self.encode(vector),
+            created_at=datetime.now()
+        ))
+        if kind == JOB:
+            with self._lock:
+                self._index(owner_id, self.decode(row.vector, row.dtype))
+        return row
+    
+    def get(self, db: Session, kind: str, owner_id: int) -> Optional[np.ndarray]:
+        """Stored float32 unit vector, or None if missing or from another model."""
+        row = db.get(Embedding, (kind, owner_id))
+        if row is None or row.model != self.model_name():
+            return None
+        return self.to_float(self.decode(row.vector, row.dtype))
+    
+    def embed_jobs(self, db: Session, jobs: List[Job]) -> int:
+        """Embed jobs in one model call and store the vectors; returns the count."""
+        if not jobs:
+            return 0
+        from services.embeddings import batch_generate_embeddings
+        
+        vectors = batch_generate_embeddings([self.job_text(job) for job in jobs], use_openai=settings.embedding_use_openai)
+        for job, vector in zip(jobs, vectors):
+            self.store(db, JOB, job.id, vector)
+        return len(jobs)
+    
+    def resume_vector(self, db: Session, resume: Resume) -> np.ndarray:
+        """The resume's vector, embedding and storing it on first use."""
+        vector = self.get(db, RESUME, resume.id)
+        if vector is None:
+            from services.embeddings import generate_embedding
+            
+            row = self.store(db, RESUME, resume.id, generate_embedding(
+                JobNormalizer.compress_resume(resume.content or ""), use_openai=settings.embedding_use_openai
+            ))
+            db.commit()
+            vector = self.to_float(self.decode(row.vector, row.dtype))
+        return vector
+    
+    def similarity_matrix(self, db: Session, jobs: List[Job], resumes: List[Resume]) -> np.ndarray:
+        """
+        Cosine similarity of every job to every resume, as one matrix product.
+        
+        Job vectors come from the in-memory index (embed the jobs first);
+        resumes are embedded on first use.
+        
+        Returns:
+            (len(jobs), len(resumes)) float32 array, NaN rows for jobs without a vector
+        """
+        resume_matrix = np.stack([self.resume_vector(db, resume) for resume in resumes])
+        similarities = np.full((len(jobs), len(resumes)), np.nan, dtype=np.float32)
+        with self._lock:
+            rows = [self._rows.get(job.id) for job in jobs]
+            present = [i for i, row in enumerate(rows) if row is not None]
+            job_matrix = self.to_float(self._matrix[[rows[i] for i in present]]) if present else None
+        if job_matrix is not None and job_matrix.shape[1] == resume_matrix.shape[1]:
+            similarities[present] = job_matrix @ resume_matrix.T
+        return similarities
+    
+    @staticmethod
+    def job_text(job: Job) -> str:
+        """Text embedded for a job: title plus the compressed description."""
+        return f"{job.title}\n{JobNormalizer.compress_description(job.description or '')}"
+    
+    # ===== Index =====
+    
+    def ensure_loaded(self, db: Session):
+        """Load stored job vectors on first use."""
+        if not self._loaded:
+            self.load(db)
+    
+    def invalidate(self):
+        """Force a full reload on next use."""
+        self._loaded = False
+    
+    def load(self, db: Session):
+        """(Re)build the in-memory matrix from the database."""
+        rows = db.query(Embedding).filter(Embedding.kind == JOB, Embedding.model == self.model_name()).all()
+        
+        with self._lock:
+            self._matrix = None
+            self._ids = np.empty(0, dtype=np.int64)
+            self._rows.clear()
+            self._size = 0
+            self._refreshed_at = None
+            for row in rows:
+                self._track_refresh(row.created_at)
+                self._index(row.owner_id, self.decode(row.vector, row.dtype))
+            self._loaded = True
+        
+        logger.info(f"Loaded embedding index with {self.size} jobs")
+    
+    def refresh(self, db: Session):
+        """Pull in job vectors other processes stored since the last load."""
+        if not self._loaded:
+            self.load(db)
+            return
+        
+        query = db.query(Embedding).filter(Embedding.kind == JOB, Embedding.model == self.model_name())
+        if self._refreshed_at is not None:
+            # Overlap the window so rows committed slightly out of order aren't missed
+            query = query.filter(Embedding.created_at >= self._refreshed_at - _REFRESH_OVERLAP)
+        
+        with self._lock:
+            for row in query.all():
+                self._track_refresh(row.created_at)
+                self._index(row.owner_id, self.decode(row.vector, row.dtype))
+    
+    def nearest(self, query: np.ndarray, k: int, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """
+        Most similar jobs by cosine similarity.
+        
+        Args:
+            query: Query vector (normalized here)
+            k: Number of neighbors
+            exclude: Job IDs to leave out (e.g. the query job itself)
+        
+        Returns:
+            (job id, similarity) pairs, most similar first
+        """
+        with self._lock:
+            matrix, ids, size = self._matrix, self._ids, self._size
+        if size == 0 or k <= 0:
+            return []
+        
+        query = np.asarray(query, dtype=np.float32)
+        if query.shape[0] != matrix.shape[1]:
+            raise ValueError(f"Query has {query.shape[0]} dimensions, index has {matrix.shape[1]}")
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        
+        exclude = np.fromiter(exclude, dtype=np.int64)
+        wanted = k + exclude.size
+        best_ids, best_scores = [], []
+        for start in range(0, size, self.block_rows):
+            stop = min(start + self.block_rows, size)
+            scores = self.to_float(matrix[start:stop]) @ query
+            if scores.size > wanted:
+                top = np.argpartition(scores, -wanted)[-wanted:]
+            else:
+                top = np.arange(scores.size)
+            best_ids.append(ids[start:stop][top])
+            best_scores.append(scores[top])
+        
+        candidate_ids = np.concatenate(best_ids)
+        candidate_scores = np.concatenate(best_scores)
+        keep = ~np.isin(candidate_ids, exclude)
+        candidate_ids, candidate_scores = candidate_ids[keep], candidate_scores[keep]
+        order = np.argsort(-candidate_scores, kind="stable")[:k]
+        return [(int(candidate_ids[i]), round(float(candidate_scores[i]), 4)) for i in order]
+    
+    def _index(self, job_id: int, vector: np.ndarray):
+        """Add or replace a job's matrix row (caller holds the lock)."""
+        if self._matrix is None:
+            self._matrix = np.empty((64, vector.shape[0]), dtype=DTYPES[self.dtype])
+            self._ids = np.empty(64, dtype=np.int64)
+        if vector.shape[0] != self._matrix.shape[1]:
+            logger.warning(f"Skipping embedding of job {job_id}: {vector.shape[0]} dims, index has {self._matrix.shape[1]}")
+            return
+        
+        vector = self._convert(vector)
+        row = self._rows.get(job_id)
+        if row is None:
+            if self._size == self._matrix.shape[0]:
+                # Grow into new arrays so concurrent searches keep a consistent view
+                self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+                self._ids = np.concatenate([self._ids, np.empty_like(self._ids)])
+            row = self._size
+            self._ids[row] = job_id
+            self._rows[job_id] = row
+            self._size += 1
+        self._matrix[row] = vector
+    
+    def _convert(self, vector: np.ndarray) -> np.ndarray:
+        """A stored vector in this index's dtype (rows written before a dtype change)."""
+        if vector.dtype == DTYPES[self.dtype]:
+            return vector
+        unit = self.to_float(vector)
+        if self.dtype == "int8":
+            return np.clip(np.round(unit * _INT8_SCALE), -127, 127).astype(np.int8)
+        return unit.astype(np.float16)
+    
+    def _track_refresh(self, created_at: Optional[datetime]):
+        if created_at is not None and (self._refreshed_at is None or created_at > self._refreshed_at):
+            self._refreshed_at = created_at
+
+
+# Global store shared by the worker and the API
+embedding_store = EmbeddingStore()
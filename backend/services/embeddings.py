@@ -1,27 +1,274 @@
-"""Embedding generation service."""
-import openai
-from typing import List
-from sentence_transformers import SentenceTransformer
-from config import get_settings
+"""Embedding generation service.
+
+Callers on any thread hand their texts to an EmbeddingService, whose
+dedicated thread merges concurrent requests into micro-batches (up to
+``embedding_max_batch_size`` texts, waiting at most ``embedding_max_wait_ms``
+for more to arrive) so they share one forward pass. Vectors are cached on
+disk keyed by model and text hash, so a text is never embedded twice.
+"""
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+import numpy as np
+from config import BACKEND_DIR, get_settings
 from utils import get_logger
+from utils.metrics import CACHE_HITS, EMBEDDED_TEXTS, EMBED_BATCH_SECONDS
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 # Cache for embedding model
 _embedding_model = None
+_embedding_model_lock = threading.Lock()
 
 
 def get_embedding_model():
-    """Get or create embedding model."""
+    """Get or create the local embedding model (torch, or ONNX per ``embedding_backend``)."""
     global _embedding_model
-    if _embedding_model is None:
-        logger.info(f"Loading local embedding model: {settings.local_embedding_model}")
-        _embedding_model = SentenceTransformer(settings.local_embedding_model)
+    with _embedding_model_lock:  # The warm-up thread may be loading it already
+        if _embedding_model is None:
+            from sentence_transformers import SentenceTransformer  # Pulls in torch - import only when needed
+            logger.info(f"Loading local embedding model: {settings.local_embedding_model} ({settings.embedding_backend})")
+            if settings.embedding_backend == "onnx":
+                # Quantized ONNX weights run int8 matmuls on CPU-only hosts
+                model_kwargs = {"file_name": settings.embedding_onnx_file} if settings.embedding_onnx_file else None
+                _embedding_model = SentenceTransformer(
+                    settings.local_embedding_model, backend="onnx", model_kwargs=model_kwargs
+                )
+            else:
+                _embedding_model = SentenceTransformer(settings.local_embedding_model)
     return _embedding_model
 
 
-def generate_embedding(text: str, use_openai: bool = False) -> List[float]:
+def _encode_local(texts: List[str]) -> np.ndarray:
+    """Run the local model on a batch of texts."""
+    model = get_embedding_model()
+    return np.asarray(
+        model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False),
+        dtype=np.float32
+    )
+
+
+def _encode_openai(texts: List[str]) -> np.ndarray:
+    """Embed a batch of texts with the OpenAI API."""
+    import openai
+    response = openai.embeddings.create(model=settings.embedding_model, input=texts)
+    return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+
+class EmbeddingCache:
+    """On-disk vector cache (SQLite) keyed by model name and text hash."""
+    
+    def __init__(self, path: str):
+        path = Path(path)
+        self.path = path if path.is_absolute() else BACKEND_DIR / path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        """Cache key of a text under a model."""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for the keys that have one."""
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), 500):  # SQLite variable limit
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Store vectors by key."""
+        if not items:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+            )
+            conn.commit()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        return self._conn
+
+
+class EmbeddingService:
+    """
+    Merge concurrent embedding requests into micro-batches on one thread.
+    
+    Each batch is looked up in the disk cache first; only missing (and
+    de-duplicated) texts reach the model.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        encoder: Callable[[List[str]], np.ndarray],
+        model_key: str,
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_size: int = None,
+        max_wait_ms: float = None
+    ):
+        self.name = name
+        self.encoder = encoder
+        self.model_key = model_key
+        self.cache = cache
+        self.max_batch_size = max_batch_size or settings.embedding_max_batch_size
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.embedding_max_wait_ms) / 1000.0
+        
+        self.stats = {"requests": 0, "texts": 0, "cache_hits": 0, "encoded": 0, "batches": 0, "encode_seconds": 0.0}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def embed(self, texts: List[str], timeout: float = None) -> np.ndarray:
+        """
+        Embed texts, sharing a forward pass with concurrent callers.
+        
+        Args:
+            texts: Texts to embed
+            timeout: Seconds to wait for the result (None = no limit)
+        
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future.result(timeout)
+    
+    def report(self) -> Dict[str, Any]:
+        """Counters plus model throughput in texts per second."""
+        stats = dict(self.stats)
+        stats["encode_seconds"] = round(stats["encode_seconds"], 3)
+        stats["texts_per_second"] = (
+            round(self.stats["encoded"] / self.stats["encode_seconds"], 1) if self.stats["encode_seconds"] else None
+        )
+        stats["mean_batch_size"] = round(self.stats["encoded"] / self.stats["batches"], 1) if self.stats["batches"] else None
+        stats["model"] = self.model_key
+        return stats
+    
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"embed-{self.name}", daemon=True)
+                    self._thread.start()
+    
+    def _run(self):
+        """Collect requests into batches and process them, forever."""
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request[0])
+            
+            try:
+                results = self._process([texts for texts, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), vectors in zip(batch, results):
+                future.set_result(vectors)
+    
+    def _process(self, requests: List[List[str]]) -> List[np.ndarray]:
+        """Embed the texts of several requests with cache lookups and one model pass per chunk."""
+        unique = list(dict.fromkeys(text for texts in requests for text in texts))
+        keys = {text: EmbeddingCache.key(self.model_key, text) for text in unique}
+        
+        vectors: Dict[str, np.ndarray] = {}
+        if self.cache is not None:
+            cached = self.cache.get_many(list(keys.values()))
+            vectors = {text: cached[key] for text, key in keys.items() if key in cached}
+        
+        missing = [text for text in unique if text not in vectors]
+        for start in range(0, len(missing), self.max_batch_size):
+            chunk = missing[start:start + self.max_batch_size]
+            began = time.perf_counter()
+            encoded = self.encoder(chunk)
+            elapsed = time.perf_counter() - began
+            
+            EMBED_BATCH_SECONDS.labels(backend=self.name).observe(elapsed)
+            EMBEDDED_TEXTS.labels(backend=self.name).inc(len(chunk))
+            self.stats["batches"] += 1
+            self.stats["encode_seconds"] += elapsed
+            logger.debug(f"Embedded {len(chunk)} texts with {self.name} in {elapsed * 1000:.1f} ms")
+            
+            fresh = dict(zip(chunk, encoded))
+            vectors.update(fresh)
+            if self.cache is not None:
+                self.cache.put_many({keys[text]: vector for text, vector in fresh.items()})
+        
+        hits = len(unique) - len(missing)
+        if hits:
+            CACHE_HITS.labels(cache="embeddings").inc(hits)
+        self.stats["requests"] += len(requests)
+        self.stats["texts"] += sum(len(texts) for texts in requests)
+        self.stats["cache_hits"] += hits
+        self.stats["encoded"] += len(missing)
+        
+        return [np.stack([vectors[text] for text in texts]) for texts in requests]
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_service(use_openai: bool = False) -> EmbeddingService:
+    """Shared service for the OpenAI API or the local model."""
+    name = "openai" if use_openai else settings.embedding_backend
+    with _services_lock:
+        if name not in _services:
+            if use_openai:
+                encoder, model_key = _encode_openai, f"openai:{settings.embedding_model}"
+            else:
+                encoder = _encode_local
+                model_key = f"{settings.local_embedding_model}:{name}"
+                if name == "onnx":
+                    model_key += f":{settings.embedding_onnx_file}"
+            cache = EmbeddingCache(settings.embedding_cache_path) if settings.embedding_cache_path else None
+            _services[name] = EmbeddingService(name, encoder, model_key, cache)
+        return _services[name]
+
+
+def embedding_stats() -> Dict[str, Dict[str, Any]]:
+    """Throughput and cache counters of every started service."""
+    with _services_lock:
+        return {name: service.report() for name, service in _services.items()}
+
+
+def generate_embedding(text: str, use_openai: bool = False) -> np.ndarray:
     """
     Generate embedding for text.
     
@@ -30,27 +277,12 @@ def generate_embedding(text: str, use_openai: bool = False) -> List[float]:
         use_openai: Whether to use OpenAI API (requires API key)
     
     Returns:
-        List of floats representing the embedding
+        float32 vector
     """
-    if use_openai and settings.openai_api_key:
-        try:
-            logger.info("Generating embedding using OpenAI")
-            response = openai.embeddings.create(
-                model=settings.embedding_model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.warning(f"OpenAI embedding failed: {e}. Falling back to local model.")
-    
-    # Use local model
-    logger.info("Generating embedding using local model")
-    model = get_embedding_model()
-    embedding = model.encode(text, convert_to_tensor=False)
-    return embedding.tolist()
+    return batch_generate_embeddings([text], use_openai=use_openai)[0]
 
 
-def batch_generate_embeddings(texts: List[str], use_openai: bool = False) -> List[List[float]]:
+def batch_generate_embeddings(texts: List[str], use_openai: bool = False) -> np.ndarray:
     """
     Generate embeddings for multiple texts.
     
@@ -59,22 +291,12 @@ def batch_generate_embeddings(texts: List[str], use_openai: bool = False) -> Lis
         use_openai: Whether to use OpenAI API
     
     Returns:
-        List of embeddings
+        float32 array with one row per text
     """
     if use_openai and settings.openai_api_key:
         try:
-            logger.info(f"Generating {len(texts)} embeddings using OpenAI")
-            response = openai.embeddings.create(
-                model=settings.embedding_model,
-                input=texts
-            )
-            return [item.embedding for item in response.data]
+            return get_service(use_openai=True).embed(texts)
         except Exception as e:
-            logger.warning(f"OpenAI batch embedding failed: {e}. Falling back to local model.")
+            logger.warning(f"OpenAI embedding failed: {e}. Falling back to local model.")
     
-    # Use local model
-    logger.info(f"Generating {len(texts)} embeddings using local model")
-    model = get_embedding_model()
-    embeddings = model.encode(texts, convert_to_tensor=False, show_progress_bar=False)
-    return [emb.tolist() for emb in embeddings]
-
+    return get_service().embed(texts)
@@ -0,0 +1,207 @@
+"""Record raw JobSpy fetches and replay them later.
+
+With ``fetch_record_dir`` set, every per-source JobSpy batch is written as
+one zstd-compressed NDJSON file
+
+    recordings/2024-06-01/20240601T120000123456-<cycle id>-indeed.ndjson.zst
+
+whose first line is the batch metadata (source, query, fetch time, scrape
+duration, fetch cycle) and the rest are the raw rows. With
+``fetch_replay_dir`` set, the scheduler takes its fetch cycles from such a
+directory instead of scraping (see ``replay.py``).
+"""
+import asyncio
+import io
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from config import get_settings
+from utils import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+RECORDING_SUFFIX = ".ndjson.zst"
+
+
+@dataclass
+class RecordedBatch:
+    """One recorded per-source JobSpy result."""
+    
+    meta: Dict[str, Any]
+    frame: "pd.DataFrame"
+    
+    @property
+    def fetched_at(self) -> datetime:
+        return datetime.fromisoformat(self.meta["fetched_at"])
+
+
+class FetchRecorder:
+    """Write raw fetch batches to compressed NDJSON files."""
+    
+    def __init__(self, record_dir: str):
+        self.record_dir = Path(record_dir)
+    
+    def record(
+        self,
+        frame: "pd.DataFrame",
+        source: str,
+        search_term: str,
+        location: str,
+        fetched_at: datetime,
+        elapsed_seconds: float,
+        cycle_id: str
+    ) -> Optional[Path]:
+        """
+        Store one batch (empty batches too, so replays keep the cycle shape).
+        
+        Returns:
+            The written file, or None if writing failed (recording never breaks a fetch)
+        """
+        import pandas as pd
+        import zstandard
+        
+        frame = frame if frame is not None else pd.DataFrame()
+        meta = {
+            "source": source,
+            "search_term": search_term,
+            "location": location,
+            "fetched_at": fetched_at.isoformat(),
+            "elapsed_seconds": round(elapsed_seconds, 3),
+            "cycle_id": cycle_id,
+            "rows": len(frame),
+        }
+        directory = self.record_dir / fetched_at.date().isoformat()
+        path = directory / f"{fetched_at.strftime('%Y%m%dT%H%M%S%f')}-{cycle_id}-{source}{RECORDING_SUFFIX}"
+        
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "wb") as f, zstandard.ZstdCompressor(level=10).stream_writer(f) as writer:
+                writer.write((json.dumps(meta) + "\n").encode("utf-8"))
+                if not frame.empty:
+                    writer.write(frame.to_json(orient="records", lines=True, date_format="iso").encode("utf-8"))
+                    writer.write(b"\n")
+            tmp.replace(path)
+        except Exception as e:
+            logger.error(f"Failed to record {source} fetch: {e}")
+            return None
+        
+        logger.debug(f"Recorded {len(frame)} {source} jobs to {path}")
+        return path
+    
+    @staticmethod
+    def read(path: Path) -> RecordedBatch:
+        """Load one recording."""
+        import pandas as pd
+        import zstandard
+        
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            text = io.TextIOWrapper(reader, encoding="utf-8")
+            meta = json.loads(text.readline())
+            rest = text.read()
+        frame = pd.read_json(io.StringIO(rest), lines=True, dtype=False) if rest.strip() else pd.DataFrame()
+        return RecordedBatch(meta=meta, frame=frame)
+    
+    @staticmethod
+    def new_cycle_id() -> str:
+        """Id shared by the batches of one fetch cycle."""
+        return uuid.uuid4().hex[:12]
+    
+    @staticmethod
+    def files(record_dir: str) -> List[Path]:
+        """Recordings in fetch order (file names start with the fetch time)."""
+        root = Path(record_dir)
+        if not root.exists():
+            return []
+        return sorted(root.glob(f"*/*{RECORDING_SUFFIX}"), key=lambda path: path.name)
+
+
+class ReplayFetcher:
+    """
+    Drop-in for JobFetcher.fetch_jobs_frame that serves recorded fetch cycles.
+    
+    Each call returns the next recorded cycle (all its sources concatenated),
+    then empty frames once the recordings are used up. ``speed`` 0 replays as
+    fast as the pipeline goes; 1 reproduces the original gaps between cycles
+    and scrape durations, 10 runs them ten times faster.
+    """
+    
+    def __init__(
+        self,
+        replay_dir: str,
+        speed: float = None,
+        since: datetime = None,
+        until: datetime = None
+    ):
+        self.replay_dir = replay_dir
+        self.speed = settings.fetch_replay_speed if speed is None else speed
+        self.sources = ["replay"]
+        self._cycles = self._group_cycles(replay_dir, since, until)
+        self._position = 0
+        self._clock_start: Optional[float] = None
+        self._origin: Optional[datetime] = None
+        logger.info(f"Replaying {len(self._cycles)} recorded fetch cycles from {replay_dir}")
+    
+    @property
+    def remaining(self) -> int:
+        """Cycles not replayed yet."""
+        return len(self._cycles) - self._position
+    
+    @staticmethod
+    def _group_cycles(replay_dir: str, since: datetime, until: datetime) -> List[List[Path]]:
+        """Recording files grouped by fetch cycle, in fetch order (from the file names alone)."""
+        cycles: Dict[str, List[Path]] = {}
+        for path in FetchRecorder.files(replay_dir):
+            stamp, cycle_id, _ = path.name[:-len(RECORDING_SUFFIX)].split("-", 2)
+            fetched_at = datetime.strptime(stamp, "%Y%m%dT%H%M%S%f")
+            if (since and fetched_at < since) or (until and fetched_at >= until):
+                continue
+            cycles.setdefault(cycle_id, []).append(path)
+        return list(cycles.values())
+    
+    async def fetch_jobs_frame(self, search_term: str = None, location: str = None, sources: List[str] = None) -> "pd.DataFrame":
+        """
+        Next recorded cycle as one raw JobSpy DataFrame (empty when exhausted).
+        
+        Query arguments are ignored - the recording fixes what was fetched.
+        """
+        import pandas as pd
+        if self._position >= len(self._cycles):
+            logger.info("Replay finished - no recorded fetches left")
+            return pd.DataFrame()
+        
+        batches = await asyncio.to_thread(lambda: [FetchRecorder.read(path) for path in self._cycles[self._position]])
+        self._position += 1
+        
+        delay = self._delay(batches)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        frames = [batch.frame for batch in batches if not batch.frame.empty]
+        logger.info(
+            f"Replayed fetch of {batches[0].meta['fetched_at']}: "
+            f"{sum(len(frame) for frame in frames)} jobs from {', '.join(b.meta['source'] for b in batches)}"
+        )
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    
+    def _delay(self, batches: List[RecordedBatch]) -> float:
+        """Seconds to wait so this cycle completes at its original (scaled) offset."""
+        if not self.speed:
+            return 0.0
+        started = min(batch.fetched_at for batch in batches)
+        scrape_seconds = max(batch.meta.get("elapsed_seconds", 0.0) for batch in batches)
+        if self._clock_start is None:
+            self._clock_start = time.monotonic()
+            self._origin = started
+        target = ((started - self._origin).total_seconds() + scrape_seconds) / self.speed
+        return max(0.0, target - (time.monotonic() - self._clock_start))
@@ -0,0 +1,321 @@
+"""Retention: move old jobs out of the hot table into compressed archives.
+
+Finished jobs stored longer than ``retention_days`` (least-fit ones after
+``retention_least_fit_days``) are written to date-partitioned files
+
+    archive/jobs/date=2024-05-01/part-20240801-030000-1a2b3c.parquet
+
+and deleted from ``jobs`` with their signatures, embeddings and profile scores. Their
+apply URLs stay in ``archived_job_keys`` so they are never fetched again.
+Files are written before rows are deleted, so a crash can at worst archive
+a job twice; readers keep one copy per id.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, TYPE_CHECKING
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from config import get_settings
+from models import ArchivedJobKey, Embedding, Job, JobLabel, JobScore, JobSignature, JobSkill, JobStatus
+from utils import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+ARCHIVE_FORMATS = {"parquet": ".parquet", "ndjson": ".ndjson.zst"}
+
+
+@lru_cache(maxsize=256)
+def _read_file(path: str, mtime: float) -> "pd.DataFrame":
+    """Load one archive file (cached until the file changes)."""
+    import pandas as pd
+    if path.endswith(ARCHIVE_FORMATS["parquet"]):
+        return pd.read_parquet(path)
+    import zstandard
+    with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+        return pd.read_json(reader, lines=True, dtype=False)
+
+
+class JobArchiver:
+    """Archive old jobs and read them back."""
+    
+    def __init__(self, archive_dir: str = None, archive_format: str = None):
+        self.archive_dir = Path(archive_dir or settings.archive_dir) / "jobs"
+        self.requested_format = archive_format or settings.archive_format
+        if self.requested_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"archive_format must be one of {', '.join(ARCHIVE_FORMATS)}")
+        self._lock = threading.Lock()  # One retention pass at a time
+    
+    @property
+    def format(self) -> str:
+        """Format used for new files (parquet falls back to ndjson without pyarrow)."""
+        if self.requested_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                return "ndjson"
+        return self.requested_format
+    
+    # ===== Retention =====
+    
+    def run(self, db: Session, now: datetime = None) -> Dict[str, int]:
+        """
+        Archive every job due for retention, then refresh planner statistics.
+        
+        Args:
+            db: Database session (committed here)
+            now: Reference time (defaults to now)
+        
+        Returns:
+            Counts: ``archived`` jobs and ``files`` written
+        """
+        if not self._lock.acquire(blocking=False):
+            logger.info("Retention already running - skipping")
+            return {"archived": 0, "files": 0}
+        
+        try:
+            now = now or datetime.now()
+            if self.format != self.requested_format:
+                logger.warning("pyarrow is not installed - archiving as zstd NDJSON instead of Parquet")
+            
+            stats = {"archived": 0, "files": 0}
+            while True:
+                ids = [job_id for (job_id,) in self._due(db, now).limit(settings.retention_batch_size)]
+                if not ids:
+                    break
+                jobs = (
+                    db.query(Job)
+                    .filter(or_(Job.id.in_(ids), and_(Job.canonical_job_id.in_(ids), self._finished())))
+                    .all()
+                )
+                stats["files"] += self._archive(db, jobs, now)
+                stats["archived"] += len(jobs)
+            
+            if stats["archived"]:
+                from services.embedding_store import embedding_store
+                from services.job_deduplicator import deduplicator
+                from services.job_read_model import job_read_model
+                from utils.response_cache import response_cache
+                embedding_store.invalidate()
+                deduplicator.invalidate()
+                job_read_model.invalidate()
+                response_cache.bump("retention")
+                self.compact(db)
+            
+            logger.info(f"Retention archived {stats['archived']} jobs into {stats['files']} files")
+            return stats
+        finally:
+            self._lock.release()
+    
+    @staticmethod
+    def _finished():
+        """Jobs no worker will touch again."""
+        return or_(
+            Job.status == JobStatus.CLASSIFIED,
+            and_(Job.status == JobStatus.FAILED, Job.attempts >= settings.queue_max_attempts)
+        )
+    
+    def _due(self, db: Session, now: datetime):
+        """Canonical finished jobs past their retention age, oldest first."""
+        cutoff = now - timedelta(days=settings.retention_days)
+        least_fit_cutoff = now - timedelta(days=settings.retention_least_fit_days)
+        return (
+            db.query(Job.id)
+            .filter(
+                Job.canonical_job_id.is_(None),
+                self._finished(),
+                or_(
+                    Job.created_at < cutoff,
+                    and_(Job.label == JobLabel.LEAST_FIT, Job.created_at < least_fit_cutoff)
+                )
+            )
+            .order_by(Job.id)
+        )
+    
+    def _archive(self, db: Session, jobs: List[Job], now: datetime) -> int:
+        """Write jobs to their partitions and remove them from the hot tables; returns files written."""
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            record = job.to_dict()
+            record["archived_at"] = now.isoformat()
+            partitions.setdefault(self.partition_of(job), []).append(record)
+        
+        for partition, records in partitions.items():
+            self._write(partition, records)
+        
+        ids = [job.id for job in jobs]
+        for job in jobs:
+            if job.apply_url:
+                db.merge(ArchivedJobKey(
+                    apply_url=job.apply_url, job_id=job.job_id, partition=self.partition_of(job), archived_at=now
+                ))
+        # Unfinished duplicates of archived jobs get scored on their own
+        db.execute(
+            update(Job).where(Job.canonical_job_id.in_(ids), Job.id.notin_(ids)).values(canonical_job_id=None)
+        )
+        db.query(JobScore).filter(JobScore.job_id.in_(ids)).delete(synchronize_session=False)
+        db.query(JobSkill).filter(JobSkill.job_id.in_(ids)).delete(synchronize_session=False)
+        db.query(JobSignature).filter(JobSignature.job_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Embedding).filter(Embedding.kind == "job", Embedding.owner_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Job).filter(Job.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        db.expunge_all()
+        return len(partitions)
+    
+    @staticmethod
+    def partition_of(job: Job) -> str:
+        """Date partition of a job (the day it was stored)."""
+        return (job.created_at or job.timestamp_fetched or datetime.now()).date().isoformat()
+    
+    def _write(self, partition: str, records: List[Dict[str, Any]]):
+        """Write one part file atomically (temp file, then rename)."""
+        import pandas as pd
+        fmt = self.format
+        directory = self.archive_dir / f"date={partition}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}{ARCHIVE_FORMATS[fmt]}"
+        tmp = path.with_name(path.name + ".tmp")
+        
+        if fmt == "parquet":
+            pd.DataFrame.from_records(records).to_parquet(tmp, compression="zstd", index=False)
+        else:
+            import zstandard
+            with open(tmp, "wb") as f, zstandard.ZstdCompressor(level=10).stream_writer(f) as writer:
+                for record in records:
+                    writer.write((json.dumps(record, default=str, ensure_ascii=False) + "\n").encode("utf-8"))
+        os.replace(tmp, path)
+    
+    @staticmethod
+    def compact(db: Session):
+        """
+        Refresh planner statistics after bulk deletes, and reclaim space if
+        ``retention_vacuum`` is on.
+        
+        A busy database is left alone until the next retention run - the
+        archived rows are already gone either way.
+        """
+        engine = db.get_bind()
+        sqlite = engine.dialect.name == "sqlite"
+        statements = ["VACUUM"] if settings.retention_vacuum and sqlite else []
+        if sqlite:
+            statements.append("ANALYZE")
+        else:
+            statements.append("VACUUM ANALYZE jobs" if settings.retention_vacuum else "ANALYZE jobs")
+        
+        try:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                for statement in statements:
+                    conn.exec_driver_sql(statement)
+        except OperationalError as e:
+            logger.warning(f"Skipped compaction after retention, database is busy: {e.orig}")
+            return
+        logger.info(f"Ran {' and '.join(statements)} after retention")
+    
+    # ===== Read path =====
+    
+    def files(self) -> List[Path]:
+        """Archive part files, oldest partition first."""
+        if not self.archive_dir.exists():
+            return []
+        return sorted(
+            path for path in self.archive_dir.glob("date=*/part-*")
+            if any(path.name.endswith(suffix) for suffix in ARCHIVE_FORMATS.values())
+        )
+    
+    def load(self) -> "pd.DataFrame":
+        """Every archived job (one row per id)."""
+        import pandas as pd
+        frames = [_read_file(str(path), path.stat().st_mtime) for path in self.files()]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True).drop_duplicates("id", keep="last")
+    
+    def search(
+        self,
+        label: Optional[str] = None,
+        company: Optional[str] = None,
+        remote_only: bool = False,
+        search: Optional[str] = None,
+        limit: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Archived classified canonical jobs matching the /api/jobs filters, best score first.
+        
+        Args:
+            label: Fit label value (best/mid/least)
+            company: Case-insensitive substring of the company
+            remote_only: Only remote jobs
+            search: Case-insensitive substring of title, description or company
+            limit: Maximum rows to return
+        """
+        frame = self.load()
+        if frame.empty:
+            return []
+        
+        matches = self._matches(frame, label, company, remote_only, search)
+        matches = matches.sort_values("score", ascending=False, kind="stable")
+        if limit is not None:
+            matches = matches.head(limit)
+        return self._records(matches)
+    
+    def iter_matches(
+        self,
+        label: Optional[str] = None,
+        company: Optional[str] = None,
+        remote_only: bool = False,
+        search: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Like :meth:`search`, one file at a time (unsorted), for bounded-memory exports."""
+        seen = set()
+        for path in self.files():
+            frame = _read_file(str(path), path.stat().st_mtime)
+            if frame.empty:
+                continue
+            matches = self._matches(frame, label, company, remote_only, search)
+            matches = matches[~matches["id"].isin(seen)]
+            seen.update(matches["id"].tolist())
+            if not matches.empty:
+                yield self._records(matches)
+    
+    @staticmethod
+    def _matches(frame: "pd.DataFrame", label, company, remote_only, search) -> "pd.DataFrame":
+        """Rows visible through /api/jobs that pass its filters."""
+        mask = (frame["status"] == JobStatus.CLASSIFIED.value) & frame["canonical_job_id"].isna()
+        if label:
+            mask &= frame["label"] == label
+        if company:
+            mask &= frame["company"].str.contains(company, case=False, regex=False, na=False)
+        if remote_only:
+            mask &= frame["type"] == "remote"
+        if search:
+            mask &= (
+                frame["title"].str.contains(search, case=False, regex=False, na=False)
+                | frame["description"].str.contains(search, case=False, regex=False, na=False)
+                | frame["company"].str.contains(search, case=False, regex=False, na=False)
+            )
+        return frame[mask]
+    
+    @staticmethod
+    def _records(frame: "pd.DataFrame") -> List[Dict[str, Any]]:
+        """Archive rows as job dictionaries flagged ``archived``."""
+        records = frame.astype(object).where(frame.notna(), None).to_dict("records")
+        for record in records:
+            keywords = record.get("keywords_matched")
+            if keywords is not None and not isinstance(keywords, list):
+                record["keywords_matched"] = list(keywords)  # Parquet lists load as arrays
+            record["archived"] = True
+        return records
+
+
+# Global archiver used by the scheduler, the API and the admin API
+job_archiver = JobArchiver()
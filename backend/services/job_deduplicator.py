@@ -0,0 +1,319 @@
+"""Near-duplicate job detection using MinHash LSH."""
+import re
+import threading
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from config import get_settings
+from models import Job, JobSignature
+from utils import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_PRIME = np.uint64((1 << 31) - 1)
+# Fixed seed so persisted signatures stay comparable across restarts
+_SEED = 1_234_567
+
+# How far back refresh() re-reads signatures written by other processes
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_COMPANY_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "plc", "gmbh", "limited"}
+
+
+class JobDeduplicator:
+    """
+    Detect cross-posted and reposted jobs before they are scored.
+    
+    Each job gets a MinHash signature over word shingles of its title and
+    description. Signatures are split into LSH bands so lookups only compare
+    against a handful of candidates, and are persisted in ``job_signatures``
+    so the index survives restarts.
+    """
+    
+    def __init__(
+        self,
+        num_perm: int = None,
+        bands: int = None,
+        threshold: float = None,
+        shingle_size: int = None
+    ):
+        self.num_perm = num_perm or settings.dedupe_num_perm
+        self.bands = bands or settings.dedupe_bands
+        self.threshold = threshold if threshold is not None else settings.dedupe_similarity_threshold
+        self.shingle_size = shingle_size or settings.dedupe_shingle_size
+        
+        if self.num_perm % self.bands != 0:
+            raise ValueError("dedupe_num_perm must be divisible by dedupe_bands")
+        self.rows = self.num_perm // self.bands
+        
+        rng = np.random.RandomState(_SEED)
+        self._a = rng.randint(1, int(_PRIME), size=self.num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=self.num_perm).astype(np.uint64)
+        
+        self._buckets: Dict[tuple, List[int]] = defaultdict(list)
+        self._signatures: Dict[int, tuple] = {}  # job id -> (company_key, signature)
+        self._loaded = False
+        self._refreshed_at = None  # Newest JobSignature.created_at seen in the DB
+        self._lock = threading.Lock()
+    
+    @property
+    def size(self) -> int:
+        """Number of canonical jobs in the index."""
+        return len(self._signatures)
+    
+    def ensure_loaded(self, db: Session):
+        """Load persisted signatures on first use."""
+        if not self._loaded:
+            self.load(db)
+    
+    def invalidate(self):
+        """Force a full reload on next use (e.g. after a failed commit)."""
+        self._loaded = False
+    
+    def refresh(self, db: Session):
+        """
+        Pull in signatures other processes stored since the last load.
+        
+        Workers each keep their own index, so they refresh before deduping.
+        """
+        if not self._loaded:
+            self.load(db)
+            return
+        
+        query = (
+            db.query(JobSignature, Job)
+            .join(Job, Job.id == JobSignature.job_id)
+            .filter(Job.canonical_job_id.is_(None))
+        )
+        if self._refreshed_at is not None:
+            # Overlap the window so rows committed slightly out of order aren't missed
+            query = query.filter(JobSignature.created_at >= self._refreshed_at - _REFRESH_OVERLAP)
+        
+        with self._lock:
+            for sig_row, job in query.all():
+                self._track_refresh(sig_row.created_at)
+                signature = np.frombuffer(sig_row.signature, dtype=np.uint32)
+                if signature.size == self.num_perm:
+                    self._index(job.id, sig_row.company_key, signature)
+    
+    def load(self, db: Session):
+        """(Re)build the in-memory LSH index from the database."""
+        rows = (
+            db.query(JobSignature, Job)
+            .join(Job, Job.id == JobSignature.job_id)
+            .filter(Job.canonical_job_id.is_(None))
+            .all()
+        )
+        
+        with self._lock:
+            self._buckets.clear()
+            self._signatures.clear()
+            self._refreshed_at = None
+            
+            skipped = 0
+            for sig_row, job in rows:
+                self._track_refresh(sig_row.created_at)
+                signature = np.frombuffer(sig_row.signature, dtype=np.uint32)
+                if signature.size != self.num_perm:
+                    skipped += 1
+                    continue
+                self._index(job.id, sig_row.company_key, signature)
+            
+            self._loaded = True
+        
+        if skipped:
+            logger.warning(f"Skipped {skipped} signatures built with a different dedupe_num_perm")
+        logger.info(f"Loaded near-duplicate index with {self.size} canonical jobs")
+    
+    def signature(self, job_data: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a normalized job.
+        
+        Args:
+            job_data: Normalized job data
+        
+        Returns:
+            uint32 array of length ``num_perm``, or None if the job has no text
+        """
+        text = f"{job_data.get('title') or ''} {job_data.get('description') or ''}"
+        hashes = self._shingle_hashes(text)
+        if hashes.size == 0:
+            return None
+        
+        values = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return values.min(axis=1).astype(np.uint32)
+    
+    def find_duplicate(
+        self,
+        job_data: Dict[str, Any],
+        signature: np.ndarray = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find an already stored canonical job that this job duplicates.
+        
+        Args:
+            job_data: Normalized job data
+            signature: Precomputed signature (computed if omitted)
+        
+        Returns:
+            Dict with the canonical ``job_id`` and ``similarity``, or None if
+            the job is new. Scores aren't cached here - the canonical job may
+            not be scored yet, so callers read them from the database
+        """
+        if signature is None:
+            signature = self.signature(job_data)
+        if signature is None:
+            return None
+        
+        company_key = self.company_key(job_data.get("company"))
+        best_id, best_similarity = None, 0.0
+        
+        with self._lock:
+            for candidate_id in self._candidates(signature):
+                candidate_company, candidate_sig = self._signatures[candidate_id]
+                if candidate_company != company_key:
+                    continue
+                similarity = float(np.mean(candidate_sig == signature))
+                if similarity > best_similarity:
+                    best_id, best_similarity = candidate_id, similarity
+        
+        if best_id is None or best_similarity < self.threshold:
+            return None
+        
+        return {
+            "job_id": best_id,
+            "similarity": round(best_similarity, 3)
+        }
+    
+    def match_batch(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Dedupe a batch against the stored index and against itself.
+        
+        Args:
+            jobs: Normalized jobs, in processing order
+        
+        Returns:
+            One dict per job with its ``signature``, the stored ``match``
+            (as returned by :meth:`find_duplicate`) and ``batch_index``, the
+            position of an earlier job in the batch it duplicates
+        """
+        local_buckets: Dict[tuple, List[int]] = defaultdict(list)
+        local: Dict[int, tuple] = {}  # batch index -> (company_key, signature)
+        results = []
+        
+        for index, job_data in enumerate(jobs):
+            signature = self.signature(job_data)
+            result = {"signature": signature, "match": None, "batch_index": None}
+            results.append(result)
+            if signature is None:
+                continue
+            
+            result["match"] = self.find_duplicate(job_data, signature)
+            if result["match"]:
+                continue
+            
+            company_key = self.company_key(job_data.get("company"))
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(local_buckets.get(key, ()))
+            
+            best_index, best_similarity = None, 0.0
+            for candidate in candidates:
+                candidate_company, candidate_sig = local[candidate]
+                if candidate_company != company_key:
+                    continue
+                similarity = float(np.mean(candidate_sig == signature))
+                if similarity > best_similarity:
+                    best_index, best_similarity = candidate, similarity
+            
+            if best_index is not None and best_similarity >= self.threshold:
+                result["batch_index"] = best_index
+                result["similarity"] = round(best_similarity, 3)
+                continue
+            
+            local[index] = (company_key, signature)
+            for key in self._band_keys(signature):
+                local_buckets[key].append(index)
+        
+        return results
+    
+    def add(self, db: Session, job: Job, signature: Optional[np.ndarray]):
+        """
+        Register a stored canonical job in the index and persist its signature.
+        
+        Args:
+            db: Database session (committed by the caller)
+            job: Stored job (must have an id)
+            signature: Signature returned by :meth:`signature`
+        """
+        if signature is None or job.canonical_job_id is not None:
+            return
+        
+        company_key = self.company_key(job.company)
+        db.merge(JobSignature(
+            job_id=job.id,
+            company_key=company_key,
+            signature=signature.astype(np.uint32).tobytes()
+        ))
+        
+        with self._lock:
+            self._index(job.id, company_key, signature)
+    
+    @staticmethod
+    def company_key(company: Optional[str]) -> str:
+        """Normalize a company name so 'Acme, Inc.' and 'ACME' compare equal."""
+        tokens = _TOKEN_RE.findall((company or "").lower())
+        return " ".join(t for t in tokens if t not in _COMPANY_SUFFIXES)
+    
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """Hash word shingles of the text into a uint64 array."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        if not tokens:
+            return np.empty(0, dtype=np.uint64)
+        
+        k = self.shingle_size
+        if len(tokens) <= k:
+            shingles = {" ".join(tokens)}
+        else:
+            shingles = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+        
+        return np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+    
+    def _band_keys(self, signature: np.ndarray):
+        """Yield one LSH bucket key per band."""
+        for band, chunk in enumerate(signature.reshape(self.bands, self.rows)):
+            yield band, chunk.tobytes()
+    
+    def _candidates(self, signature: np.ndarray) -> set:
+        """Collect job ids sharing at least one LSH bucket with the signature."""
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        return candidates
+    
+    def _index(self, job_id: int, company_key: str, signature: np.ndarray):
+        """Insert a signature into the in-memory index (caller holds the lock)."""
+        if job_id in self._signatures:
+            return
+        self._signatures[job_id] = (company_key, signature)
+        for key in self._band_keys(signature):
+            self._buckets[key].append(job_id)
+    
+    def _track_refresh(self, created_at: Optional[datetime]):
+        """Advance the refresh cursor (caller holds the lock)."""
+        if created_at is not None and (self._refreshed_at is None or created_at > self._refreshed_at):
+            self._refreshed_at = created_at
+
+
+# Global deduplicator instance shared by the pipeline and the scheduler
+deduplicator = JobDeduplicator()
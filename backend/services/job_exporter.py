@@ -0,0 +1,188 @@
+"""Streaming bulk export of jobs as NDJSON, CSV or Parquet."""
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Any, Iterable, Iterator, List
+from sqlalchemy import select
+from config import get_settings
+from models import Job
+from utils import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+EXPORT_FIELDS = [
+    "id", "job_id", "title", "company", "description", "location", "type", "apply_url",
+    "status", "label", "score", "keywords_matched", "llm_reasoning",
+    "timestamp_fetched", "classified_at", "created_at", "updated_at",
+]
+_TIMESTAMP_FIELDS = {"timestamp_fetched", "classified_at", "created_at", "updated_at"}
+
+# format -> (media type, file suffix)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ".ndjson"),
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _StreamSink:
+    """Write-only file object handing written bytes back in chunks (tell() keeps counting)."""
+    
+    def __init__(self):
+        self.closed = False
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        """Bytes written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class JobExporter:
+    """
+    Stream jobs straight from a server-side cursor into an export format.
+    
+    Rows are read ``export_batch_rows`` at a time as plain tuples (no ORM
+    objects or response models) and each batch is encoded and handed to the
+    client before the next is fetched, so memory stays flat however many
+    jobs match.
+    """
+    
+    def __init__(self, engine, batch_rows: int = None):
+        self.engine = engine
+        self.batch_rows = batch_rows or settings.export_batch_rows
+    
+    @staticmethod
+    def statement(filters: Iterable) -> Any:
+        """SELECT of the exported columns, in primary key order."""
+        columns = [Job.__table__.c[field] for field in EXPORT_FIELDS]
+        return select(*columns).where(*filters).order_by(Job.id)
+    
+    def stream(self, statement, fmt: str, archived: Iterable[List[Dict[str, Any]]] = ()) -> Iterator[bytes]:
+        """
+        Encoded export, chunk by chunk.
+        
+        Args:
+            statement: SELECT built by :meth:`statement`
+            fmt: One of EXPORT_FORMATS
+            archived: Extra batches of archived job dicts appended after the hot rows
+        """
+        writer = {"ndjson": self._ndjson, "csv": self._csv, "parquet": self._parquet}[fmt]
+        batches = chain(
+            ([self._row(row, archived=False) for row in batch] for batch in self._batches(statement)),
+            ([self._row(record, archived=True) for record in batch] for batch in archived),
+        )
+        rows = 0
+        for chunk, count in writer(batches):
+            rows += count
+            if chunk:
+                yield chunk
+        logger.info(f"Exported {rows} jobs as {fmt}")
+    
+    def _batches(self, statement) -> Iterator[List[Dict[str, Any]]]:
+        """Rows from a server-side cursor, ``batch_rows`` at a time."""
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.batch_rows).execute(statement)
+            for partition in result.mappings().partitions():
+                yield partition
+    
+    @staticmethod
+    def _row(row, archived: bool) -> Dict[str, Any]:
+        """Export record with enums as values and timestamps as datetimes."""
+        record = {}
+        for field in EXPORT_FIELDS:
+            value = row.get(field)
+            if isinstance(value, enum.Enum):
+                value = value.value
+            elif field in _TIMESTAMP_FIELDS and isinstance(value, str):
+                value = datetime.fromisoformat(value)  # Archived records carry ISO strings
+            record[field] = value
+        record["archived"] = archived
+        return record
+    
+    @staticmethod
+    def _ndjson(batches) -> Iterator:
+        for batch in batches:
+            lines = "".join(json.dumps(row, default=_json_default, ensure_ascii=False) + "\n" for row in batch)
+            yield lines.encode("utf-8"), len(batch)
+    
+    @staticmethod
+    def _csv(batches) -> Iterator:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS + ["archived"])
+        for batch in batches:
+            for row in batch:
+                writer.writerow([
+                    json.dumps(value) if isinstance(value, list)
+                    else value.isoformat() if isinstance(value, datetime)
+                    else "" if value is None
+                    else value
+                    for value in row.values()
+                ])
+            yield buffer.getvalue().encode("utf-8"), len(batch)
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode("utf-8"), 0  # Header of an empty export
+    
+    @staticmethod
+    def _parquet(batches) -> Iterator:
+        """One zstd row group per batch."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        timestamp = pa.timestamp("us")
+        schema = pa.schema([
+            ("id", pa.int64()), ("job_id", pa.string()), ("title", pa.string()), ("company", pa.string()),
+            ("description", pa.string()), ("location", pa.string()), ("type", pa.string()),
+            ("apply_url", pa.string()), ("status", pa.string()), ("label", pa.string()),
+            ("score", pa.float64()), ("keywords_matched", pa.list_(pa.string())), ("llm_reasoning", pa.string()),
+            ("timestamp_fetched", timestamp), ("classified_at", timestamp), ("created_at", timestamp),
+            ("updated_at", timestamp), ("archived", pa.bool_()),
+        ])
+        
+        sink = _StreamSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                yield sink.drain(), len(batch)
+        finally:
+            writer.close()
+        yield sink.drain(), 0  # Footer
@@ -1,14 +1,26 @@
 """Job fetching service using JobSpy for real-time scraping."""
-from typing import List, Dict, Any
+import asyncio
+import time
+from typing import List, Dict, Any, TYPE_CHECKING
 from datetime import datetime
-from jobspy import scrape_jobs
 from config import get_settings
+from services.fetch_recorder import FetchRecorder
 from utils import get_logger
+from utils.metrics import FETCH_SECONDS
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 
+def scrape_jobs(**kwargs) -> "pd.DataFrame":
+    """JobSpy's scraper, imported on first use (it loads every site scraper)."""
+    from jobspy import scrape_jobs as jobspy_scrape_jobs
+    return jobspy_scrape_jobs(**kwargs)
+
+
 class JobFetcher:
     """Fetch jobs from multiple sources using JobSpy."""
     
@@ -22,9 +34,11 @@ class JobFetcher:
         self.job_type = settings.job_type if settings.job_type else None
         self.country_indeed = settings.job_country_indeed
         self.proxy = settings.proxy_url if settings.proxy_url else None
+        # Raw batches are kept for offline replay when a recording directory is set
+        self.recorder = FetchRecorder(settings.fetch_record_dir) if settings.fetch_record_dir else None
     
     async def fetch_jobs(
-        self, 
+        self,
         search_term: str = None,
         location: str = None,
         sources: List[str] = None
@@ -40,25 +54,8 @@ class JobFetcher:
         Returns:
             Raw JobSpy job dictionaries. Normalization happens in the LangGraph pipeline.
         """
-        search_term = search_term or self.search_term
-        location = location or self.location
-        sources = sources or self.sources
-        
-        logger.info(f"Fetching jobs via JobSpy: '{search_term}' in '{location}'")
-        logger.info(f"Sources: {sources}, Results wanted: {self.results_wanted}")
-        
         try:
-            jobs_df = scrape_jobs(
-                site_name=sources,
-                search_term=search_term,
-                location=location,
-                results_wanted=self.results_wanted,
-                hours_old=self.hours_old,
-                country_indeed=self.country_indeed,
-                is_remote=self.is_remote,
-                job_type=self.job_type,
-                proxy=self.proxy
-            )
+            jobs_df = await asyncio.to_thread(self._scrape, search_term, location, sources)
             
             if jobs_df is None or jobs_df.empty:
                 logger.warning("No jobs found")
@@ -68,7 +65,91 @@ class JobFetcher:
             jobs_list = jobs_df.to_dict('records')
             logger.info(f"Fetched {len(jobs_list)} raw jobs from JobSpy")
             return jobs_list
-            
+        
         except Exception as e:
             logger.error(f"Error fetching jobs with JobSpy: {e}")
             return []
+    
+    async def fetch_jobs_frame(
+        self,
+        search_term: str = None,
+        location: str = None,
+        sources: List[str] = None
+    ) -> "pd.DataFrame":
+        """
+        Fetch jobs as the raw JobSpy DataFrame.
+        
+        Skips the per-row dict conversion so the pipeline can normalize
+        column-wise (see JobNormalizer.normalize_frame). Sources are scraped
+        concurrently, one JobSpy call each, so a slow or failing site
+        doesn't hold up or sink the others.
+        
+        Returns:
+            Raw JobSpy DataFrame (empty on failure)
+        """
+        import pandas as pd
+        sources = sources or self.sources
+        cycle_id = FetchRecorder.new_cycle_id()
+        results = await asyncio.gather(*(
+            self._scrape_source(source, search_term, location, cycle_id) for source in sources
+        ))
+        
+        frames = [frame for frame in results if frame is not None and not frame.empty]
+        if not frames:
+            logger.warning("No jobs found")
+            return pd.DataFrame()
+        
+        jobs_df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+        logger.info(f"Fetched {len(jobs_df)} raw jobs from JobSpy")
+        return jobs_df
+    
+    async def _scrape_source(
+        self,
+        source: str,
+        search_term: str = None,
+        location: str = None,
+        cycle_id: str = None
+    ) -> "pd.DataFrame":
+        """Scrape one source off the event loop, timing and optionally recording it (empty on failure)."""
+        import pandas as pd
+        fetched_at = datetime.now()
+        start = time.perf_counter()
+        with FETCH_SECONDS.labels(source=source).time():
+            try:
+                frame = await asyncio.to_thread(self._scrape, search_term, location, [source])
+            except Exception as e:
+                logger.error(f"Error fetching jobs from {source} with JobSpy: {e}")
+                return pd.DataFrame()
+        
+        if self.recorder is not None:
+            await asyncio.to_thread(
+                self.recorder.record, frame, source, search_term or self.search_term, location or self.location,
+                fetched_at, time.perf_counter() - start, cycle_id or FetchRecorder.new_cycle_id()
+            )
+        return frame
+    
+    def _scrape(
+        self,
+        search_term: str = None,
+        location: str = None,
+        sources: List[str] = None
+    ):
+        """Run a blocking JobSpy scrape (called off the event loop)."""
+        search_term = search_term or self.search_term
+        location = location or self.location
+        sources = sources or self.sources
+        
+        logger.info(f"Fetching jobs via JobSpy: '{search_term}' in '{location}'")
+        logger.info(f"Sources: {sources}, Results wanted: {self.results_wanted}")
+        
+        return scrape_jobs(
+            site_name=sources,
+            search_term=search_term,
+            location=location,
+            results_wanted=self.results_wanted,
+            hours_old=self.hours_old,
+            country_indeed=self.country_indeed,
+            is_remote=self.is_remote,
+            job_type=self.job_type,
+            proxy=self.proxy
+        )
@@ -1,16 +1,121 @@
 """Job normalization service."""
-from typing import Dict, Any
-from datetime import datetime
-from utils import get_logger
+import hashlib
+import re
+from collections.abc import Mapping
+from typing import Dict, Any, List, Optional, Set, Union, TYPE_CHECKING
+from datetime import date, datetime
+import numpy as np
+from sqlalchemy.orm import Session
+from config import get_settings
+from models import BoilerplateParagraph
+from utils import get_logger, count_tokens, truncate_tokens
+from utils.metrics import CACHE_HITS
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = get_logger(__name__)
+settings = get_settings()
+
+# Markdown noise commonly found in scraped descriptions
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_ESCAPE_RE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!&|<>])")
+_MD_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|~~|`)")
+_MD_HEADING_RE = re.compile(r"^[ \t]{0,3}#{1,6}[ \t]*", re.MULTILINE)
+_MD_BULLET_RE = re.compile(r"^\s*[*\u2022\u25cf+-]\s+", re.MULTILINE)
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+
+# Section headings that carry the matching signal vs. ones that rarely do
+_KEEP_SECTION_RE = re.compile(
+    r"(requirement|qualification|responsibilit|what you.{0,3}ll do|what you.{0,3}ll bring|"
+    r"skills|experience|must have|nice to have|preferred|about the role|the role|you will)",
+    re.IGNORECASE
+)
+_DROP_SECTION_RE = re.compile(
+    r"(benefit|perks|equal opportunit|eeo|about us|about the company|who we are|"
+    r"compensation|salary|pay range|privacy|accommodation|e-verify|diversity)",
+    re.IGNORECASE
+)
+_MAX_HEADING_CHARS = 60
+_RESUME_CACHE_SIZE = 32
+
+# Source field names for each normalized field, in priority order (JobSpy names included)
+FIELD_ALIASES = {
+    "job_id": ("external_id", "id", "job_id"),
+    "title": ("title", "job_title"),
+    "company": ("company", "company_name"),
+    "description": ("description", "job_description"),
+    "location": ("location", "job_location"),
+    "type": ("type", "work_type"),
+    "apply_url": ("apply_url", "url", "link", "job_url", "job_url_direct"),
+    "timestamp": ("timestamp",),
+}
+
+
+class NormalizedJob(Mapping):
+    """Compact normalized job record that reads like a dict."""
+    
+    __slots__ = (
+        "job_id", "title", "company", "description", "location",
+        "type", "apply_url", "timestamp_fetched", "compressed_description",
+    )
+    
+    def __init__(
+        self,
+        job_id: str,
+        title: str,
+        company: str,
+        description: str,
+        location: str,
+        type: str,
+        apply_url: str,
+        timestamp_fetched: datetime,
+        compressed_description: Optional[str] = None
+    ):
+        self.job_id = job_id
+        self.title = title
+        self.company = company
+        self.description = description
+        self.location = location
+        self.type = type
+        self.apply_url = apply_url
+        self.timestamp_fetched = timestamp_fetched
+        self.compressed_description = compressed_description
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __iter__(self):
+        return iter(self.__slots__)
+    
+    def __len__(self) -> int:
+        return len(self.__slots__)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dictionary."""
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    def __repr__(self) -> str:
+        return f"NormalizedJob(job_id={self.job_id!r}, title={self.title!r}, company={self.company!r})"
 
 
 class JobNormalizer:
     """Normalize job data from various sources into consistent schema."""
     
+    # Paragraph hashes learned from the DB as recurring boilerplate
+    _boilerplate_hashes: Set[str] = set()
+    # Compressed resume text keyed by resume content hash
+    _resume_cache: Dict[str, str] = {}
+    
     @staticmethod
-    def normalize(raw_job: Dict[str, Any]) -> Dict[str, Any]:
+    def normalize(raw_job: Dict[str, Any]) -> Optional[NormalizedJob]:
         """
         Normalize raw job data into consistent schema.
         
@@ -22,22 +127,30 @@ class JobNormalizer:
         """
         try:
             # Handle different field names from different sources
-            normalized = {
-                "job_id": raw_job.get("external_id") or raw_job.get("id") or raw_job.get("job_id"),
-                "title": raw_job.get("title") or raw_job.get("job_title", "Unknown Title"),
-                "company": raw_job.get("company") or raw_job.get("company_name", "Unknown Company"),
-                "description": raw_job.get("description") or raw_job.get("job_description", ""),
-                "location": raw_job.get("location") or raw_job.get("job_location", ""),
-                "type": JobNormalizer._normalize_job_type(raw_job.get("type") or raw_job.get("work_type", "")),
-                "apply_url": raw_job.get("apply_url") or raw_job.get("url") or raw_job.get("link", ""),
-                "timestamp_fetched": JobNormalizer._parse_timestamp(raw_job.get("timestamp")),
-            }
+            first = JobNormalizer._first_value
+            job_id = first(raw_job, "job_id")
             
             # Validate required fields
-            if not normalized["job_id"]:
+            if job_id is None:
                 logger.error("Missing job_id in raw job data")
                 return None
             
+            description = str(first(raw_job, "description") or "")
+            normalized = NormalizedJob(
+                job_id=str(job_id),
+                title=str(first(raw_job, "title") or "Unknown Title"),
+                company=str(first(raw_job, "company") or "Unknown Company"),
+                description=description,
+                location=str(first(raw_job, "location") or ""),
+                type=JobNormalizer._normalize_job_type(
+                    str(first(raw_job, "type") or ""),
+                    raw_job.get("is_remote") is True
+                ),
+                apply_url=str(first(raw_job, "apply_url") or ""),
+                timestamp_fetched=JobNormalizer._parse_timestamp(first(raw_job, "timestamp")),
+                compressed_description=JobNormalizer.compress_description(description)
+            )
+            
             if not normalized["description"]:
                 logger.warning(f"Job {normalized['job_id']} has no description")
             
@@ -49,8 +162,133 @@ class JobNormalizer:
             return None
     
     @staticmethod
-    def _normalize_job_type(job_type: str) -> str:
+    def normalize_frame(df: "pd.DataFrame") -> List[Optional[NormalizedJob]]:
+        """
+        Normalize a JobSpy DataFrame column-wise.
+        
+        Field aliases are coalesced per column, job types and timestamps are
+        derived with vectorized string/datetime ops, and pandas NaN never
+        reaches the output strings. Description compression walks paragraphs
+        in Python and cannot be vectorized; it runs once per distinct
+        description rather than once per row.
+        
+        Args:
+            df: Raw jobs, one row per posting
+        
+        Returns:
+            NormalizedJob records aligned with the rows (None where the job_id is missing)
+        """
+        import pandas as pd
+        if df is None or df.empty:
+            return []
+        
+        coalesce = JobNormalizer._coalesce_columns
+        job_id = coalesce(df, FIELD_ALIASES["job_id"])
+        description = coalesce(df, FIELD_ALIASES["description"]).fillna("")
+        compressed = {
+            desc: JobNormalizer.compress_description(desc)
+            for desc in description.drop_duplicates().tolist()
+        }
+        
+        # Work type: substring checks over the whole column, plus JobSpy's is_remote flag
+        type_text = coalesce(df, FIELD_ALIASES["type"]).fillna("").str.lower()
+        is_remote = type_text.str.contains("remote", regex=False)
+        if "is_remote" in df.columns:
+            is_remote = is_remote | df["is_remote"].eq(True).to_numpy()
+        job_type = np.where(
+            is_remote, "remote",
+            np.where(type_text.str.contains("hybrid", regex=False), "hybrid", "onsite")
+        )
+        
+        # Fetch timestamps: a parseable "timestamp" column wins, otherwise now
+        timestamps = None
+        for column in FIELD_ALIASES["timestamp"]:
+            if column not in df.columns:
+                continue
+            parsed = pd.to_datetime(df[column], errors="coerce", utc=True, format="mixed")
+            timestamps = parsed if timestamps is None else timestamps.fillna(parsed)
+        now = datetime.now()
+        if timestamps is None:
+            timestamp_values = [now] * len(df)
+        else:
+            timestamp_values = timestamps.dt.tz_convert(None).fillna(pd.Timestamp(now)).dt.to_pydatetime().tolist()
+        
+        columns = zip(
+            job_id.tolist(),
+            coalesce(df, FIELD_ALIASES["title"]).fillna("Unknown Title").tolist(),
+            coalesce(df, FIELD_ALIASES["company"]).fillna("Unknown Company").tolist(),
+            description.tolist(),
+            coalesce(df, FIELD_ALIASES["location"]).fillna("").tolist(),
+            job_type.tolist(),
+            coalesce(df, FIELD_ALIASES["apply_url"]).fillna("").tolist(),
+            timestamp_values,
+        )
+        
+        normalized_jobs: List[Optional[NormalizedJob]] = []
+        missing_ids = 0
+        for jid, title, company, desc, location, jtype, apply_url, ts in columns:
+            if jid is pd.NA or jid is None:
+                missing_ids += 1
+                normalized_jobs.append(None)
+                continue
+            normalized_jobs.append(NormalizedJob(
+                job_id=jid,
+                title=title,
+                company=company,
+                description=desc,
+                location=location,
+                type=jtype,
+                apply_url=apply_url,
+                timestamp_fetched=ts,
+                compressed_description=compressed[desc]
+            ))
+        
+        if missing_ids:
+            logger.error(f"Missing job_id in {missing_ids} raw jobs")
+        logger.debug(f"Normalized {len(df) - missing_ids} jobs from DataFrame")
+        return normalized_jobs
+    
+    @staticmethod
+    def _coalesce_columns(df: "pd.DataFrame", aliases: tuple) -> "pd.Series":
+        """First non-blank value across alias columns, as a string Series (<NA> if none)."""
+        import pandas as pd
+        result = None
+        for column in aliases:
+            if column not in df.columns:
+                continue
+            values = df[column].astype("string").str.strip()
+            values = values.mask(values == "")
+            result = values if result is None else result.fillna(values)
+        if result is None:
+            return pd.Series(pd.NA, index=df.index, dtype="string")
+        return result
+    
+    @staticmethod
+    def _first_value(raw_job: Dict[str, Any], field: str) -> Any:
+        """First non-blank, non-NaN value among a field's aliases."""
+        import pandas as pd
+        for key in FIELD_ALIASES[field]:
+            value = raw_job.get(key)
+            if value is None:
+                continue
+            if isinstance(value, str):
+                if value.strip():
+                    return value.strip()
+                continue
+            try:
+                if pd.isna(value):
+                    continue
+            except (TypeError, ValueError):
+                pass
+            return value
+        return None
+    
+    @staticmethod
+    def _normalize_job_type(job_type: str, is_remote: bool = False) -> str:
         """Normalize job type to one of: remote, hybrid, onsite."""
+        if is_remote:
+            return "remote"
+        
         if not job_type:
             return "onsite"  # Default
         
@@ -69,6 +307,9 @@ class JobNormalizer:
         if isinstance(timestamp, datetime):
             return timestamp
         
+        if isinstance(timestamp, date):
+            return datetime.combine(timestamp, datetime.min.time())
+        
         if isinstance(timestamp, str):
             try:
                 return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
@@ -79,7 +320,201 @@ class JobNormalizer:
         return datetime.now()
     
     @staticmethod
-    def batch_normalize(raw_jobs: list[Dict[str, Any]]):
-        """Deprecated: batch normalization is unused; use pipeline per job."""
-        raise NotImplementedError("batch_normalize is removed; process per-job via pipeline")
+    def clean_markdown(text: str) -> str:
+        """Collapse markdown noise (escapes, emphasis, links, headings, bullets)."""
+        if not text:
+            return ""
+        
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        text = _MD_LINK_RE.sub(r"\1", text)
+        text = _MD_ESCAPE_RE.sub(r"\1", text)
+        text = _MD_HEADING_RE.sub("", text)
+        text = _MD_BULLET_RE.sub("- ", text)
+        text = _MD_EMPHASIS_RE.sub("", text)
+        text = re.sub(r"[ \t\u00a0]+", " ", text)
+        text = re.sub(r" *\n *", "\n", text)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        return text.strip()
+    
+    @staticmethod
+    def _is_heading(line: str) -> bool:
+        """Short line that is neither a bullet nor a sentence, e.g. "Benefits" or "Our stack:"."""
+        return (len(line) <= _MAX_HEADING_CHARS
+                and not line.startswith("- ")
+                and not line.endswith((".", "!", "?")))
+    
+    @staticmethod
+    def split_paragraphs(text: str) -> List[str]:
+        """Split cleaned text into non-empty paragraphs."""
+        return [p.strip() for p in _PARAGRAPH_SPLIT_RE.split(text) if p.strip()]
+    
+    @staticmethod
+    def paragraph_hash(paragraph: str) -> str:
+        """Stable hash of a paragraph, insensitive to case, whitespace and punctuation."""
+        key = re.sub(r"[^a-z0-9]+", " ", paragraph.lower()).strip()
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    
+    @classmethod
+    def load_boilerplate(cls, db: Session) -> int:
+        """
+        Refresh the boilerplate paragraph set from DB paragraph frequencies.
+        
+        Returns:
+            Number of paragraphs treated as boilerplate
+        """
+        rows = (
+            db.query(BoilerplateParagraph.paragraph_hash)
+            .filter(BoilerplateParagraph.job_count >= settings.boilerplate_min_jobs)
+            .all()
+        )
+        cls._boilerplate_hashes = {row.paragraph_hash for row in rows}
+        logger.info(f"Loaded {len(cls._boilerplate_hashes)} boilerplate paragraphs")
+        return len(cls._boilerplate_hashes)
+    
+    @classmethod
+    def record_paragraphs(cls, db: Session, description: str):
+        """
+        Count the paragraphs of a stored posting towards boilerplate detection.
+        
+        New rows are flushed before returning: sessions don't autoflush, and a
+        worker batch records many postings in one transaction, so without the
+        flush a paragraph shared by two postings was inserted twice and the
+        batch's commit failed on the primary key.
+        
+        Args:
+            db: Database session (committed by the caller)
+            description: Raw job description
+        """
+        samples = {}
+        for paragraph in cls.split_paragraphs(cls.clean_markdown(description)):
+            if len(paragraph) >= settings.boilerplate_min_chars:
+                samples.setdefault(cls.paragraph_hash(paragraph), paragraph)
+        
+        if not samples:
+            return
+        
+        existing = {
+            row.paragraph_hash: row
+            for row in db.query(BoilerplateParagraph).filter(
+                BoilerplateParagraph.paragraph_hash.in_(list(samples))
+            )
+        }
+        for paragraph_hash, paragraph in samples.items():
+            row = existing.get(paragraph_hash)
+            if row is None:
+                db.add(BoilerplateParagraph(
+                    paragraph_hash=paragraph_hash,
+                    job_count=1,
+                    sample=paragraph[:200]
+                ))
+            else:
+                row.job_count = (row.job_count or 0) + 1
+        db.flush()
+    
+    @classmethod
+    def compress_description(cls, description: str, max_tokens: int = None) -> str:
+        """
+        Compress a job description for the scoring prompt.
+        
+        Strips learned boilerplate and benefits/EEO sections, collapses markdown
+        noise, then fills the token budget with requirement and responsibility
+        sections first. Kept paragraphs stay in their original order.
+        
+        Args:
+            description: Raw job description
+            max_tokens: Token budget (defaults to scoring_description_max_tokens)
+        
+        Returns:
+            Compressed description
+        """
+        max_tokens = max_tokens or settings.scoring_description_max_tokens
+        text = cls.clean_markdown(description)
+        if not text:
+            return ""
+        
+        # Tag paragraphs with the section they belong to
+        candidates = []  # (priority, index, paragraph)
+        section_priority = 1
+        for index, paragraph in enumerate(cls.split_paragraphs(text)):
+            first_line = paragraph.split("\n", 1)[0]
+            if cls._is_heading(first_line):
+                # Any heading ends the previous section, dropped or not
+                if _DROP_SECTION_RE.search(first_line):
+                    section_priority = None
+                elif _KEEP_SECTION_RE.search(first_line):
+                    section_priority = 0
+                else:
+                    section_priority = 1
+            
+            if section_priority is None:
+                continue
+            if (len(paragraph) >= settings.boilerplate_min_chars
+                    and cls.paragraph_hash(paragraph) in cls._boilerplate_hashes):
+                continue
+            candidates.append((section_priority, index, paragraph))
+        
+        if not candidates:
+            # Everything looked like boilerplate - better to keep something
+            return truncate_tokens(text, max_tokens)
+        
+        kept = []
+        remaining = max_tokens
+        for priority, index, paragraph in sorted(candidates):
+            tokens = count_tokens(paragraph) + 1  # paragraph separator
+            if tokens <= remaining:
+                kept.append((index, paragraph))
+                remaining -= tokens
+            elif remaining > 20:
+                kept.append((index, truncate_tokens(paragraph, remaining - 1)))
+                remaining = 0
+            if remaining <= 0:
+                break
+        
+        return "\n\n".join(paragraph for _, paragraph in sorted(kept))
+    
+    @classmethod
+    def compress_resume(cls, content: str, max_tokens: int = None) -> str:
+        """
+        Compress resume text for the scoring prompt, cached per resume hash.
+        
+        Args:
+            content: Resume text
+            max_tokens: Token budget (defaults to scoring_resume_max_tokens)
+        
+        Returns:
+            Cleaned resume text truncated to the token budget
+        """
+        max_tokens = max_tokens or settings.scoring_resume_max_tokens
+        if not content:
+            return ""
+        
+        key = f"{hashlib.sha256(content.encode('utf-8')).hexdigest()}:{max_tokens}"
+        cached = cls._resume_cache.get(key)
+        if cached is not None:
+            CACHE_HITS.labels(cache="resume_prompt").inc()
+            return cached
+        
+        compressed = truncate_tokens(cls.clean_markdown(content), max_tokens)
+        if len(cls._resume_cache) >= _RESUME_CACHE_SIZE:
+            cls._resume_cache.clear()
+        cls._resume_cache[key] = compressed
+        return compressed
+    
+    @staticmethod
+    def batch_normalize(
+        raw_jobs: "Union[pd.DataFrame, List[Dict[str, Any]]]"
+    ) -> List[Optional[NormalizedJob]]:
+        """
+        Normalize a batch of raw jobs column-wise.
+        
+        Args:
+            raw_jobs: JobSpy DataFrame, or raw job dictionaries from fetcher
+        
+        Returns:
+            Normalized jobs aligned with the input (None where normalization failed)
+        """
+        import pandas as pd
+        if not isinstance(raw_jobs, pd.DataFrame):
+            raw_jobs = pd.DataFrame.from_records(list(raw_jobs))
+        return JobNormalizer.normalize_frame(raw_jobs)
 
@@ -0,0 +1,235 @@
+"""DB-backed work queue built on Job.status."""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import get_settings
+from models import ArchivedJobKey, Job, JobStatus
+from services.job_normalizer import NormalizedJob
+from utils import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Statuses a worker still has to advance
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.NORMALIZED, JobStatus.SCORED)
+
+# Chunk size for apply_url IN (...) lookups
+_URL_CHUNK = 500
+
+
+def default_owner() -> str:
+    """Identify this process in lease rows."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Work queue over the ``jobs`` table.
+    
+    Fetched jobs are inserted as PENDING. Workers lease batches by stamping
+    ``lease_owner``/``lease_expires_at`` on rows nobody holds (or whose lease
+    expired), advance them PENDING -> NORMALIZED -> SCORED -> CLASSIFIED and
+    commit after every stage, so a crashed worker's jobs are picked up where
+    they stopped. FAILED jobs are retried with exponential backoff, using
+    ``lease_expires_at`` as the not-before time.
+    """
+    
+    def __init__(self, owner: str = None):
+        self.owner = owner or default_owner()
+    
+    @staticmethod
+    def enqueue(db: Session, normalized_jobs: List[Optional[NormalizedJob]]) -> int:
+        """
+        Insert normalized jobs as PENDING, skipping URLs already stored or archived.
+        
+        Args:
+            db: Database session (committed here)
+            normalized_jobs: Output of JobNormalizer.batch_normalize (None entries are skipped)
+        
+        Returns:
+            Number of jobs inserted
+        """
+        rows = []
+        seen_urls = set()
+        for job in normalized_jobs:
+            if job is None:
+                continue
+            apply_url = job.get("apply_url") or None
+            if apply_url:
+                if apply_url in seen_urls:
+                    continue
+                seen_urls.add(apply_url)
+            rows.append({
+                "job_id": job["job_id"],
+                "title": job["title"],
+                "company": job["company"],
+                "description": job["description"],
+                "location": job.get("location"),
+                "type": job.get("type"),
+                "apply_url": apply_url,
+                "timestamp_fetched": job.get("timestamp_fetched"),
+                "status": JobStatus.PENDING,
+                "attempts": 0,
+            })
+        
+        existing = JobQueue._existing_urls(db, list(seen_urls))
+        rows = [row for row in rows if row["apply_url"] is None or row["apply_url"] not in existing]
+        if not rows:
+            return 0
+        
+        try:
+            db.execute(insert(Job), rows)
+            db.commit()
+            return len(rows)
+        except IntegrityError:
+            # Another process stored some of these meanwhile - insert one by one
+            db.rollback()
+        
+        inserted = 0
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(Job), [row])
+                inserted += 1
+            except IntegrityError:
+                continue
+        db.commit()
+        return inserted
+    
+    def lease(self, db: Session, batch_size: int = None, lease_seconds: int = None) -> List[Job]:
+        """
+        Lease a batch of jobs that need work.
+        
+        Args:
+            db: Database session (committed here)
+            batch_size: Maximum jobs to lease
+            lease_seconds: Lease duration
+        
+        Returns:
+            Leased jobs ordered by id (empty if there is nothing to do)
+        """
+        batch_size = batch_size or settings.queue_batch_size
+        lease_seconds = lease_seconds or settings.queue_lease_seconds
+        now = datetime.now()
+        lease_id = f"{self.owner}/{uuid.uuid4().hex[:12]}"
+        
+        available = or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < now)
+        needs_work = or_(
+            Job.status.in_(ACTIVE_STATUSES),
+            and_(Job.status == JobStatus.FAILED, Job.attempts < settings.queue_max_attempts)
+        )
+        candidates = (
+            select(Job.id)
+            .where(needs_work, available)
+            .order_by(Job.id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        
+        # Re-check availability in the UPDATE so concurrent leasers can't both win
+        result = db.execute(
+            update(Job)
+            .where(Job.id.in_(candidates), available)
+            .values(lease_owner=lease_id, lease_expires_at=now + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        
+        if not result.rowcount:
+            return []
+        
+        jobs = db.query(Job).filter(Job.lease_owner == lease_id).order_by(Job.id).all()
+        logger.debug(f"Leased {len(jobs)} jobs as {lease_id}")
+        return jobs
+    
+    @staticmethod
+    def extend(db: Session, jobs: List[Job], lease_seconds: int = None):
+        """Push the lease expiry of jobs still held (caller commits)."""
+        lease_seconds = lease_seconds or settings.queue_lease_seconds
+        expires = datetime.now() + timedelta(seconds=lease_seconds)
+        for job in jobs:
+            if job.lease_owner:
+                job.lease_expires_at = expires
+    
+    @staticmethod
+    def release(db: Session, jobs: List[Job], delay_seconds: int = 0):
+        """
+        Give jobs back to the queue (caller commits).
+        
+        Args:
+            db: Database session
+            jobs: Jobs to release
+            delay_seconds: Keep them invisible to other leases for this long
+        """
+        not_before = datetime.now() + timedelta(seconds=delay_seconds) if delay_seconds else None
+        for job in jobs:
+            if job.lease_owner is None:
+                continue
+            job.lease_owner = None
+            job.lease_expires_at = not_before
+    
+    @staticmethod
+    def fail(db: Session, job: Job, stage: JobStatus, error: str):
+        """
+        Mark a job FAILED at a stage and schedule its retry (caller commits).
+        
+        Args:
+            db: Database session
+            job: Job that failed
+            stage: Status the job was in, i.e. where the retry resumes
+            error: Error message
+        """
+        job.attempts = (job.attempts or 0) + 1
+        job.status = JobStatus.FAILED
+        job.failed_status = stage
+        job.last_error = str(error)[:2000]
+        job.lease_owner = None
+        
+        backoff = settings.queue_retry_backoff_seconds * (2 ** (job.attempts - 1))
+        job.lease_expires_at = datetime.now() + timedelta(seconds=backoff)
+        
+        if job.attempts >= settings.queue_max_attempts:
+            logger.error(f"Job {job.job_id} failed permanently at {stage.value}: {error}")
+        else:
+            logger.warning(f"Job {job.job_id} failed at {stage.value} (attempt {job.attempts}), will retry: {error}")
+    
+    @staticmethod
+    def stage_of(job: Job) -> JobStatus:
+        """Stage a leased job is at (FAILED jobs resume where they failed)."""
+        if job.status == JobStatus.FAILED:
+            return job.failed_status or JobStatus.PENDING
+        return job.status
+    
+    @staticmethod
+    def advance(job: Job, status: JobStatus):
+        """Move a job to the next status, clearing any failure marker."""
+        job.status = status
+        job.failed_status = None
+    
+    @staticmethod
+    def depths(db: Session) -> Dict[str, int]:
+        """Job counts per status."""
+        counts = {status.value: 0 for status in JobStatus}
+        for status, count in db.query(Job.status, func.count(Job.id)).group_by(Job.status):
+            if status is not None:
+                counts[status.value] = count
+        return counts
+    
+    @staticmethod
+    def _existing_urls(db: Session, urls: List[str]) -> set:
+        """apply_urls among ``urls`` that are already stored or archived."""
+        existing = set()
+        for start in range(0, len(urls), _URL_CHUNK):
+            chunk = urls[start:start + _URL_CHUNK]
+            existing.update(
+                url for (url,) in db.query(Job.apply_url).filter(Job.apply_url.in_(chunk))
+            )
+            existing.update(
+                url for (url,) in db.query(ArchivedJobKey.apply_url).filter(ArchivedJobKey.apply_url.in_(chunk))
+            )
+        return existing
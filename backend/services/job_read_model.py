@@ -0,0 +1,239 @@
+"""In-memory columnar read model for job list queries.
+
+The dashboard lists classified jobs filtered by label, remote-only and
+company, ordered by score. Those columns for every visible job (classified,
+not a near-duplicate) are kept here as NumPy arrays, so a list query is a
+few boolean masks and a partial sort; the database only hydrates the page's
+rows by primary key. Searches, archives and per-profile views still go to
+the database.
+
+The model loads on first use (the API loads it at startup) and catches up
+with rows changed since its last refresh - the scheduler refreshes it on
+every broadcast poll, i.e. right after jobs are stored. Deleted rows (e.g.
+archived by retention in another process) leave no updated_at behind, so a
+refresh that ends up with a different visible count than the database
+reloads in full.
+"""
+import re
+import threading
+from datetime import timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from config import get_settings
+from models import Job, JobLabel, JobStatus
+from utils import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Label column codes (-1 = unlabeled)
+LABEL_CODES = {label: code for code, label in enumerate(JobLabel)}
+
+# How far back refresh() re-reads rows (updated_at has second precision)
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+_COLUMNS = (Job.id, Job.score, Job.label, Job.type, Job.company)
+
+
+class JobReadModel:
+    """Visible jobs as parallel NumPy columns, answering filtered top-N-by-score queries."""
+    
+    def __init__(self):
+        self._ids = np.empty(0, dtype=np.int64)
+        self._scores = np.empty(0, dtype=np.float64)
+        self._labels = np.empty(0, dtype=np.int8)
+        self._remote = np.empty(0, dtype=bool)
+        self._companies = np.empty(0, dtype=np.int32)  # Code into _company_names
+        self._alive = np.empty(0, dtype=bool)  # False for rows removed since the last load
+        self._rows: Dict[int, int] = {}  # job id -> row
+        self._size = 0
+        self._company_names: List[str] = []  # Lower-cased, one per code
+        self._company_codes: Dict[str, int] = {}
+        self._refreshed_at = None  # Newest Job.updated_at seen
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+    
+    @property
+    def size(self) -> int:
+        """Visible jobs in the model."""
+        return len(self._rows)
+    
+    @staticmethod
+    def _visible():
+        return (Job.status == JobStatus.CLASSIFIED, Job.canonical_job_id.is_(None))
+    
+    # ===== Loading =====
+    
+    def ensure_loaded(self, db: Session):
+        """Load on first use."""
+        if not self._loaded:
+            self.load(db)
+    
+    def invalidate(self):
+        """Force a full reload on next use (e.g. after bulk deletes)."""
+        self._loaded = False
+    
+    def load(self, db: Session):
+        """(Re)build the columns from the database."""
+        refreshed_at = db.execute(select(func.max(Job.updated_at))).scalar()
+        rows = db.execute(select(*_COLUMNS).where(*self._visible()).order_by(Job.id)).all()
+        
+        with self._lock:
+            self._rows.clear()
+            self._size = 0
+            self._company_names = []
+            self._company_codes = {}
+            self._allocate(max(1024, len(rows)))
+            for row in rows:
+                self._upsert(*row)
+            self._refreshed_at = refreshed_at
+            self._loaded = True
+        
+        logger.info(f"Loaded job read model with {self.size} jobs")
+    
+    def refresh(self, db: Session) -> int:
+        """
+        Apply rows changed since the last refresh (loading first if needed).
+        
+        Returns:
+            Number of rows re-read
+        """
+        if not self._loaded:
+            self.load(db)
+            return self.size
+        
+        query = select(*_COLUMNS, Job.status, Job.canonical_job_id, Job.updated_at)
+        if self._refreshed_at is not None:
+            query = query.where(Job.updated_at >= self._refreshed_at - _REFRESH_OVERLAP)
+        rows = db.execute(query).all()
+        
+        with self._lock:
+            for job_id, score, label, job_type, company, status, canonical_job_id, updated_at in rows:
+                if status == JobStatus.CLASSIFIED and canonical_job_id is None:
+                    self._upsert(job_id, score, label, job_type, company)
+                else:
+                    self._remove(job_id)
+                if updated_at is not None and (self._refreshed_at is None or updated_at > self._refreshed_at):
+                    self._refreshed_at = updated_at
+        
+        if self._visible_count(db) != self.size:
+            logger.info("Job read model is missing deleted rows, reloading")
+            self.load(db)
+        return len(rows)
+    
+    def _visible_count(self, db: Session) -> int:
+        return db.execute(select(func.count(Job.id)).where(*self._visible())).scalar()
+    
+    # ===== Queries =====
+    
+    def query(
+        self,
+        label: Optional[JobLabel] = None,
+        company: Optional[str] = None,
+        remote_only: bool = False,
+        offset: int = 0,
+        limit: int = 100
+    ) -> List[int]:
+        """
+        Ids of visible jobs matching the filters, best score first (ties by id).
+        
+        Args:
+            label: Only this label
+            company: Case-insensitive ILIKE ``%company%`` pattern (``%``/``_`` are wildcards, as in SQL)
+            remote_only: Only remote jobs
+            offset: Matches to skip
+            limit: Matches to return
+        """
+        with self._lock:
+            size = self._size
+            ids, scores = self._ids[:size], self._scores[:size]
+            mask = self._alive[:size].copy()
+            if label is not None:
+                mask &= self._labels[:size] == LABEL_CODES[label]
+            if remote_only:
+                mask &= self._remote[:size]
+            if company:
+                # Match the (few) distinct names, then the code column
+                pattern = _like_pattern(company.lower())
+                allowed = np.fromiter((pattern.search(name) is not None for name in self._company_names), dtype=bool,
+                                      count=len(self._company_names))
+                mask &= allowed[self._companies[:size]] if allowed.size else False
+            matches = np.flatnonzero(mask)
+            wanted = offset + limit
+            
+            if matches.size > wanted:
+                # Partial sort: everything scoring at least the wanted-th best (all ties kept)
+                match_scores = scores[matches]
+                cutoff = -np.partition(-match_scores, wanted - 1)[wanted - 1]
+                matches = matches[match_scores >= cutoff]
+            order = np.lexsort((ids[matches], -scores[matches]))
+            return ids[matches[order]][offset:wanted].tolist()
+    
+    # ===== Columns =====
+    
+    def _allocate(self, capacity: int):
+        """Fresh, empty columns (caller holds the lock)."""
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._scores = np.empty(capacity, dtype=np.float64)
+        self._labels = np.empty(capacity, dtype=np.int8)
+        self._remote = np.empty(capacity, dtype=bool)
+        self._companies = np.empty(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+    
+    def _grow(self):
+        """Double the columns into new arrays, so running queries keep a consistent view."""
+        def doubled(column, fill=None):
+            extra = np.zeros_like(column) if fill is not None else np.empty_like(column)
+            return np.concatenate([column, extra])
+        
+        self._ids = doubled(self._ids)
+        self._scores = doubled(self._scores)
+        self._labels = doubled(self._labels)
+        self._remote = doubled(self._remote)
+        self._companies = doubled(self._companies)
+        self._alive = doubled(self._alive, fill=False)
+    
+    def _upsert(self, job_id: int, score: Optional[float], label: Optional[JobLabel], job_type: Optional[str], company: Optional[str]):
+        """Add or update a job's row (caller holds the lock)."""
+        row = self._rows.get(job_id)
+        if row is None:
+            if self._size == self._ids.shape[0]:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[job_id] = row
+            self._ids[row] = job_id
+        
+        name = (company or "").lower()
+        code = self._company_codes.get(name)
+        if code is None:
+            code = self._company_codes[name] = len(self._company_names)
+            self._company_names.append(name)
+        
+        self._scores[row] = score or 0.0
+        self._labels[row] = LABEL_CODES[label] if label is not None else -1
+        self._remote[row] = job_type == "remote"
+        self._companies[row] = code
+        self._alive[row] = True
+    
+    def _remove(self, job_id: int):
+        """Drop a job that is no longer visible (caller holds the lock)."""
+        row = self._rows.pop(job_id, None)
+        if row is not None:
+            self._alive[row] = False
+
+
+def _like_pattern(like: str) -> "re.Pattern":
+    """Regex searching for a LIKE pattern: ``%`` is any run of characters, ``_`` any one."""
+    parts = (".*" if char == "%" else "." if char == "_" else re.escape(char) for char in like)
+    return re.compile("".join(parts), re.DOTALL)
+
+
+# Global read model shared by the API routes and the scheduler
+job_read_model = JobReadModel()
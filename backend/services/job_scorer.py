@@ -1,14 +1,32 @@
 """Job scoring service using LLM - completely simplified."""
+import re
+from functools import lru_cache
 from typing import Dict, Any, Tuple
-from openai import OpenAI
 from config import get_settings
+from services.job_normalizer import JobNormalizer
 from utils import get_logger
+from utils.metrics import LLM_CALLS, LLM_TOKENS, FALLBACKS
 
 logger = get_logger(__name__)
 settings = get_settings()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+# Terms ignored by the keyword fallback
+_TERM_RE = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+_STOPWORDS = {
+    "and", "the", "for", "with", "you", "our", "are", "will", "your", "have", "this", "that",
+    "from", "who", "all", "can", "not", "but", "has", "was", "their", "they", "them", "what",
+    "work", "team", "years", "year", "experience", "job", "role", "company", "including",
+    "ability", "strong", "able", "about", "into", "across", "such", "other", "more", "also",
+}
+
+
+@lru_cache()
+def get_client():
+    """OpenAI client, created on first use; None without an API key."""
+    if not settings.openai_api_key:
+        return None
+    from openai import OpenAI  # Imported lazily - the SDK takes ~0.5s to import
+    return OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url or None)
 
 
 class JobScorer:
@@ -26,9 +44,11 @@ class JobScorer:
         extracts skills automatically, and provides intelligent matching.
         """
         try:
+            client = get_client()
             if not client:
                 logger.warning("No OpenAI API key - using basic fallback")
-                return JobScorer._simple_fallback(job_data, resume_data)
+                FALLBACKS.labels(reason="no_api_key").inc()
+                return JobScorer.keyword_score(job_data, resume_data)
             
             # Get resume content (just the text!)
             resume_content = resume_data.get("content", "")
@@ -36,18 +56,23 @@ class JobScorer:
                 logger.error("Resume content missing or too short")
                 return 0.0, {"error": "No resume content", "matched_keywords": []}
             
+            # Token-budgeted, boilerplate-free description (normalizer precomputes it)
+            description = job_data.get("compressed_description")
+            if description is None:
+                description = JobNormalizer.compress_description(job_data.get("description", ""))
+            
             # Build job summary
             job_summary = f"""Title: {job_data.get('title', 'N/A')}
 Company: {job_data.get('company', 'N/A')}
 Location: {job_data.get('location', 'N/A')}
 Type: {job_data.get('type', 'N/A')}
-Description: {job_data.get('description', 'N/A')[:1500]}"""
+Description: {description or 'N/A'}"""
             
             # LLM prompt - let it extract everything
             prompt = f"""You are an expert resume-job matching AI. Score how well this candidate matches the job.
 
 CANDIDATE'S RESUME:
-{resume_content[:3000]}
+{JobNormalizer.compress_resume(resume_content)}
 
 JOB POSTING:
 {job_summary}
@@ -74,12 +99,24 @@ Scoring guide:
 - 0-39: Weak match (few relevant qualifications)"""
             
             # Call LLM
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                max_tokens=400
-            )
+            try:
+                response = client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.2,
+                    max_tokens=400
+                )
+            except Exception:
+                LLM_CALLS.labels(outcome="error").inc()
+                raise
+            
+            LLM_CALLS.labels(outcome="ok").inc()
+            usage = {
+                "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(response.usage, "completion_tokens", 0) or 0
+            }
+            LLM_TOKENS.labels(kind="prompt").inc(usage["prompt_tokens"])
+            LLM_TOKENS.labels(kind="completion").inc(usage["completion_tokens"])
             
             # Parse JSON response
             import json
@@ -100,7 +137,8 @@ Scoring guide:
                 "score": round(score, 2),
                 "llm_reasoning": str(result.get("reasoning", ""))[:500],
                 "matched_keywords": [str(s) for s in result.get("matched_skills", [])[:20]],
-                "total_keywords_matched": len(result.get("matched_skills", []))
+                "total_keywords_matched": len(result.get("matched_skills", [])),
+                "usage": usage
             }
             
             logger.info(f"LLM scored '{job_data.get('title')}': {score}/100")
@@ -108,6 +146,40 @@ Scoring guide:
             
         except Exception as e:
             logger.error(f"LLM scoring error: {e}")
-            return JobScorer._simple_fallback(job_data, resume_data)
+            FALLBACKS.labels(reason="llm_error").inc()
+            return JobScorer.keyword_score(job_data, resume_data)
     
-   
\ No newline at end of file
+    @staticmethod
+    def keyword_score(
+        job_data: Dict[str, Any],
+        resume_data: Dict[str, Any]
+    ) -> Tuple[float, Dict[str, Any]]:
+        """
+        Keyword-overlap score used when the LLM is unavailable or not worth calling.
+        
+        Scores the share of distinct job terms that also appear in the resume.
+        """
+        resume_terms = set(_TERM_RE.findall(resume_data.get("content", "").lower())) - _STOPWORDS
+        job_text = f"{job_data.get('title', '')} {job_data.get('description', '')}".lower()
+        job_terms = {t for t in _TERM_RE.findall(job_text) if len(t) > 2} - _STOPWORDS
+        
+        if not resume_terms or not job_terms:
+            return 0.0, {
+                "score": 0.0,
+                "llm_reasoning": "Keyword fallback: no comparable terms",
+                "matched_keywords": [],
+                "total_keywords_matched": 0,
+                "fallback": True
+            }
+        
+        matched = sorted(job_terms & resume_terms)
+        score = round(min(100.0, 100.0 * len(matched) / len(job_terms)), 2)
+        
+        details = {
+            "score": score,
+            "llm_reasoning": f"Keyword fallback: {len(matched)} of {len(job_terms)} job terms found in resume",
+            "matched_keywords": matched[:20],
+            "total_keywords_matched": len(matched),
+            "fallback": True
+        }
+        return score, details
@@ -0,0 +1,101 @@
+"""Leader election over a DB lease row, so one process runs the scheduler."""
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import get_settings
+from models import SchedulerLease
+from services.job_queue import default_owner
+from utils import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class LeaderElector:
+    """
+    Hold a named lease in ``scheduler_leases``.
+    
+    Every process heartbeats: the leader renews its lease, the others try to
+    take it over, which only succeeds once the leader's lease has lapsed. The
+    conditional UPDATE is atomic, so at most one process holds the lease.
+    """
+    
+    def __init__(self, name: str = "scheduler", owner: str = None, lease_seconds: int = None):
+        self.name = name
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds or settings.leader_lease_seconds
+        self.is_leader = False
+    
+    def heartbeat(self, db: Session) -> bool:
+        """
+        Renew the lease if held, otherwise try to acquire it.
+        
+        Args:
+            db: Database session (committed here)
+        
+        Returns:
+            True if this process is the leader
+        """
+        now = datetime.now()
+        self._ensure_row(db)
+        
+        result = db.execute(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == self.name,
+                or_(
+                    SchedulerLease.owner == self.owner,
+                    SchedulerLease.owner.is_(None),
+                    SchedulerLease.expires_at.is_(None),
+                    SchedulerLease.expires_at < now
+                )
+            )
+            .values(
+                owner=self.owner,
+                expires_at=now + timedelta(seconds=self.lease_seconds),
+                heartbeat_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        
+        was_leader = self.is_leader
+        self.is_leader = bool(result.rowcount)
+        if self.is_leader and not was_leader:
+            logger.info(f"{self.owner} is now the scheduler leader")
+        elif was_leader and not self.is_leader:
+            logger.warning(f"{self.owner} lost scheduler leadership")
+        return self.is_leader
+    
+    def release(self, db: Session):
+        """Give up the lease so a follower can take over immediately."""
+        db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == self.name, SchedulerLease.owner == self.owner)
+            .values(owner=None, expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if self.is_leader:
+            logger.info(f"{self.owner} released scheduler leadership")
+        self.is_leader = False
+    
+    def current(self, db: Session) -> Optional[Dict[str, Any]]:
+        """Current lease holder, or None if nobody holds a live lease."""
+        lease = db.get(SchedulerLease, self.name)
+        if lease is None or lease.owner is None or lease.expires_at is None or lease.expires_at < datetime.now():
+            return None
+        return lease.to_dict()
+    
+    def _ensure_row(self, db: Session):
+        """Create the lease row on first use."""
+        if db.get(SchedulerLease, self.name) is not None:
+            return
+        try:
+            db.add(SchedulerLease(name=self.name))
+            db.commit()
+        except IntegrityError:
+            # Another process created it first
+            db.rollback()
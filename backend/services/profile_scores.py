@@ -0,0 +1,157 @@
+"""Per-profile job scores.
+
+Every resume profile (one per team member) gets its own score and label for
+each job in ``job_scores``. The job row itself keeps the best-fitting
+profile's score, so profile-less views show what fits anyone on the team.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Embedding, Job, JobScore, JobStatus, Resume
+from services.job_classifier import JobClassifier
+from services.skill_index import SkillIndex
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProfileScores:
+    """Read and write the ``job_scores`` rows of jobs and profiles."""
+    
+    @staticmethod
+    def existing(db: Session, job_ids: List[int]) -> Dict[int, Dict[int, JobScore]]:
+        """Stored scores of jobs: job id -> resume id -> score row."""
+        scores: Dict[int, Dict[int, JobScore]] = {job_id: {} for job_id in job_ids}
+        if job_ids:
+            for row in db.query(JobScore).filter(JobScore.job_id.in_(list(scores))):
+                scores[row.job_id][row.resume_id] = row
+        return scores
+    
+    @staticmethod
+    def record(
+        db: Session,
+        job: Job,
+        resume: Resume,
+        score: float,
+        details: Dict[str, Any],
+        similarity: Optional[float] = None,
+        prefiltered: bool = False
+    ) -> JobScore:
+        """Add one job/profile score (caller commits)."""
+        row = JobScore(
+            job_id=job.id,
+            resume_id=resume.id,
+            score=score,
+            keywords_matched=details.get("matched_keywords", []),
+            llm_reasoning=details.get("llm_reasoning", ""),
+            similarity=similarity,
+            prefiltered=prefiltered,
+            scored_at=datetime.now()
+        )
+        db.add(row)
+        return row
+    
+    @staticmethod
+    def apply_best(job: Job, scores: List[JobScore]):
+        """Copy the best-fitting profile's score onto the job row."""
+        if not scores:
+            return
+        best = max(scores, key=lambda row: row.score or 0.0)
+        job.score = best.score
+        job.keywords_matched = best.keywords_matched
+        job.llm_reasoning = best.llm_reasoning
+    
+    @staticmethod
+    def copy(db: Session, source: Job, target: Job) -> int:
+        """Give a near-duplicate its canonical job's profile scores (caller commits)."""
+        have = {resume_id for (resume_id,) in db.query(JobScore.resume_id).filter(JobScore.job_id == target.id)}
+        copied = 0
+        for row in db.query(JobScore).filter(JobScore.job_id == source.id):
+            if row.resume_id in have:
+                continue
+            db.add(JobScore(
+                job_id=target.id,
+                resume_id=row.resume_id,
+                score=row.score,
+                label=row.label,
+                keywords_matched=row.keywords_matched,
+                llm_reasoning=row.llm_reasoning,
+                similarity=row.similarity,
+                prefiltered=row.prefiltered,
+                scored_at=row.scored_at
+            ))
+            copied += 1
+        return copied
+    
+    @staticmethod
+    def classify(db: Session, jobs: List[Job]):
+        """Label the profile scores of jobs (caller commits)."""
+        if not jobs:
+            return
+        for row in db.query(JobScore).filter(JobScore.job_id.in_([job.id for job in jobs])):
+            row.label = JobClassifier.classify(row.score or 0.0)
+    
+    @staticmethod
+    def by_profile(db: Session, job_ids: List[int]) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """Scores of jobs keyed by profile name: job id -> profile -> score and label."""
+        result: Dict[int, Dict[str, Dict[str, Any]]] = {job_id: {} for job_id in job_ids}
+        if not job_ids:
+            return result
+        rows = (
+            db.query(JobScore.job_id, Resume.profile, JobScore.score, JobScore.label)
+            .join(Resume, Resume.id == JobScore.resume_id)
+            .filter(JobScore.job_id.in_(job_ids))
+        )
+        for job_id, profile, score, label in rows:
+            result[job_id][profile] = {"score": score, "label": label.value if label else None}
+        return result
+    
+    @staticmethod
+    def remove_profile(db: Session, resume: Resume) -> int:
+        """
+        Delete a profile with its scores, re-deriving the best score of the jobs it scored.
+        
+        Jobs no other profile has scored keep their last score.
+        
+        Returns:
+            Number of job scores removed (committed here)
+        """
+        job_ids = [job_id for (job_id,) in db.query(JobScore.job_id).filter(JobScore.resume_id == resume.id)]
+        removed = db.query(JobScore).filter(JobScore.resume_id == resume.id).delete(synchronize_session=False)
+        db.query(Embedding).filter(Embedding.kind == "resume", Embedding.owner_id == resume.id).delete(synchronize_session=False)
+        db.delete(resume)
+        db.flush()
+        
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            remaining = ProfileScores.existing(db, chunk)
+            rescored = []
+            for job in db.query(Job).filter(Job.id.in_(chunk)):
+                scores = list(remaining[job.id].values())
+                if not scores:
+                    continue
+                ProfileScores.apply_best(job, scores)
+                if job.status == JobStatus.CLASSIFIED:
+                    job.label = JobClassifier.classify(job.score or 0.0)
+                    rescored.append(job)
+            SkillIndex.index(db, rescored)  # Best profile's keywords
+        db.commit()
+        
+        logger.info(f"Removed profile '{resume.profile}' and {removed} job scores")
+        return removed
+    
+    @staticmethod
+    def counts(db: Session, resume: Resume) -> Dict[Any, int]:
+        """Visible classified jobs per label for one profile."""
+        rows = (
+            db.query(JobScore.label, func.count(JobScore.job_id))
+            .join(Job, Job.id == JobScore.job_id)
+            .filter(
+                JobScore.resume_id == resume.id,
+                Job.status == JobStatus.CLASSIFIED,
+                Job.canonical_job_id.is_(None)
+            )
+            .group_by(JobScore.label)
+        )
+        return {label: count for label, count in rows}
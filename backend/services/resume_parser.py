@@ -1,7 +1,6 @@
 """Resume parsing service - simplified for LLM."""
 import re
 from typing import Dict, Any
-from PyPDF2 import PdfReader
 from io import BytesIO
 from utils import get_logger
 
@@ -15,6 +14,7 @@ class ResumeParser:
     def parse_pdf(pdf_file: bytes) -> str:
         """Extract text from PDF file."""
         try:
+            from PyPDF2 import PdfReader
             pdf_reader = PdfReader(BytesIO(pdf_file))
             text = ""
             for page in pdf_reader.pages:
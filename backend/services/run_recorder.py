@@ -0,0 +1,179 @@
+"""Fetch run history: timings, counts and token usage per fetch cycle."""
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import FetchRun, RunStatus
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Counters persisted on FetchRun
+RUN_COUNTS = ("fetched", "deduped", "scored", "stored", "failed", "prompt_tokens", "completion_tokens")
+
+
+class RunRecorder:
+    """
+    Record one fetch run in ``fetch_runs``.
+    
+    Usage::
+    
+        recorder = RunRecorder(run_id)
+        with recorder.stage("fetch"):
+            ...
+        recorder.add(fetched=120)
+        recorder.finish()
+    """
+    
+    def __init__(self, run_id: int, session_factory=SessionLocal):
+        self.run_id = run_id
+        self.session_factory = session_factory
+        self.stage_seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {name: 0 for name in RUN_COUNTS}
+        self._started = time.perf_counter()
+    
+    @staticmethod
+    def create(db: Session, trigger: str, status: RunStatus = RunStatus.RUNNING, owner: str = None) -> FetchRun:
+        """
+        Insert a run row.
+        
+        Args:
+            db: Database session (committed here)
+            trigger: What started the run (scheduled / manual)
+            status: RUNNING when it starts right away, PENDING when handed to the leader
+            owner: Process running it
+        
+        Returns:
+            The stored run
+        """
+        run = FetchRun(
+            trigger=trigger,
+            status=status,
+            owner=owner,
+            started_at=datetime.now() if status == RunStatus.RUNNING else None,
+            created_at=datetime.now()  # Local time like started_at (expire_abandoned compares them)
+        )
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+        return run
+    
+    @staticmethod
+    def claim_pending(db: Session, owner: str) -> Optional[int]:
+        """
+        Claim the oldest PENDING run for this process.
+        
+        Returns:
+            The claimed run id, or None if there is nothing to claim
+        """
+        run_id = (
+            db.query(FetchRun.id)
+            .filter(FetchRun.status == RunStatus.PENDING)
+            .order_by(FetchRun.id)
+            .limit(1)
+            .scalar()
+        )
+        if run_id is None:
+            return None
+        
+        # Conditional UPDATE so a run is only ever claimed once
+        result = db.execute(
+            update(FetchRun)
+            .where(FetchRun.id == run_id, FetchRun.status == RunStatus.PENDING)
+            .values(status=RunStatus.RUNNING, owner=owner, started_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return run_id if result.rowcount else None
+    
+    @staticmethod
+    def expire_abandoned(db: Session, owner: str, pending_before: datetime) -> int:
+        """
+        Fail runs a previous leader left behind, on taking over the lease.
+        
+        Args:
+            db: Database session (committed here)
+            owner: The new leader - its own runs are left alone
+            pending_before: PENDING runs queued before this were waiting on the old leader
+        
+        Returns:
+            Number of runs marked FAILED
+        """
+        now = datetime.now()
+        running = db.execute(
+            update(FetchRun)
+            .where(FetchRun.status == RunStatus.RUNNING, or_(FetchRun.owner.is_(None), FetchRun.owner != owner))
+            .values(status=RunStatus.FAILED, finished_at=now, error="Abandoned: its scheduler leader stopped before it finished")
+            .execution_options(synchronize_session=False)
+        )
+        pending = db.execute(
+            update(FetchRun)
+            .where(FetchRun.status == RunStatus.PENDING, FetchRun.created_at < pending_before)
+            .values(status=RunStatus.FAILED, finished_at=now, error="Expired: no scheduler leader claimed it")
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        expired = running.rowcount + pending.rowcount
+        if expired:
+            logger.warning(f"Marked {running.rowcount} abandoned and {pending.rowcount} expired fetch runs as failed")
+        return expired
+    
+    @staticmethod
+    def list_runs(db: Session, limit: int = 50, offset: int = 0) -> List[FetchRun]:
+        """Most recent runs first."""
+        return db.query(FetchRun).order_by(FetchRun.id.desc()).offset(offset).limit(limit).all()
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage of the run (accumulates if the stage repeats)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_seconds[name] = round(self.stage_seconds.get(name, 0.0) + elapsed, 3)
+    
+    def add(self, **counts: int):
+        """Add to the run counters."""
+        for name, value in counts.items():
+            if name in self.counts:
+                self.counts[name] += int(value or 0)
+    
+    def finish(self, error: str = None) -> Dict[str, Any]:
+        """
+        Persist the run outcome.
+        
+        Args:
+            error: Error message if the run failed
+        
+        Returns:
+            The stored run as a dict
+        """
+        db: Session = self.session_factory()
+        try:
+            run = db.get(FetchRun, self.run_id)
+            if run is None:
+                logger.error(f"Fetch run {self.run_id} disappeared before it finished")
+                return {}
+            
+            run.status = RunStatus.FAILED if error else RunStatus.COMPLETED
+            run.error = error
+            run.finished_at = datetime.now()
+            run.duration_seconds = round(time.perf_counter() - self._started, 3)
+            run.stage_seconds = dict(self.stage_seconds)
+            for name, value in self.counts.items():
+                setattr(run, name, value)
+            db.commit()
+            
+            summary = run.to_dict()
+            logger.info(
+                f"Fetch run #{self.run_id} {summary['status']} in {summary['duration_seconds']}s: "
+                f"{run.fetched} fetched, {run.stored} stored, {run.deduped} deduped, "
+                f"{run.scored} scored, {run.failed} failed"
+            )
+            return summary
+        finally:
+            db.close()
@@ -0,0 +1,153 @@
+"""Skill facet index over jobs' matched keywords.
+
+``Job.keywords_matched`` is an opaque JSON list, so filtering or counting by
+skill would mean parsing every row. Instead each stored (classified) job's
+keywords are normalized into ``skills`` and indexed as ``job_skills`` rows
+when the job is classified or its best profile changes; skill filters and
+facet counts are then plain indexed joins.
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import Job, JobSkill, JobStatus, Skill
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class SkillIndex:
+    """Maintain and query the ``job_skills`` index."""
+    
+    @staticmethod
+    def normalize(name) -> str:
+        """Canonical skill name: lower-cased, whitespace collapsed."""
+        return _WHITESPACE.sub(" ", str(name or "")).strip().lower()
+    
+    @staticmethod
+    def parse(values: Optional[List[str]]) -> List[str]:
+        """Distinct normalized skills from query values (repeated and/or comma-separated)."""
+        names = []
+        for value in values or []:
+            for part in value.split(","):
+                name = SkillIndex.normalize(part)
+                if name and name not in names:
+                    names.append(name)
+        return names
+    
+    @staticmethod
+    def skill_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """Ids of skill names, creating missing ones (caller commits)."""
+        names = set(names)
+        if not names:
+            return {}
+        ids = {name: skill_id for skill_id, name in db.query(Skill.id, Skill.name).filter(Skill.name.in_(names))}
+        for name in sorted(names - set(ids)):
+            try:
+                with db.begin_nested():
+                    skill = Skill(name=name)
+                    db.add(skill)
+                ids[name] = skill.id
+            except IntegrityError:
+                # Another process added it meanwhile
+                ids[name] = db.query(Skill.id).filter(Skill.name == name).scalar()
+        return ids
+    
+    @staticmethod
+    def index(db: Session, jobs: List[Job]) -> int:
+        """
+        Replace the index rows of jobs from their keywords_matched (caller commits).
+        
+        Returns:
+            Number of job/skill rows written
+        """
+        if not jobs:
+            return 0
+        names = {
+            job.id: {SkillIndex.normalize(keyword) for keyword in (job.keywords_matched or [])} - {""}
+            for job in jobs
+        }
+        ids = SkillIndex.skill_ids(db, set().union(*names.values()))
+        rows = [
+            {"job_id": job_id, "skill_id": ids[name]}
+            for job_id, job_names in names.items()
+            for name in job_names
+        ]
+        db.query(JobSkill).filter(JobSkill.job_id.in_(list(names))).delete(synchronize_session=False)
+        if rows:
+            db.execute(insert(JobSkill), rows)
+        return len(rows)
+    
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 1000) -> int:
+        """
+        Index classified jobs that have keywords but no index rows (stored before
+        the index existed, or missed by an interrupted backfill).
+        
+        Returns:
+            Number of jobs indexed (committed here)
+        """
+        unindexed = ~exists().where(JobSkill.job_id == Job.id)
+        indexed = 0
+        last_id = 0
+        while True:
+            jobs = (
+                db.query(Job)
+                .filter(Job.status == JobStatus.CLASSIFIED, Job.id > last_id, unindexed)
+                .order_by(Job.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not jobs:
+                break
+            last_id = jobs[-1].id
+            jobs = [job for job in jobs if job.keywords_matched]
+            SkillIndex.index(db, jobs)
+            db.commit()
+            indexed += len(jobs)
+        if indexed:
+            logger.info(f"Backfilled the skill index for {indexed} jobs")
+        return indexed
+    
+    @staticmethod
+    def filter(names: List[str], match_all: bool = True):
+        """
+        WHERE clause on Job.id: jobs having every skill (match_all) or any of them.
+        
+        Args:
+            names: Normalized skill names (see parse)
+            match_all: AND semantics; OR otherwise
+        """
+        having = (
+            select(JobSkill.job_id)
+            .join(Skill, Skill.id == JobSkill.skill_id)
+            .where(Skill.name.in_(names))
+        )
+        if match_all and len(names) > 1:
+            having = having.group_by(JobSkill.job_id).having(func.count(JobSkill.skill_id) == len(names))
+        return Job.id.in_(having)
+    
+    @staticmethod
+    def facets(db: Session, filters: list, limit: int = 50) -> List[Dict[str, object]]:
+        """
+        Skill counts over the jobs matching filters, most common first.
+        
+        Args:
+            db: Database session
+            filters: WHERE clauses on Job (as for the job list)
+            limit: Skills to return
+        """
+        jobs = select(Job.id).where(*filters)
+        count = func.count(JobSkill.job_id)
+        rows = (
+            db.query(Skill.name, count)
+            .join(JobSkill, JobSkill.skill_id == Skill.id)
+            .filter(JobSkill.job_id.in_(jobs))
+            .group_by(Skill.id)
+            .order_by(count.desc(), Skill.name)
+            .limit(limit)
+        )
+        return [{"skill": name, "count": jobs_with_skill} for name, jobs_with_skill in rows]
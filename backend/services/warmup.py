@@ -0,0 +1,126 @@
+"""Background warm-up of lazily loaded dependencies.
+
+Heavy libraries (JobSpy, OpenAI, LangGraph, sentence-transformers) are
+imported where they are first used, so the API starts listening quickly.
+This loads them in a background thread right after startup, so the first
+fetch run or request doesn't pay for it, and reports readiness per
+component for the health endpoint.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from config import get_settings
+from utils import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def _warm_tokenizer():
+    from utils.tokens import _get_encoding
+    _get_encoding()
+
+
+def _warm_scraper():
+    import jobspy  # noqa: F401
+
+
+def _warm_llm_client():
+    from services.job_scorer import get_client
+    if get_client() is None:
+        return SKIPPED
+
+
+def _warm_graph():
+    from pipeline.langgraph_pipeline import compiled_graph
+    compiled_graph()
+
+
+def _warm_embedding_model():
+    if not settings.embedding_enabled or settings.embedding_use_openai:
+        return SKIPPED
+    from services.embeddings import get_embedding_model
+    get_embedding_model()
+
+
+# (name, loader) in load order; a loader may return SKIPPED when not configured
+COMPONENTS: List[Tuple[str, Callable[[], Optional[str]]]] = [
+    ("tokenizer", _warm_tokenizer),
+    ("scraper", _warm_scraper),
+    ("llm_client", _warm_llm_client),
+    ("graph", _warm_graph),
+    ("embedding_model", _warm_embedding_model),
+]
+
+
+class WarmUp:
+    """Load components in a background thread and track their status."""
+    
+    def __init__(self, components: List[Tuple[str, Callable[[], Optional[str]]]] = None):
+        self.components = components if components is not None else COMPONENTS
+        self.status: Dict[str, Dict[str, Any]] = {
+            name: {"status": PENDING} for name, _ in self.components
+        }
+        self.started_at: Optional[datetime] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def ready(self) -> bool:
+        """True once every component has been attempted."""
+        return self._thread is not None and all(
+            component["status"] != PENDING for component in self.status.values()
+        )
+    
+    def start(self):
+        """Start warming up in a daemon thread (once)."""
+        if self._thread is not None:
+            return
+        self.started_at = datetime.now()
+        self._thread = threading.Thread(target=self.run, name="warm-up", daemon=True)
+        self._thread.start()
+    
+    def run(self):
+        """Load every component in order; failures are recorded, not raised."""
+        total = time.perf_counter()
+        for name, loader in self.components:
+            start = time.perf_counter()
+            try:
+                outcome = loader() or READY
+                self.status[name] = {"status": outcome}
+            except Exception as e:
+                # The component loads (and fails) again on first real use
+                logger.warning(f"Warm-up of {name} failed: {e}")
+                self.status[name] = {"status": FAILED, "error": str(e)}
+            self.status[name]["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Warm-up finished in {time.perf_counter() - total:.2f}s")
+    
+    def wait(self, timeout: float = None) -> bool:
+        """Block until warm-up finishes; returns readiness."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+    
+    def health(self) -> Dict[str, Any]:
+        """Readiness summary for the health endpoint."""
+        if not self.ready:
+            status = "starting"
+        elif any(component["status"] == FAILED for component in self.status.values()):
+            status = "degraded"
+        else:
+            status = "ok"
+        return {
+            "status": status,
+            "ready": self.ready,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "components": self.status,
+        }
+
+
+# Global warm-up started by the API lifespan
+warmup = WarmUp()
@@ -0,0 +1,96 @@
+"""Shared test fixtures."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database import Base
+
+
+@pytest.fixture(autouse=True)
+def fresh_read_model():
+    """Every test has its own database, so the global job read model and response cache start over."""
+    from services.job_read_model import job_read_model
+    from utils.response_cache import response_cache
+    
+    job_read_model.invalidate()
+    response_cache.clear()
+    yield
+    job_read_model.invalidate()
+    response_cache.clear()
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory over a fresh in-memory SQLite database with all tables created."""
+    import models  # noqa: F401 - register models on Base
+    
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def db_session(session_factory):
+    """In-memory SQLite session with all tables created."""
+    session = session_factory()
+    
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def api_client(session_factory):
+    """TestClient for the app, with its database sessions drawn from ``session_factory``."""
+    import main
+    from database import SessionLocal, get_db
+    from utils.response_cache import response_cache
+    
+    def override_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    main.app.dependency_overrides[get_db] = override_db
+    response_cache.session_factory = session_factory  # ETags fingerprint the test database
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.clear()
+        response_cache.session_factory = SessionLocal
+
+
+@pytest.fixture
+def make_job():
+    """
+    Factory storing a classified mid-fit job keyed ``key`` (committed).
+    
+    Any other ``Job`` column can be given as a keyword argument.
+    """
+    from models import Job, JobLabel, JobStatus
+    
+    def make(db, key, **fields):
+        values = {
+            "job_id": key, "title": f"Engineer {key}", "company": "Initech", "description": "Python and SQL.",
+            "type": "remote", "apply_url": f"https://jobs.example/{key}", "status": JobStatus.CLASSIFIED,
+            "label": JobLabel.MID_FIT, "score": 50.0, "keywords_matched": ["python"],
+        }
+        values.update(fields)
+        job = Job(**values)
+        db.add(job)
+        db.commit()
+        return job
+    
+    return make
@@ -0,0 +1,204 @@
+"""Tests for the benchmark harness pieces."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+from benchmarks.fake_openai import FakeOpenAI
+from benchmarks.load import histogram_quantiles, parse_lag_buckets
+from benchmarks.pipeline import StageTimer, compare
+from benchmarks.scorers import Backend, KeywordBackend, ResultCache, cascade, evaluate, format_report, spearman
+from benchmarks.synthetic import make_jobs_frame, split_by_source
+from services.job_normalizer import JobNormalizer
+
+
+def test_synthetic_frame_has_jobspy_shape_and_reposts():
+    frame = make_jobs_frame(200, duplicate_ratio=0.25, seed=3)
+    
+    assert len(frame) == 200
+    assert frame["id"].is_unique and frame["job_url"].is_unique
+    reposts = frame.duplicated(["title", "company", "location"]).sum()
+    assert 30 <= reposts <= 70
+    assert all(job is not None for job in JobNormalizer.normalize_frame(frame))
+    assert sum(len(rows) for rows in split_by_source(frame).values()) == 200
+
+
+def test_synthetic_frame_is_deterministic_per_seed():
+    assert make_jobs_frame(20, seed=1).equals(make_jobs_frame(20, seed=1))
+    assert set(make_jobs_frame(20, seed=1)["id"]).isdisjoint(make_jobs_frame(20, seed=2)["id"])
+
+
+def test_fake_openai_serves_completions_and_rate_limits():
+    openai = pytest.importorskip("openai")
+    with FakeOpenAI(rate_limit_ratio=0.0) as server:
+        client = openai.OpenAI(base_url=server.url, api_key="test", max_retries=0)
+        first = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "python"}])
+        second = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "python"}])
+        
+        server.rate_limit_ratio = 1.0
+        with pytest.raises(openai.RateLimitError):
+            client.chat.completions.create(model="m", messages=[{"role": "user", "content": "python"}])
+    
+    assert first.choices[0].message.content == second.choices[0].message.content
+    assert first.usage.prompt_tokens > 0
+    assert server.stats == {"requests": 3, "completions": 2, "rate_limited": 1}
+
+
+def test_stage_timer_wraps_and_restores():
+    class Target:
+        @staticmethod
+        def work(value):
+            return value * 2
+    
+    timer = StageTimer()
+    timer.wrap(Target, "work", "work")
+    assert Target.work(2) == 4
+    assert Target().work(3) == 6
+    timer.restore()
+    Target.work(1)
+    
+    summary = timer.summary()
+    assert summary["work"]["count"] == 2
+    assert summary["work"]["p50_ms"] <= summary["work"]["p99_ms"]
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {
+        "throughput": {"jobs_per_second": 100.0},
+        "stages": {"llm_score": {"p95_ms": 200.0}, "enqueue": {"p95_ms": 0.5}},
+        "peak_rss_mb": 150.0,
+    }
+    result = {
+        "throughput": {"jobs_per_second": 70.0},
+        "stages": {"llm_score": {"p95_ms": 260.0}, "enqueue": {"p95_ms": 1.2}},
+        "peak_rss_mb": 160.0,
+    }
+    
+    regressions = compare(result, baseline, tolerance=0.2)
+    
+    assert len(regressions) == 2
+    assert regressions[0].startswith("throughput")
+    assert regressions[1].startswith("llm_score")
+    assert compare(baseline, baseline, tolerance=0.2) == []
+
+
+def test_pipeline_benchmark_runs_end_to_end(tmp_path):
+    """A small scenario scores every fetched job through the fake server."""
+    backend = Path(__file__).resolve().parent.parent
+    report = tmp_path / "report.json"
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.pipeline", "--jobs", "30", "--repeat", "1", "--latency-ms", "1",
+         "--jitter-ms", "0", "--name", "test-never-saved", "--output", str(report)],
+        cwd=backend, capture_output=True, text=True, timeout=120
+    )
+    
+    assert result.returncode == 0, result.stdout + result.stderr
+    data = json.loads(report.read_text())
+    assert data["counts"]["fetched"] == 30
+    assert data["counts"]["scored"] == 30
+    assert data["counts"]["failed"] == 0
+    assert {"llm_score", "db_commit", "worker_score", "cycle"} <= set(data["stages"])
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    # 100 observations: 50 under 10ms, 40 more under 50ms, 10 beyond the last bound
+    buckets = [(0.01, 50.0), (0.05, 90.0), (1.0, 90.0), (float("inf"), 100.0)]
+    
+    quantiles = histogram_quantiles(buckets)
+    
+    assert quantiles["p50_ms"] == 10.0
+    assert quantiles["p95_ms"] == 1000.0  # Past the last finite bucket
+    assert histogram_quantiles([(0.01, 0.0), (float("inf"), 0.0)]) == {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    assert histogram_quantiles([(0.01, 0.0), (0.05, 10.0), (float("inf"), 10.0)])["p50_ms"] == 30.0
+
+
+def test_lag_buckets_are_read_from_metrics_page():
+    from utils.metrics import EVENT_LOOP_LAG, render_latest
+    EVENT_LOOP_LAG.observe(0.003)
+    
+    buckets = parse_lag_buckets(render_latest()[0].decode())
+    
+    assert buckets[-1][0] == float("inf")
+    assert buckets[-1][1] >= 1
+    assert [count for _, count in buckets] == sorted(count for _, count in buckets)
+
+
+def test_load_test_runs_end_to_end(tmp_path):
+    """A tiny scenario answers every request and delivers every broadcast."""
+    backend = Path(__file__).resolve().parent.parent
+    report = tmp_path / "report.json"
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.load", "--jobs", "100", "--duration", "2", "--rps", "10",
+         "--ws-clients", "5", "--slow-clients", "0.2", "--slow-delay-ms", "10", "--write-rate", "2",
+         "--output", str(report)],
+        cwd=backend, capture_output=True, text=True, timeout=180
+    )
+    
+    assert result.returncode == 0, result.stdout + result.stderr
+    step = json.loads(report.read_text())["steps"][0]
+    assert step["rest"]["errors"] == 0
+    assert step["rest"]["all"]["count"] == 20
+    assert step["websocket"]["clients"] == 5
+    assert step["websocket"]["jobs_written"] > 0
+    assert step["websocket"]["delivered_ratio"] == 1.0
+    assert step["server_loop_lag"]["p50_ms"] is not None
+
+
+def test_spearman_handles_ties_and_gaps():
+    a = np.array([1.0, 2.0, 3.0, 4.0, np.nan])
+    
+    assert spearman(a, np.array([10.0, 20.0, 30.0, 40.0, 0.0])) == 1.0
+    assert spearman(a, np.array([4.0, 3.0, 2.0, 1.0, 9.0])) == -1.0
+    assert spearman(a, np.array([1.0, 1.0, 2.0, 2.0, 5.0])) == pytest.approx(0.8944, abs=1e-4)
+    assert spearman(a, np.array([5.0, 5.0, 5.0, 5.0, 5.0])) is None
+
+
+def test_cascade_cutoff_keeps_the_recall_target():
+    reference = np.array([90.0, 80.0, 70.0, 66.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0])
+    cheap = np.array([0.9, 0.5, 0.3, 0.2, 0.1, 0.05, 0.25, 0.0, 0.4, 0.35])
+    
+    strict, = cascade(reference, cheap, 65, recalls=(0.99,))
+    loose, = cascade(reference, cheap, 65, recalls=(0.75,))
+    
+    assert (strict["cutoff"], strict["recall"], strict["skipped"]) == (0.2, 1.0, 0.3)
+    assert (loose["cutoff"], loose["recall"], loose["skipped"]) == (0.3, 0.75, 0.5)
+
+
+def test_scorer_evaluation_compares_backends_and_caches(tmp_path):
+    class ExactBackend(Backend):
+        """Stands in for the LLM: replays known scores and counts calls."""
+        name = "llm"
+        calls = 0
+        
+        def score(self, jobs, resume_text):
+            ExactBackend.calls += len(jobs)
+            return [(float(job["truth"]), 0.2, 1000, 50) for job in jobs]
+    
+    words = ["python", "sql", "airflow", "kubernetes", "spark"]
+    jobs = [
+        {"job_id": str(i), "title": "Engineer", "company": "Initech", "description": " ".join(words[:i % 5 + 1]),
+         "truth": 20 * (i % 5) + 10}
+        for i in range(20)
+    ]
+    stored = np.array([job["truth"] for job in jobs], dtype=float)
+    backends = {"llm": ExactBackend(), "keyword": KeywordBackend()}
+    
+    cache = ResultCache(str(tmp_path / "eval.sqlite"))
+    first = evaluate(jobs, "python sql airflow kubernetes spark", stored, backends, cache=cache)
+    second = evaluate(jobs, "python sql airflow kubernetes spark", stored, backends, cache=cache)
+    cache.close()
+    
+    assert ExactBackend.calls == 20
+    assert second["backends"]["llm"]["cached"] == 20
+    llm, keyword = first["backends"]["llm"], first["backends"]["keyword"]
+    assert first["reference"] == "llm" and llm["spearman"] is None
+    assert llm["tokens_per_job"] == 1050.0
+    assert llm["cost_per_1k_jobs"] == pytest.approx((1000 * 0.15 + 50 * 0.60) / 1000)
+    assert llm["latency"]["p50_ms"] == 200.0
+    # Same order as the reference, different scale: ranks agree, labels don't
+    assert keyword["spearman"] == 1.0 and keyword["label_agreement"] < 1.0
+    assert sum(map(sum, keyword["confusion"])) == 20
+    assert keyword["cascade"][0]["recall"] >= 0.9
+    assert "cutoffs keeping llm best/mid fits" in format_report(first)
+
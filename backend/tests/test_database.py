@@ -0,0 +1,66 @@
+"""Tests for upgrading databases created by earlier versions."""
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database import Base, upgrade_schema
+from models import DEFAULT_PROFILE, Job, Resume
+from services.job_queue import JobQueue
+
+# Schema of the first release, before any column was added
+BASELINE_SCHEMA = [
+    """CREATE TABLE jobs (
+        id INTEGER NOT NULL, job_id VARCHAR NOT NULL, title VARCHAR NOT NULL, company VARCHAR NOT NULL,
+        description TEXT NOT NULL, location VARCHAR, type VARCHAR, apply_url VARCHAR, timestamp_fetched DATETIME,
+        status VARCHAR(10), score FLOAT, label VARCHAR(9), keywords_matched JSON, llm_reasoning TEXT,
+        created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX ix_jobs_status ON jobs (status)",
+    "CREATE INDEX ix_jobs_label ON jobs (label)",
+    "CREATE INDEX ix_jobs_job_id ON jobs (job_id)",
+    "CREATE UNIQUE INDEX ix_jobs_apply_url ON jobs (apply_url)",
+    "CREATE INDEX ix_jobs_id ON jobs (id)",
+    """CREATE TABLE resumes (
+        id INTEGER NOT NULL, filename VARCHAR, content TEXT NOT NULL, skills JSON, experiences JSON,
+        education JSON, created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX ix_resumes_id ON resumes (id)",
+    """INSERT INTO jobs (id, job_id, title, company, description, apply_url, status, score, label)
+       VALUES (1, 'a', 'Data Engineer', 'Initech', 'd', 'https://jobs.example/a', 'CLASSIFIED', 80.0, 'BEST_FIT')""",
+    "INSERT INTO resumes (id, filename, content) VALUES (1, 'older.txt', 'Backend engineer')",
+    "INSERT INTO resumes (id, filename, content) VALUES (2, 'old.txt', 'Data engineer')",
+]
+
+
+def _baseline_engine():
+    import models  # noqa: F401 - register models on Base
+    
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(text(statement))
+    return engine
+
+
+def test_upgrade_adds_columns_and_indexes_to_a_baseline_database():
+    engine = _baseline_engine()
+    
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)  # Idempotent
+    
+    columns = {column["name"] for column in inspect(engine).get_columns("jobs")}
+    indexes = {index["name"] for index in inspect(engine).get_indexes("jobs")}
+    assert {"canonical_job_id", "lease_owner", "lease_expires_at", "attempts", "failed_status", "classified_at"} <= columns
+    assert {"ix_jobs_canonical_job_id", "ix_jobs_lease_owner", "ix_jobs_lease_expires_at", "ix_jobs_classified_at"} <= indexes
+    assert "ix_jobs_updated_at" in indexes  # Read model refresh cursor, on a column that already existed
+    
+    db = sessionmaker(bind=engine)()
+    job = db.query(Job).one()
+    assert job.title == "Data Engineer" and job.canonical_job_id is None
+    assert job.attempts == 0  # Existing rows join the queue with no failed attempts
+    assert JobQueue.depths(db)["classified"] == 1
+    assert [(resume.id, resume.profile) for resume in db.query(Resume).order_by(Resume.id)] == [
+        (1, "default-1"), (2, DEFAULT_PROFILE)
+    ]
+    assert "ix_resumes_profile" in {index["name"] for index in inspect(engine).get_indexes("resumes")}
+    db.close()
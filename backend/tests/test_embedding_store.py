@@ -0,0 +1,106 @@
+"""Tests for the persistent embedding store and similarity search."""
+from datetime import datetime
+import numpy as np
+import pytest
+from models import Job, Resume, JobStatus, JobLabel
+from services.embedding_store import EmbeddingStore, JOB
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.RandomState(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _add_jobs(db, count):
+    jobs = [
+        Job(
+            job_id=f"j{i}", title=f"Job {i}", company="Initech", description="Python and SQL.",
+            apply_url=f"https://jobs.example/{i}", status=JobStatus.CLASSIFIED,
+            label=JobLabel.MID_FIT, score=50.0, timestamp_fetched=datetime(2024, 1, 1)
+        )
+        for i in range(count)
+    ]
+    db.add_all(jobs)
+    db.commit()
+    return jobs
+
+
+@pytest.mark.parametrize("dtype, itemsize", [("float16", 2), ("int8", 1)])
+def test_vectors_stored_compact_and_read_without_copy(dtype, itemsize):
+    """Vectors are unit-normalized, quantized and decoded as zero-copy views."""
+    store = EmbeddingStore(dtype=dtype)
+    vector = _vectors(1, dim=384)[0]
+    
+    blob = store.encode(vector)
+    decoded = store.decode(blob, dtype)
+    
+    assert len(blob) == 384 * itemsize
+    assert decoded.base is not None  # View over the bytes, not a copy
+    restored = store.to_float(decoded)
+    assert np.isclose(np.linalg.norm(restored), 1.0, atol=0.02)
+    assert restored @ (vector / np.linalg.norm(vector)) > 0.99
+
+
+def test_blocked_search_matches_brute_force(db_session):
+    """Nearest neighbors over several blocks equal a full scan, minus excluded IDs."""
+    vectors = _vectors(50)
+    store = EmbeddingStore(block_rows=7)
+    for job_id, vector in enumerate(vectors, start=1):
+        store.store(db_session, JOB, job_id, vector)
+    
+    query = vectors[0] + 0.1 * vectors[1]
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = [int(i) + 1 for i in np.argsort(-(unit @ query))]
+    
+    neighbors = store.nearest(query, k=5, exclude=[expected[0]])
+    
+    assert [job_id for job_id, _ in neighbors] == expected[1:6]
+    assert neighbors[0][1] >= neighbors[-1][1]
+
+
+def test_index_reloads_and_refreshes_from_db(db_session):
+    """Another process's store loads persisted vectors and picks up new ones."""
+    vectors = _vectors(4)
+    writer = EmbeddingStore()
+    for job_id in (1, 2, 3):
+        writer.store(db_session, JOB, job_id, vectors[job_id])
+    db_session.commit()
+    
+    reader = EmbeddingStore()
+    reader.refresh(db_session)
+    assert reader.size == 3
+    
+    writer.store(db_session, JOB, 1, vectors[0])  # Re-embedded: replaces the row
+    db_session.commit()
+    reader.refresh(db_session)
+    
+    assert reader.size == 3
+    assert reader.nearest(vectors[0], k=1)[0][0] == 1
+
+
+def test_similar_and_resume_match_endpoints(session_factory, monkeypatch, api_client):
+    """The API returns visible neighbors ordered by similarity."""
+    from api import routes
+    
+    store = EmbeddingStore()
+    monkeypatch.setattr(routes, "embedding_store", store)
+    db = session_factory()
+    jobs = _add_jobs(db, 4)
+    jobs[3].canonical_job_id = jobs[0].id  # Duplicates are hidden
+    db.add(Resume(content="Python engineer"))
+    vectors = _vectors(4)
+    for job, vector in zip(jobs, vectors):
+        store.store(db, JOB, job.id, vector)
+    db.commit()
+    
+    monkeypatch.setattr("services.embeddings.generate_embedding", lambda text, use_openai=False: vectors[2].tolist())
+    
+    similar = api_client.get(f"/api/jobs/{jobs[0].id}/similar", params={"limit": 5}).json()
+    matches = api_client.get("/api/resume/matches", params={"limit": 1}).json()
+    missing = api_client.get("/api/jobs/999/similar")
+    db.close()
+    
+    assert {item["job"]["job_id"] for item in similar} == {"j1", "j2"}
+    assert similar[0]["similarity"] >= similar[1]["similarity"]
+    assert matches[0]["job"]["job_id"] == "j2"
+    assert matches[0]["similarity"] == pytest.approx(1.0, abs=0.01)
+    assert missing.status_code == 404
@@ -0,0 +1,96 @@
+"""Tests for the micro-batching embedding service and its disk cache."""
+import threading
+import numpy as np
+import pytest
+from services.embeddings import EmbeddingCache, EmbeddingService
+
+
+class FakeEncoder:
+    """Deterministic encoder recording the batches it receives."""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return np.array([[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts], dtype=np.float32)
+
+
+def _expected(text):
+    return np.array([len(text), sum(map(ord, text)) % 97, 1.0], dtype=np.float32)
+
+
+def test_concurrent_requests_share_a_batch():
+    """Requests arriving within the wait window go through one forward pass."""
+    encoder = FakeEncoder()
+    service = EmbeddingService("fake", encoder, "fake-model", max_batch_size=64, max_wait_ms=200)
+    texts = [f"text number {i}" for i in range(8)]
+    results = {}
+    barrier = threading.Barrier(len(texts))
+    
+    def call(text):
+        barrier.wait()
+        results[text] = service.embed([text])
+    
+    threads = [threading.Thread(target=call, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(encoder.batches) < len(texts)
+    assert sum(len(batch) for batch in encoder.batches) == len(texts)
+    for text in texts:
+        assert np.array_equal(results[text][0], _expected(text))
+    assert service.report()["requests"] == len(texts)
+
+
+def test_batches_respect_max_size_and_dedupe():
+    """Repeated texts are encoded once and batches never exceed the maximum."""
+    encoder = FakeEncoder()
+    service = EmbeddingService("fake", encoder, "fake-model", max_batch_size=3, max_wait_ms=0)
+    
+    vectors = service.embed(["a", "b", "a", "c", "d", "b"])
+    
+    assert vectors.shape == (6, 3)
+    assert np.array_equal(vectors[0], vectors[2])
+    assert [len(batch) for batch in encoder.batches] == [3, 1]
+    report = service.report()
+    assert report["encoded"] == 4
+    assert report["texts_per_second"] is not None
+
+
+def test_disk_cache_is_keyed_by_model(tmp_path):
+    """Cached vectors are reused across services of the same model only."""
+    path = tmp_path / "embeddings.sqlite"
+    first = FakeEncoder()
+    EmbeddingService("fake", first, "model-a", cache=EmbeddingCache(str(path)), max_wait_ms=0).embed(["hello", "world"])
+    
+    again = FakeEncoder()
+    service = EmbeddingService("fake", again, "model-a", cache=EmbeddingCache(str(path)), max_wait_ms=0)
+    vectors = service.embed(["world", "new"])
+    
+    assert again.batches == [["new"]]
+    assert np.array_equal(vectors[0], _expected("world"))
+    assert service.report()["cache_hits"] == 1
+    
+    other_model = FakeEncoder()
+    EmbeddingService("fake", other_model, "model-b", cache=EmbeddingCache(str(path)), max_wait_ms=0).embed(["hello"])
+    assert other_model.batches == [["hello"]]
+
+
+def test_encoder_errors_reach_the_caller():
+    """A failed forward pass raises in every waiting caller, and the service keeps running."""
+    calls = []
+    
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError("model crashed")
+        return np.ones((len(texts), 2), dtype=np.float32)
+    
+    service = EmbeddingService("fake", flaky, "fake-model", max_wait_ms=0)
+    
+    with pytest.raises(RuntimeError, match="model crashed"):
+        service.embed(["a"])
+    assert service.embed(["a"]).shape == (1, 2)
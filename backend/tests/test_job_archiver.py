@@ -0,0 +1,118 @@
+"""Tests for retention archiving and the archive read path."""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from config import get_settings
+from database import Base
+from models import ArchivedJobKey, Job, JobLabel, JobSignature, JobStatus
+from services.job_archiver import JobArchiver
+from services.job_normalizer import NormalizedJob
+from services.job_queue import JobQueue
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def _ago(days):
+    return NOW - timedelta(days=days)
+
+
+@pytest.fixture
+def archiver(tmp_path):
+    return JobArchiver(archive_dir=str(tmp_path), archive_format="ndjson")
+
+
+def test_retention_moves_old_jobs_to_partitions(db_session, archiver, make_job):
+    """Old and stale least-fit jobs (with their duplicates) leave the hot table."""
+    old = make_job(db_session, "old", created_at=_ago(120))
+    make_job(db_session, "old-dup", created_at=_ago(1), canonical_job_id=old.id)
+    make_job(db_session, "stale-least", created_at=_ago(40), label=JobLabel.LEAST_FIT)
+    make_job(db_session, "recent", created_at=_ago(5), label=JobLabel.BEST_FIT)
+    make_job(db_session, "old-pending", created_at=_ago(120), label=None, status=JobStatus.PENDING)
+    db_session.add(JobSignature(job_id=old.id, company_key="initech", signature=b"\0" * 8))
+    db_session.commit()
+    
+    stats = archiver.run(db_session, now=NOW)
+    
+    assert stats["archived"] == 3
+    assert sorted(job.job_id for job in db_session.query(Job)) == ["old-pending", "recent"]
+    assert db_session.query(JobSignature).count() == 0
+    assert {path.parent.name for path in archiver.files()} == {
+        f"date={(NOW - timedelta(days=120)).date()}",
+        f"date={(NOW - timedelta(days=40)).date()}",
+        f"date={(NOW - timedelta(days=1)).date()}",
+    }
+    assert db_session.query(ArchivedJobKey).count() == 3
+
+
+def test_archived_jobs_are_not_fetched_again(db_session, archiver, make_job):
+    """Archived URLs stay dedupe keys for the queue."""
+    make_job(db_session, "old", created_at=_ago(120))
+    archiver.run(db_session, now=NOW)
+    
+    fetched = NormalizedJob(
+        job_id="old", title="Engineer old", company="Initech", description="Python and SQL.",
+        location="", type="remote", apply_url="https://jobs.example/old", timestamp_fetched=NOW
+    )
+    
+    assert JobQueue.enqueue(db_session, [fetched]) == 0
+
+
+def test_archive_search_applies_filters(db_session, archiver, make_job):
+    """The read path returns archived canonical jobs matching the filters, best first."""
+    canonical = make_job(db_session, "a", created_at=_ago(120), score=40.0)
+    make_job(db_session, "b", created_at=_ago(120), score=80.0, company="Hooli")
+    make_job(db_session, "c", created_at=_ago(120), score=60.0, canonical_job_id=canonical.id)
+    archiver.run(db_session, now=NOW)
+    
+    assert [job["job_id"] for job in archiver.search()] == ["b", "a"]
+    assert [job["job_id"] for job in archiver.search(company="hoo")] == ["b"]
+    assert archiver.search(search="python", limit=1)[0]["archived"] is True
+    assert archiver.search(label="best") == []
+
+
+def test_jobs_endpoint_merges_archives(session_factory, archiver, monkeypatch, api_client, make_job):
+    """include_archived merges archived jobs into the score-ordered listing."""
+    from api import routes
+    
+    db = session_factory()
+    make_job(db, "archived", created_at=_ago(120), score=90.0)
+    archiver.run(db, now=NOW)
+    make_job(db, "hot", created_at=_ago(1), score=70.0)
+    db.close()
+    monkeypatch.setattr(routes, "job_archiver", archiver)
+    
+    hot_only = api_client.get("/api/jobs").json()
+    merged = api_client.get("/api/jobs", params={"include_archived": True}).json()
+    
+    assert [job["job_id"] for job in hot_only] == ["hot"]
+    assert [(job["job_id"], job["archived"]) for job in merged] == [("archived", True), ("hot", False)]
+
+
+def test_parquet_archives_round_trip(db_session, tmp_path, make_job):
+    """Parquet archives (zstd) read back like NDJSON ones."""
+    pytest.importorskip("pyarrow")
+    archiver = JobArchiver(archive_dir=str(tmp_path), archive_format="parquet")
+    make_job(db_session, "old", created_at=_ago(120), keywords_matched=["python"])
+    
+    archiver.run(db_session, now=NOW)
+    
+    assert archiver.files()[0].suffix == ".parquet"
+    assert archiver.search()[0]["keywords_matched"] == ["python"]
+
+
+def test_compaction_skips_a_locked_database(tmp_path, monkeypatch, caplog):
+    """VACUUM is opt-in, and a database locked by another writer is left for the next run."""
+    monkeypatch.setattr(get_settings(), "retention_vacuum", True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"timeout": 0.1})
+    Base.metadata.create_all(bind=engine)
+    
+    with engine.connect() as writer:
+        writer.exec_driver_sql("BEGIN IMMEDIATE")
+        db = Session(bind=engine)
+        JobArchiver.compact(db)  # Must not raise
+        db.close()
+        writer.exec_driver_sql("ROLLBACK")
+    engine.dispose()
+    
+    assert "database is busy" in caplog.text
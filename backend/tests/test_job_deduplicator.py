@@ -0,0 +1,128 @@
+"""Tests for near-duplicate job detection."""
+from models import Job, JobStatus, JobLabel, JobSignature
+from services.job_deduplicator import JobDeduplicator
+
+
+DESCRIPTION = (
+    "We are looking for a backend engineer to build scalable Python services. "
+    "You will design REST APIs, own PostgreSQL schemas, and run services on "
+    "Kubernetes. Requirements: 5+ years of Python, experience with FastAPI or "
+    "Django, strong SQL skills, and a track record of shipping production systems."
+)
+
+
+def _job(**overrides):
+    job = {
+        "title": "Senior Backend Engineer",
+        "company": "Acme Inc.",
+        "description": DESCRIPTION,
+    }
+    job.update(overrides)
+    return job
+
+
+def _store(db, dedup, job_data, score=88.0):
+    job = Job(
+        job_id="ext-1",
+        title=job_data["title"],
+        company=job_data["company"],
+        description=job_data["description"],
+        apply_url="https://indeed.example/1",
+        status=JobStatus.CLASSIFIED,
+        score=score,
+        label=JobLabel.BEST_FIT,
+        keywords_matched=["python"],
+        llm_reasoning="Strong match",
+    )
+    db.add(job)
+    db.flush()
+    dedup.add(db, job, dedup.signature(job_data))
+    db.commit()
+    return job
+
+
+def test_signature_is_deterministic():
+    """Signatures must be stable so persisted ones stay comparable."""
+    a = JobDeduplicator().signature(_job())
+    b = JobDeduplicator().signature(_job())
+    assert a is not None
+    assert len(a) == 128
+    assert (a == b).all()
+
+
+def test_cross_post_detected(db_session):
+    """A reposted job from another source links to the stored canonical job."""
+    dedup = JobDeduplicator()
+    dedup.load(db_session)
+    canonical = _store(db_session, dedup, _job())
+    
+    repost = _job(
+        company="ACME",
+        description=DESCRIPTION + " Apply on LinkedIn today.",
+    )
+    match = dedup.find_duplicate(repost)
+    
+    assert match is not None
+    assert match["job_id"] == canonical.id
+    assert match["similarity"] >= dedup.threshold
+    assert "score" not in match  # Read from the database, never cached before scoring
+
+
+def test_pipeline_copies_the_score_once_the_canonical_is_scored(monkeypatch, session_factory):
+    """Duplicates of a job still waiting to be scored are scored themselves."""
+    from pipeline import langgraph_pipeline
+    
+    db = session_factory()
+    dedup = JobDeduplicator()
+    dedup.load(db)
+    canonical = _store(db, dedup, _job())
+    canonical.status, canonical.score = JobStatus.NORMALIZED, None
+    db.commit()
+    monkeypatch.setattr(langgraph_pipeline, "deduplicator", dedup)
+    monkeypatch.setattr(langgraph_pipeline, "SessionLocal", session_factory)
+    state = {"normalized_job": _job(company="ACME"), "job_id": "ext-2"}
+    
+    assert "duplicate_of" not in langgraph_pipeline.dedupe_job(state)
+    
+    canonical.status, canonical.score = JobStatus.CLASSIFIED, 88.0
+    db.commit()
+    update = langgraph_pipeline.dedupe_job(state)
+    assert update["duplicate_of"] == canonical.id and update["score"] == 88.0
+    assert update["score_details"]["matched_keywords"] == ["python"]
+    db.close()
+
+
+def test_different_company_is_not_duplicate(db_session):
+    """Same template text at a different company is a different job."""
+    dedup = JobDeduplicator()
+    dedup.load(db_session)
+    _store(db_session, dedup, _job())
+    
+    assert dedup.find_duplicate(_job(company="Globex")) is None
+
+
+def test_unrelated_job_is_not_duplicate(db_session):
+    """Unrelated descriptions do not collapse."""
+    dedup = JobDeduplicator()
+    dedup.load(db_session)
+    _store(db_session, dedup, _job())
+    
+    other = _job(
+        title="Data Analyst",
+        description="Analyze marketing funnels in Excel and Tableau, present weekly reports to stakeholders.",
+    )
+    assert dedup.find_duplicate(other) is None
+
+
+def test_index_reloads_from_database(db_session):
+    """Persisted signatures rebuild the index in a fresh process."""
+    dedup = JobDeduplicator()
+    dedup.load(db_session)
+    canonical = _store(db_session, dedup, _job())
+    assert db_session.query(JobSignature).count() == 1
+    
+    fresh = JobDeduplicator()
+    fresh.load(db_session)
+    
+    assert fresh.size == 1
+    assert fresh.find_duplicate(_job())["job_id"] == canonical.id
@@ -0,0 +1,102 @@
+"""Tests for the streaming job export."""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+import pytest
+from models import JobLabel, JobStatus
+from services.job_archiver import JobArchiver
+from services.job_exporter import EXPORT_FIELDS, JobExporter
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def _export(db, fmt, batch_rows=2, **filters):
+    from api.routes import _job_filters
+    exporter = JobExporter(db.get_bind(), batch_rows=batch_rows)
+    statement = exporter.statement(_job_filters(
+        filters.get("label"), filters.get("company"), filters.get("remote_only", False), filters.get("search")
+    ))
+    return list(exporter.stream(statement, fmt))
+
+
+def test_ndjson_streams_one_chunk_per_batch(db_session, make_job):
+    """Rows arrive in cursor-sized chunks as JSON lines, enums and timestamps as strings."""
+    for key in "abcde":
+        make_job(db_session, key, created_at=NOW)
+    
+    chunks = _export(db_session, "ndjson", batch_rows=2)
+    rows = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+    
+    assert len(chunks) == 3
+    assert [row["job_id"] for row in rows] == list("abcde")
+    assert rows[0]["label"] == "mid" and rows[0]["status"] == "classified"
+    assert rows[0]["keywords_matched"] == ["python"]
+    assert rows[0]["created_at"] == NOW.isoformat()
+    assert rows[0]["archived"] is False
+
+
+def test_export_applies_job_list_filters(db_session, make_job):
+    """Filters match /api/jobs: duplicates, unclassified jobs and non-matches are left out."""
+    canonical = make_job(db_session, "a", company="Hooli")
+    make_job(db_session, "b", canonical_job_id=canonical.id, company="Hooli")
+    make_job(db_session, "c", label=None, status=JobStatus.PENDING, company="Hooli")
+    make_job(db_session, "d", label=JobLabel.BEST_FIT)
+    
+    hooli = _export(db_session, "ndjson", company="hoo")
+    best = _export(db_session, "ndjson", label=JobLabel.BEST_FIT)
+    
+    assert [json.loads(line)["job_id"] for line in b"".join(hooli).decode().splitlines()] == ["a"]
+    assert [json.loads(line)["job_id"] for line in b"".join(best).decode().splitlines()] == ["d"]
+
+
+def test_csv_has_header_and_json_lists(db_session, make_job):
+    """CSV carries a header row; list columns are JSON-encoded."""
+    make_job(db_session, "a", llm_reasoning='Says "yes", twice')
+    
+    rows = list(csv.DictReader(io.StringIO(b"".join(_export(db_session, "csv")).decode())))
+    
+    assert list(rows[0]) == EXPORT_FIELDS + ["archived"]
+    assert rows[0]["keywords_matched"] == '["python"]'
+    assert rows[0]["llm_reasoning"] == 'Says "yes", twice'
+    assert rows[0]["classified_at"] == ""
+
+
+def test_empty_csv_export_is_just_the_header(db_session):
+    rows = b"".join(_export(db_session, "csv")).decode().splitlines()
+    
+    assert rows == [",".join(EXPORT_FIELDS + ["archived"])]
+
+
+def test_parquet_writes_a_row_group_per_batch(db_session, make_job):
+    pq = pytest.importorskip("pyarrow.parquet")
+    for key in "abcde":
+        make_job(db_session, key)
+    
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(_export(db_session, "parquet", batch_rows=2))))
+    
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().column("job_id").to_pylist() == list("abcde")
+
+
+def test_export_endpoint_appends_archived_jobs(session_factory, tmp_path, monkeypatch, api_client, make_job):
+    """include_archived streams archived jobs after the hot ones."""
+    from api import routes
+    
+    archiver = JobArchiver(archive_dir=str(tmp_path), archive_format="ndjson")
+    db = session_factory()
+    make_job(db, "archived", created_at=NOW - timedelta(days=120))
+    archiver.run(db, now=NOW)
+    make_job(db, "hot")
+    db.close()
+    monkeypatch.setattr(routes, "job_archiver", archiver)
+    
+    response = api_client.get("/api/jobs/export", params={"include_archived": True})
+    bad_format = api_client.get("/api/jobs/export", params={"format": "xlsx"})
+    
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "attachment" in response.headers["content-disposition"]
+    assert [(row["job_id"], row["archived"]) for row in rows] == [("hot", False), ("archived", True)]
+    assert rows[1]["created_at"] == (NOW - timedelta(days=120)).isoformat()
+    assert bad_format.status_code == 400
@@ -45,3 +45,57 @@ def test_no_internal_type_detection_anymore():
     """Ensure internal type detection helper is removed."""
     fetcher = JobFetcher()
     assert not hasattr(fetcher, '_normalize_job')
+
+
+@pytest.mark.asyncio
+async def test_fetch_jobs_frame_returns_dataframe(monkeypatch):
+    """The frame fetch hands JobSpy's DataFrame straight to the pipeline."""
+    import pandas as pd
+    fetcher = JobFetcher()
+    
+    def fake_scrape_jobs(**kwargs):
+        return pd.DataFrame([
+            {'site': 'indeed', 'id': '1', 'title': 'A', 'company': 'C', 'job_url': 'u1'},
+        ])
+    
+    monkeypatch.setattr('services.job_fetcher.scrape_jobs', fake_scrape_jobs)
+    
+    frame = await fetcher.fetch_jobs_frame(sources=['indeed'])
+    
+    assert isinstance(frame, pd.DataFrame)
+    assert list(frame['job_url']) == ['u1']
+
+
+@pytest.mark.asyncio
+async def test_fetch_jobs_frame_scrapes_sources_separately(monkeypatch):
+    """Each source is scraped on its own, so one failing site doesn't sink the rest."""
+    import pandas as pd
+    fetcher = JobFetcher()
+    
+    def fake_scrape_jobs(**kwargs):
+        site = kwargs['site_name'][0]
+        if site == 'linkedin':
+            raise RuntimeError("rate limited")
+        return pd.DataFrame([{'site': site, 'id': site, 'title': 'A', 'company': 'C', 'job_url': f'u-{site}'}])
+    
+    monkeypatch.setattr('services.job_fetcher.scrape_jobs', fake_scrape_jobs)
+    
+    frame = await fetcher.fetch_jobs_frame(sources=['indeed', 'linkedin', 'glassdoor'])
+    
+    assert sorted(frame['job_url']) == ['u-glassdoor', 'u-indeed']
+    assert list(frame.index) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_fetch_jobs_frame_empty_on_error(monkeypatch):
+    """Scrape failures yield an empty frame rather than raising."""
+    fetcher = JobFetcher()
+    
+    def failing_scrape_jobs(**kwargs):
+        raise RuntimeError("blocked")
+    
+    monkeypatch.setattr('services.job_fetcher.scrape_jobs', failing_scrape_jobs)
+    
+    frame = await fetcher.fetch_jobs_frame()
+    
+    assert frame.empty
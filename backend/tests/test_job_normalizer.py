@@ -1,5 +1,6 @@
 """Tests for job normalizer service."""
 import pytest
+from models import BoilerplateParagraph
 from services.job_normalizer import JobNormalizer
 from datetime import datetime
 
@@ -63,3 +64,152 @@ def test_batch_normalize():
     
     assert len(normalized_jobs) == 3
     assert all(job["job_id"] for job in normalized_jobs)
+
+
+def test_compress_description_drops_boilerplate_sections():
+    """Benefits/EEO sections are stripped and markdown noise collapsed."""
+    description = (
+        "**Responsibilities**\n\n"
+        "* Build \\- and operate [FastAPI](https://fastapi.tiangolo.com) services\n\n"
+        "**Benefits**\n\n"
+        "Unlimited PTO, free lunch, and a generous 401k match for every employee.\n\n"
+        "**Requirements**\n\n"
+        "* 5+ years of Python"
+    )
+    
+    compressed = JobNormalizer.compress_description(description)
+    
+    assert "Build - and operate FastAPI services" in compressed
+    assert "5+ years of Python" in compressed
+    assert "401k" not in compressed
+    assert "**" not in compressed
+    assert "https://" not in compressed
+
+
+def test_compress_description_drops_only_until_the_next_heading():
+    """A dropped section ends at any heading, not just at a requirements one."""
+    description = (
+        "## Benefits\n\n"
+        "Dental, vision and a yearly learning stipend for everyone.\n\n"
+        "## Our Stack\n\n"
+        "Postgres, Kafka and Go services on Kubernetes.\n\n"
+        "## Perks\n\n"
+        "- Free snacks"
+    )
+    
+    compressed = JobNormalizer.compress_description(description)
+    
+    assert "Postgres, Kafka and Go services on Kubernetes." in compressed
+    assert "stipend" not in compressed
+    assert "snacks" not in compressed
+
+
+def test_compress_description_strips_learned_boilerplate(monkeypatch):
+    """Paragraphs learned as recurring boilerplate are removed."""
+    boilerplate = "Acme is a global leader in widgets, serving customers in over forty countries worldwide."
+    monkeypatch.setattr(
+        JobNormalizer, "_boilerplate_hashes", {JobNormalizer.paragraph_hash(boilerplate.upper())}
+    )
+    
+    compressed = JobNormalizer.compress_description(f"{boilerplate}\n\nWe need a Go engineer.")
+    
+    assert compressed == "We need a Go engineer."
+
+
+def test_compress_description_prefers_requirements_within_budget():
+    """When over budget, requirement sections win over generic paragraphs."""
+    filler = "\n\n".join(f"Our culture paragraph number {i} talks about values." for i in range(50))
+    description = f"{filler}\n\nRequirements\n\nKubernetes and Terraform expertise."
+    
+    compressed = JobNormalizer.compress_description(description, max_tokens=40)
+    
+    assert "Kubernetes and Terraform expertise." in compressed
+
+
+def test_record_paragraphs_and_load_boilerplate(db_session, monkeypatch):
+    """Paragraph frequencies in the DB drive the boilerplate set."""
+    monkeypatch.setattr(JobNormalizer, "_boilerplate_hashes", set())
+    paragraph = "We are an equal opportunity employer and value diversity at our company in every office."
+    
+    for _ in range(5):
+        JobNormalizer.record_paragraphs(db_session, f"Unique intro\n\n{paragraph}")
+        db_session.commit()
+    
+    assert JobNormalizer.load_boilerplate(db_session) == 1
+    assert JobNormalizer.paragraph_hash(paragraph) in JobNormalizer._boilerplate_hashes
+
+
+def test_record_paragraphs_counts_repeats_within_one_transaction(db_session):
+    """A worker batch records many postings before committing once (regression: duplicate inserts)."""
+    paragraph = "We are an equal opportunity employer and value diversity at our company in every office."
+    
+    for _ in range(3):
+        JobNormalizer.record_paragraphs(db_session, paragraph)
+    db_session.commit()
+    
+    row = db_session.get(BoilerplateParagraph, JobNormalizer.paragraph_hash(paragraph))
+    assert row.job_count == 3
+
+
+def test_compress_resume_is_cached_per_hash(monkeypatch):
+    """Resume compression is computed once per resume content."""
+    monkeypatch.setattr(JobNormalizer, "_resume_cache", {})
+    resume = "**Jane Doe**\n\nPython engineer with ten years of backend experience."
+    
+    first = JobNormalizer.compress_resume(resume)
+    second = JobNormalizer.compress_resume(resume)
+    
+    assert first == "Jane Doe\n\nPython engineer with ten years of backend experience."
+    assert first is second
+    assert len(JobNormalizer._resume_cache) == 1
+
+
+def test_normalize_frame_coalesces_jobspy_columns():
+    """JobSpy DataFrame columns map onto the schema without NaN leaking through."""
+    import pandas as pd
+    from datetime import date
+    
+    df = pd.DataFrame([
+        {
+            "id": "in-1", "site": "indeed", "title": "Backend Engineer", "company": "Acme",
+            "description": "Build APIs", "location": "Austin, TX", "job_type": "fulltime",
+            "is_remote": True, "job_url": "https://indeed.example/1", "date_posted": date(2024, 5, 1),
+        },
+        {
+            "id": "li-2", "site": "linkedin", "title": "Platform Engineer", "company": float("nan"),
+            "description": float("nan"), "location": None, "work_type": "Hybrid",
+            "is_remote": False, "job_url": "https://linkedin.example/2", "date_posted": None,
+        },
+        {
+            "id": None, "title": "No id", "company": "X", "description": "dropped",
+            "is_remote": False, "job_url": "https://x.example/3", "date_posted": None,
+        },
+    ])
+    
+    jobs = JobNormalizer.normalize_frame(df)
+    
+    assert len(jobs) == 3
+    first, second, missing = jobs
+    assert missing is None
+    
+    assert first["job_id"] == "in-1"
+    assert first["type"] == "remote"
+    assert first["apply_url"] == "https://indeed.example/1"
+    assert abs(datetime.now() - first["timestamp_fetched"]).total_seconds() < 60  # Fetch time, not date_posted
+    
+    assert second["company"] == "Unknown Company"
+    assert second["description"] == ""
+    assert second["location"] == ""
+    assert second["type"] == "hybrid"
+    assert isinstance(second["timestamp_fetched"], datetime)
+
+
+def test_normalized_job_is_compact_mapping():
+    """NormalizedJob uses __slots__ but still reads like a dict."""
+    job = JobNormalizer.normalize({"id": "1", "title": "Dev", "description": "Python", "job_url": "u"})
+    
+    assert not hasattr(job, "__dict__")
+    assert job.get("apply_url") == "u"
+    assert job.get("missing", "default") == "default"
+    assert job.to_dict()["title"] == "Dev"
+    assert "compressed_description" in job
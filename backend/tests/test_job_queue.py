@@ -0,0 +1,177 @@
+"""Tests for the DB-backed job queue and the pipeline worker."""
+from datetime import datetime, timedelta
+import pytest
+from models import BoilerplateParagraph, Job, Resume, JobStatus, JobLabel
+from services.job_deduplicator import JobDeduplicator
+from services.job_normalizer import JobNormalizer, NormalizedJob
+from services.job_queue import JobQueue
+from services.job_scorer import JobScorer
+from worker import PipelineWorker
+
+
+DESCRIPTION = (
+    "Build data pipelines in Python and SQL. Own our Airflow deployment, "
+    "model warehouse tables in dbt, and partner with analysts on reporting. "
+    "Requirements: 3+ years of Python, strong SQL, and Airflow experience."
+)
+
+
+def _job(job_id, **overrides):
+    fields = {
+        "job_id": job_id,
+        "title": "Data Engineer",
+        "company": "Initech",
+        "description": DESCRIPTION,
+        "location": "Remote",
+        "type": "remote",
+        "apply_url": f"https://jobs.example/{job_id}",
+        "timestamp_fetched": datetime(2024, 1, 1),
+    }
+    fields.update(overrides)
+    return NormalizedJob(**fields)
+
+
+@pytest.fixture
+def scored_calls(monkeypatch):
+    """Replace the LLM scorer with a deterministic stub that records calls."""
+    calls = []
+    
+    def fake_score_job(job_data, resume_data):
+        calls.append(job_data["job_id"])
+        if job_data["title"] == "Explodes":
+            raise RuntimeError("LLM timeout")
+        return 90.0, {"score": 90.0, "llm_reasoning": "stub", "matched_keywords": ["python"]}
+    
+    monkeypatch.setattr(JobScorer, "score_job", staticmethod(fake_score_job))
+    return calls
+
+
+@pytest.fixture
+def worker(session_factory):
+    """Worker over the test database with a private dedupe index and a resume on file."""
+    db = session_factory()
+    db.add(Resume(content="Data engineer with Python, SQL, Airflow and dbt experience."))
+    db.commit()
+    db.close()
+    return PipelineWorker(session_factory=session_factory, deduplicator=JobDeduplicator())
+
+
+def test_enqueue_skips_stored_and_repeated_urls(db_session):
+    """Only URLs not already stored (or repeated in the batch) are queued."""
+    assert JobQueue.enqueue(db_session, [_job("a"), _job("b"), None]) == 2
+    
+    queued = JobQueue.enqueue(db_session, [_job("a"), _job("c"), _job("c2", apply_url="https://jobs.example/c")])
+    
+    assert queued == 1
+    assert db_session.query(Job).count() == 3
+    assert {job.status for job in db_session.query(Job)} == {JobStatus.PENDING}
+
+
+def test_lease_is_exclusive_until_expiry(db_session):
+    """A leased job is invisible to other workers until its lease expires."""
+    JobQueue.enqueue(db_session, [_job("a"), _job("b")])
+    
+    first = JobQueue("w1").lease(db_session, batch_size=1)
+    second = JobQueue("w2").lease(db_session, batch_size=10)
+    
+    assert [job.job_id for job in first] == ["a"]
+    assert [job.job_id for job in second] == ["b"]
+    assert JobQueue("w3").lease(db_session) == []
+    
+    # Worker 1 crashed - its lease runs out and the job is picked up again
+    first[0].lease_expires_at = datetime.now() - timedelta(seconds=1)
+    db_session.commit()
+    
+    released = JobQueue("w3").lease(db_session)
+    assert [job.job_id for job in released] == ["a"]
+    assert released[0].lease_owner.startswith("w3/")
+
+
+def test_worker_advances_jobs_to_classified(session_factory, worker, scored_calls):
+    """A drained queue leaves every job CLASSIFIED, unleased and timestamped."""
+    db = session_factory()
+    JobQueue.enqueue(db, [_job("a"), _job("b", company="Hooli", description="Design chips. " * 20)])
+    db.close()
+    
+    stats = worker.drain()
+    
+    assert stats["classified"] == 2
+    assert sorted(scored_calls) == ["a", "b"]
+    
+    db = session_factory()
+    jobs = db.query(Job).order_by(Job.id).all()
+    assert {job.status for job in jobs} == {JobStatus.CLASSIFIED}
+    assert all(job.label == JobLabel.BEST_FIT and job.lease_owner is None for job in jobs)
+    assert all(job.classified_at is not None for job in jobs)
+    db.close()
+
+
+def test_worker_copies_score_to_duplicates(session_factory, worker, scored_calls):
+    """Near-duplicates are linked to their canonical job and never scored themselves."""
+    db = session_factory()
+    JobQueue.enqueue(db, [_job("a"), _job("b", company="Initech, Inc.")])
+    db.close()
+    
+    worker.drain()
+    
+    assert scored_calls == ["a"]
+    db = session_factory()
+    canonical, duplicate = db.query(Job).order_by(Job.id).all()
+    assert duplicate.canonical_job_id == canonical.id
+    assert duplicate.status == JobStatus.CLASSIFIED
+    assert duplicate.score == canonical.score == 90.0
+    db.close()
+
+
+def test_worker_loads_learned_boilerplate(session_factory, worker, monkeypatch):
+    """Standalone workers strip the boilerplate learned by other processes."""
+    boilerplate = "Initech is a global leader in data platforms, serving customers in over forty countries."
+    monkeypatch.setattr(JobNormalizer, "_boilerplate_hashes", set())
+    compressed = []
+    monkeypatch.setattr(JobScorer, "score_job", staticmethod(
+        lambda job_data, resume_data: compressed.append(job_data["compressed_description"]) or (90.0, {})
+    ))
+    db = session_factory()
+    db.add(BoilerplateParagraph(paragraph_hash=JobNormalizer.paragraph_hash(boilerplate), job_count=50))
+    JobQueue.enqueue(db, [_job("a", description=f"{boilerplate}\n\n{DESCRIPTION}")])
+    db.close()
+    
+    worker.drain()
+    
+    assert len(compressed) == 1
+    assert "forty countries" not in compressed[0] and "Airflow" in compressed[0]
+
+
+def test_failed_job_retries_from_its_stage(session_factory, worker, scored_calls):
+    """A scoring failure is retried after backoff without redoing earlier stages."""
+    db = session_factory()
+    JobQueue.enqueue(db, [_job("x", title="Explodes")])
+    db.close()
+    
+    stats = worker.drain()
+    
+    assert stats["failed"] == 1
+    db = session_factory()
+    job = db.query(Job).one()
+    assert job.status == JobStatus.FAILED
+    assert job.failed_status == JobStatus.NORMALIZED
+    assert job.attempts == 1
+    assert "LLM timeout" in job.last_error
+    
+    # Still backing off - nothing to lease
+    assert worker.drain() == {}
+    
+    job.title = "Fixed"
+    job.lease_expires_at = datetime.now() - timedelta(seconds=1)
+    db.commit()
+    db.close()
+    
+    stats = worker.drain()
+    
+    assert stats["classified"] == 1
+    assert stats["normalized"] == 0
+    db = session_factory()
+    job = db.query(Job).one()
+    assert job.status == JobStatus.CLASSIFIED
+    assert job.failed_status is None
+    db.close()
@@ -0,0 +1,130 @@
+"""Tests for the in-memory job list read model."""
+import random
+from datetime import datetime
+from config import get_settings
+from models import Job, JobLabel, JobStatus
+from services.job_read_model import JobReadModel
+
+LABELS = [JobLabel.BEST_FIT, JobLabel.MID_FIT, JobLabel.LEAST_FIT, None]
+
+
+def _jobs(count, seed=0):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        jobs.append(Job(
+            job_id=f"j{i}",
+            title=f"Job {i}",
+            company=rng.choice(["Initech", "Hooli", "initech labs", "Globex"]),
+            description="d",
+            apply_url=f"https://jobs.example/{i}",
+            type=rng.choice(["remote", "onsite", None]),
+            score=float(rng.randint(0, 10) * 10),  # Plenty of ties
+            label=rng.choice(LABELS),
+            status=rng.choice([JobStatus.CLASSIFIED, JobStatus.CLASSIFIED, JobStatus.SCORED]),
+            timestamp_fetched=datetime(2024, 1, 1)
+        ))
+    jobs[1].canonical_job_id = 1  # A near-duplicate clone stays hidden
+    return jobs
+
+
+def _db_ids(db, label=None, company=None, remote_only=False, offset=0, limit=100):
+    """The list query the model replaces, with ties broken by id."""
+    from api.routes import _job_filters
+    
+    query = db.query(Job.id).filter(*_job_filters(label, company, remote_only, None))
+    return [job_id for (job_id,) in query.order_by(Job.score.desc(), Job.id).offset(offset).limit(limit)]
+
+
+def test_queries_match_the_database(db_session):
+    db_session.add_all(_jobs(300))
+    db_session.commit()
+    model = JobReadModel()
+    model.load(db_session)
+    
+    cases = [
+        {},
+        {"label": JobLabel.BEST_FIT},
+        {"remote_only": True},
+        {"company": "INITECH"},
+        {"company": "nobody"},
+        {"company": "in_tech"},  # LIKE wildcards, as in the database
+        {"company": "h%li"},
+        {"label": JobLabel.MID_FIT, "remote_only": True, "company": "hoo"},
+        {"offset": 7, "limit": 13},
+        {"label": JobLabel.LEAST_FIT, "offset": 20, "limit": 5},
+        {"offset": 1000, "limit": 10},
+    ]
+    for case in cases:
+        assert model.query(**case) == _db_ids(db_session, **case), case
+
+
+def test_refresh_applies_changes(db_session):
+    jobs = _jobs(50)
+    db_session.add_all(jobs)
+    db_session.commit()
+    model = JobReadModel()
+    model.load(db_session)
+    
+    top = model.query(limit=1)[0]
+    demoted = db_session.get(Job, top)
+    demoted.score = -1.0
+    hidden = db_session.get(Job, model.query(limit=2)[1])
+    hidden.status = JobStatus.FAILED
+    added = Job(job_id="new", title="New", company="Umbrella", description="d", apply_url="https://jobs.example/new",
+                score=1000.0, status=JobStatus.CLASSIFIED)
+    db_session.add(added)
+    db_session.commit()
+    
+    model.refresh(db_session)
+    
+    ids = model.query(limit=500)
+    assert ids[0] == added.id and ids[-1] == demoted.id
+    assert hidden.id not in ids
+    assert model.query(company="umbrella") == [added.id]
+    assert ids == _db_ids(db_session, limit=500)
+
+
+def test_refresh_reloads_after_deletes_elsewhere(db_session):
+    """Rows deleted by another process (retention) leave no updated_at to catch up with."""
+    db_session.add_all(_jobs(50))
+    db_session.commit()
+    model = JobReadModel()
+    model.load(db_session)
+    
+    archived = model.query(limit=3)
+    db_session.query(Job).filter(Job.id.in_(archived)).delete(synchronize_session=False)
+    db_session.commit()
+    model.refresh(db_session)
+    
+    assert not set(archived) & set(model.query(limit=500))
+    assert model.query(limit=500) == _db_ids(db_session, limit=500)
+
+
+def test_job_list_api_uses_the_model(session_factory, monkeypatch, api_client):
+    """Pages come from the model; searches still query the database; rows the model hasn't caught up with are dropped."""
+    from services.job_read_model import job_read_model
+    
+    db = session_factory()
+    db.add_all(_jobs(40))
+    db.commit()
+    expected = _db_ids(db, remote_only=True, limit=5)
+    db.close()
+    
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", False)
+    queries = []
+    original = job_read_model.query
+    monkeypatch.setattr(job_read_model, "query", lambda **kwargs: queries.append(kwargs) or original(**kwargs))
+    page = api_client.get("/api/jobs", params={"remote_only": True, "limit": 5}).json()
+    searched = api_client.get("/api/jobs", params={"search": "Job 3"}).json()
+    
+    db = session_factory()
+    db.get(Job, expected[0]).status = JobStatus.FAILED
+    db.commit()
+    db.close()
+    stale = api_client.get("/api/jobs", params={"remote_only": True, "limit": 5}).json()
+    
+    assert [job["id"] for job in page] == expected
+    assert len(queries) == 2
+    assert searched and all("3" in job["title"] for job in searched)
+    assert [job["id"] for job in stale] == expected[1:]
@@ -1,61 +1,66 @@
 """Tests for job scorer service."""
 import pytest
+from benchmarks.fake_openai import FakeOpenAI
+from services import job_scorer
 from services.job_scorer import JobScorer
-from services.embeddings import generate_embedding
 
+RESUME = {
+    "content": "Senior Python developer with React, PostgreSQL and Docker experience building web platforms."
+}
+JOB = {
+    "title": "Python Developer",
+    "description": "Looking for a Python developer with React and PostgreSQL experience. Docker knowledge is a plus.",
+    "company": "Tech Corp"
+}
 
-def test_score_job():
-    """Test job scoring."""
-    job_data = {
-        "title": "Python Developer",
-        "description": "Looking for a Python developer with React and PostgreSQL experience. Docker knowledge is a plus.",
-        "company": "Tech Corp"
-    }
-    
-    resume_data = {
-        "skills": ["python", "react", "postgresql", "docker"],
-        "embedding": generate_embedding("Python developer with React, PostgreSQL, and Docker experience")
-    }
-    
-    score, details = JobScorer.score_job(job_data, resume_data)
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """JobScorer talking to a local fake OpenAI server."""
+    openai = pytest.importorskip("openai")
+    with FakeOpenAI() as server:
+        client = openai.OpenAI(base_url=server.url, api_key="test", max_retries=0)
+        monkeypatch.setattr(job_scorer, "get_client", lambda: client)
+        yield server
+
+
+def test_score_job(fake_openai):
+    """LLM scores come back clamped with reasoning, skills and token usage."""
+    score, details = JobScorer.score_job(JOB, RESUME)
     
     assert 0 <= score <= 100
-    assert "embedding_score" in details
-    assert "keyword_score" in details
-    assert "matched_keywords" in details
-    assert len(details["matched_keywords"]) > 0
-
-
-def test_keyword_match():
-    """Test keyword matching."""
-    job_data = {
-        "title": "Python Developer",
-        "description": "We need Python, Django, and React skills"
-    }
-    
-    resume_skills = ["python", "django", "react", "docker"]
+    assert details["score"] == score
+    assert details["llm_reasoning"]
+    assert "python" in details["matched_keywords"]
+    assert details["usage"]["prompt_tokens"] > 0
+    assert fake_openai.stats["completions"] == 1
+
+
+def test_rate_limited_call_falls_back_to_keywords(fake_openai):
+    """A 429 the client gives up on degrades to the keyword fallback."""
+    fake_openai.rate_limit_ratio = 1.0
     
-    score, matched = JobScorer._calculate_keyword_match(job_data, resume_skills)
+    score, details = JobScorer.score_job(JOB, RESUME)
     
-    assert score > 0
-    assert "python" in matched
-    assert "django" in matched
-    assert "react" in matched
+    assert details["fallback"] is True
+    assert "python" in details["matched_keywords"]
+    assert fake_openai.stats["rate_limited"] == 1
 
 
-def test_batch_scoring():
-    """Test batch job scoring."""
-    jobs = [
-        {"title": "Python Dev", "description": "Python and React"},
-        {"title": "Java Dev", "description": "Java and Spring"},
-    ]
+def test_no_api_key_uses_keyword_fallback(monkeypatch):
+    """Without a client the keyword overlap score is used."""
+    monkeypatch.setattr(job_scorer, "get_client", lambda: None)
     
-    resume_data = {
-        "skills": ["python", "react"],
-        "embedding": generate_embedding("Python and React developer")
-    }
+    score, details = JobScorer.score_job(JOB, RESUME)
     
-    results = JobScorer.batch_score_jobs(jobs, resume_data)
+    assert score > 0
+    assert details["fallback"] is True
+    assert {"python", "react", "postgresql", "docker"} <= set(details["matched_keywords"])
+
+
+def test_short_resume_scores_zero(fake_openai):
+    score, details = JobScorer.score_job(JOB, {"content": "Python"})
     
-    assert len(results) == 2
-    assert all(0 <= result[1] <= 100 for result in results)
+    assert score == 0.0
+    assert details["error"] == "No resume content"
+    assert fake_openai.stats["requests"] == 0
@@ -0,0 +1,105 @@
+"""Tests for the LangGraph processing pipeline."""
+import pytest
+from models import Resume
+from pipeline import JobProcessingPipeline
+from services.job_deduplicator import JobDeduplicator
+from services.job_scorer import JobScorer
+from worker import PipelineWorker
+
+
+DESCRIPTION = (
+    "Build data pipelines in Python and SQL. Own our Airflow deployment, "
+    "model warehouse tables in dbt, and partner with analysts on reporting. "
+    "Requirements: 3+ years of Python, strong SQL, and Airflow experience."
+)
+
+
+def _raw(job_id, **overrides):
+    raw = {
+        "id": job_id,
+        "title": "Data Engineer",
+        "company": "Initech",
+        "description": DESCRIPTION,
+        "apply_url": f"https://jobs.example/{job_id}",
+    }
+    raw.update(overrides)
+    return raw
+
+
+@pytest.fixture
+def scored_calls(monkeypatch):
+    """Replace the LLM scorer with a deterministic stub that records calls."""
+    calls = []
+    
+    def fake_score_job(job_data, resume_data):
+        calls.append(job_data["job_id"])
+        if job_data["title"] == "Explodes":
+            raise RuntimeError("LLM timeout")
+        return 90.0, {"score": 90.0, "llm_reasoning": "stub", "matched_keywords": ["python"]}
+    
+    monkeypatch.setattr(JobScorer, "score_job", staticmethod(fake_score_job))
+    return calls
+
+
+@pytest.fixture
+def pipeline(session_factory):
+    """Pipeline over the test database with a private dedupe index and a resume on file."""
+    db = session_factory()
+    db.add(Resume(content="Data engineer with Python, SQL, Airflow and dbt experience."))
+    db.commit()
+    db.close()
+    worker = PipelineWorker(session_factory=session_factory, deduplicator=JobDeduplicator())
+    return JobProcessingPipeline(session_factory=session_factory, worker=worker)
+
+
+def test_process_batch_preserves_order_and_isolates_errors(pipeline, scored_calls):
+    """A failing job doesn't affect the rest of the batch."""
+    raw_jobs = [
+        _raw("a"),
+        {"title": "No id", "company": "X", "description": "missing id"},
+        _raw("c", title="Explodes", company="Hooli", description="Something else entirely."),
+    ]
+    
+    results = pipeline.process_batch(raw_jobs)
+    
+    assert len(results) == 3
+    assert results[0]["job_id"] == "a"
+    assert results[0]["label"] == "best"
+    assert results[1]["error"] == "Failed to normalize job"
+    assert "LLM timeout" in results[2]["error"]
+
+
+def test_process_batch_scores_in_batch_duplicates_once(pipeline, scored_calls):
+    """Cross-posts within one fetch are scored once and share the score."""
+    results = pipeline.process_batch([_raw("a"), _raw("b", company="Initech, Inc.")])
+    
+    assert scored_calls == ["a"]
+    assert results[1]["duplicate_of"] is not None
+    assert results[1]["score"] == results[0]["score"] == 90.0
+    assert results[1]["label"] == "best"
+
+
+@pytest.mark.asyncio
+async def test_aprocess_batch_matches_sync(pipeline, scored_calls):
+    """The async entry point returns the same per-job results."""
+    results = await pipeline.aprocess_batch([_raw("a")])
+    
+    assert len(results) == 1
+    assert results[0]["score"] == 90.0
+    assert results[0]["label"] == "best"
+
+
+def test_process_batch_accepts_jobspy_dataframe(pipeline, scored_calls):
+    """A raw JobSpy DataFrame is normalized column-wise and processed."""
+    import pandas as pd
+    
+    frame = pd.DataFrame([
+        {"id": "a", "title": "Data Engineer", "company": "Initech", "description": DESCRIPTION, "job_url": "u1"},
+        {"id": "b", "title": "Designer", "company": "Hooli", "description": "Figma and user research.", "job_url": "u2"},
+    ])
+    
+    results = pipeline.process_batch(frame)
+    
+    assert [r["job_id"] for r in results] == ["a", "b"]
+    assert results[0]["normalized_job"]["apply_url"] == "u1"
+    assert sorted(scored_calls) == ["a", "b"]
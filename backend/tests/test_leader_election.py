@@ -0,0 +1,43 @@
+"""Tests for scheduler leader election."""
+from datetime import datetime, timedelta
+from models import SchedulerLease
+from services.leader_election import LeaderElector
+
+
+def test_only_one_process_leads(db_session):
+    """The first process to heartbeat leads; others follow while its lease is live."""
+    a = LeaderElector(owner="a")
+    b = LeaderElector(owner="b")
+    
+    assert a.heartbeat(db_session) is True
+    assert b.heartbeat(db_session) is False
+    assert a.heartbeat(db_session) is True  # renewal
+    assert a.current(db_session)["owner"] == "a"
+
+
+def test_follower_takes_over_expired_lease(db_session):
+    """When the leader stops heartbeating, a follower takes over."""
+    a = LeaderElector(owner="a")
+    b = LeaderElector(owner="b")
+    a.heartbeat(db_session)
+    
+    lease = db_session.get(SchedulerLease, "scheduler")
+    lease.expires_at = datetime.now() - timedelta(seconds=1)
+    db_session.commit()
+    
+    assert b.heartbeat(db_session) is True
+    assert a.heartbeat(db_session) is False
+    assert a.is_leader is False
+
+
+def test_release_hands_over_immediately(db_session):
+    """A leader shutting down releases the lease for the next heartbeat."""
+    a = LeaderElector(owner="a")
+    b = LeaderElector(owner="b")
+    a.heartbeat(db_session)
+    
+    a.release(db_session)
+    
+    assert a.current(db_session) is None
+    assert b.heartbeat(db_session) is True
+
@@ -0,0 +1,85 @@
+"""Tests for logging configuration."""
+import json
+import logging
+import sys
+from config import get_settings
+from utils import logger as logger_module
+from utils.logger import JsonFormatter, SamplingFilter, _QueueHandler, _parse_levels
+
+
+def _record(msg="hello", level=logging.INFO, lineno=10, created=1000.0, **extra):
+    record = logging.LogRecord("test", level, "/app/x.py", lineno, msg, None, None)
+    record.created = created
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_sampling_limits_each_call_site():
+    """Past the burst, INFO records from one call site are dropped until the window rolls."""
+    sampler = SamplingFilter(burst=2, window=60)
+    
+    kept = [sampler.filter(_record(created=1000.0 + i)) for i in range(5)]
+    other_site = sampler.filter(_record(lineno=20, created=1004.0))
+    next_window = _record(created=1061.0)
+    
+    assert kept == [True, True, False, False, False]
+    assert other_site is True
+    assert sampler.filter(next_window) is True
+    assert next_window.suppressed == 3
+
+
+def test_sampling_never_drops_warnings():
+    """Warnings and errors always go through."""
+    sampler = SamplingFilter(burst=1, window=60)
+    
+    assert all(sampler.filter(_record(level=logging.WARNING)) for _ in range(5))
+
+
+def test_json_formatter_includes_extras_and_traceback():
+    """Records become one JSON object with extra fields and the traceback."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("test", logging.ERROR, "/app/x.py", 1, "failed %s", ("job-1",), sys.exc_info())
+    record.run_id = 7
+    
+    prepared = _QueueHandler(None).prepare(record)
+    entry = json.loads(JsonFormatter().format(prepared))
+    
+    assert entry["message"] == "failed job-1"
+    assert entry["level"] == "ERROR"
+    assert entry["run_id"] == 7
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_parse_module_levels():
+    """Per-module overrides are parsed from a comma-separated spec."""
+    assert _parse_levels("apscheduler=warning, services.job_scorer=DEBUG,bad") == {
+        "apscheduler": "WARNING",
+        "services.job_scorer": "DEBUG",
+    }
+
+
+def test_log_file_is_reopened_after_external_rotation(monkeypatch, tmp_path):
+    """Processes share the file and leave rotation to logrotate, picking up the new file once it's moved."""
+    log_file = tmp_path / "app.log"
+    monkeypatch.setattr(get_settings(), "log_file", str(log_file))
+    monkeypatch.setattr(logger_module, "_listener", None)
+    monkeypatch.setattr(logger_module, "_queue_handler", None)
+    root_level = logging.getLogger().level
+    
+    logger_module.configure_logging()
+    try:
+        logging.getLogger("test.rotation").warning("before")
+        logger_module.shutdown_logging()  # Flush
+        log_file.rename(tmp_path / "app.log.1")
+        logger_module._listener.start()
+        logging.getLogger("test.rotation").warning("after")
+    finally:
+        logger_module.shutdown_logging()
+        logging.getLogger().removeHandler(logger_module._queue_handler)
+        logging.getLogger().setLevel(root_level)
+    
+    assert json.loads((tmp_path / "app.log.1").read_text())["message"] == "before"
+    assert json.loads(log_file.read_text())["message"] == "after"
@@ -0,0 +1,77 @@
+"""Tests for Prometheus metrics."""
+import asyncio
+import time
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy.orm import sessionmaker
+from pipeline.langgraph_pipeline import classify_job
+from utils.metrics import NODE_SECONDS, instrument_sessions, monitor_event_loop, timed
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_timed_keeps_function_name():
+    """LangGraph names nodes after their function, so the wrapper must keep it."""
+    @timed(NODE_SECONDS.labels(node="test"))
+    def my_node(state):
+        return {}
+    
+    assert my_node.__name__ == "my_node"
+    before = _sample("jobagent_pipeline_node_seconds_count", {"node": "test"})
+    my_node({})
+    assert _sample("jobagent_pipeline_node_seconds_count", {"node": "test"}) == before + 1
+
+
+def test_pipeline_nodes_are_timed():
+    """Calling a node records one observation under its label."""
+    before = _sample("jobagent_pipeline_node_seconds_count", {"node": "classify"})
+    
+    classify_job({"score": 80.0, "job_id": "x", "error": ""})
+    
+    assert _sample("jobagent_pipeline_node_seconds_count", {"node": "classify"}) == before + 1
+
+
+def test_commits_are_timed(session_factory):
+    """Instrumented session factories observe commit latency."""
+    factory = sessionmaker(bind=session_factory.kw["bind"])
+    instrument_sessions(factory)
+    before = _sample("jobagent_db_commit_seconds_count")
+    
+    session = factory()
+    session.commit()
+    session.close()
+    
+    assert _sample("jobagent_db_commit_seconds_count") == before + 1
+
+
+def test_metrics_endpoint_serves_text_format():
+    """/metrics exposes the registry in the Prometheus text format."""
+    from main import app
+    
+    response = TestClient(app).get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "jobagent_pipeline_node_seconds_bucket" in response.text
+    assert "jobagent_websocket_clients" in response.text
+
+
+def test_event_loop_lag_is_observed():
+    """A callback that blocks the loop shows up as lag."""
+    async def scenario():
+        monitor = asyncio.create_task(monitor_event_loop(0.01))
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # Block the loop
+        await asyncio.sleep(0.03)
+        monitor.cancel()
+    
+    before_count = _sample("jobagent_event_loop_lag_seconds_count")
+    before_slow = _sample("jobagent_event_loop_lag_seconds_bucket", {"le": "0.05"})
+    asyncio.run(scenario())
+    
+    observed = _sample("jobagent_event_loop_lag_seconds_count") - before_count
+    within_50ms = _sample("jobagent_event_loop_lag_seconds_bucket", {"le": "0.05"}) - before_slow
+    assert observed >= 2
+    assert within_50ms <= observed - 1
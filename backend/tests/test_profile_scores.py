@@ -0,0 +1,246 @@
+"""Tests for multi-profile scoring (one fetch, a score per resume profile)."""
+from datetime import datetime
+import numpy as np
+import pytest
+from config import get_settings
+from models import Job, JobLabel, JobScore, JobSkill, JobStatus, Resume, Skill
+from services.embedding_store import EmbeddingStore, JOB, RESUME
+from services.job_deduplicator import JobDeduplicator
+from services.job_normalizer import JobNormalizer, NormalizedJob
+from services.job_queue import JobQueue
+from services.job_scorer import JobScorer
+from services.profile_scores import ProfileScores
+from worker import PipelineWorker
+
+PROFILE_SCORES = {"alice": 90.0, "bob": 70.0}
+
+
+def _job(job_id, **overrides):
+    fields = {
+        "job_id": job_id,
+        "title": "Data Engineer",
+        "company": "Initech",
+        "description": "Build data pipelines in Python and SQL. Own our Airflow deployment and dbt models.",
+        "location": "Remote",
+        "type": "remote",
+        "apply_url": f"https://jobs.example/{job_id}",
+        "timestamp_fetched": datetime(2024, 1, 1),
+    }
+    fields.update(overrides)
+    return NormalizedJob(**fields)
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Deterministic scorer: the score depends on the profile; 'Explodes' fails for bob."""
+    calls = []
+    
+    def fake_score_job(job_data, resume_data):
+        profile = resume_data["profile"]
+        calls.append((job_data["job_id"], profile))
+        if job_data["title"] == "Explodes" and profile == "bob":
+            raise RuntimeError("LLM timeout")
+        return PROFILE_SCORES[profile], {"llm_reasoning": f"fits {profile}", "matched_keywords": [profile]}
+    
+    monkeypatch.setattr(JobScorer, "score_job", staticmethod(fake_score_job))
+    return calls
+
+
+@pytest.fixture
+def worker(session_factory):
+    db = session_factory()
+    db.add_all([
+        Resume(profile="alice", content="Data engineer: Python, SQL, Airflow."),
+        Resume(profile="bob", content="Chip designer: Verilog, timing closure."),
+    ])
+    db.commit()
+    db.close()
+    return PipelineWorker(session_factory=session_factory, deduplicator=JobDeduplicator())
+
+
+def _scores(db):
+    rows = db.query(JobScore, Job.job_id, Resume.profile).join(Job).join(Resume).all()
+    return {(job_id, profile): row for row, job_id, profile in rows}
+
+
+def test_every_job_is_scored_for_every_profile(session_factory, worker, llm_calls):
+    db = session_factory()
+    JobQueue.enqueue(db, [_job("a"), _job("b", company="Hooli", description="Design chips. " * 20)])
+    db.close()
+    
+    stats = worker.drain()
+    
+    assert stats["classified"] == 2
+    assert stats["llm_pairs"] == 4
+    assert sorted(llm_calls) == [("a", "alice"), ("a", "bob"), ("b", "alice"), ("b", "bob")]
+    db = session_factory()
+    scores = _scores(db)
+    assert scores[("a", "alice")].label == JobLabel.BEST_FIT
+    assert scores[("a", "bob")].label == JobLabel.MID_FIT
+    assert scores[("a", "bob")].llm_reasoning == "fits bob"
+    # The job row carries the best-fitting profile
+    job = db.query(Job).filter(Job.job_id == "a").one()
+    assert (job.score, job.label, job.llm_reasoning) == (90.0, JobLabel.BEST_FIT, "fits alice")
+    # ... and its keywords are in the skill index
+    assert db.query(Skill.name).join(JobSkill, JobSkill.skill_id == Skill.id).filter(JobSkill.job_id == job.id).all() == [("alice",)]
+    db.close()
+
+
+def test_descriptions_are_compressed_once_per_job(session_factory, worker, llm_calls, monkeypatch):
+    """Every profile's prompt shares the job's compressed description."""
+    compressed = []
+    compress = JobNormalizer.compress_description
+    monkeypatch.setattr(JobNormalizer, "compress_description", lambda text: compressed.append(text) or compress(text))
+    db = session_factory()
+    JobQueue.enqueue(db, [_job("a")])
+    db.close()
+    
+    worker.drain()
+    
+    assert len(llm_calls) == 2
+    assert len(compressed) == 1
+
+
+def test_failed_profile_is_retried_alone(session_factory, worker, llm_calls):
+    """Scores that landed before a failure are kept; the retry only pays for the missing pair."""
+    db = session_factory()
+    JobQueue.enqueue(db, [_job("x", title="Explodes")])
+    db.close()
+    
+    worker.drain()
+    
+    db = session_factory()
+    job = db.query(Job).one()
+    assert job.status == JobStatus.FAILED
+    assert set(_scores(db)) == {("x", "alice")}
+    job.title = "Fixed"
+    job.lease_expires_at = datetime(2000, 1, 1)
+    db.commit()
+    db.close()
+    llm_calls.clear()
+    
+    stats = worker.drain()
+    
+    assert stats["classified"] == 1
+    assert llm_calls == [("x", "bob")]
+
+
+def test_duplicates_get_the_canonical_profile_scores(session_factory, worker, llm_calls):
+    db = session_factory()
+    JobQueue.enqueue(db, [_job("a"), _job("b", company="Initech, Inc.")])
+    db.close()
+    
+    worker.drain()
+    
+    db = session_factory()
+    scores = _scores(db)
+    assert {job_id for job_id, _ in llm_calls} == {"a"}
+    assert scores[("b", "bob")].score == 70.0
+    assert scores[("b", "bob")].label == JobLabel.MID_FIT
+    db.close()
+
+
+def test_embedding_prefilter_skips_the_llm_for_distant_pairs(session_factory, worker, llm_calls, monkeypatch):
+    """One jobs x resumes similarity matrix decides which pairs reach the LLM."""
+    import worker as worker_module
+    
+    monkeypatch.setattr(get_settings(), "embedding_enabled", True)
+    monkeypatch.setattr(get_settings(), "profile_prefilter_similarity", 0.3)
+    store = EmbeddingStore()
+    monkeypatch.setattr(worker_module, "embedding_store", store)
+    axes = {"a": [1.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0]}
+    monkeypatch.setattr(store, "embed_jobs", lambda db, jobs: [store.store(db, JOB, job.id, axes[job.job_id]) for job in jobs])
+    
+    db = session_factory()
+    alice, bob = db.query(Resume).order_by(Resume.id).all()
+    store.store(db, RESUME, alice.id, [1.0, 0.1, 0.0])
+    store.store(db, RESUME, bob.id, [0.1, 1.0, 0.0])
+    db.commit()
+    JobQueue.enqueue(db, [_job("a"), _job("b", company="Hooli", description="Design chips. " * 20)])
+    db.close()
+    
+    stats = worker.drain()
+    
+    assert sorted(llm_calls) == [("a", "alice"), ("b", "bob")]
+    assert stats["prefiltered_pairs"] == 2
+    db = session_factory()
+    scores = _scores(db)
+    assert scores[("a", "bob")].prefiltered
+    assert scores[("a", "bob")].similarity == pytest.approx(0.0995, abs=1e-3)
+    assert not scores[("a", "alice")].prefiltered
+    assert db.query(Job).filter(Job.job_id == "b").one().score == 70.0
+    db.close()
+
+
+def test_similarity_matrix_is_one_product(db_session):
+    store = EmbeddingStore()
+    resumes = [Resume(profile="p1", content="x"), Resume(profile="p2", content="y")]
+    db_session.add_all(resumes)
+    jobs = [Job(job_id=f"j{i}", title="t", company="c", description="d", apply_url=f"u{i}") for i in range(3)]
+    db_session.add_all(jobs)
+    db_session.commit()
+    vectors = np.random.RandomState(0).normal(size=(4, 8)).astype(np.float32)
+    store.store(db_session, JOB, jobs[0].id, vectors[0])
+    store.store(db_session, JOB, jobs[2].id, vectors[1])  # jobs[1] has no vector
+    store.store(db_session, RESUME, resumes[0].id, vectors[2])
+    store.store(db_session, RESUME, resumes[1].id, vectors[3])
+    db_session.commit()
+    
+    similarities = store.similarity_matrix(db_session, jobs, resumes)
+    
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    assert similarities.shape == (3, 2)
+    assert np.isnan(similarities[1]).all()
+    np.testing.assert_allclose(similarities[[0, 2]], unit[:2] @ unit[2:].T, atol=2e-3)
+
+
+def test_profile_api(session_factory, monkeypatch, api_client):
+    """Per-profile job lists, stats, uploads that keep other profiles, and deletes that re-derive the best score."""
+    
+    db = session_factory()
+    alice, bob = Resume(profile="alice", content="a" * 60), Resume(profile="bob", content="b" * 60)
+    db.add_all([alice, bob])
+    jobs = [
+        Job(job_id=f"j{i}", title=f"Job {i}", company="Initech", description="d", apply_url=f"https://jobs.example/{i}",
+            status=JobStatus.CLASSIFIED, timestamp_fetched=datetime(2024, 1, 1))
+        for i in range(2)
+    ]
+    db.add_all(jobs)
+    db.commit()
+    for job, (alice_score, bob_score) in zip(jobs, [(90.0, 40.0), (30.0, 70.0)]):
+        ProfileScores.record(db, job, alice, alice_score, {"llm_reasoning": "alice"})
+        ProfileScores.record(db, job, bob, bob_score, {"llm_reasoning": "bob"})
+        db.flush()
+        ProfileScores.apply_best(job, list(ProfileScores.existing(db, [job.id])[job.id].values()))
+    ProfileScores.classify(db, jobs)
+    for job in jobs:
+        job.label = JobLabel.BEST_FIT if job.score >= 85 else JobLabel.MID_FIT
+    db.commit()
+    db.close()
+    
+    best = api_client.get("/api/jobs").json()
+    for_bob = api_client.get("/api/jobs", params={"profile": "bob"}).json()
+    bob_mid = api_client.get("/api/jobs", params={"profile": "bob", "label": "mid"}).json()
+    bob_stats = api_client.get("/api/jobs/stats/summary", params={"profile": "bob"}).json()
+    unknown = api_client.get("/api/jobs", params={"profile": "carol"})
+    uploaded = api_client.post(
+        "/api/resume/upload", params={"profile": "carol"},
+        files={"file": ("carol.txt", b"Frontend engineer with React and TypeScript. " * 3, "text/plain")}
+    )
+    profiles = [resume["profile"] for resume in api_client.get("/api/resumes").json()]
+    deleted = api_client.delete("/api/resume/delete", params={"profile": "alice"})
+    after_delete = api_client.get("/api/jobs").json()
+    
+    assert [(job["job_id"], job["score"], job["profile"]) for job in best] == [("j0", 90.0, None), ("j1", 70.0, None)]
+    assert [(job["job_id"], job["score"], job["label"]) for job in for_bob] == [("j1", 70.0, "mid"), ("j0", 40.0, "least")]
+    assert for_bob[0]["profile"] == "bob" and for_bob[0]["llm_reasoning"] == "bob"
+    assert [job["job_id"] for job in bob_mid] == ["j1"]
+    assert bob_stats["by_label"] == {"best_fit": 0, "mid_fit": 1, "least_fit": 1}
+    assert unknown.status_code == 404
+    assert uploaded.status_code == 200 and uploaded.json()["profile"] == "carol"
+    assert profiles == ["alice", "bob", "carol"]
+    assert deleted.status_code == 200
+    # Without alice, j0's best fit is bob's 40
+    assert {job["job_id"]: (job["score"], job["label"]) for job in after_delete} == {
+        "j0": (40.0, "least"), "j1": (70.0, "mid")
+    }
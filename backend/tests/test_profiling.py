@@ -0,0 +1,121 @@
+"""Tests for on-demand profiling."""
+import pstats
+import time
+from contextlib import nullcontext
+import pytest
+from fastapi.testclient import TestClient
+from config import get_settings
+from utils.profiling import Profiler
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "profiling_dir", str(tmp_path))
+    return tmp_path
+
+
+def _busy(seconds=0.05):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def test_disarmed_profiler_is_a_no_op(profile_dir):
+    """Nothing is profiled or stored until armed."""
+    profiler = Profiler()
+    
+    assert isinstance(profiler.cycle("run"), nullcontext)
+    assert isinstance(profiler.request("/api/jobs"), nullcontext)
+    assert profiler.results == []
+
+
+def test_cprofile_cycle_writes_pstats(profile_dir):
+    """An armed cycle yields a loadable pstats dump, then the profiler disarms."""
+    profiler = Profiler()
+    profiler.arm_cycles(1, mode="cprofile", memory=True)
+    
+    with profiler.cycle("fetch run #1"):
+        _busy()
+    with profiler.cycle("fetch run #2"):
+        _busy()
+    
+    assert len(profiler.results) == 1
+    result = profiler.results[0]
+    assert result["formats"] == ["pstats", "allocations"]
+    stats = pstats.Stats(str(profiler.result_path(result["id"], "pstats")))
+    assert any(func[2] == "_busy" for func in stats.stats)
+
+
+def test_sampling_cycle_writes_collapsed_stacks(profile_dir):
+    """Sampling mode records collapsed stacks of running threads."""
+    profiler = Profiler()
+    profiler.arm_cycles(1, mode="sampling")
+    
+    with profiler.cycle("fetch run #1"):
+        _busy(0.2)
+    
+    path = profiler.result_path(profiler.results[0]["id"], "collapsed")
+    lines = path.read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_busy" in line for line in lines)
+
+
+def test_requests_filtered_by_path(profile_dir):
+    """Only requests under the armed path prefix are profiled."""
+    profiler = Profiler()
+    profiler.arm_requests(1, path_prefix="/api/jobs")
+    
+    assert isinstance(profiler.request("/api/resume/current"), nullcontext)
+    with profiler.request("/api/jobs"):
+        _busy(0.01)
+    
+    assert profiler.requests_armed == 0
+    assert profiler.results[0]["label"] == "/api/jobs"
+
+
+def test_admin_routes_require_token(monkeypatch, profile_dir):
+    """Profiling endpoints are closed without the admin token."""
+    from main import app
+    monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+    client = TestClient(app)
+    
+    assert client.get("/api/admin/profiling").status_code == 401
+    response = client.post(
+        "/api/admin/profiling/requests",
+        params={"count": 2, "mode": "nope"},
+        headers={"X-Admin-Token": "s3cret"}
+    )
+    assert response.status_code == 400
+    
+    response = client.delete("/api/admin/profiling", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.json()["requests_armed"] == 0
+
+
+def test_results_are_shared_between_processes(profile_dir):
+    """Results live on disk, so another worker process can list and serve them."""
+    recorder = Profiler()
+    recorder.arm_requests(1)
+    with recorder.request("/api/jobs"):
+        _busy(0.01)
+    
+    other_worker = Profiler()
+    
+    result_id = other_worker.results[0]["id"]
+    assert other_worker.status()["results"][0]["label"] == "/api/jobs"
+    assert other_worker.result_path(result_id, "pstats").exists()
+    assert other_worker.result_path("../" + result_id, "pstats") is None
+
+
+def test_old_results_are_deleted(monkeypatch, profile_dir):
+    """Only the newest profiling_max_results results are kept."""
+    monkeypatch.setattr(get_settings(), "profiling_max_results", 2)
+    profiler = Profiler()
+    
+    for number in range(3):
+        profiler.arm_cycles(1, mode="cprofile")
+        with profiler.cycle(f"fetch run #{number}"):
+            pass
+    
+    assert [result["label"] for result in profiler.results] == ["fetch run #1", "fetch run #2"]
+    assert len(list(profile_dir.iterdir())) == 4  # pstats and metadata of each
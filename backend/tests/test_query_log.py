@@ -0,0 +1,113 @@
+"""Tests for the SQL slow-query log and statement aggregates."""
+import logging
+import threading
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from config import get_settings
+from utils.query_log import QueryStats, fingerprint, instrument_engine
+
+
+def _engine(stats):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    instrument_engine(engine, stats)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE jobs (id INTEGER PRIMARY KEY, title TEXT, score FLOAT)"))
+    return engine
+
+
+def test_fingerprint_normalizes_literals():
+    """Executions differing only in values share a fingerprint."""
+    assert fingerprint("SELECT * FROM jobs WHERE id = 5 AND title = 'x'") == \
+        fingerprint("SELECT *  FROM jobs\nWHERE id = 12 AND title = 'it''s'")
+    assert fingerprint("SELECT * FROM jobs WHERE id IN (?, ?, ?)") == "SELECT * FROM jobs WHERE id IN (?...)"
+    assert fingerprint("SELECT * FROM jobs WHERE id = :id_1") == "SELECT * FROM jobs WHERE id = ?"
+
+
+def test_statements_aggregate_per_fingerprint():
+    """Every statement is counted under its fingerprint."""
+    stats = QueryStats()
+    engine = _engine(stats)
+    stats.reset()
+    
+    with engine.connect() as conn:
+        for limit in (1, 2, 3):
+            conn.execute(text(f"SELECT id FROM jobs ORDER BY score DESC LIMIT {limit}")).all()
+    
+    rows = stats.snapshot(sort="count")
+    assert len(rows) == 1
+    assert rows[0]["fingerprint"] == "SELECT id FROM jobs ORDER BY score DESC LIMIT ?"
+    assert rows[0]["count"] == 3
+    assert rows[0]["slow_count"] == 0
+
+
+def test_slow_select_logged_with_plan(monkeypatch, caplog):
+    """Slow SELECTs are logged with parameters; their plan is captured in the background."""
+    monkeypatch.setattr(get_settings(), "slow_query_ms", 0.0)
+    stats = QueryStats()
+    engine = _engine(stats)
+    
+    with caplog.at_level(logging.WARNING, logger="utils.query_log"):
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT id FROM jobs WHERE title LIKE :q ORDER BY score DESC"), {"q": "%python%"}
+            ).all()
+        stats.wait_for_plans()
+    
+    assert rows == []
+    record = next(r for r in caplog.records if r.getMessage().startswith("Slow query") and "FROM jobs" in r.getMessage())
+    assert "%python%" in record.getMessage()
+    plan_record = next(r for r in caplog.records if r.getMessage().startswith("Plan of slow query SELECT id"))
+    assert any("SCAN" in line for line in plan_record.plan)
+    
+    select = next(row for row in stats.snapshot() if row["fingerprint"].startswith("SELECT"))
+    assert select["slow_count"] == 1
+    assert select["plan"] == plan_record.plan
+
+
+def test_explain_runs_off_the_executing_thread(monkeypatch):
+    """The statement's caller never runs EXPLAIN itself."""
+    monkeypatch.setattr(get_settings(), "slow_query_ms", 0.0)
+    stats = QueryStats()
+    threads = []
+    
+    def explain():
+        threads.append(threading.current_thread())
+        return ["SCAN jobs"]
+    
+    stats.record("SELECT id FROM jobs", 0.5, explain=explain)
+    stats.record("SELECT id FROM jobs", 0.5, explain=explain)
+    stats.wait_for_plans()
+    
+    assert len(threads) == 1 and threads[0] is not threading.current_thread()
+    assert stats.snapshot()[0]["plan"] == ["SCAN jobs"]
+
+
+def test_least_recently_seen_fingerprint_evicted():
+    """The number of tracked statements stays bounded."""
+    stats = QueryStats(max_fingerprints=2)
+    stats.record("SELECT 1 FROM a", 0.001)
+    stats.record("SELECT 1 FROM b", 0.001)
+    stats.record("SELECT 1 FROM a", 0.001)
+    stats.record("SELECT 1 FROM c", 0.001)
+    
+    assert {row["fingerprint"] for row in stats.snapshot()} == {"SELECT ? FROM a", "SELECT ? FROM c"}
+
+
+def test_admin_queries_endpoint(monkeypatch):
+    """Aggregates are served to admins and can be reset."""
+    from main import app
+    monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "s3cret"}
+    
+    assert client.get("/api/admin/queries").status_code == 401
+    assert client.get("/api/admin/queries", params={"sort": "nope"}, headers=headers).status_code == 400
+    
+    response = client.get("/api/admin/queries", params={"sort": "max_ms"}, headers=headers)
+    assert response.status_code == 200
+    assert "queries" in response.json()
+    
+    assert client.delete("/api/admin/queries", headers=headers).status_code == 200
@@ -0,0 +1,110 @@
+"""Tests for the data-versioned response cache (ETag / 304 on dashboard polls)."""
+from datetime import datetime
+import pytest
+from config import get_settings
+from models import Job, JobLabel, JobStatus
+from utils.response_cache import ResponseCache, response_cache
+
+
+def test_versioned_entries():
+    cache = ResponseCache(max_entries=2)
+    key = cache.key("/api/jobs", b"limit=5&label=best&company=")
+    assert key == cache.key("/api/jobs", b"label=best&limit=5")
+    
+    cache.put(key, cache.version, [], b"old")
+    assert cache.get(key) == ([], b"old")
+    cache.bump("test")
+    assert cache.get(key) is None
+    cache.put(key, cache.version - 1, [], b"computed before the bump")
+    assert cache.get(key) is None
+    
+    for i in range(3):
+        cache.put(cache.key("/api/jobs", f"offset={i}".encode()), cache.version, [], b"")
+    assert cache.stats()["entries"] == 2
+    
+    version = cache.version
+    cache.observe((10, "t1"))  # Baseline
+    cache.observe((10, "t1"))
+    assert cache.version == version
+    cache.observe((11, "t2"))
+    assert cache.version == version + 1
+
+
+@pytest.fixture
+def client(session_factory, api_client):
+    db = session_factory()
+    db.add(Job(job_id="a", title="Data Engineer", company="Initech", description="d", apply_url="https://jobs.example/a",
+               score=90.0, label=JobLabel.BEST_FIT, status=JobStatus.CLASSIFIED, timestamp_fetched=datetime(2024, 1, 1)))
+    db.commit()
+    db.close()
+    return api_client
+
+
+def _add_job(session_factory):
+    db = session_factory()
+    db.add(Job(job_id="b", title="Chip Designer", company="Hooli", description="d", apply_url="https://jobs.example/b",
+               score=50.0, label=JobLabel.MID_FIT, status=JobStatus.CLASSIFIED, timestamp_fetched=datetime(2024, 1, 1)))
+    db.commit()
+    db.close()
+
+
+def test_polls_revalidate_until_the_version_changes(client, session_factory):
+    first = client.get("/api/jobs/stats/summary")
+    etag = first.headers["etag"]
+    
+    not_modified = client.get("/api/jobs/stats/summary", headers={"If-None-Match": etag})
+    _add_job(session_factory)  # No bump yet: the cache still answers
+    cached = client.get("/api/jobs/stats/summary")
+    still_not_modified = client.get("/api/jobs/stats/summary", headers={"If-None-Match": f"W/{etag}"})
+    
+    response_cache.bump("test")
+    changed = client.get("/api/jobs/stats/summary", headers={"If-None-Match": etag})
+    
+    assert first.status_code == 200 and first.json()["total_jobs"] == 1
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert cached.json() == first.json() and cached.headers["etag"] == etag
+    assert still_not_modified.status_code == 304
+    assert changed.status_code == 200 and changed.json()["total_jobs"] == 2
+    assert changed.headers["etag"] != etag
+
+
+def test_entries_are_per_route_and_query(client, session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "read_model_enabled", False)  # Read the insert straight from the database
+    best = client.get("/api/jobs?label=best&limit=5").json()
+    _add_job(session_factory)
+    reordered = client.get("/api/jobs?limit=5&label=best").json()
+    mid = client.get("/api/jobs?label=mid").json()
+    errors = client.get("/api/jobs", params={"profile": "nobody"})
+    
+    assert [job["job_id"] for job in best] == [job["job_id"] for job in reordered] == ["a"]
+    assert [job["job_id"] for job in mid] == ["b"]  # Not cached before the insert
+    assert errors.status_code == 404 and "etag" not in errors.headers
+
+
+def test_resume_upload_bumps_the_version(client):
+    version = response_cache.version
+    
+    uploaded = client.post(
+        "/api/resume/upload", params={"profile": "carol"},
+        files={"file": ("carol.txt", b"Frontend engineer with React and TypeScript. " * 3, "text/plain")}
+    )
+    
+    assert uploaded.status_code == 200
+    assert response_cache.version == version + 1
+
+
+def test_etags_match_across_api_processes(client, session_factory):
+    """Another API worker tags the same data alike, so a poll it answers is still a 304."""
+    etag = client.get("/api/jobs").headers["etag"]
+    other_process = ResponseCache(session_factory=session_factory)
+    other_process.bump("local change history differs")
+    
+    other_process.reload()
+    # This process loses its stored responses and version history too
+    response_cache.clear()
+    response_cache.bump("restart")
+    revalidated = client.get("/api/jobs", headers={"If-None-Match": etag})
+    
+    assert other_process.etag == etag
+    assert revalidated.status_code == 304
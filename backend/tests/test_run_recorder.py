@@ -0,0 +1,81 @@
+"""Tests for fetch run recording."""
+from models import FetchRun, RunStatus
+from services.run_recorder import RunRecorder
+
+
+def test_finish_persists_timings_and_counts(session_factory):
+    """A finished run stores its stage timings, counters and outcome."""
+    db = session_factory()
+    run = RunRecorder.create(db, "manual", owner="host:1")
+    assert run.status == RunStatus.RUNNING
+    assert run.started_at is not None
+    
+    recorder = RunRecorder(run.id, session_factory=session_factory)
+    with recorder.stage("fetch"):
+        pass
+    recorder.add(fetched=10, stored=8, scored=7, prompt_tokens=1200, unknown=5)
+    recorder.add(scored=1)
+    summary = recorder.finish()
+    
+    assert summary["status"] == "completed"
+    assert summary["fetched"] == 10
+    assert summary["scored"] == 8
+    assert summary["prompt_tokens"] == 1200
+    assert "fetch" in summary["stage_seconds"]
+    assert summary["duration_seconds"] >= 0
+    db.close()
+
+
+def test_finish_with_error_marks_run_failed(session_factory):
+    """Errors are recorded on the run."""
+    db = session_factory()
+    run_id = RunRecorder.create(db, "scheduled").id
+    db.close()
+    
+    summary = RunRecorder(run_id, session_factory=session_factory).finish(error="JobSpy down")
+    
+    assert summary["status"] == "failed"
+    assert summary["error"] == "JobSpy down"
+
+
+def test_pending_run_is_claimed_once(db_session):
+    """Runs queued by followers are claimed by exactly one leader."""
+    pending = RunRecorder.create(db_session, "manual", status=RunStatus.PENDING)
+    assert pending.started_at is None
+    
+    assert RunRecorder.claim_pending(db_session, "leader") == pending.id
+    assert RunRecorder.claim_pending(db_session, "other") is None
+    
+    run = db_session.get(FetchRun, pending.id)
+    assert run.status == RunStatus.RUNNING
+    assert run.owner == "leader"
+
+
+def test_list_runs_newest_first(db_session):
+    """Run history is listed most recent first."""
+    ids = [RunRecorder.create(db_session, "scheduled").id for _ in range(3)]
+    
+    runs = RunRecorder.list_runs(db_session, limit=2)
+    
+    assert [run.id for run in runs] == ids[::-1][:2]
+
+
+def test_new_leader_expires_abandoned_runs(session_factory):
+    """Runs a crashed leader left RUNNING, and requests that waited on it too long, are failed."""
+    from datetime import datetime, timedelta
+    
+    db = session_factory()
+    crashed = RunRecorder.create(db, "scheduled", owner="old:1").id
+    own = RunRecorder.create(db, "manual", owner="new:2").id
+    stale = RunRecorder.create(db, "manual", status=RunStatus.PENDING).id
+    db.get(FetchRun, stale).created_at = datetime.now() - timedelta(minutes=5)
+    fresh = RunRecorder.create(db, "manual", status=RunStatus.PENDING).id
+    db.commit()
+    
+    expired = RunRecorder.expire_abandoned(db, "new:2", pending_before=datetime.now() - timedelta(seconds=30))
+    
+    statuses = {run.id: run.status for run in db.query(FetchRun)}
+    assert expired == 2
+    assert statuses == {crashed: RunStatus.FAILED, own: RunStatus.RUNNING, stale: RunStatus.FAILED, fresh: RunStatus.PENDING}
+    assert db.get(FetchRun, crashed).error.startswith("Abandoned")
+    db.close()
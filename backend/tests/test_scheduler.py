@@ -0,0 +1,190 @@
+"""Tests for per-source fetch schedules, overlap coalescing and continuous mode."""
+import asyncio
+import time
+import pandas as pd
+from config import get_settings
+from models import FetchRun, Resume
+import scheduler as scheduler_module
+from scheduler import ALL_SOURCES, JobScheduler
+from services.leader_election import LeaderElector
+from services.run_recorder import RunRecorder
+
+
+class _Leader:
+    is_leader = True
+    owner = "test:1"
+
+
+def _scheduler(monkeypatch, **overrides):
+    for name, value in {"fetch_replay_dir": "", "job_search_terms": [], "job_source_intervals": {}, **overrides}.items():
+        monkeypatch.setattr(get_settings(), name, value)
+    job_scheduler = JobScheduler()
+    job_scheduler.elector = _Leader()
+    return job_scheduler
+
+
+def test_schedules_per_source_and_search_term(monkeypatch):
+    job_scheduler = _scheduler(
+        monkeypatch, job_sources=["indeed", "linkedin"], job_search_terms=["data engineer", "sre"],
+        job_source_intervals={"linkedin": 45}, job_fetch_interval_minutes=10
+    )
+    replay = _scheduler(monkeypatch, job_sources=["indeed", "linkedin"], fetch_replay_dir="recordings")
+    
+    intervals = {key: schedule.interval_minutes for key, schedule in job_scheduler.schedules.items()}
+    assert intervals == {
+        "indeed/data engineer": 10, "indeed/sre": 10,
+        "linkedin/data engineer": 45, "linkedin/sre": 45,
+    }
+    assert list(replay.schedules) == [ALL_SOURCES] and replay.schedules[ALL_SOURCES] is replay.manual
+
+
+def test_overlapping_firings_coalesce_into_one_follow_up(monkeypatch):
+    # Runs take longer than the interval: APScheduler fires several times during each
+    job_scheduler = _scheduler(monkeypatch, job_sources=["indeed"], job_fetch_interval_minutes=0.1 / 60, fetch_jitter_seconds=0)
+    triggers = []
+    
+    def create_run(trigger, status):
+        triggers.append(trigger)
+        return len(triggers)
+    
+    async def execute(run_id, schedule):
+        schedule.run_id = run_id
+        await asyncio.sleep(0.35)
+        schedule.run_id = None
+    
+    job_scheduler._create_run = create_run
+    job_scheduler._execute_run = execute
+    
+    async def scenario():
+        job_scheduler._add_fetch_jobs()
+        job_scheduler.scheduler.start()
+        await asyncio.sleep(0.6)
+        job_scheduler.scheduler.shutdown(wait=False)
+    
+    asyncio.run(scenario())
+    
+    # The firings during the first run became exactly one follow-up run
+    assert triggers == ["scheduled:indeed", "coalesced:indeed"]
+
+
+def test_run_fetches_only_its_source(monkeypatch, session_factory):
+    job_scheduler = _scheduler(monkeypatch, job_sources=["indeed", "linkedin"], job_search_terms=["sre"])
+    monkeypatch.setattr(get_settings(), "queue_inline_worker", False)
+    monkeypatch.setattr(scheduler_module, "SessionLocal", session_factory)
+    
+    class Recorder(RunRecorder):
+        def __init__(self, run_id):
+            super().__init__(run_id, session_factory)
+    
+    monkeypatch.setattr(scheduler_module, "RunRecorder", Recorder)
+    db = session_factory()
+    db.add(Resume(profile="default", content="Site reliability engineer"))
+    db.commit()
+    db.close()
+    
+    calls = []
+    
+    class Fetcher:
+        async def fetch_jobs_frame(self, search_term=None, location=None, sources=None):
+            calls.append((search_term, sources))
+            return pd.DataFrame()
+    
+    async def no_broadcast():
+        pass
+    
+    job_scheduler.fetcher = Fetcher()
+    job_scheduler.broadcast_classified_jobs = no_broadcast
+    asyncio.run(job_scheduler.run_cycle(key="linkedin/sre"))
+    
+    db = session_factory()
+    run = db.query(FetchRun).one()
+    db.close()
+    assert calls == [("sre", ["linkedin"])]
+    assert run.trigger == "scheduled:linkedin/sre" and run.status.value == "completed"
+    assert job_scheduler.schedules["linkedin/sre"].last_fetch_time is not None
+
+
+def test_continuous_mode_respects_the_source_budget(monkeypatch):
+    job_scheduler = _scheduler(
+        monkeypatch, job_sources=["indeed"], job_search_terms=["a", "b"],
+        fetch_min_interval_seconds=0.1, fetch_jitter_seconds=0
+    )
+    starts = []
+    
+    async def run_cycle(trigger, key):
+        starts.append((time.monotonic(), key, trigger))
+    
+    job_scheduler.run_cycle = run_cycle
+    
+    async def scenario():
+        loops = [asyncio.create_task(job_scheduler._continuous(schedule)) for schedule in job_scheduler.schedules.values()]
+        await asyncio.sleep(0.35)
+        for loop in loops:
+            loop.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+    
+    asyncio.run(scenario())
+    
+    # Both searches share indeed's budget: one start per 0.1 s between them
+    gaps = [later[0] - earlier[0] for earlier, later in zip(starts, starts[1:])]
+    assert 3 <= len(starts) <= 4
+    assert all(gap >= 0.09 for gap in gaps)
+    assert {key for _, key, _ in starts} == {"indeed/a", "indeed/b"}
+    assert {trigger for _, _, trigger in starts} == {"continuous"}
+
+
+def test_manual_and_queued_runs_coalesce_with_source_runs(monkeypatch, session_factory):
+    job_scheduler = _scheduler(monkeypatch, job_sources=["indeed", "linkedin"])
+    monkeypatch.setattr(scheduler_module, "SessionLocal", session_factory)
+    claims = []
+    monkeypatch.setattr(scheduler_module.RunRecorder, "claim_pending", staticmethod(lambda db, owner: claims.append(owner)))
+    job_scheduler._renew_lease = lambda: None
+    runs = []
+    
+    def create_run(trigger, status):
+        runs.append(trigger)
+        return len(runs)
+    
+    async def execute(run_id, schedule):
+        schedule.run_id = run_id
+        await asyncio.sleep(0.05)
+        schedule.run_id = None
+    
+    job_scheduler._create_run = create_run
+    job_scheduler._execute_run = execute
+    
+    async def scenario():
+        source_run = asyncio.create_task(job_scheduler.run_cycle(key="indeed"))
+        await asyncio.sleep(0.01)
+        manual = await job_scheduler.trigger("manual")
+        await job_scheduler.heartbeat()  # Must not start a queued all-sources run meanwhile
+        await source_run
+        
+        everything = await job_scheduler.trigger("manual")
+        await asyncio.sleep(0.01)
+        await job_scheduler.run_cycle(key="linkedin")  # Covered by the run of every source
+        await asyncio.gather(*job_scheduler._run_tasks)
+        return manual, everything
+    
+    manual, everything = asyncio.run(scenario())
+    
+    assert manual == {"run_id": 1, "status": "running", "coalesced": True, "delegated": False}
+    assert claims == []
+    assert everything["run_id"] == 2 and not everything["coalesced"]
+    assert runs == ["scheduled:indeed", "manual"]
+
+
+def test_lease_takeover_fails_the_previous_leaders_runs(monkeypatch, session_factory):
+    job_scheduler = _scheduler(monkeypatch, job_sources=["indeed"])
+    job_scheduler.elector = LeaderElector(owner="new:2")
+    monkeypatch.setattr(scheduler_module, "SessionLocal", session_factory)
+    db = session_factory()
+    run_id = RunRecorder.create(db, "scheduled", owner="old:1").id
+    db.close()
+    
+    job_scheduler._renew_lease()
+    
+    db = session_factory()
+    assert job_scheduler.is_leader
+    assert db.get(FetchRun, run_id).status.value == "failed"
+    db.close()
@@ -0,0 +1,99 @@
+"""Tests for the job_skills facet index."""
+from datetime import datetime
+from models import Job, JobLabel, JobSkill, JobStatus, Resume, Skill
+from services.profile_scores import ProfileScores
+from services.skill_index import SkillIndex
+
+KEYWORDS = {
+    "a": ["Kubernetes", "Go", "  python "],
+    "b": ["python", "SQL"],
+    "c": ["kubernetes", "Python"],
+    "d": [],
+}
+
+
+def _store(db):
+    jobs = []
+    for i, (job_id, keywords) in enumerate(KEYWORDS.items()):
+        jobs.append(Job(
+            job_id=job_id, title=f"Job {job_id}", company="Initech", description="d",
+            apply_url=f"https://jobs.example/{job_id}", score=90.0 - i, keywords_matched=keywords,
+            label=JobLabel.BEST_FIT if i < 2 else JobLabel.MID_FIT,
+            status=JobStatus.CLASSIFIED, timestamp_fetched=datetime(2024, 1, 1)
+        ))
+    db.add_all(jobs)
+    db.commit()
+    return jobs
+
+
+def test_index_normalizes_and_replaces(db_session):
+    jobs = _store(db_session)
+    
+    SkillIndex.index(db_session, jobs)
+    db_session.commit()
+    jobs[0].keywords_matched = ["GO", "Rust"]
+    SkillIndex.index(db_session, jobs[:1])
+    db_session.commit()
+    
+    skills = dict(db_session.query(Skill.name, Skill.id))
+    assert set(skills) == {"kubernetes", "go", "python", "sql", "rust"}
+    rows = db_session.query(JobSkill.skill_id).filter(JobSkill.job_id == jobs[0].id)
+    assert {skill_id for (skill_id,) in rows} == {skills["go"], skills["rust"]}
+    assert SkillIndex.parse(["Kubernetes, go", "kubernetes", " "]) == ["kubernetes", "go"]
+
+
+def test_backfill_completes_a_partial_index(db_session):
+    jobs = _store(db_session)
+    SkillIndex.index(db_session, jobs[:1])
+    db_session.commit()
+    
+    assert SkillIndex.backfill(db_session) == 2  # b and c; d has no keywords
+    assert SkillIndex.backfill(db_session) == 0
+    assert db_session.query(JobSkill).count() == 7
+
+
+def test_skill_filters_and_facets_api(session_factory, api_client):
+
+    db = session_factory()
+    _store(db)
+    SkillIndex.backfill(db)
+    db.close()
+    
+    both = api_client.get("/api/jobs", params={"skills": "kubernetes,python"}).json()
+    repeated = api_client.get("/api/jobs", params=[("skills", "Kubernetes"), ("skills", "python")]).json()
+    either = api_client.get("/api/jobs", params={"skills": "go,sql", "skills_mode": "any"}).json()
+    unknown = api_client.get("/api/jobs", params={"skills": "python,cobol"}).json()
+    facets = api_client.get("/api/jobs/facets/skills").json()
+    best_facets = api_client.get("/api/jobs/facets/skills", params={"label": "best", "limit": 2}).json()
+    archived = api_client.get("/api/jobs", params={"skills": "go", "include_archived": True})
+    profiled = api_client.get("/api/jobs", params={"skills": "go", "profile": "default"})
+    
+    assert [job["job_id"] for job in both] == ["a", "c"]
+    assert repeated == both
+    assert [job["job_id"] for job in either] == ["a", "b"]
+    assert unknown == []
+    assert facets == [
+        {"skill": "python", "count": 3}, {"skill": "kubernetes", "count": 2},
+        {"skill": "go", "count": 1}, {"skill": "sql", "count": 1},
+    ]
+    assert best_facets == [{"skill": "python", "count": 2}, {"skill": "go", "count": 1}]
+    assert archived.status_code == 400
+    assert profiled.status_code == 400
+
+
+def test_removing_a_profile_reindexes_the_best_keywords(db_session):
+    alice, bob = Resume(profile="alice", content="a"), Resume(profile="bob", content="b")
+    job = Job(job_id="j", title="t", company="c", description="d", apply_url="u", status=JobStatus.CLASSIFIED)
+    db_session.add_all([alice, bob, job])
+    db_session.commit()
+    ProfileScores.record(db_session, job, alice, 90.0, {"matched_keywords": ["Kubernetes"]})
+    ProfileScores.record(db_session, job, bob, 40.0, {"matched_keywords": ["Verilog"]})
+    db_session.flush()
+    ProfileScores.apply_best(job, list(ProfileScores.existing(db_session, [job.id])[job.id].values()))
+    SkillIndex.index(db_session, [job])
+    db_session.commit()
+    
+    ProfileScores.remove_profile(db_session, alice)
+    
+    names = db_session.query(Skill.name).join(JobSkill, JobSkill.skill_id == Skill.id).filter(JobSkill.job_id == job.id)
+    assert [name for (name,) in names] == ["verilog"]
@@ -0,0 +1,61 @@
+"""Tests for lazy imports and the startup warm-up."""
+import subprocess
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+from services.warmup import WarmUp, SKIPPED
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded on first use or by the warm-up, never by importing the app
+HEAVY_MODULES = ("jobspy", "openai", "langgraph", "pandas", "sentence_transformers", "PyPDF2")
+
+
+def test_app_import_is_lazy():
+    """Importing the app skips heavy dependencies."""
+    code = (
+        "import sys\n"
+        "import main\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_warmup_records_component_status():
+    """Each component ends ready, skipped or failed; failures don't stop the rest."""
+    def broken():
+        raise ImportError("no module named torch")
+    
+    warmup = WarmUp([("ok", lambda: None), ("broken", broken), ("off", lambda: SKIPPED)])
+    assert not warmup.ready
+    
+    warmup.start()
+    assert warmup.wait(timeout=5)
+    
+    health = warmup.health()
+    assert health["status"] == "degraded"
+    assert health["components"]["ok"]["status"] == "ready"
+    assert health["components"]["broken"]["error"] == "no module named torch"
+    assert health["components"]["off"]["status"] == "skipped"
+
+
+def test_health_endpoint_reports_readiness(monkeypatch):
+    """The health endpoint answers 503 until warm-up has finished."""
+    import main
+    warmup = WarmUp([("ok", lambda: None)])
+    monkeypatch.setattr(main, "warmup", warmup)
+    client = TestClient(main.app)
+    
+    response = client.get("/api/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    
+    warmup.start()
+    warmup.wait(timeout=5)
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
@@ -1,5 +1,5 @@
 """Utility modules."""
-from .logger import get_logger
-
-__all__ = ["get_logger"]
+from .logger import get_logger, configure_logging
+from .tokens import count_tokens, truncate_tokens
 
+__all__ = ["get_logger", "configure_logging", "count_tokens", "truncate_tokens"]
@@ -1,22 +1,188 @@
-"""Logging configuration."""
+"""Logging configuration.
+
+Records are handed to a background thread through a QueueHandler, so the
+hot path never waits on disk or stdout. The listener appends JSON lines
+to the log file and writes readable text to stdout. Repetitive INFO/DEBUG
+messages are sampled per call site; warnings and errors always go through.
+
+API and worker processes append to the same file, so none of them rotates
+it - rotate externally (e.g. logrotate); each process reopens the file
+once it has been moved.
+"""
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
 from pathlib import Path
+from typing import Dict, Tuple
+from config import get_settings
+
+_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limit INFO/DEBUG records per call site.
+    
+    Each call site (file and line) may emit ``burst`` records per ``window``
+    seconds; the rest are dropped and counted. The first record of the next
+    window carries the count as ``suppressed``.
+    """
+    
+    def __init__(self, burst: int, window: float):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._sites: Dict[Tuple[str, int], list] = {}  # site -> [window start, emitted, suppressed]
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.burst <= 0:
+            return True
+        
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or record.created - site[0] >= self.window:
+                if site is not None and site[2]:
+                    record.suppressed = site[2]
+                self._sites[key] = [record.created, 1, 0]
+                return True
+            
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+            
+            site[2] += 1
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra`` fields."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines, noting sampled-out records."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" [{suppressed} similar messages suppressed]"
+        return text
 
-# Create logs directory
-Path("logs").mkdir(exist_ok=True)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("logs/app.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+class _QueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback apart from the message for the JSON formatter."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Parse "module=LEVEL,module=LEVEL" into a dict."""
+    levels = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(force: bool = False):
+    """
+    Route all logging through the background writer.
+    
+    Called by each entry point (API lifespan, worker, replay) rather than on
+    import, so importing the app's modules leaves logging alone.
+    
+    Args:
+        force: Reconfigure even if already set up (e.g. in a forked worker
+            process, where the listener thread doesn't exist)
+    """
+    global _listener, _queue_handler
+    
+    with _lock:
+        if _listener is not None and not force:
+            return
+        
+        settings = get_settings()
+        root = logging.getLogger()
+        
+        if _queue_handler is not None:
+            root.removeHandler(_queue_handler)
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+        
+        log_path = Path(settings.log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        file_handler = WatchedFileHandler(log_path, encoding="utf-8", delay=True)
+        file_handler.setFormatter(JsonFormatter() if settings.log_json else TextFormatter(_TEXT_FORMAT))
+        
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(TextFormatter(_TEXT_FORMAT))
+        
+        log_queue = queue.Queue(-1)
+        _queue_handler = _QueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter(settings.log_sample_burst, settings.log_sample_window_seconds))
+        
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        
+        root.setLevel(settings.log_level.upper())
+        root.addHandler(_queue_handler)
+        for name, level in _parse_levels(settings.log_module_levels).items():
+            logging.getLogger(name).setLevel(level)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    with _lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+
+
+atexit.register(shutdown_logging)
+
 
 def get_logger(name: str) -> logging.Logger:
     """Get logger instance."""
     return logging.getLogger(name)
-
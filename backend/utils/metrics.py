@@ -0,0 +1,120 @@
+"""Prometheus metrics exported on /metrics.
+
+Metrics live in the default registry of each process; standalone
+``worker.py`` processes keep their own counts.
+"""
+import asyncio
+import functools
+import time
+from typing import Callable
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+_NAMESPACE = "jobagent"
+
+# Latency buckets (seconds): DB commits, broadcasts and embedding batches are fast, LLM calls and scrapes slow
+_FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# ===== Histograms =====
+
+FETCH_SECONDS = Histogram(
+    "fetch_seconds", "JobSpy scrape time per source",
+    ["source"], namespace=_NAMESPACE, buckets=_SLOW_BUCKETS
+)
+NODE_SECONDS = Histogram(
+    "pipeline_node_seconds", "Pipeline node execution time",
+    ["node"], namespace=_NAMESPACE, buckets=_SLOW_BUCKETS
+)
+DB_COMMIT_SECONDS = Histogram(
+    "db_commit_seconds", "Session commit time (flush included)",
+    namespace=_NAMESPACE, buckets=_FAST_BUCKETS
+)
+BROADCAST_SECONDS = Histogram(
+    "websocket_broadcast_seconds", "Time to send one message to every WebSocket client",
+    namespace=_NAMESPACE, buckets=_FAST_BUCKETS
+)
+EMBED_BATCH_SECONDS = Histogram(
+    "embedding_batch_seconds", "Model time per embedding micro-batch",
+    ["backend"], namespace=_NAMESPACE, buckets=_FAST_BUCKETS
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late a periodic timer fires on the API event loop (time spent blocked)",
+    namespace=_NAMESPACE, buckets=_FAST_BUCKETS + (5.0, 10.0)
+)
+
+# ===== Counters =====
+
+LLM_CALLS = Counter("llm_calls", "LLM scoring calls", ["outcome"], namespace=_NAMESPACE)
+LLM_TOKENS = Counter("llm_tokens", "LLM tokens used", ["kind"], namespace=_NAMESPACE)
+CACHE_HITS = Counter("cache_hits", "In-process cache hits", ["cache"], namespace=_NAMESPACE)
+DEDUPE_DROPS = Counter(
+    "dedupe_drops", "Jobs linked to a canonical job instead of being scored",
+    ["scope"], namespace=_NAMESPACE
+)
+EMBEDDED_TEXTS = Counter(
+    "embedded_texts", "Texts run through an embedding model (cache misses)", ["backend"], namespace=_NAMESPACE
+)
+FALLBACKS = Counter(
+    "scoring_fallbacks", "Keyword fallback activations", ["reason"], namespace=_NAMESPACE
+)
+RESPONSE_CACHE = Counter(
+    "response_cache_requests", "Cacheable GET requests by outcome (not_modified, hit, miss)",
+    ["outcome"], namespace=_NAMESPACE
+)
+
+# ===== Gauges =====
+
+QUEUE_DEPTH = Gauge("queue_depth", "Jobs per status", ["status"], namespace=_NAMESPACE)
+WEBSOCKET_CLIENTS = Gauge("websocket_clients", "Connected WebSocket clients", namespace=_NAMESPACE)
+
+
+def timed(histogram: Histogram) -> Callable:
+    """
+    Decorator observing a function's run time in a histogram.
+    
+    Unlike ``Histogram.time()`` this keeps the function's plain signature,
+    so LangGraph still names the node after it.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def instrument_sessions(session_factory):
+    """Observe commit time of every session made by the factory."""
+    from sqlalchemy import event
+    
+    @event.listens_for(session_factory, "before_commit")
+    def _before_commit(session):
+        session.info["commit_started"] = time.perf_counter()
+    
+    @event.listens_for(session_factory, "after_commit")
+    def _after_commit(session):
+        started = session.info.pop("commit_started", None)
+        if started is not None:
+            DB_COMMIT_SECONDS.observe(time.perf_counter() - started)
+    
+    @event.listens_for(session_factory, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop("commit_started", None)
+
+
+async def monitor_event_loop(interval: float):
+    """Observe event-loop lag forever: how far past ``interval`` seconds each sleep wakes up."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - interval))
+
+
+def render_latest() -> tuple:
+    """Current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
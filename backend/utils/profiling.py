@@ -0,0 +1,311 @@
+"""On-demand profiling of fetch runs and API requests.
+
+Nothing runs until an admin arms the profiler (see api/admin.py). While
+disarmed, the hooks cost a single counter check.
+
+Two modes:
+
+- ``cprofile``: deterministic cProfile of the thread running the target,
+  saved as a ``.prof`` file for pstats / snakeviz. Requests and fetch runs
+  are coroutines, so that thread is the event loop: the profile covers
+  every task that ran on the loop while the target was awaiting, not just
+  the target.
+- ``sampling``: a background thread samples the stacks of *all* threads
+  (event loop, scoring pool, worker drain), saved as flamegraph-ready
+  collapsed stacks.
+
+Either mode can add a tracemalloc snapshot of the top allocating lines.
+
+Results are files in ``profiling_dir`` with a ``.meta.json`` record each,
+so any API worker process can list and serve results recorded by another.
+"""
+import cProfile
+import json
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from config import get_settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+# File suffix per downloadable result format
+RESULT_FORMATS = {
+    "pstats": ".prof",
+    "collapsed": ".folded",
+    "allocations": ".allocations.json",
+}
+META_SUFFIX = ".meta.json"
+
+
+class StackSampler(threading.Thread):
+    """Periodically sample every thread's stack into collapsed-stack counts."""
+    
+    def __init__(self, interval: float):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+    
+    def stop(self) -> Counter:
+        """Stop sampling and return the collected stacks."""
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+class Profiler:
+    """Arm, run and keep results of profiling sessions."""
+    
+    def __init__(self):
+        self.cycles_armed = 0
+        self.requests_armed = 0
+        self.cycle_options: Dict[str, Any] = {}
+        self.request_options: Dict[str, Any] = {}
+        self._active = False  # cProfile and tracemalloc are process-wide - one session at a time
+        self._lock = threading.Lock()
+    
+    # ===== Arming =====
+    
+    def arm_cycles(self, count: int, mode: str = "sampling", memory: bool = False):
+        """Profile the next ``count`` fetch runs."""
+        self._check_mode(mode)
+        with self._lock:
+            self.cycles_armed = count
+            self.cycle_options = {"mode": mode, "memory": memory}
+        logger.info(f"Profiler armed for the next {count} fetch runs ({mode}, memory={memory})")
+    
+    def arm_requests(
+        self,
+        count: int,
+        mode: str = "cprofile",
+        memory: bool = False,
+        sample_rate: float = 1.0,
+        path_prefix: str = "/api"
+    ):
+        """Profile the next ``count`` sampled API requests under ``path_prefix``."""
+        self._check_mode(mode)
+        with self._lock:
+            self.requests_armed = count
+            self.request_options = {
+                "mode": mode, "memory": memory, "sample_rate": sample_rate, "path_prefix": path_prefix
+            }
+        logger.info(f"Profiler armed for the next {count} requests under {path_prefix} ({mode}, rate={sample_rate})")
+    
+    def disarm(self):
+        """Stop profiling anything new."""
+        with self._lock:
+            self.cycles_armed = 0
+            self.requests_armed = 0
+    
+    def status(self) -> Dict[str, Any]:
+        """Armed counts, options and stored results."""
+        return {
+            "cycles_armed": self.cycles_armed,
+            "cycle_options": self.cycle_options,
+            "requests_armed": self.requests_armed,
+            "request_options": self.request_options,
+            "active": self._active,
+            "results": list(reversed(self.results)),
+        }
+    
+    # ===== Hooks =====
+    
+    def cycle(self, label: str):
+        """Context manager for a fetch run - profiles it only when armed."""
+        if not self.cycles_armed:
+            return nullcontext()
+        if not self._claim("cycles_armed"):
+            return nullcontext()
+        return self._session("cycle", label, **self.cycle_options)
+    
+    def request(self, path: str):
+        """Context manager for an API request - profiles it only when armed and sampled."""
+        if not self.requests_armed:
+            return nullcontext()
+        
+        options = self.request_options
+        if not path.startswith(options["path_prefix"]) or random.random() >= options["sample_rate"]:
+            return nullcontext()
+        if not self._claim("requests_armed"):
+            return nullcontext()
+        return self._session("request", path, mode=options["mode"], memory=options["memory"])
+    
+    # ===== Results =====
+    
+    @property
+    def results(self) -> List[Dict[str, Any]]:
+        """Stored results of every process, oldest first."""
+        directory = Path(settings.profiling_dir)
+        if not directory.is_dir():
+            return []
+        
+        results = []
+        for path in directory.glob(f"*{META_SUFFIX}"):
+            try:
+                results.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # Deleted by another process meanwhile
+        return sorted(results, key=lambda result: (result["started_at"], result["id"]))
+    
+    def result_path(self, result_id: str, fmt: str) -> Optional[Path]:
+        """Path of a stored result file, or None if it doesn't exist."""
+        if fmt not in RESULT_FORMATS:
+            return None
+        for result in self.results:
+            if result["id"] == result_id and fmt in result["formats"]:
+                path = Path(settings.profiling_dir) / f"{result_id}{RESULT_FORMATS[fmt]}"
+                return path if path.exists() else None
+        return None
+    
+    # ===== Internals =====
+    
+    @staticmethod
+    def _check_mode(mode: str):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}' (expected one of {', '.join(PROFILE_MODES)})")
+    
+    def _claim(self, counter: str) -> bool:
+        """Take one armed slot, unless another session is running."""
+        with self._lock:
+            if self._active or getattr(self, counter) <= 0:
+                return False
+            setattr(self, counter, getattr(self, counter) - 1)
+            self._active = True
+            return True
+    
+    @contextmanager
+    def _session(self, kind: str, label: str, mode: str = "sampling", memory: bool = False):
+        """Profile the enclosed block and store the result."""
+        result_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        started_tracemalloc = memory and not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(10)
+        
+        profile = cProfile.Profile() if mode == "cprofile" else None
+        sampler = StackSampler(settings.profiling_sample_interval_ms / 1000.0) if mode == "sampling" else None
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        if sampler is not None:
+            sampler.start()
+        
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            stacks = sampler.stop() if sampler is not None else None
+            snapshot = tracemalloc.take_snapshot() if memory else None
+            if started_tracemalloc:
+                tracemalloc.stop()
+            
+            try:
+                self._store(result_id, kind, label, mode, time.perf_counter() - start, profile, stacks, snapshot)
+            except Exception as e:
+                logger.error(f"Error saving profile {result_id}: {e}")
+            finally:
+                with self._lock:
+                    self._active = False
+    
+    def _store(self, result_id, kind, label, mode, duration, profile, stacks, snapshot):
+        """Write result files and register the result."""
+        directory = Path(settings.profiling_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        formats = []
+        
+        if profile is not None:
+            profile.dump_stats(str(directory / f"{result_id}{RESULT_FORMATS['pstats']}"))
+            formats.append("pstats")
+        
+        if stacks is not None:
+            lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+            (directory / f"{result_id}{RESULT_FORMATS['collapsed']}").write_text("\n".join(lines) + "\n")
+            formats.append("collapsed")
+        
+        top_allocations = []
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ])
+            for stat in snapshot.statistics("lineno")[:settings.profiling_top_allocations]:
+                frame = stat.traceback[0]
+                top_allocations.append({
+                    "location": f"{frame.filename}:{frame.lineno}",
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                })
+            (directory / f"{result_id}{RESULT_FORMATS['allocations']}").write_text(json.dumps(top_allocations, indent=2))
+            formats.append("allocations")
+        
+        result = {
+            "id": result_id,
+            "kind": kind,
+            "label": label,
+            "mode": mode,
+            "started_at": datetime.now().isoformat(),
+            "duration_seconds": round(duration, 3),
+            "formats": formats,
+            "top_allocations": top_allocations[:10],
+        }
+        # Written last and renamed into place, so other processes never list a partial result
+        temp_path = directory / f".{result_id}{META_SUFFIX}.tmp"
+        temp_path.write_text(json.dumps(result))
+        temp_path.replace(directory / f"{result_id}{META_SUFFIX}")
+        
+        results = self.results
+        expired = results[:-settings.profiling_max_results] if settings.profiling_max_results > 0 else []
+        for old in expired:
+            for suffix in (*RESULT_FORMATS.values(), META_SUFFIX):
+                (directory / f"{old['id']}{suffix}").unlink(missing_ok=True)
+        
+        logger.info(f"Saved {mode} profile {result_id} of {kind} '{label}' ({duration:.2f}s)")
+
+
+# Global profiler shared by the scheduler, the middleware and the admin API
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling sampled HTTP requests while the profiler is armed."""
+    
+    def __init__(self, app, profiler_instance: Profiler = None):
+        self.app = app
+        self.profiler = profiler_instance or profiler
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.requests_armed:
+            await self.app(scope, receive, send)
+            return
+        
+        with self.profiler.request(scope.get("path", "")):
+            await self.app(scope, receive, send)
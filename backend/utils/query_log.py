@@ -0,0 +1,241 @@
+"""SQL statement timing, slow-query log and per-fingerprint aggregates."""
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from config import get_settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_PARAM_RE = re.compile(r"%\([^)]+\)s|:\w+|\$\d+|%s")
+
+# Longest parameter repr written to the slow-query log
+_MAX_PARAMS_CHARS = 500
+# Statement text -> fingerprint cache size
+_FINGERPRINT_CACHE_SIZE = 2048
+
+SORT_KEYS = ("total_ms", "mean_ms", "max_ms", "count", "slow_count")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so executions differing only in values group together.
+    
+    Literals and placeholders become ``?`` and ``IN (?, ?, ...)`` lists
+    collapse to ``IN (?...)``.
+    """
+    text = _WHITESPACE_RE.sub(" ", statement).strip()
+    text = _STRING_RE.sub("?", text)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    return _IN_LIST_RE.sub("IN (?...)", text)
+
+
+class QueryStats:
+    """
+    Aggregate statement timings per fingerprint and log slow ones.
+    
+    Plans of slow SELECTs are captured by a background thread on a separate
+    connection, so the request that ran the slow statement never waits on
+    EXPLAIN.
+    """
+    
+    def __init__(self, max_fingerprints: int = None):
+        self.max_fingerprints = max_fingerprints or settings.query_stats_max_fingerprints
+        self._stats: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # Least recently seen first
+        self._fingerprints: "OrderedDict[str, str]" = OrderedDict()
+        self._explaining = set()  # Fingerprints whose plan is being captured
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def record(
+        self,
+        statement: str,
+        elapsed: float,
+        parameters: Any = None,
+        explain=None,
+        executemany: bool = False
+    ):
+        """
+        Record one execution.
+        
+        Args:
+            statement: SQL as sent to the driver
+            elapsed: Execution time in seconds
+            parameters: Bound parameters (logged for slow statements)
+            explain: Callable returning the plan lines, run in the background
+                for slow SELECTs whose plan hasn't been captured yet
+            executemany: Whether this was a bulk execution
+        """
+        elapsed_ms = elapsed * 1000.0
+        is_slow = elapsed_ms >= settings.slow_query_ms
+        key = self._fingerprint(statement)
+        
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    # Make room by forgetting the least recently seen statement
+                    self._stats.popitem(last=False)
+                stats = self._stats[key] = {
+                    "fingerprint": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "slow_count": 0, "last_seen": None, "plan": None
+                }
+            else:
+                self._stats.move_to_end(key)
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["last_seen"] = datetime.now()
+            if not is_slow:
+                return
+            
+            stats["slow_count"] += 1
+            plan = stats["plan"]
+            explain_now = (
+                plan is None and explain is not None and not executemany and settings.slow_query_explain
+                and key not in self._explaining and key.lstrip().upper().startswith("SELECT")
+            )
+            if explain_now:
+                self._explaining.add(key)
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        
+        if explain_now:
+            self._executor.submit(self._capture_plan, key, explain)
+        
+        params = repr(parameters)
+        if len(params) > _MAX_PARAMS_CHARS:
+            params = params[:_MAX_PARAMS_CHARS] + "..."
+        logger.warning(
+            f"Slow query ({elapsed_ms:.1f} ms): {_WHITESPACE_RE.sub(' ', statement).strip()} | params={params}"
+            + (f" | plan: {' / '.join(plan)}" if plan else ""),
+            extra={"query_ms": round(elapsed_ms, 1), "fingerprint": key, "plan": plan}
+        )
+    
+    def wait_for_plans(self):
+        """Block until the plans requested so far are captured."""
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            executor.submit(lambda: None).result()
+    
+    def _capture_plan(self, key: str, explain):
+        """Run EXPLAIN for a slow statement and store and log its plan."""
+        try:
+            plan = explain()
+        except Exception as e:
+            plan = [f"EXPLAIN failed: {e}"]
+        
+        with self._lock:
+            self._explaining.discard(key)
+            if key in self._stats:
+                self._stats[key]["plan"] = plan
+        logger.warning(
+            f"Plan of slow query {key}: {' / '.join(plan)}",
+            extra={"fingerprint": key, "plan": plan}
+        )
+    
+    def snapshot(self, sort: str = "total_ms", limit: int = 50) -> List[Dict[str, Any]]:
+        """Aggregates sorted by ``sort`` (one of SORT_KEYS), largest first."""
+        with self._lock:
+            rows = [
+                {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                    "mean_ms": round(stats["total_ms"] / stats["count"], 3),
+                    "last_seen": stats["last_seen"].isoformat() if stats["last_seen"] else None,
+                }
+                for stats in self._stats.values()
+            ]
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows[:limit]
+    
+    def reset(self):
+        """Forget all aggregates."""
+        with self._lock:
+            self._stats.clear()
+            self._explaining.clear()
+    
+    def _fingerprint(self, statement: str) -> str:
+        """Cached fingerprint - compiled statements repeat verbatim."""
+        with self._lock:
+            cached = self._fingerprints.get(statement)
+            if cached is not None:
+                self._fingerprints.move_to_end(statement)
+                return cached
+        
+        key = fingerprint(statement)
+        with self._lock:
+            self._fingerprints[statement] = key
+            if len(self._fingerprints) > _FINGERPRINT_CACHE_SIZE:
+                self._fingerprints.popitem(last=False)
+        return key
+
+
+def _explainer(engine, statement: str, parameters: Any):
+    """Build a callable running EXPLAIN on its own pooled connection (raw, so no event recursion)."""
+    def explain() -> List[str]:
+        dialect = engine.dialect.name
+        prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters or ())
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            connection.close()
+        if dialect == "sqlite":
+            # (id, parent, notused, detail)
+            return [str(row[-1]) for row in rows]
+        return [" ".join(str(col) for col in row) for row in rows]
+    return explain
+
+
+def instrument_engine(engine, stats: Optional[QueryStats] = None):
+    """Time every statement executed through the engine."""
+    from sqlalchemy import event
+    
+    stats = stats or query_stats
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        is_slow = elapsed * 1000.0 >= settings.slow_query_ms
+        stats.record(
+            statement,
+            elapsed,
+            parameters=parameters,
+            explain=_explainer(conn.engine, statement, parameters) if is_slow else None,
+            executemany=executemany
+        )
+    
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+# Global aggregates for the application engine
+query_stats = QueryStats()
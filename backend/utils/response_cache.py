@@ -0,0 +1,212 @@
+"""Versioned response cache with ETag revalidation for polled dashboard endpoints.
+
+Dashboards poll the job list and stats far more often than jobs change. A
+process-wide data version is bumped whenever stored jobs or resumes change
+(new jobs queued or processed, a resume replaced or deleted, retention, or a
+change another process made, seen by the scheduler's poll). Responses of the
+cached GET paths are kept per route and normalized query string, tagged with
+the version they were computed at.
+
+ETags come from the data fingerprint (row counts and newest update times of
+jobs and resumes) rather than the local version, so every API process tags
+the same data alike and a poll answered by another worker still gets a 304.
+After a local bump the fingerprint is re-read before the next ETag is issued:
+
+- ``If-None-Match`` with the current ETag -> 304, no body
+- same route and query at the current version -> the stored body
+- anything else -> the route runs and its 200 response is stored
+
+Bumping the version invalidates every entry at once; stale entries are
+overwritten or fall out of the LRU.
+"""
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders
+from config import get_settings
+from database import SessionLocal
+from models import Job, Resume
+from utils.logger import get_logger
+from utils.metrics import RESPONSE_CACHE
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# GET paths whose responses depend only on the query string and the stored jobs / resumes
+CACHED_PATHS = ("/api/jobs", "/api/jobs/stats/summary", "/api/jobs/facets/skills")
+
+
+class ResponseCache:
+    """Data version plus stored response bodies keyed by route and query."""
+    
+    def __init__(self, max_entries: int = None, session_factory=SessionLocal):
+        self.max_entries = max_entries or settings.response_cache_max_entries
+        self.session_factory = session_factory
+        self._version = 0
+        self._fingerprint = None
+        self._etag: Optional[str] = None  # None until the fingerprint is (re)read
+        self._entries: "OrderedDict[Tuple, Tuple[int, list, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def version(self) -> int:
+        return self._version
+    
+    @property
+    def etag(self) -> Optional[str]:
+        """ETag of the current data (None when the fingerprint must be re-read first)."""
+        return self._etag
+    
+    def bump(self, reason: str = ""):
+        """Invalidate every cached response; the next request re-reads the fingerprint."""
+        self._bump(reason)
+        self._etag = None
+    
+    def _bump(self, reason: str):
+        with self._lock:
+            self._version += 1
+        logger.debug(f"Response cache version {self._version} ({reason})")
+    
+    def observe(self, fingerprint: Any):
+        """Bump if a summary of the stored data changed since the last call (first call sets the baseline)."""
+        if fingerprint != self._fingerprint:
+            if self._fingerprint is not None:
+                self._bump("data changed")
+            self._fingerprint = fingerprint
+        digest = hashlib.sha1(repr(fingerprint).encode("utf-8")).hexdigest()[:16]
+        self._etag = f'"{digest}"'
+    
+    @staticmethod
+    def fingerprint(db: Session) -> Tuple:
+        """Row counts and newest update times of jobs and resumes, the same in every process."""
+        # classified_at has sub-second precision, unlike the database-stamped updated_at
+        jobs = db.query(func.count(Job.id), func.max(Job.updated_at), func.max(Job.classified_at)).one()
+        resumes = db.query(func.count(Resume.id), func.max(Resume.id), func.max(Resume.updated_at)).one()
+        return tuple(jobs) + tuple(resumes)
+    
+    def reload(self):
+        """Re-read the fingerprint from the database."""
+        db: Session = self.session_factory()
+        try:
+            self.observe(self.fingerprint(db))
+        finally:
+            db.close()
+    
+    @staticmethod
+    def key(path: str, query_string: bytes) -> Tuple:
+        """Route plus the query parameters in a canonical order (blank values dropped)."""
+        params = parse_qsl(query_string.decode("latin-1"), keep_blank_values=False)
+        return (path, tuple(sorted(params)))
+    
+    def get(self, key: Tuple) -> Optional[Tuple[list, bytes]]:
+        """Headers and body stored at the current version."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self._version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+    
+    def put(self, key: Tuple, version: int, headers: list, body: bytes):
+        """Store a response computed at version (ignored if the data changed meanwhile)."""
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = (version, headers, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop the stored responses and forget the fingerprint."""
+        with self._lock:
+            self._entries.clear()
+        self._fingerprint = None
+        self._etag = None
+    
+    def stats(self) -> Dict[str, int]:
+        return {"version": self._version, "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving CACHED_PATHS from the response cache."""
+    
+    def __init__(self, app, cache: ResponseCache = None):
+        self.app = app
+        self.cache = cache or response_cache
+    
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in CACHED_PATHS
+            or not settings.response_cache_enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        if self.cache.etag is None:
+            try:
+                await asyncio.to_thread(self.cache.reload)
+            except Exception as e:
+                logger.error(f"Could not read the data fingerprint, not caching: {e}")
+                await self.app(scope, receive, send)
+                return
+        
+        version = self.cache.version
+        etag = self.cache.etag
+        
+        if _matches(Headers(scope=scope).get("if-none-match"), etag):
+            RESPONSE_CACHE.labels(outcome="not_modified").inc()
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        key = self.cache.key(scope["path"], scope.get("query_string", b""))
+        cached = self.cache.get(key)
+        if cached is not None:
+            RESPONSE_CACHE.labels(outcome="hit").inc()
+            headers, body = cached
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        RESPONSE_CACHE.labels(outcome="miss").inc()
+        response = {"status": None, "headers": None, "chunks": []}
+        
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                if message["status"] == 200:
+                    headers = MutableHeaders(scope=message)
+                    headers["etag"] = etag
+                    headers["cache-control"] = "no-cache"
+                    response["headers"] = list(message["headers"])
+            elif message["type"] == "http.response.body" and response["status"] == 200:
+                response["chunks"].append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    self.cache.put(key, version, response["headers"], b"".join(response["chunks"]))
+            await send(message)
+        
+        await self.app(scope, receive, capture)
+
+
+# Global response cache
+response_cache = ResponseCache()
@@ -0,0 +1,63 @@
+"""Token counting helpers for prompt budgeting."""
+import math
+import re
+from functools import lru_cache
+from config import get_settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Rough average for English prose when no tokenizer is available
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache()
+def _get_encoding():
+    """Load the tiktoken encoding once; None if tiktoken is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(settings.tokenizer_encoding)
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable ({e}); estimating tokens from characters")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens in text."""
+    if not text:
+        return 0
+    
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to at most max_tokens tokens.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget
+    
+    Returns:
+        The text itself if it fits, otherwise its longest prefix within budget
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    
+    encoding = _get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        # Cut on a word boundary
+        cut = text[:max_chars]
+        return re.sub(r"\s+\S*$", "", cut) or cut
+    
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
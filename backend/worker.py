@@ -0,0 +1,451 @@
+"""Pipeline worker - advances queued jobs through the processing stages.
+
+Run standalone workers next to the API to scale scoring:
+
+    python worker.py                  # one worker process
+    python worker.py --processes 4    # four worker processes on this box
+    python worker.py --once           # drain the queue and exit
+"""
+import argparse
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from config import get_settings
+from database import SessionLocal, init_db
+from models import Job, Resume, JobStatus, JobLabel
+from services import JobNormalizer
+from services.job_deduplicator import deduplicator as shared_deduplicator
+from services.embedding_store import embedding_store
+from services.job_normalizer import NormalizedJob
+from services.job_queue import JobQueue
+from services.job_scorer import JobScorer
+from services.profile_scores import ProfileScores
+from services.skill_index import SkillIndex
+from pipeline.langgraph_pipeline import score_job, classify_job
+from utils import get_logger, configure_logging
+from utils.metrics import NODE_SECONDS, DEDUPE_DROPS
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class PipelineWorker:
+    """Lease queued jobs and advance them PENDING -> NORMALIZED -> SCORED -> CLASSIFIED."""
+    
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        queue: JobQueue = None,
+        deduplicator=None,
+        batch_size: int = None,
+        lease_seconds: int = None
+    ):
+        self.session_factory = session_factory
+        self.queue = queue or JobQueue()
+        self.deduplicator = deduplicator or shared_deduplicator
+        self.batch_size = batch_size or settings.queue_batch_size
+        self.lease_seconds = lease_seconds or settings.queue_lease_seconds
+        self._boilerplate_loaded_at: Optional[float] = None  # monotonic time of the last load
+    
+    def run_once(self) -> Dict[str, int]:
+        """
+        Lease one batch and advance it as far as possible.
+        
+        Returns:
+            Per-stage counts for the batch (``leased`` is 0 when the queue is empty)
+        """
+        db: Session = self.session_factory()
+        # Leased rows are ours - no need to reload them after every per-job commit
+        db.expire_on_commit = False
+        
+        try:
+            jobs = self.queue.lease(db, self.batch_size, self.lease_seconds)
+            if not jobs:
+                return {"leased": 0}
+            
+            resumes = db.query(Resume).order_by(Resume.id).all()
+            if not resumes:
+                logger.warning("No resume found - leaving queued jobs for later")
+                self.queue.release(db, jobs, delay_seconds=self.lease_seconds)
+                db.commit()
+                return {"leased": 0}
+            
+            self._refresh_boilerplate(db)
+            return self.process(db, jobs, resumes)
+        finally:
+            db.close()
+    
+    def _refresh_boilerplate(self, db: Session):
+        """Reload the learned boilerplate set every ``boilerplate_refresh_seconds``, so every process compresses alike."""
+        now = time.monotonic()
+        if (self._boilerplate_loaded_at is not None
+                and now - self._boilerplate_loaded_at < settings.boilerplate_refresh_seconds):
+            return
+        try:
+            JobNormalizer.load_boilerplate(db)
+            self._boilerplate_loaded_at = now
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not load boilerplate paragraphs: {e}")
+    
+    def drain(self, max_batches: int = None) -> Dict[str, int]:
+        """Run batches until the queue has nothing ready, returning summed counts."""
+        totals: Dict[str, int] = {}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            stats = self.run_once()
+            if not stats.get("leased"):
+                break
+            batches += 1
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+    
+    def run_forever(self, stop_event: threading.Event):
+        """Process batches until stop_event is set, sleeping while the queue is empty."""
+        logger.info(f"Worker {self.queue.owner} started (batch size {self.batch_size})")
+        while not stop_event.is_set():
+            try:
+                stats = self.run_once()
+            except Exception as e:
+                logger.error(f"Worker batch error: {e}")
+                stats = {}
+            if not stats.get("leased"):
+                stop_event.wait(settings.queue_poll_interval_seconds)
+        logger.info(f"Worker {self.queue.owner} stopped")
+    
+    def process(self, db: Session, jobs: List[Job], resumes: List[Resume]) -> Dict[str, int]:
+        """
+        Advance leased jobs stage by stage, committing after each stage.
+        
+        Args:
+            db: Database session holding the leased jobs
+            jobs: Leased jobs
+            resumes: Resume profiles every job is scored against
+        
+        Returns:
+            Per-stage counts
+        """
+        stats = {
+            "leased": len(jobs), "normalized": 0, "duplicates": 0, "scored": 0,
+            "classified": 0, "failed": 0, "deferred": 0,
+            "llm_pairs": 0, "prefiltered_pairs": 0,
+            "prompt_tokens": 0, "completion_tokens": 0
+        }
+        deferred: List[Job] = []
+        
+        stages = (
+            (JobStatus.PENDING, lambda batch: self._normalize(db, batch, stats)),
+            (JobStatus.NORMALIZED, lambda batch: deferred.extend(self._score(db, batch, resumes, stats))),
+            (JobStatus.SCORED, lambda batch: self._classify(db, batch, stats)),
+        )
+        
+        try:
+            for stage, run in stages:
+                batch = [job for job in jobs if self.queue.stage_of(job) == stage and job not in deferred]
+                if not batch:
+                    continue
+                try:
+                    run(batch)
+                except Exception as e:
+                    db.rollback()
+                    self.deduplicator.invalidate()
+                    logger.error(f"Stage {stage.value} failed for {len(batch)} jobs: {e}")
+                    for job in batch:
+                        if job.status != JobStatus.FAILED:
+                            self.queue.fail(db, job, stage, e)
+                            stats["failed"] += 1
+                    db.commit()
+                
+                # Keep the lease alive before the next (possibly slow) stage
+                self.queue.extend(db, jobs, self.lease_seconds)
+                db.commit()
+        finally:
+            self.queue.release(db, deferred, delay_seconds=int(settings.queue_poll_interval_seconds * 2))
+            self.queue.release(db, jobs)
+            db.commit()
+        
+        stats["deferred"] = len(deferred)
+        logger.info(
+            f"Worker batch: {stats['normalized']} normalized ({stats['duplicates']} duplicates), "
+            f"{stats['scored']} scored ({stats['llm_pairs']} LLM pairs, {stats['prefiltered_pairs']} prefiltered), "
+            f"{stats['classified']} classified, "
+            f"{stats['failed']} failed, {stats['deferred']} deferred"
+        )
+        return stats
+    
+    def _normalize(self, db: Session, jobs: List[Job], stats: Dict[str, int]):
+        """PENDING -> NORMALIZED: link near-duplicates and learn boilerplate."""
+        matches = [None] * len(jobs)
+        if settings.dedupe_enabled:
+            with NODE_SECONDS.labels(node="dedupe_batch").time():
+                self.deduplicator.refresh(db)
+                matches = self.deduplicator.match_batch([self._normalized(job) for job in jobs])
+        
+        for job, match in zip(jobs, matches):
+            if match and match["match"]:
+                job.canonical_job_id = match["match"]["job_id"]
+                DEDUPE_DROPS.labels(scope="stored").inc()
+            elif match and match["batch_index"] is not None:
+                job.canonical_job_id = jobs[match["batch_index"]].id
+                DEDUPE_DROPS.labels(scope="batch").inc()
+            else:
+                if match:
+                    self.deduplicator.add(db, job, match["signature"])
+                JobNormalizer.record_paragraphs(db, job.description)
+            
+            if job.canonical_job_id:
+                stats["duplicates"] += 1
+            self.queue.advance(job, JobStatus.NORMALIZED)
+            stats["normalized"] += 1
+        
+        db.commit()
+    
+    def _score(self, db: Session, jobs: List[Job], resumes: List[Resume], stats: Dict[str, int]) -> List[Job]:
+        """
+        NORMALIZED -> SCORED: copy canonical scores, score the rest against every profile.
+        
+        Each job/profile score is committed as soon as it lands, so a crash
+        never pays for the same LLM call twice.
+        
+        Returns:
+            Duplicates whose canonical job isn't scored yet (retried later)
+        """
+        to_score = [job for job in jobs if not job.canonical_job_id]
+        duplicates = [job for job in jobs if job.canonical_job_id]
+        
+        # Duplicates whose canonical is gone for good stand on their own
+        for job in duplicates:
+            canonical = db.get(Job, job.canonical_job_id)
+            if canonical is None or (canonical.status == JobStatus.FAILED
+                                     and (canonical.attempts or 0) >= settings.queue_max_attempts):
+                job.canonical_job_id = None
+                to_score.append(job)
+        duplicates = [job for job in duplicates if job.canonical_job_id]
+        
+        if to_score:
+            db.commit()
+            # Embed first - the profile prefilter compares these vectors with the resumes
+            self._embed(db, to_score)
+            self._score_own(db, to_score, resumes, stats)
+        
+        # Canonicals in this batch are scored by now - copy their scores over
+        deferred = []
+        for job in duplicates:
+            canonical = db.get(Job, job.canonical_job_id)
+            if canonical.status in (JobStatus.SCORED, JobStatus.CLASSIFIED):
+                job.score = canonical.score
+                job.keywords_matched = canonical.keywords_matched
+                job.llm_reasoning = canonical.llm_reasoning
+                ProfileScores.copy(db, canonical, job)
+                self.queue.advance(job, JobStatus.SCORED)
+                stats["scored"] += 1
+            else:
+                deferred.append(job)
+        db.commit()
+        
+        return deferred
+    
+    def _score_own(self, db: Session, jobs: List[Job], resumes: List[Resume], stats: Dict[str, int]):
+        """
+        Score jobs against every profile, committing each job/profile score as it completes.
+        
+        With embeddings on, one jobs x resumes similarity matrix picks the
+        pairs worth an LLM call; pairs below ``profile_prefilter_similarity``
+        get the keyword score instead. Pairs scored by an earlier attempt are
+        kept. A job is SCORED once all its profiles are, carrying the best one.
+        """
+        scores = ProfileScores.existing(db, [job.id for job in jobs])
+        similarities = self._similarities(db, jobs, resumes)
+        cutoff = settings.profile_prefilter_similarity
+        
+        pairs = []
+        for i, job in enumerate(jobs):
+            for j, resume in enumerate(resumes):
+                if resume.id in scores[job.id]:
+                    continue
+                similarity = None
+                if similarities is not None and not np.isnan(similarities[i, j]):
+                    similarity = round(float(similarities[i, j]), 4)
+                if similarity is not None and similarity < cutoff:
+                    score, details = JobScorer.keyword_score(self._normalized(job), self._resume_data(resume))
+                    scores[job.id][resume.id] = ProfileScores.record(db, job, resume, score, details, similarity, prefiltered=True)
+                    stats["prefiltered_pairs"] += 1
+                else:
+                    pairs.append((job, resume, similarity))
+        db.commit()
+        
+        failed = set()
+        if pairs:
+            # Compressed once per job, shared by all of its profiles
+            compressed = {}
+            for job, _, _ in pairs:
+                if job.id not in compressed:
+                    compressed[job.id] = JobNormalizer.compress_description(job.description)
+            
+            workers = max(1, min(settings.scoring_concurrency, len(pairs)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="score") as executor:
+                futures = {
+                    executor.submit(score_job, self._state(job, self._resume_data(resume), compressed[job.id])): (job, resume, similarity)
+                    for job, resume, similarity in pairs
+                }
+                for future in as_completed(futures):
+                    job, resume, similarity = futures[future]
+                    update = future.result()  # score_job isolates its own errors
+                    if update.get("error"):
+                        if job.id not in failed:
+                            failed.add(job.id)
+                            self.queue.fail(db, job, JobStatus.NORMALIZED, update["error"])
+                            stats["failed"] += 1
+                    else:
+                        details = update.get("score_details", {})
+                        scores[job.id][resume.id] = ProfileScores.record(db, job, resume, update["score"], details, similarity)
+                        stats["llm_pairs"] += 1
+                        usage = details.get("usage") or {}
+                        stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+                        stats["completion_tokens"] += usage.get("completion_tokens", 0)
+                    db.commit()
+        
+        for job in jobs:
+            if job.id in failed:
+                continue
+            ProfileScores.apply_best(job, list(scores[job.id].values()))
+            self.queue.advance(job, JobStatus.SCORED)
+            stats["scored"] += 1
+        db.commit()
+    
+    @staticmethod
+    def _similarities(db: Session, jobs: List[Job], resumes: List[Resume]) -> Optional[np.ndarray]:
+        """Jobs x resumes embedding similarities for the prefilter, or None when it is off."""
+        if not settings.embedding_enabled or settings.profile_prefilter_similarity <= 0:
+            return None
+        try:
+            return embedding_store.similarity_matrix(db, jobs, resumes)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Profile prefilter unavailable, scoring every pair with the LLM: {e}")
+            return None
+    
+    def _embed(self, db: Session, jobs: List[Job]):
+        """Store embeddings of jobs about to be scored (optional - failures are only logged)."""
+        if not settings.embedding_enabled or not jobs:
+            return
+        try:
+            with NODE_SECONDS.labels(node="embed_batch").time():
+                embedding_store.embed_jobs(db, jobs)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            embedding_store.invalidate()
+            logger.error(f"Embedding {len(jobs)} jobs failed: {e}")
+    
+    def _classify(self, db: Session, jobs: List[Job], stats: Dict[str, int]):
+        """SCORED -> CLASSIFIED."""
+        now = datetime.now()
+        for job in jobs:
+            update = classify_job({"score": job.score or 0.0, "job_id": job.job_id, "error": ""})
+            if update.get("error"):
+                self.queue.fail(db, job, JobStatus.SCORED, update["error"])
+                stats["failed"] += 1
+                continue
+            
+            job.label = JobLabel(update["label"])
+            job.classified_at = now
+            self.queue.advance(job, JobStatus.CLASSIFIED)
+            stats["classified"] += 1
+            logger.debug(f"Processed and stored job: {job.job_id} (score: {job.score})")
+        
+        classified = [job for job in jobs if job.status == JobStatus.CLASSIFIED]
+        ProfileScores.classify(db, classified)
+        SkillIndex.index(db, classified)
+        db.commit()
+    
+    @staticmethod
+    def _normalized(job: Job) -> NormalizedJob:
+        """Rebuild the normalized record of a stored job."""
+        return NormalizedJob(
+            job_id=job.job_id,
+            title=job.title,
+            company=job.company,
+            description=job.description,
+            location=job.location or "",
+            type=job.type or "onsite",
+            apply_url=job.apply_url or "",
+            timestamp_fetched=job.timestamp_fetched
+        )
+    
+    @staticmethod
+    def _resume_data(resume: Resume) -> Dict[str, Any]:
+        """Resume data for scoring."""
+        return {"content": resume.content or "", "profile": resume.profile}
+    
+    @classmethod
+    def _state(cls, job: Job, resume_data: Dict[str, Any], compressed_description: str) -> Dict[str, Any]:
+        """Pipeline state for scoring a stored job."""
+        normalized = cls._normalized(job)
+        normalized["compressed_description"] = compressed_description
+        return {
+            "normalized_job": normalized,
+            "resume_data": resume_data,
+            "job_id": job.job_id,
+            "error": "",
+            "duplicate_of": None
+        }
+
+
+def _run_worker_process(batch_size: int, lease_seconds: int):
+    """Entry point of one worker process."""
+    # Forked children don't inherit the log writer thread
+    configure_logging(force=True)
+    
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+    
+    PipelineWorker(batch_size=batch_size, lease_seconds=lease_seconds).run_forever(stop_event)
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Advance queued jobs through the processing pipeline.")
+    parser.add_argument("--batch-size", type=int, default=settings.queue_batch_size, help="Jobs leased per batch")
+    parser.add_argument("--lease-seconds", type=int, default=settings.queue_lease_seconds, help="Lease timeout")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to run on this box")
+    parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+    args = parser.parse_args()
+    
+    configure_logging()
+    init_db()
+    
+    if args.once:
+        stats = PipelineWorker(batch_size=args.batch_size, lease_seconds=args.lease_seconds).drain()
+        logger.info(f"Queue drained: {stats}")
+        return
+    
+    if args.processes <= 1:
+        _run_worker_process(args.batch_size, args.lease_seconds)
+        return
+    
+    processes = [
+        multiprocessing.Process(target=_run_worker_process, args=(args.batch_size, args.lease_seconds))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()